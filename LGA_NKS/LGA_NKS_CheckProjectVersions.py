@@ -1,17 +1,21 @@
 """
 _______________________________________________________________
 
-  LGA_NKS_CheckProjectVersions v1.81 - 2025 - Lega
+  LGA_NKS_CheckProjectVersions v1.92 - 2025 - Lega
   Chequea versiones de todos los proyectos abiertos en Hiero
+  El chequeo del temporizador corre en un hilo del QThreadPool: las
+  carpetas se listan una vez por mtime (indice compartido
+  LGA_NKS_VersionIndex) y la ventana solo se actualiza si cambian las
+  versiones nuevas. La version y el nombre base de cada proyecto salen
+  de la misma gramatica del indice
 _______________________________________________________________
 
 """
 
 import hiero.core
 import hiero.ui
-import re
 import os
-import glob
+import sys
 import datetime
 from PySide2.QtWidgets import (
     QMainWindow,
@@ -27,9 +31,12 @@ from PySide2.QtWidgets import (
     QHBoxLayout,
     QAbstractItemView,
 )
-from PySide2.QtCore import Qt, QTimer
+from PySide2.QtCore import Qt, QTimer, QObject, QRunnable, QThreadPool, Signal, Slot
 from PySide2.QtGui import QFont, QColor
 
+sys.path.append(os.path.dirname(__file__))
+import LGA_NKS_VersionIndex as VersionIndex
+
 # Configuración del temporizador (en minutos)
 INTERVALO_TEMPORIZADOR = 4
 
@@ -40,6 +47,10 @@ temporizador_id = "LGA_CheckProjects_Timer"
 # Variable global para controlar si el temporizador esta habilitado
 is_timer_enabled = True
 
+# Estado del chequeo en segundo plano
+chequeo_en_curso = False
+ultima_firma = None
+
 DEBUG = False
 
 
@@ -49,55 +60,9 @@ def debug_print(*message):
 
 
 def extraer_version(ruta_disco):
-    """Extrae el número de versión de la ruta del archivo en disco"""
-    if not ruta_disco:
-        return "No detectada"
-
-    try:
-        # Obtener el nombre del archivo (sin la ruta completa)
-        nombre_archivo = os.path.basename(ruta_disco)
-
-        # Quitar la extensión .hrox
-        nombre_sin_extension = os.path.splitext(nombre_archivo)[0]
-
-        # Buscar la parte que comienza con 'v' seguida de números al final del nombre
-        resultado = re.search(r"(?:_|-)?(v\d+)$", nombre_sin_extension)
-        if resultado:
-            return resultado.group(1)  # Devuelve 'v###'
-
-        # Si no encuentra 'v', buscar solo números al final después de un guion bajo o guion
-        resultado = re.search(r"(?:_|-)?(\d+)$", nombre_sin_extension)
-        if resultado:
-            return "v" + resultado.group(1)  # Añade 'v' a los números encontrados
-
-        return "No detectada"
-    except Exception as e:
-        debug_print(f"Error al extraer versión: {str(e)}")
-        return "Error"
-
-
-def comparar_versiones(version1, version2):
-    """Compara dos versiones en formato 'v###' y devuelve la mayor"""
-    try:
-        # Extraer solo los números de las versiones
-        match1 = re.search(r"v?(\d+)", version1)
-        match2 = re.search(r"v?(\d+)", version2)
-
-        if not match1 or not match2:
-            return (
-                version1  # Si no se pueden extraer números, devuelve la primera versión
-            )
-
-        num1 = int(match1.group(1))
-        num2 = int(match2.group(1))
-
-        if num1 > num2:
-            return version1
-        else:
-            return version2
-    except Exception as e:
-        debug_print(f"Error al comparar versiones {version1} y {version2}: {str(e)}")
-        return version1  # En caso de error, devuelve la primera versión
+    """Número de versión del archivo en disco (gramática de LGA_NKS_VersionIndex), o -1"""
+    version = VersionIndex.version_number(ruta_disco)
+    return -1 if version is None else version
 
 
 def encontrar_version_mas_alta(ruta_actual):
@@ -106,58 +71,14 @@ def encontrar_version_mas_alta(ruta_actual):
         return "No disponible"
 
     try:
-        # Obtener la carpeta que contiene el archivo actual
-        directorio = os.path.dirname(ruta_actual)
-
-        # Obtener el nombre base del proyecto (sin versión ni extensión)
-        nombre_archivo = os.path.basename(ruta_actual)
-
-        # Extraer la parte base del nombre (antes de la versión)
-        base_match = re.match(r"(.+?)(?:_|-)?v?\d+\.hrox$", nombre_archivo)
-        if not base_match:
-            base_match = re.match(r"(.+?)\.hrox$", nombre_archivo)
-            if not base_match:
-                return "No detectada"
-
-        base_nombre = base_match.group(1)
-
-        # Buscar todos los archivos .hrox en el directorio con el mismo nombre base
-        patron_busqueda = os.path.join(directorio, f"{base_nombre}*v*.hrox")
-        archivos = glob.glob(patron_busqueda)
-
-        # Si no encuentra con el patrón v*.hrox, intentar con cualquier número
-        if not archivos:
-            patron_busqueda = os.path.join(directorio, f"{base_nombre}*[0-9]*.hrox")
-            archivos = glob.glob(patron_busqueda)
-
-        if not archivos:
-            return "No hay otras versiones"
-
-        # Extraer versiones de todos los archivos encontrados
-        version_mas_alta = None
-        archivo_mas_alto = None
-
-        for archivo in archivos:
-            version = extraer_version(archivo)
-            if version == "No detectada" or version == "Error":
-                continue
-
-            if version_mas_alta is None:
-                version_mas_alta = version
-                archivo_mas_alto = archivo
-            else:
-                version_previa = version_mas_alta
-                version_mas_alta = comparar_versiones(version_mas_alta, version)
-
-                if version_mas_alta != version_previa:
-                    archivo_mas_alto = archivo
-
-        if version_mas_alta and archivo_mas_alto:
-            # Devolver la ruta completa del archivo con la versión más alta
-            return archivo_mas_alto
-        else:
+        # Las versiones hermanas salen del indice de la carpeta (listada una vez por mtime)
+        version_mas_alta, archivo_mas_alto = VersionIndex.latest_version(ruta_actual)
+        if version_mas_alta is None:
             return "No detectada"
 
+        # Devolver la ruta completa del archivo con la versión más alta
+        return archivo_mas_alto
+
     except Exception as e:
         debug_print(f"Error al buscar versión más alta: {str(e)}")
         return "Error"
@@ -335,106 +256,9 @@ class ProyectosAbertosDialog(QMainWindow):
             self.close()  # Cerrar la ventana si no hay proyectos abiertos
             return
 
-        # Paso 1: Crear un diccionario de todos los proyectos abiertos agrupados por nombre base
-        proyectos_abiertos_por_base = {}
-
-        for proyecto in proyectos:
-            ruta_disco = proyecto.path()
-            nombre_base = obtener_nombre_base_proyecto(ruta_disco)
-
-            if nombre_base:
-                if nombre_base not in proyectos_abiertos_por_base:
-                    proyectos_abiertos_por_base[nombre_base] = []
-
-                version_num = -1
-                version_str = extraer_version(ruta_disco)
-                if version_str != "No detectada" and version_str != "Error":
-                    match = re.search(r"v?(\d+)", version_str)
-                    if match:
-                        version_num = int(match.group(1))
-
-                proyectos_abiertos_por_base[nombre_base].append(
-                    {
-                        "proyecto": proyecto,
-                        "ruta": ruta_disco,
-                        "version_num": version_num,
-                        "version_str": version_str,
-                    }
-                )
-
-        # Paso 2: Filtrar proyectos que tienen una versión más alta disponible que NO esté ya abierta
-        proyectos_con_version_alta = []
-
-        for proyecto in proyectos:
-            # Obtener nombre de la interfaz
-            nombre_interfaz = proyecto.name()
-
-            # Obtener ruta del disco
-            ruta_disco = proyecto.path()
-            nombre_base = obtener_nombre_base_proyecto(ruta_disco)
-
-            if not nombre_base:
-                continue
-
-            # Extraer versión de la ruta en disco (para comparación)
-            version_actual = extraer_version(ruta_disco)
-
-            # Encontrar la ruta de la versión más alta en disco
-            ruta_version_alta = encontrar_version_mas_alta(ruta_disco)
-
-            # Verificar si tiene una versión más alta que la actual
-            version_actual_num = -1
-            version_alta_num = -1
-
-            try:
-                if version_actual != "No detectada" and version_actual != "Error":
-                    match_actual = re.search(r"v?(\d+)", version_actual)
-                    if match_actual:
-                        version_actual_num = int(match_actual.group(1))
-
-                if (
-                    ruta_version_alta != "No detectada"
-                    and ruta_version_alta != "Error"
-                    and ruta_version_alta != "No disponible"
-                    and ruta_version_alta != "No hay otras versiones"
-                ):
-                    version_alta = extraer_version(ruta_version_alta)
-                    if version_alta != "No detectada" and version_alta != "Error":
-                        match_alta = re.search(r"v?(\d+)", version_alta)
-                        if match_alta:
-                            version_alta_num = int(match_alta.group(1))
-            except Exception as e:
-                debug_print(f"Error al comparar versiones: {str(e)}")
-
-            # Verificar si la versión más alta ya está abierta
-            version_alta_ya_abierta = False
-            if nombre_base in proyectos_abiertos_por_base and version_alta_num > 0:
-                for proyecto_abierto in proyectos_abiertos_por_base[nombre_base]:
-                    if proyecto_abierto["version_num"] == version_alta_num:
-                        version_alta_ya_abierta = True
-                        debug_print(
-                            f"La versión más alta v{version_alta_num} del proyecto {nombre_base} ya está abierta"
-                        )
-                        break
-
-            # Solo incluir proyectos con versión más alta disponible QUE NO ESTÉ YA ABIERTA
-            if (
-                version_actual_num > 0
-                and version_alta_num > 0
-                and version_actual_num < version_alta_num
-                and not version_alta_ya_abierta
-            ):
-                proyectos_con_version_alta.append(
-                    {
-                        "proyecto": proyecto,
-                        "nombre": nombre_interfaz,
-                        "ruta_actual": ruta_disco,
-                        "ruta_alta": ruta_version_alta,
-                    }
-                )
-                debug_print(
-                    f"Proyecto {nombre_interfaz} - Versión actual: v{version_actual_num}, Versión más alta disponible (no abierta): v{version_alta_num}"
-                )
+        proyectos_con_version_alta = buscar_proyectos_con_version_alta(
+            recolectar_proyectos(proyectos)
+        )
 
         # Si no hay proyectos con versiones más altas que no estén ya abiertas, cerrar la ventana
         if not proyectos_con_version_alta:
@@ -604,7 +428,7 @@ def iniciar_temporizador():
     # Crear un nuevo temporizador
     temporizador_global = QTimer()
     temporizador_global.setObjectName(temporizador_id)
-    temporizador_global.timeout.connect(main)
+    temporizador_global.timeout.connect(chequear_en_segundo_plano)
     temporizador_global.start(
         INTERVALO_TEMPORIZADOR * 60 * 1000
     )  # Convertir minutos a milisegundos
@@ -652,56 +476,49 @@ def actualizar_intervalo_temporizador(nuevo_intervalo):
 
 
 def obtener_nombre_base_proyecto(ruta):
-    """Obtiene el nombre base del proyecto sin versión ni extensión"""
+    """
+    Clave del proyecto sin versión: la carpeta más la clave con la que
+    LGA_NKS_VersionIndex agrupa las versiones hermanas. None si no tiene versión.
+    """
     if not ruta:
         return None
-
-    nombre_archivo = os.path.basename(ruta)
-    # Extraer la parte base del nombre (antes de la versión)
-    base_match = re.match(r"(.+?)(?:_|-)?v?\d+\.hrox$", nombre_archivo)
-    if not base_match:
-        base_match = re.match(r"(.+?)\.hrox$", nombre_archivo)
-        if not base_match:
-            return None
-
-    return base_match.group(1)
+    parsed = VersionIndex.parse_versioned_name(os.path.basename(ruta))
+    if not parsed:
+        return None
+    return os.path.normcase(os.path.dirname(os.path.normpath(ruta))), parsed[0]
 
 
-def main():
-    """Función principal que muestra el diálogo con los proyectos abiertos SOLO si hay versiones más altas"""
-    # Iniciar o reiniciar el temporizador
-    iniciar_temporizador()
+def recolectar_proyectos(proyectos=None):
+    """Nombre y ruta de los proyectos abiertos (se llama en el hilo de la UI)"""
+    if proyectos is None:
+        proyectos = hiero.core.projects()
+    return [
+        {"proyecto": proyecto, "nombre": proyecto.name(), "ruta_actual": proyecto.path()}
+        for proyecto in proyectos or []
+    ]
 
-    # Verificar primero si hay proyectos abiertos
-    proyectos = hiero.core.projects()
-    if not proyectos or len(proyectos) == 0:
-        debug_print("No hay proyectos abiertos. No se mostrará la ventana.")
-        return
 
+def buscar_proyectos_con_version_alta(proyectos_info):
+    """
+    Proyectos con una versión más alta en disco que no esté ya abierta.
+    Solo lee el disco (no llama a Hiero), así que puede correr en otro hilo.
+    """
     # Paso 1: Crear un diccionario de todos los proyectos abiertos agrupados por nombre base
     proyectos_abiertos_por_base = {}
 
-    for proyecto in proyectos:
-        ruta_disco = proyecto.path()
+    for proyecto_info in proyectos_info:
+        ruta_disco = proyecto_info["ruta_actual"]
         nombre_base = obtener_nombre_base_proyecto(ruta_disco)
 
         if nombre_base:
             if nombre_base not in proyectos_abiertos_por_base:
                 proyectos_abiertos_por_base[nombre_base] = []
 
-            version_num = -1
-            version_str = extraer_version(ruta_disco)
-            if version_str != "No detectada" and version_str != "Error":
-                match = re.search(r"v?(\d+)", version_str)
-                if match:
-                    version_num = int(match.group(1))
-
             proyectos_abiertos_por_base[nombre_base].append(
                 {
-                    "proyecto": proyecto,
+                    "proyecto": proyecto_info["proyecto"],
                     "ruta": ruta_disco,
-                    "version_num": version_num,
-                    "version_str": version_str,
+                    "version_num": extraer_version(ruta_disco),
                 }
             )
 
@@ -709,40 +526,21 @@ def main():
     # pero que NO estén ya abiertos
     proyectos_con_version_alta = []
 
-    for proyecto in proyectos:
-        nombre_interfaz = proyecto.name()
-        ruta_disco = proyecto.path()
+    for proyecto_info in proyectos_info:
+        nombre_interfaz = proyecto_info["nombre"]
+        ruta_disco = proyecto_info["ruta_actual"]
         nombre_base = obtener_nombre_base_proyecto(ruta_disco)
 
         if not nombre_base:
             continue
 
-        version_actual = extraer_version(ruta_disco)
         ruta_version_alta = encontrar_version_mas_alta(ruta_disco)
 
         # Verificar si tiene una versión más alta que la actual
-        version_actual_num = -1
+        version_actual_num = extraer_version(ruta_disco)
         version_alta_num = -1
-
-        try:
-            if version_actual != "No detectada" and version_actual != "Error":
-                match_actual = re.search(r"v?(\d+)", version_actual)
-                if match_actual:
-                    version_actual_num = int(match_actual.group(1))
-
-            if (
-                ruta_version_alta != "No detectada"
-                and ruta_version_alta != "Error"
-                and ruta_version_alta != "No disponible"
-                and ruta_version_alta != "No hay otras versiones"
-            ):
-                version_alta = extraer_version(ruta_version_alta)
-                if version_alta != "No detectada" and version_alta != "Error":
-                    match_alta = re.search(r"v?(\d+)", version_alta)
-                    if match_alta:
-                        version_alta_num = int(match_alta.group(1))
-        except Exception as e:
-            debug_print(f"Error al comparar versiones: {str(e)}")
+        if ruta_version_alta not in ("No detectada", "Error", "No disponible"):
+            version_alta_num = extraer_version(ruta_version_alta)
 
         # Verificar si la versión más alta ya está abierta
         version_alta_ya_abierta = False
@@ -751,7 +549,7 @@ def main():
                 if proyecto_abierto["version_num"] == version_alta_num:
                     version_alta_ya_abierta = True
                     debug_print(
-                        f"La versión más alta v{version_alta_num} del proyecto {nombre_base} ya está abierta"
+                        f"La versión más alta v{version_alta_num} del proyecto {nombre_interfaz} ya está abierta"
                     )
                     break
 
@@ -764,7 +562,7 @@ def main():
         ):
             proyectos_con_version_alta.append(
                 {
-                    "proyecto": proyecto,
+                    "proyecto": proyecto_info["proyecto"],
                     "nombre": nombre_interfaz,
                     "ruta_actual": ruta_disco,
                     "ruta_alta": ruta_version_alta,
@@ -774,7 +572,11 @@ def main():
                 f"Proyecto {nombre_interfaz} - Versión actual: v{version_actual_num}, Versión más alta disponible (no abierta): v{version_alta_num}"
             )
 
-    # Si no hay proyectos con versiones más altas que no estén ya abiertas, no abrir la ventana
+    return proyectos_con_version_alta
+
+
+def mostrar_proyectos_con_version_alta(proyectos_con_version_alta):
+    """Muestra o actualiza la ventana con los proyectos que tienen versiones nuevas"""
     if not proyectos_con_version_alta:
         debug_print(
             "No hay proyectos con versiones más altas que no estén ya abiertas. No se mostrará la ventana."
@@ -809,5 +611,76 @@ def main():
         ventana_proyectos.show()  # Usar show() en lugar de exec_() para modo no modal
 
 
+class VersionCheckSignals(QObject):
+    resultado = Signal(object)  # lista de proyectos con versión más alta
+
+
+class VersionCheckWorker(QRunnable):
+    """Busca las versiones en disco fuera del hilo de la UI"""
+
+    def __init__(self, proyectos_info):
+        super(VersionCheckWorker, self).__init__()
+        self.proyectos_info = proyectos_info
+        self.signals = VersionCheckSignals()
+
+    @Slot()
+    def run(self):
+        try:
+            resultado = buscar_proyectos_con_version_alta(self.proyectos_info)
+        except Exception as e:
+            debug_print(f"Error en el chequeo de versiones: {str(e)}")
+            resultado = None
+        self.signals.resultado.emit(resultado)
+
+
+def recibir_resultado(resultado, forzar):
+    """Publica el resultado en la UI solo si cambio el conjunto de versiones nuevas"""
+    global chequeo_en_curso, ultima_firma
+    chequeo_en_curso = False
+    if resultado is None:
+        return
+    firma = frozenset(
+        (proyecto_data["ruta_actual"], proyecto_data["ruta_alta"])
+        for proyecto_data in resultado
+    )
+    if firma == ultima_firma and not forzar:
+        debug_print("Sin cambios en las versiones de los proyectos.")
+        return
+    ultima_firma = firma
+    mostrar_proyectos_con_version_alta(resultado)
+
+
+def chequear_en_segundo_plano(forzar=False):
+    """Lanza el chequeo de versiones en el QThreadPool (uno a la vez)"""
+    global chequeo_en_curso
+    if chequeo_en_curso:
+        debug_print("Ya hay un chequeo de versiones en curso.")
+        return
+    proyectos_info = recolectar_proyectos()
+    if not proyectos_info:
+        return
+    chequeo_en_curso = True
+    worker = VersionCheckWorker(proyectos_info)
+    worker.signals.resultado.connect(
+        lambda resultado, forzar=forzar: recibir_resultado(resultado, forzar)
+    )
+    QThreadPool.globalInstance().start(worker)
+
+
+def main():
+    """Función principal que muestra el diálogo con los proyectos abiertos SOLO si hay versiones más altas"""
+    # Iniciar o reiniciar el temporizador
+    iniciar_temporizador()
+
+    # Verificar primero si hay proyectos abiertos
+    proyectos = hiero.core.projects()
+    if not proyectos or len(proyectos) == 0:
+        debug_print("No hay proyectos abiertos. No se mostrará la ventana.")
+        return
+
+    # El chequeo de disco corre en segundo plano; la ventana se muestra al terminar
+    chequear_en_segundo_plano(forzar=True)
+
+
 if __name__ == "__main__":
     main()
@@ -1,7 +1,7 @@
 """
 ______________________________________________________________________________________________
 
-  LGA_NKS_Clip_DisableEXR v1.0 - 2024 - Lega
+  LGA_NKS_Clip_DisableEXR v1.1 - 2024 - Lega
 
   Habilita o deshabilita el clip en el track EXR que se encuentra bajo el playhead.
   
@@ -15,6 +15,11 @@ ________________________________________________________________________________
 
 import hiero.core
 import hiero.ui
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+import LGA_NKS_TimelineIndex as TimelineIndex
 
 DEBUG = False
 
@@ -44,23 +49,15 @@ def find_exr_clip_at_position(position):
         debug_print("No hay una secuencia activa.")
         return None
 
-    # Buscar el track EXR
-    exr_track = None
-    for track in seq.videoTracks():
-        if track.name() == "EXR":
-            exr_track = track
-            break
+    # Buscar el track EXR (indice por intervalos, se arma una vez por secuencia)
+    exr_track = TimelineIndex.sequence_index(seq).track("EXR")
 
     if not exr_track:
         debug_print("No se encontró un track llamado 'EXR'.")
         return None
 
     # Buscar el clip que contiene la posición
-    for item in exr_track.items():
-        if item.timelineIn() <= position < item.timelineOut():
-            return item
-
-    return None
+    return TimelineIndex.item_at(seq, exr_track, position)
 
 def toggle_clip_enabled(clip):
     """
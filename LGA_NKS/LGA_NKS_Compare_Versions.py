@@ -1,7 +1,7 @@
 """
 ______________________________________________________________________
 
-  LGA_NKS_Compare_Versions v1.0 - 2024 - Lega
+  LGA_NKS_Compare_Versions v1.1 - 2024 - Lega
   Crea un nuevo track con una version anterior del clip seleccionado
   y pone al track en modo difference
 ______________________________________________________________________
@@ -10,8 +10,13 @@ ______________________________________________________________________
 
 import hiero.core
 import hiero.ui
+import sys
+from pathlib import Path
 from PySide2.QtGui import QColor
 
+sys.path.append(str(Path(__file__).parent))
+import LGA_NKS_VersionScan_Cache as VersionScanCache
+
 def copy_clip():
     # Obtener la secuencia activa en el timeline
     seq = hiero.ui.activeSequence()
@@ -132,10 +137,12 @@ def scan_and_downgrade_clip_version(clip):
         versions = binItem.items()
         return sorted(versions, key=lambda v: int(v.name().split('_v')[-1]))
 
-    vc = hiero.core.VersionScanner()
     bin_item = clip.source().binItem()
     activeVersion = bin_item.activeVersion()
-    vc.doScan(activeVersion)
+    # Para bajar de version hace falta cualquier version que el bin no tenga
+    if VersionScanCache.needs_version_scan(clip, newer_only=False):
+        vc = hiero.core.VersionScanner()
+        vc.doScan(activeVersion)
 
     versions = get_all_versions(bin_item)
     if versions:
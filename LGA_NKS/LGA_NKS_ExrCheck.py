@@ -0,0 +1,401 @@
+"""
+______________________________________________________________________
+
+  LGA_NKS_ExrCheck v1.01 - Lega Pugliese
+  Validador de archivos EXR en Python puro (reemplaza a exrheader.exe:
+  sin crear un proceso por frame y funciona tambien en Linux y macOS).
+  Lee solo el header y la tabla de offsets (unos KB por frame):
+    - magic number y flags de version (tiled, nombres largos, deep, multipart)
+    - atributos del header: channels, compression, dataWindow, tiles,
+      chunkCount, type
+    - tabla de offsets de cada parte: un offset en cero, fuera del archivo
+      o antes del final de la tabla indica un render cortado o corrupto
+    - el ultimo chunk tiene que entrar completo en el tamaño del archivo
+  No descomprime pixeles: un chunk con datos basura pero bien ubicado
+  no se detecta (exrheader tampoco lo hacia).
+
+  Uso:
+    python LGA_NKS_ExrCheck.py archivo.exr [archivo.exr ...]
+______________________________________________________________________
+
+"""
+
+import os
+import struct
+import sys
+
+EXR_MAGIC = 20000630
+
+VERSION_MASK = 0xFF
+FLAG_TILED = 0x200
+FLAG_LONG_NAMES = 0x400
+FLAG_NON_IMAGE = 0x800
+FLAG_MULTIPART = 0x1000
+KNOWN_FLAGS = FLAG_TILED | FLAG_LONG_NAMES | FLAG_NON_IMAGE | FLAG_MULTIPART
+
+# Lineas por chunk de cada compresion (archivos scanline)
+LINES_PER_CHUNK = {
+    0: 1,  # NONE
+    1: 1,  # RLE
+    2: 1,  # ZIPS
+    3: 16,  # ZIP
+    4: 32,  # PIZ
+    5: 16,  # PXR24
+    6: 32,  # B44
+    7: 32,  # B44A
+    8: 32,  # DWAA
+    9: 256,  # DWAB
+}
+COMPRESSION_NAMES = {
+    0: "none",
+    1: "rle",
+    2: "zips",
+    3: "zip",
+    4: "piz",
+    5: "pxr24",
+    6: "b44",
+    7: "b44a",
+    8: "dwaa",
+    9: "dwab",
+}
+
+# El header casi siempre entra en el primer bloque; si no, se lee de a mas
+HEADER_READ_SIZE = 64 * 1024
+# Un header mas grande que esto es basura (evita leer archivos enteros)
+MAX_HEADER_SIZE = 16 * 1024 * 1024
+
+
+class ExrError(ValueError):
+    """El archivo no es un EXR valido o esta cortado."""
+
+
+class _Reader:
+    """Lectura secuencial del comienzo del archivo, pidiendo mas bytes si hace falta."""
+
+    def __init__(self, handle, file_size):
+        self.handle = handle
+        self.file_size = file_size
+        self.data = handle.read(HEADER_READ_SIZE)
+        self.pos = 0
+
+    def _need(self, count):
+        end = self.pos + count
+        if end <= len(self.data):
+            return
+        if end > self.file_size:
+            raise ExrError("Archivo cortado dentro del header")
+        if end > MAX_HEADER_SIZE:
+            raise ExrError("Header demasiado grande")
+        self.data += self.handle.read(max(end - len(self.data), HEADER_READ_SIZE))
+        if end > len(self.data):
+            raise ExrError("Archivo cortado dentro del header")
+
+    def read(self, count):
+        self._need(count)
+        value = self.data[self.pos : self.pos + count]
+        self.pos += count
+        return value
+
+    def unpack(self, fmt):
+        return struct.unpack(fmt, self.read(struct.calcsize(fmt)))
+
+    def string(self, max_length):
+        """Texto terminado en cero (nombres de atributo y de tipo)."""
+        start = self.pos
+        while True:
+            self._need(1)
+            if self.data[self.pos] == 0:
+                break
+            self.pos += 1
+            if self.pos - start > max_length:
+                raise ExrError("Nombre de atributo demasiado largo")
+        value = self.data[start : self.pos].decode("latin-1")
+        self.pos += 1
+        return value
+
+    def peek_byte(self):
+        self._need(1)
+        return self.data[self.pos]
+
+
+def _parse_channels(value):
+    channels = []
+    pos = 0
+    while pos < len(value) and value[pos] != 0:
+        end = value.index(b"\0", pos)
+        name = value[pos:end].decode("latin-1")
+        pixel_type, _, _, x_sampling, y_sampling = struct.unpack_from(
+            "<iB3sii", value, end + 1
+        )
+        channels.append(
+            {
+                "name": name,
+                "pixel_type": pixel_type,
+                "x_sampling": x_sampling,
+                "y_sampling": y_sampling,
+            }
+        )
+        pos = end + 1 + 16
+    return channels
+
+
+def _parse_attribute(attr_type, value):
+    if attr_type == "chlist":
+        return _parse_channels(value)
+    if attr_type == "compression" or attr_type == "lineOrder":
+        return value[0]
+    if attr_type == "box2i":
+        return struct.unpack("<4i", value)
+    if attr_type == "int":
+        return struct.unpack("<i", value)[0]
+    if attr_type == "tiledesc":
+        x_size, y_size, mode = struct.unpack("<IIB", value)
+        return {"x_size": x_size, "y_size": y_size, "mode": mode}
+    if attr_type == "string":
+        return value.decode("latin-1")
+    return value
+
+
+def _read_headers(reader, flags):
+    """Lista de headers (uno por parte) como {nombre: valor}."""
+    max_name = 255 if flags & FLAG_LONG_NAMES else 31
+    headers = []
+    while True:
+        header = {}
+        while reader.peek_byte() != 0:
+            name = reader.string(max_name)
+            attr_type = reader.string(max_name)
+            (size,) = reader.unpack("<i")
+            if size < 0:
+                raise ExrError(f"Tamaño invalido en el atributo {name}")
+            value = reader.read(size)
+            try:
+                header[name] = _parse_attribute(attr_type, value)
+            except (struct.error, ValueError, IndexError):
+                raise ExrError(f"Atributo {name} ({attr_type}) corrupto")
+        reader.read(1)  # fin del header
+        if not flags & FLAG_MULTIPART:
+            return [header]
+        if not header:
+            # Un header vacio cierra la lista de partes
+            return headers
+        headers.append(header)
+
+
+def _level_count(size, rounding_up):
+    levels = 1
+    while size > 1:
+        size = (size + 1) // 2 if rounding_up else size // 2
+        levels += 1
+    return levels
+
+
+def _level_size(size, level, rounding_up):
+    for _ in range(level):
+        size = (size + 1) // 2 if rounding_up else size // 2
+    return max(size, 1)
+
+
+def _tiled_chunk_count(width, height, tiles):
+    x_size, y_size = tiles["x_size"], tiles["y_size"]
+    if x_size <= 0 or y_size <= 0:
+        raise ExrError("Tamaño de tile invalido")
+    level_mode = tiles["mode"] & 0x0F
+    rounding_up = bool(tiles["mode"] >> 4)
+
+    def tiles_in(w, h):
+        return -(-w // x_size) * -(-h // y_size)
+
+    if level_mode == 0:  # ONE_LEVEL
+        return tiles_in(width, height)
+    if level_mode == 1:  # MIPMAP
+        levels = _level_count(max(width, height), rounding_up)
+        return sum(
+            tiles_in(
+                _level_size(width, level, rounding_up),
+                _level_size(height, level, rounding_up),
+            )
+            for level in range(levels)
+        )
+    if level_mode == 2:  # RIPMAP
+        x_levels = _level_count(width, rounding_up)
+        y_levels = _level_count(height, rounding_up)
+        return sum(
+            tiles_in(
+                _level_size(width, x_level, rounding_up),
+                _level_size(height, y_level, rounding_up),
+            )
+            for x_level in range(x_levels)
+            for y_level in range(y_levels)
+        )
+    raise ExrError(f"Modo de niveles de tile desconocido: {level_mode}")
+
+
+def chunk_count(header, tiled):
+    """Cantidad de entradas de la tabla de offsets de una parte."""
+    if "chunkCount" in header:
+        return header["chunkCount"]
+    if "dataWindow" not in header:
+        raise ExrError("Falta el atributo dataWindow")
+    x_min, y_min, x_max, y_max = header["dataWindow"]
+    width = x_max - x_min + 1
+    height = y_max - y_min + 1
+    if width <= 0 or height <= 0:
+        raise ExrError(f"dataWindow invalido: {header['dataWindow']}")
+    if tiled:
+        if "tiles" not in header:
+            raise ExrError("Falta el atributo tiles")
+        return _tiled_chunk_count(width, height, header["tiles"])
+    compression = header.get("compression")
+    if compression not in LINES_PER_CHUNK:
+        raise ExrError(f"Compresion desconocida: {compression}")
+    return -(-height // LINES_PER_CHUNK[compression])
+
+
+def read_header(file_path, file_size=None):
+    """
+    Lee el header y las tablas de offsets. Devuelve un dict con version,
+    flags, file_size, parts (lista de headers con "chunk_count" y "tiled"
+    agregados) y offsets (una lista por parte). Lanza ExrError si el
+    header esta mal o cortado y OSError si no se puede leer.
+    """
+    with open(file_path, "rb") as handle:
+        if file_size is None:
+            file_size = os.fstat(handle.fileno()).st_size
+        if file_size < 8:
+            raise ExrError("Archivo vacio o cortado")
+        reader = _Reader(handle, file_size)
+        magic, version_field = reader.unpack("<ii")
+        if magic != EXR_MAGIC:
+            raise ExrError("No es un archivo EXR (magic number incorrecto)")
+        version = version_field & VERSION_MASK
+        flags = version_field & ~VERSION_MASK
+        if version != 2:
+            raise ExrError(f"Version de EXR no soportada: {version}")
+        if flags & ~KNOWN_FLAGS:
+            raise ExrError(f"Flags de version desconocidos: {flags:#x}")
+
+        parts = _read_headers(reader, flags)
+        if not parts:
+            raise ExrError("El archivo no tiene partes")
+        for header in parts:
+            part_type = header.get("type")
+            header["tiled"] = (
+                part_type in ("tiledimage", "deeptile")
+                if part_type
+                else bool(flags & FLAG_TILED)
+            )
+            header["chunk_count"] = chunk_count(header, header["tiled"])
+            if "channels" not in header:
+                raise ExrError("Falta el atributo channels")
+
+        offsets = []
+        for header in parts:
+            count = header["chunk_count"]
+            if count < 0:
+                raise ExrError("chunkCount negativo")
+            offsets.append(reader.unpack(f"<{count}Q") if count else ())
+        table_end = reader.pos
+
+        return {
+            "version": version,
+            "flags": flags,
+            "file_size": file_size,
+            "parts": parts,
+            "offsets": offsets,
+            "table_end": table_end,
+            "multipart": bool(flags & FLAG_MULTIPART),
+            "deep": bool(flags & FLAG_NON_IMAGE),
+        }
+
+
+def _check_last_chunk(handle, info, header, offset):
+    """El chunk que mas lejos empieza tiene que terminar dentro del archivo."""
+    if info["deep"] or header.get("type", "").startswith("deep"):
+        # Los chunks deep tienen tablas extra: alcanza con el offset valido
+        return
+    prefix = 4 if info["multipart"] else 0
+    # scanline: y, tamaño / tile: x, y, nivel x, nivel y, tamaño
+    fields = 5 if header["tiled"] else 2
+    handle.seek(offset)
+    data = handle.read(prefix + fields * 4)
+    if len(data) < prefix + fields * 4:
+        raise ExrError("Archivo cortado en el ultimo chunk")
+    (size,) = struct.unpack_from("<i", data, prefix + (fields - 1) * 4)
+    if size < 0 or offset + len(data) + size > info["file_size"]:
+        raise ExrError("Archivo cortado: el ultimo chunk no entra en el archivo")
+
+
+def check_exr(file_path, file_size=None):
+    """
+    Igual que validate_exr pero los errores de lectura (OSError) se propagan:
+    asi quien guarda el resultado distingue un archivo roto de un share que
+    no respondio.
+    """
+    try:
+        info = read_header(file_path, file_size)
+        file_size = info["file_size"]
+        with open(file_path, "rb") as handle:
+            for header, offsets in zip(info["parts"], info["offsets"]):
+                if not offsets:
+                    continue
+                for offset in offsets:
+                    if offset == 0:
+                        # OpenEXR escribe la tabla al cerrar el archivo
+                        return False, "Tabla de offsets incompleta (render sin terminar)"
+                    if offset < info["table_end"] or offset >= file_size:
+                        return False, f"Offset fuera del archivo: {offset}"
+                _check_last_chunk(handle, info, header, max(offsets))
+        return True, ""
+    except ExrError as e:
+        return False, str(e)
+    except struct.error as e:
+        return False, f"Datos corruptos: {e}"
+
+
+def validate_exr(file_path, file_size=None):
+    """
+    (True, "") si el EXR tiene header, tabla de offsets y ultimo chunk
+    completos; (False, motivo) si no.
+    """
+    try:
+        return check_exr(file_path, file_size)
+    except OSError as e:
+        return False, f"No se pudo leer: {e}"
+
+
+def describe(info):
+    """Resumen de una linea por parte (como una version corta de exrheader)."""
+    lines = []
+    for index, header in enumerate(info["parts"]):
+        channels = ",".join(channel["name"] for channel in header["channels"])
+        compression = COMPRESSION_NAMES.get(
+            header.get("compression"), header.get("compression")
+        )
+        lines.append(
+            f"parte {index}: {'tiled' if header['tiled'] else 'scanline'}"
+            f" {compression} dataWindow={header.get('dataWindow')}"
+            f" chunks={header['chunk_count']} channels={channels}"
+        )
+    return lines
+
+
+def main(argv=None):
+    paths = sys.argv[1:] if argv is None else argv
+    if not paths:
+        print(__doc__)
+        return 2
+    failures = 0
+    for path in paths:
+        is_valid, reason = validate_exr(path)
+        print(f"{'OK   ' if is_valid else 'ERROR'} {path}" + (f": {reason}" if reason else ""))
+        if is_valid:
+            for line in describe(read_header(path)):
+                print(f"      {line}")
+        else:
+            failures += 1
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
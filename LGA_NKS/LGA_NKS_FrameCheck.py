@@ -0,0 +1,256 @@
+"""
+______________________________________________________________________
+
+  LGA_NKS_FrameCheck v1.01 - Lega Pugliese
+  Chequeo de frames faltantes y corruptos de una secuencia EXR:
+    - los faltantes salen de un solo listado de la carpeta (LGA_NKS_FrameScan)
+    - los presentes se validan en paralelo (LGA_NKS_ExrCheck) con un pool
+      de hilos: cada validacion es casi toda espera de red, asi que en un
+      share SMB/NFS varios pedidos en vuelo rinden mucho mas que uno
+    - el resultado de cada frame se guarda en una cache SQLite persistente
+      con clave (ruta, tamaño, mtime): volver a chequear un reel despues
+      de re-renderizar una parte solo lee los frames que cambiaron; los
+      errores de lectura (un corte del share) no se guardan
+  La cache es local de cada usuario (APPDATA/LGA/FrameCheck o ~/.lga).
+  No depende de Hiero: lo usan mediaMissingFrames y las herramientas
+  de linea de comandos.
+______________________________________________________________________
+
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+import LGA_NKS_ExrCheck as ExrCheck
+import LGA_NKS_FrameScan as FrameScan
+
+# Variable global para activar o desactivar los prints
+DEBUG = False
+
+
+def debug_print(*message):
+    if DEBUG:
+        print(*message)
+
+
+# Pedidos en vuelo contra el storage: pensado para shares de red
+VALIDATE_WORKERS = 16
+
+CACHE_DB_NAME = "frame_validation_cache.db"
+# Entradas sin revisar en este tiempo se borran al abrir la cache
+CACHE_MAX_AGE_DAYS = 90
+# Parametros por consulta al buscar muchas rutas juntas (limite de SQLite: 999)
+CACHE_LOOKUP_CHUNK = 500
+
+CACHE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS frame_validation (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        is_valid INTEGER NOT NULL,
+        reason TEXT,
+        checked_at REAL NOT NULL
+    )
+"""
+
+_cache_path = None
+_path_lock = threading.Lock()
+_local = threading.local()
+_pruned = False
+_stats_lock = threading.Lock()
+stats = {"cached": 0, "validated": 0, "errors": 0}
+
+
+def _count(key, amount=1):
+    with _stats_lock:
+        stats[key] += amount
+
+
+def get_cache_path():
+    global _cache_path
+    with _path_lock:
+        if _cache_path is None:
+            base = os.environ.get("APPDATA")
+            folder = (
+                os.path.join(base, "LGA", "FrameCheck")
+                if base
+                else os.path.join(os.path.expanduser("~"), ".lga", "FrameCheck")
+            )
+            _cache_path = os.path.join(folder, CACHE_DB_NAME)
+        return _cache_path
+
+
+def set_cache_path(cache_path):
+    """Fuerza la ruta de la cache (diagnostico, pruebas o una cache compartida)."""
+    global _cache_path
+    close_connection()
+    with _path_lock:
+        _cache_path = cache_path
+
+
+def _connection():
+    global _pruned
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        cache_path = get_cache_path()
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        conn = sqlite3.connect(cache_path, timeout=10.0)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(CACHE_SCHEMA)
+        if not _pruned:
+            _pruned = True
+            with conn:
+                deleted = conn.execute(
+                    "DELETE FROM frame_validation WHERE checked_at < ?",
+                    (time.time() - CACHE_MAX_AGE_DAYS * 86400,),
+                ).rowcount
+            if deleted:
+                debug_print(f"Cache de validacion: {deleted} entradas viejas borradas")
+        _local.conn = conn
+    return conn
+
+
+def close_connection():
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        try:
+            conn.close()
+        finally:
+            _local.conn = None
+
+
+def _cached_results(signatures):
+    """
+    {ruta: (is_valid, reason)} de la cache para las rutas cuyo (tamaño, mtime)
+    coincide con signatures {ruta: (size, mtime_ns)}.
+    """
+    results = {}
+    paths = list(signatures)
+    try:
+        conn = _connection()
+        for start in range(0, len(paths), CACHE_LOOKUP_CHUNK):
+            chunk = paths[start : start + CACHE_LOOKUP_CHUNK]
+            rows = conn.execute(
+                "SELECT path, size, mtime_ns, is_valid, reason FROM frame_validation"
+                f" WHERE path IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            for path, size, mtime_ns, is_valid, reason in rows:
+                if signatures[path] == (size, mtime_ns):
+                    results[path] = (bool(is_valid), reason or "")
+    except sqlite3.Error as e:
+        debug_print(f"Error leyendo la cache de validacion: {e}")
+    return results
+
+
+def _store_results(rows):
+    """rows: [(ruta, size, mtime_ns, is_valid, reason)]"""
+    if not rows:
+        return
+    now = time.time()
+    try:
+        conn = _connection()
+        with conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO frame_validation
+                    (path, size, mtime_ns, is_valid, reason, checked_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [row[:3] + (1 if row[3] else 0, row[4], now) for row in rows],
+            )
+    except sqlite3.Error as e:
+        debug_print(f"Error guardando la cache de validacion: {e}")
+
+
+def _signature(entry):
+    """(ruta, (size, mtime_ns)) de un os.DirEntry o una ruta; None si no se puede leer."""
+    path = entry.path if isinstance(entry, os.DirEntry) else entry
+    try:
+        # En Windows DirEntry.stat() sale gratis del listado de la carpeta
+        info = entry.stat() if isinstance(entry, os.DirEntry) else os.stat(path)
+    except OSError as e:
+        return path, None, str(e)
+    return path, (info.st_size, info.st_mtime_ns), ""
+
+
+def _validate(path, signature):
+    """(ruta, is_valid, reason, cacheable): solo se cachea un parseo completo."""
+    try:
+        is_valid, reason = ExrCheck.check_exr(path, signature[0])
+    except OSError as e:
+        return path, False, f"No se pudo leer: {e}", False
+    except Exception as e:
+        return path, False, f"Error al verificar: {e}", False
+    return path, is_valid, reason, True
+
+
+def validate_frames(frames, workers=VALIDATE_WORKERS, use_cache=True):
+    """
+    Valida {frame: os.DirEntry o ruta} y devuelve {frame: (is_valid, reason)}.
+    Solo se leen los frames que no estan en la cache con el mismo tamaño y
+    mtime; el resto se valida en un pool de workers hilos.
+    """
+    if not frames:
+        return {}
+    workers = max(1, min(workers, len(frames)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        signed = list(pool.map(_signature, frames.values()))
+        signatures = {path: signature for path, signature, _ in signed if signature}
+        by_path = _cached_results(signatures) if use_cache else {}
+        _count("cached", len(by_path))
+        for path, signature, error in signed:
+            if signature is None:
+                by_path[path] = (False, f"No se pudo leer: {error}")
+                _count("errors")
+
+        pending = [path for path in signatures if path not in by_path]
+        checked = list(pool.map(_validate, pending, [signatures[p] for p in pending]))
+    _count("validated", len(checked))
+    for path, is_valid, reason, cacheable in checked:
+        by_path[path] = (is_valid, reason)
+        if not cacheable:
+            _count("errors")
+    if use_cache:
+        _store_results(
+            [
+                (path,) + signatures[path] + (is_valid, reason)
+                for path, is_valid, reason, cacheable in checked
+                if cacheable
+            ]
+        )
+    debug_print(
+        f"{len(frames)} frames: {len(frames) - len(checked)} desde la cache, {len(checked)} leidos"
+    )
+    return {
+        frame: by_path[entry.path if isinstance(entry, os.DirEntry) else entry]
+        for frame, entry in frames.items()
+    }
+
+
+def check_sequence(file_path, first_frame, last_frame, workers=VALIDATE_WORKERS, use_cache=True):
+    """
+    Frames faltantes y corruptos de la secuencia de file_path (ruta con el
+    patron de frame) en [first_frame, last_frame]. Devuelve
+    (faltantes, corruptos) donde corruptos es {frame: (ruta, motivo)}.
+    """
+    present_frames, missing_frames = FrameScan.scan_sequence(file_path, first_frame, last_frame)
+    results = validate_frames(present_frames, workers, use_cache)
+    corrupt_frames = {
+        frame: (present_frames[frame].path, reason)
+        for frame, (is_valid, reason) in sorted(results.items())
+        if not is_valid
+    }
+    return missing_frames, corrupt_frames
+
+
+def get_stats():
+    with _stats_lock:
+        return dict(stats)
@@ -0,0 +1,215 @@
+"""
+______________________________________________________________________
+
+  LGA_NKS_FrameCheck_Batch v1.00 - Lega Pugliese
+  Chequeo de frames faltantes y corruptos sin Hiero (por ejemplo de noche
+  en un nodo de render sobre episodios enteros). Usa el mismo nucleo que
+  mediaMissingFrames (LGA_NKS_FrameCheck): un listado por carpeta,
+  validacion EXR en paralelo y la cache por (ruta, tamaño, mtime).
+  Entradas:
+    - carpetas raiz de shots: se recorren y cada secuencia EXR se chequea
+      entre su primer y ultimo frame en disco
+    - --list: archivo de texto con una secuencia por linea,
+      "ruta_con_patron [primer ultimo]" (%04d, #### o @@@@) o una carpeta;
+      las lineas que empiezan con # se ignoran
+    - --edl: EDL CMX3600; solo se chequean las secuencias encontradas en
+      las carpetas raiz cuyo nombre coincide con un FROM CLIP NAME
+      (la EDL no trae rutas ni frames de los archivos)
+  Las secuencias se chequean en paralelo y el reporte se escribe en JSON
+  o CSV (por extension o --format). Sale con 1 si algo falta o esta roto.
+
+  Uso:
+    python LGA_NKS_FrameCheck_Batch.py //server/proyecto/101 --report 101.json
+    python LGA_NKS_FrameCheck_Batch.py --list reel2.txt --report reel2.csv
+    python LGA_NKS_FrameCheck_Batch.py //server/proyecto/101 --edl reel2.edl
+______________________________________________________________________
+
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+import LGA_NKS_FrameCheck as FrameCheck
+import LGA_NKS_FrameScan as FrameScan
+
+# Secuencias chequeadas a la vez (cada una usa su propio pool de validacion)
+SEQUENCE_WORKERS = 4
+# Validaciones en vuelo por secuencia
+FRAME_WORKERS = 8
+
+CSV_COLUMNS = [
+    "path",
+    "first",
+    "last",
+    "total",
+    "missing_count",
+    "missing",
+    "corrupt_count",
+    "corrupt",
+    "error",
+]
+
+_EDL_CLIP_NAME = re.compile(r"^\*\s*FROM CLIP NAME:\s*(.+?)\s*$", re.IGNORECASE)
+
+
+def sequences_under(root):
+    """Todas las secuencias EXR debajo de root: [(patron, primer, ultimo)]."""
+    sequences = []
+    for directory, _, file_names in os.walk(root):
+        if any(name.lower().endswith(".exr") for name in file_names):
+            sequences.extend(
+                sequence[:3] for sequence in FrameScan.find_sequences(directory)
+            )
+    return sequences
+
+
+def read_clip_list(list_path):
+    """Secuencias de un archivo de lista: [(patron, primer, ultimo)]."""
+    sequences = []
+    with open(list_path, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.rsplit(None, 2)
+            if len(parts) == 3 and parts[1].lstrip("-").isdigit() and parts[2].lstrip("-").isdigit():
+                sequences.append((parts[0], int(parts[1]), int(parts[2])))
+            elif os.path.isdir(line):
+                sequences.extend(sequence[:3] for sequence in FrameScan.find_sequences(line))
+            else:
+                # Sin rango: se usa el primer y ultimo frame en disco
+                frames = FrameScan.list_frames(*os.path.split(line))
+                if frames:
+                    sequences.append((line, min(frames), max(frames)))
+                else:
+                    print(f"Linea {line_number}: sin frames para {line}", file=sys.stderr)
+    return sequences
+
+
+def _clip_key(name):
+    """'SHOT_comp_v003.%04d.exr' o 'SHOT_comp_v003' -> 'shot_comp_v003'."""
+    name = os.path.basename(name)
+    name = re.sub(r"[._]?(%0?\d*d|#+|@+)", "", name)
+    return os.path.splitext(name)[0].rstrip("._").lower()
+
+
+def read_edl_clip_names(edl_path):
+    names = set()
+    with open(edl_path, "r", encoding="utf-8", errors="replace") as file:
+        for line in file:
+            match = _EDL_CLIP_NAME.match(line.strip())
+            if match:
+                names.add(_clip_key(match.group(1)))
+    return names
+
+
+def check(sequence, frame_workers, use_cache):
+    file_path, first_frame, last_frame = sequence
+    result = {
+        "path": file_path,
+        "first": first_frame,
+        "last": last_frame,
+        "total": last_frame - first_frame + 1,
+        "missing_count": 0,
+        "missing": "",
+        "corrupt_count": 0,
+        "corrupt": "",
+        "corrupt_frames": [],
+        "error": "",
+    }
+    try:
+        missing_frames, corrupt_frames = FrameCheck.check_sequence(
+            file_path, first_frame, last_frame, frame_workers, use_cache
+        )
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+    result["missing_count"] = len(missing_frames)
+    result["missing"] = FrameScan.compact_ranges(missing_frames)
+    result["corrupt_count"] = len(corrupt_frames)
+    result["corrupt"] = FrameScan.compact_ranges(corrupt_frames)
+    result["corrupt_frames"] = [
+        {"frame": frame, "path": path, "reason": reason}
+        for frame, (path, reason) in corrupt_frames.items()
+    ]
+    return result
+
+
+def write_report(results, report_path, report_format):
+    if report_format == "csv":
+        with open(report_path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(report_path, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chequeo de frames faltantes y corruptos sin Hiero.")
+    parser.add_argument("roots", nargs="*", help="Carpetas raiz de shots.")
+    parser.add_argument("--list", dest="list_path", help="Archivo con una secuencia por linea.")
+    parser.add_argument("--edl", help="EDL: solo las secuencias de sus clips.")
+    parser.add_argument("--report", help="Archivo del reporte (.json o .csv).")
+    parser.add_argument("--format", choices=["json", "csv"], help="Formato del reporte.")
+    parser.add_argument("--sequences", type=int, default=SEQUENCE_WORKERS, help="Secuencias en paralelo.")
+    parser.add_argument("--workers", type=int, default=FRAME_WORKERS, help="Validaciones en paralelo por secuencia.")
+    parser.add_argument("--no-cache", action="store_true", help="No usar la cache de validacion.")
+    args = parser.parse_args(argv)
+
+    if not args.roots and not args.list_path:
+        parser.error("hace falta al menos una carpeta raiz o --list")
+    if args.edl and not args.roots:
+        parser.error("--edl necesita carpetas raiz donde buscar los clips")
+
+    sequences = []
+    for root in args.roots:
+        sequences.extend(sequences_under(root))
+    if args.edl:
+        clip_names = read_edl_clip_names(args.edl)
+        sequences = [sequence for sequence in sequences if _clip_key(sequence[0]) in clip_names]
+        print(f"EDL: {len(clip_names)} clips, {len(sequences)} secuencias encontradas")
+    if args.list_path:
+        sequences.extend(read_clip_list(args.list_path))
+    sequences = sorted(set(sequences))
+
+    start = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, args.sequences)) as pool:
+        futures = [
+            pool.submit(check, sequence, max(1, args.workers), not args.no_cache)
+            for sequence in sequences
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result["missing_count"] or result["corrupt_count"] or result["error"]:
+                print(
+                    f"ERROR {result['path']}: faltantes [{result['missing']}]"
+                    f" corruptos [{result['corrupt']}] {result['error']}"
+                )
+    results.sort(key=lambda result: result["path"])
+
+    failed = [r for r in results if r["missing_count"] or r["corrupt_count"] or r["error"]]
+    print(
+        f"{len(results)} secuencias, {len(failed)} con problemas"
+        f" ({time.perf_counter() - start:.1f} s, {FrameCheck.get_stats()})"
+    )
+    if args.report:
+        report_format = args.format or ("csv" if args.report.lower().endswith(".csv") else "json")
+        write_report(results, args.report, report_format)
+        print(f"Reporte: {args.report}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+______________________________________________________________________
+
+  LGA_NKS_FrameScan v1.01 - Lega Pugliese
+  Busqueda de frames faltantes de una secuencia de imagenes sin un
+  os.path.exists por frame (en SMB/NFS cada uno es un viaje por la red):
+  la carpeta se lista una sola vez con os.scandir, los numeros de frame
+  salen de una expresion regular compilada por patron y los faltantes
+  son la diferencia entre el rango del clip y los frames presentes.
+  find_sequences arma los patrones de las secuencias de una carpeta
+  (para los chequeos sin timeline, como LGA_NKS_FrameCheck_Batch).
+  No depende de Hiero: lo usan mediaMissingFrames y las herramientas
+  de linea de comandos. Benchmark: LGA_NKS_FrameScan_Bench.py
+______________________________________________________________________
+
+"""
+
+import os
+import re
+from functools import lru_cache
+
+# Variable global para activar o desactivar los prints
+DEBUG = False
+
+
+def debug_print(*message):
+    if DEBUG:
+        print(*message)
+
+
+_PADDING = re.compile(r"%0?(\d*)d|#+|@+")
+# nombre.1001.exr -> ("nombre.", "1001", ".exr"): el ultimo numero antes de la extension
+_SEQUENCE_FILE = re.compile(r"^(.*?)(\d+)(\.[^.\d]+)$")
+
+
+@lru_cache(maxsize=256)
+def frame_regex(filename_pattern):
+    """
+    Expresion regular (compilada una vez por patron) que reconoce los archivos
+    de la secuencia y captura el numero de frame. Acepta %04d, %d, #### y @@@@.
+    Con padding fijo se aceptan tambien numeros mas largos (frame 10000 en %04d).
+    """
+    match = _PADDING.search(filename_pattern)
+    if not match:
+        raise ValueError(f"El patron no tiene numero de frame: {filename_pattern}")
+    token = match.group(0)
+    if token.startswith("%"):
+        width = int(match.group(1) or 1)
+    else:
+        width = len(token)
+    digits = r"(-?\d{%d,})" % width if width > 1 else r"(-?\d+)"
+    prefix = re.escape(filename_pattern[: match.start()])
+    suffix = re.escape(filename_pattern[match.end() :])
+    # Los sistemas de archivos de Windows y macOS no distinguen mayusculas
+    return re.compile(prefix + digits + suffix + r"\Z", re.IGNORECASE)
+
+
+def list_frames(directory, filename_pattern):
+    """
+    Lista la carpeta una sola vez y devuelve {frame: os.DirEntry} con los
+    archivos de la secuencia. Una carpeta inexistente devuelve {}.
+    """
+    regex = frame_regex(filename_pattern)
+    frames = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                match = regex.match(entry.name)
+                if match:
+                    frames[int(match.group(1))] = entry
+    except FileNotFoundError:
+        debug_print(f"No existe la carpeta: {directory}")
+    except NotADirectoryError:
+        debug_print(f"No es una carpeta: {directory}")
+    return frames
+
+
+def find_missing_frames(present_frames, first_frame, last_frame):
+    """Frames del rango [first_frame, last_frame] que no estan, ordenados."""
+    return sorted(set(range(first_frame, last_frame + 1)).difference(present_frames))
+
+
+def scan_sequence(file_path, first_frame, last_frame):
+    """
+    Escanea la secuencia de file_path (ruta con el patron de frame, por ejemplo
+    .../shot_v003_%04d.exr). Devuelve (presentes, faltantes): presentes es
+    {frame: os.DirEntry} limitado al rango del clip y faltantes una lista.
+    """
+    directory, filename_pattern = os.path.split(file_path)
+    frames = list_frames(directory or ".", filename_pattern)
+    present = {
+        frame: entry
+        for frame, entry in frames.items()
+        if first_frame <= frame <= last_frame
+    }
+    return present, find_missing_frames(present, first_frame, last_frame)
+
+
+def find_sequences(directory, extensions=(".exr",)):
+    """
+    Secuencias de la carpeta (un solo listado): lista ordenada de
+    (ruta_con_patron, primer_frame, ultimo_frame, cantidad_de_archivos).
+    El patron usa %0Nd con el padding mas corto encontrado.
+    """
+    extensions = tuple(extension.lower() for extension in extensions)
+    groups = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                match = _SEQUENCE_FILE.match(entry.name)
+                if not match or match.group(3).lower() not in extensions:
+                    continue
+                prefix, digits, extension = match.groups()
+                group = groups.setdefault(
+                    (prefix.lower(), extension.lower()),
+                    {"prefix": prefix, "extension": extension, "width": len(digits), "frames": []},
+                )
+                group["width"] = min(group["width"], len(digits))
+                group["frames"].append(int(digits))
+    except OSError as e:
+        debug_print(f"No se pudo listar {directory}: {e}")
+    sequences = []
+    for group in groups.values():
+        pattern = f"{group['prefix']}%0{group['width']}d{group['extension']}"
+        frames = group["frames"]
+        sequences.append(
+            (os.path.join(directory, pattern), min(frames), max(frames), len(frames))
+        )
+    return sorted(sequences)
+
+
+def compact_ranges(frames):
+    """[1001, 1002, 1003, 1004, 1010] -> '1001-1004, 1010'."""
+    ranges = []
+    start = previous = None
+    for frame in sorted(set(frames)):
+        if previous is not None and frame == previous + 1:
+            previous = frame
+            continue
+        if start is not None:
+            ranges.append(str(start) if start == previous else f"{start}-{previous}")
+        start = previous = frame
+    if start is not None:
+        ranges.append(str(start) if start == previous else f"{start}-{previous}")
+    return ", ".join(ranges)
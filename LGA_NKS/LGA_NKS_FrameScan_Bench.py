@@ -0,0 +1,112 @@
+"""
+______________________________________________________________________
+
+  LGA_NKS_FrameScan_Bench v1.00 - Lega Pugliese
+  Benchmark de LGA_NKS_FrameScan contra el chequeo anterior de
+  mediaMissingFrames (un os.path.exists por frame).
+  Crea una carpeta sintetica con una secuencia EXR de archivos vacios
+  (con huecos) y verifica que los dos metodos encuentren los mismos
+  frames faltantes antes de medir. Para medir sobre un share de red,
+  usar --dir con una carpeta del servidor.
+
+  Uso:
+    python LGA_NKS_FrameScan_Bench.py                    100000 archivos en TEMP
+    python LGA_NKS_FrameScan_Bench.py --files 20000 --dir //server/tmp/bench
+______________________________________________________________________
+
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+import LGA_NKS_FrameScan as FrameScan
+
+FILE_PATTERN = "BENCH_101_010_0010_aaa_comp_v001_%04d.exr"
+FIRST_FRAME = 1001
+
+
+def make_sequence(directory, count, gap_ratio=0.01, seed=7):
+    """Crea count frames vacios salteando ~gap_ratio de ellos. Devuelve los faltantes."""
+    random.seed(seed)
+    os.makedirs(directory, exist_ok=True)
+    missing = []
+    for frame in range(FIRST_FRAME, FIRST_FRAME + count):
+        if random.random() < gap_ratio:
+            missing.append(frame)
+            continue
+        open(os.path.join(directory, FILE_PATTERN % frame), "wb").close()
+    return missing
+
+
+def legacy_missing(directory, first_frame, last_frame):
+    """Copia del chequeo anterior de WorkerThread.check_frames (sin validar EXR)."""
+    missing = []
+    for frame in range(first_frame, last_frame + 1):
+        if not os.path.exists(os.path.join(directory, FILE_PATTERN % frame)):
+            missing.append(frame)
+    return missing
+
+
+def scandir_missing(directory, first_frame, last_frame):
+    _, missing = FrameScan.scan_sequence(
+        os.path.join(directory, FILE_PATTERN), first_frame, last_frame
+    )
+    return missing
+
+
+def benchmark(directory, count, repeats=3):
+    last_frame = FIRST_FRAME + count - 1
+    expected = legacy_missing(directory, FIRST_FRAME, last_frame)
+    found = scandir_missing(directory, FIRST_FRAME, last_frame)
+    if found != expected:
+        print("ERROR: los metodos no coinciden")
+        return None
+    print(f"  {count} frames, {len(found)} faltantes: {FrameScan.compact_ranges(found)[:80]}...")
+
+    results = {}
+    for label, function in [
+        ("os.path.exists por frame", legacy_missing),
+        ("os.scandir + regex", scandir_missing),
+    ]:
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            function(directory, FIRST_FRAME, last_frame)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[label] = best
+        print(f"  {label:28s} {best * 1000.0:9.1f} ms")
+    print(
+        f"  mejora: x{results['os.path.exists por frame'] / results['os.scandir + regex']:.1f}"
+    )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del chequeo de frames faltantes.")
+    parser.add_argument("--files", type=int, default=100000, help="Frames de la secuencia.")
+    parser.add_argument("--dir", help="Carpeta donde crear la secuencia (por defecto TEMP).")
+    parser.add_argument("--keep", action="store_true", help="No borrar la carpeta al terminar.")
+    args = parser.parse_args(argv)
+
+    # Siempre una subcarpeta nueva: al terminar se borra entera
+    directory = tempfile.mkdtemp(prefix="framescan_bench_", dir=args.dir)
+    print(f"Creando {args.files} archivos en {directory}...")
+    make_sequence(directory, args.files)
+    try:
+        print("Benchmark de LGA_NKS_FrameScan:")
+        return 0 if benchmark(directory, args.files) else 1
+    finally:
+        if not args.keep:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
 """
 __________________________________________________________
 
-  LGA_NKS_InOut_Editref v1.41 | Lega Pugliese
+  LGA_NKS_InOut_Editref v1.42 | Lega Pugliese
 
   Establece los puntos In y Out de la secuencia activa
   basándose en el clip más cercano del track "EditRef".
@@ -10,13 +10,19 @@ __________________________________________________________
    3. Establece los puntos In y Out basados en ese clip.
    4. Selecciona el clip, mueve el playhead al inicio y ajusta
       la vista para que se ajuste al clip seleccionado.
+  El clip sale del indice por intervalos de LGA_NKS_TimelineIndex.
 __________________________________________________________
 """
 
 import hiero.core
 import hiero.ui
+import os
+import sys
 from PySide2.QtCore import QTimer
 
+sys.path.append(os.path.dirname(__file__))
+import LGA_NKS_TimelineIndex as TimelineIndex
+
 DEBUG = False
 
 
@@ -46,37 +52,15 @@ def set_in_out_from_edit_ref_track():
         return None
 
     # Buscar el track llamado "EditRef" o "EditRefClean"
-    edit_ref_track = None
-    for track in seq.videoTracks():
-        if track.name() == "EditRef":
-            edit_ref_track = track
-            break
-    if not edit_ref_track:
-        for track in seq.videoTracks():
-            if track.name() == "EditRefClean":
-                edit_ref_track = track
-                break
+    index = TimelineIndex.sequence_index(seq)
+    edit_ref_track = index.track("EditRef") or index.track("EditRefClean")
 
     if not edit_ref_track:
         debug_print("No se encontro un track llamado 'EditRef' ni 'EditRefClean'.")
         return None
 
-    # Buscar el clip mas cercano en el track EditRef
-    edit_ref_clip = None
-    min_distance = float("inf")
-    for item in edit_ref_track.items():
-        if item.timelineIn() <= playhead_frame < item.timelineOut():
-            edit_ref_clip = item
-            break
-        else:
-            # Calcular la distancia al playhead
-            if playhead_frame < item.timelineIn():
-                distance = item.timelineIn() - playhead_frame
-            else:
-                distance = playhead_frame - item.timelineOut()
-            if distance < min_distance:
-                min_distance = distance
-                edit_ref_clip = item
+    # Buscar el clip bajo el playhead o el mas cercano en el track EditRef
+    edit_ref_clip = TimelineIndex.nearest_item(seq, edit_ref_track, playhead_frame)
 
     if not edit_ref_clip:
         debug_print("No se encontro ningun clip en el track EditRef.")
@@ -94,7 +78,7 @@ def set_in_out_from_edit_ref_track():
         f"Se ha establecido el in/out de la secuencia a [{ref_in}, {ref_out}] basado en el clip de EditRef mas cercano."
     )
 
-    return edit_ref_clip, edit_ref_track.name()
+    return edit_ref_clip, edit_ref_track.track.name()
 
 
 def seleccionar_y_ajustar_clip(clip, track_name):
@@ -0,0 +1,161 @@
+"""
+______________________________________________________________________
+
+  LGA_NKS_NameParser v1.00 - Lega Pugliese
+  Parser unico de nombres de media (EXR, mov, mxf) con el formato
+  PROYECTO_SEQ_SHOT_..._TASK_vNNN_%04d.exr que usan Pull, Push, Show in
+  Flow, CreateShot, Shot_info, ReviewPic, los paneles y las
+  herramientas de LGA_NKS_Edit.
+  Las expresiones regulares se compilan una vez y cada nombre se
+  parsea una sola vez (cache LRU por nombre de archivo).
+  El comportamiento de cada llamador esta fijado por los casos de
+  LGA_NKS_NameParser_Check.py (conformidad y benchmark).
+______________________________________________________________________
+
+"""
+
+import os
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Nombres distintos que se recuerdan (un timeline grande tiene pocos miles)
+CACHE_SIZE = 8192
+
+_EXR_SEQUENCE = re.compile(r"_%04d\.exr$")
+_EXTENSION = re.compile(r"\.([^.]+)$")
+_VERSION = re.compile(r"_v(\d+)")
+_VERSION_AND_SEQUENCE = re.compile(r"_v\d+_%04d\.exr")
+_FRAME_PATTERN = re.compile(r"[._](%0\d+d|#+)\.[^.]+$")
+
+
+MediaName = namedtuple(
+    "MediaName",
+    [
+        "file_name",  # nombre tal como se parseo
+        "base_name",  # sin _%04d.exr, o sin extension si no es una secuencia EXR
+        "sequence_base",  # sin _%04d.exr; otros formatos conservan la extension
+        "versionless_base",  # sin _vNNN_%04d.exr (carpeta de ReviewPic)
+        "parts",  # base_name separado por "_"
+        "project",  # primer bloque
+        "shot_code",  # primeros 5 bloques
+        "task",  # bloque anterior a la version, en minusculas, o None
+        "version_str",  # "_v003" o "_vUnknown"
+        "version_number",  # 3, o 0 si no hay version
+        "version_digits",  # "003" o "Unknown", buscado en sequence_base
+        "version_token",  # primer bloque exacto vNNN ("v003") o None
+        "frame_pattern",  # "%04d", "####" o None
+        "extension",  # "exr", "mov"... o None
+    ],
+)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_media_name(file_name):
+    """Parsea un nombre de archivo (sin carpeta). El resultado es inmutable y se cachea."""
+    sequence_base = _EXR_SEQUENCE.sub("", file_name)
+    base_name = sequence_base
+    if base_name == file_name:
+        # Archivos de video (mxf, mov, etc): solo se quita la extension
+        base_name = _EXTENSION.sub("", file_name)
+    return _build(file_name, base_name, sequence_base)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_base_name(base_name):
+    """
+    Parsea un nombre base que ya viene sin frame ni extension (el base_name que
+    los paneles le pasan a Push y a los scripts de Assignee): no se recorta nada.
+    """
+    return _build(base_name, base_name, base_name)
+
+
+def _build(file_name, base_name, sequence_base):
+    version_match = _VERSION.search(base_name)
+    if version_match:
+        version_str = "_v" + version_match.group(1)
+        version_number = int(version_match.group(1))
+    else:
+        version_str = "_vUnknown"
+        version_number = 0
+    # CreateShot, Shot_info, ShowInFlow y ReviewPic buscan la version sin quitar
+    # la extension de los videos ("a.comp_v003" tiene version para ellos)
+    if sequence_base != base_name:
+        version_match = _VERSION.search(sequence_base)
+    version_digits = version_match.group(1) if version_match else "Unknown"
+
+    parts = tuple(base_name.split("_"))
+    task = None
+    try:
+        version_index = parts.index(version_str[1:])
+        task = parts[version_index - 1].lower()
+    except ValueError:
+        pass
+    version_token = next(
+        (part for part in parts if part.startswith("v") and part[1:].isdigit()), None
+    )
+
+    frame_match = _FRAME_PATTERN.search(file_name)
+    extension_match = _EXTENSION.search(file_name)
+    return MediaName(
+        file_name=file_name,
+        base_name=base_name,
+        sequence_base=sequence_base,
+        versionless_base=_VERSION_AND_SEQUENCE.sub("", file_name),
+        parts=parts,
+        project=parts[0],
+        shot_code="_".join(parts[:5]),
+        task=task,
+        version_str=version_str,
+        version_number=version_number,
+        version_digits=version_digits,
+        version_token=version_token,
+        frame_pattern=frame_match.group(1) if frame_match else None,
+        extension=extension_match.group(1).lower() if extension_match else None,
+    )
+
+
+def parse_media_path(file_path):
+    """parse_media_name sobre el nombre del archivo de una ruta completa."""
+    return parse_media_name(os.path.basename(file_path))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def extract_version_number(version_str):
+    """Numero del primer _vNNN del texto ("_v003", nombre de version o de archivo), o 0."""
+    match = _VERSION.search(version_str)
+    return int(match.group(1)) if match else 0
+
+
+def parse_exr_name(file_name):
+    """(base_name, version_str) como lo usan Pull y las herramientas de LGA_NKS_Edit."""
+    parsed = parse_media_name(file_name)
+    return parsed.base_name, parsed.version_str
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def strict_exr_base(exr_name):
+    """
+    Nombre base con version de un EXR para los paneles ("..._comp_v003").
+    Acepta tambien "name.%04d.exr". Lanza ValueError si no tiene el formato
+    PROYECTO_SEQ_SHOT_..._vNNN_frame con al menos 7 bloques.
+    """
+    if "%04d" in exr_name:
+        exr_name = exr_name.replace(".%", "_%")
+    parts = exr_name.split("_")
+    if len(parts) < 7 or not parts[-2].startswith("v"):
+        raise ValueError(
+            f"Nombre del archivo EXR no tiene el formato esperado: {exr_name}"
+        )
+    return "_".join(parts[:-1])
+
+
+def cache_info():
+    return parse_media_name.cache_info()
+
+
+def clear_cache():
+    parse_media_name.cache_clear()
+    parse_base_name.cache_clear()
+    extract_version_number.cache_clear()
+    strict_exr_base.cache_clear()
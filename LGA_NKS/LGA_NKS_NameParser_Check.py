@@ -0,0 +1,333 @@
+"""
+______________________________________________________________________
+
+  LGA_NKS_NameParser_Check v1.00 - Lega Pugliese
+  Conformidad y benchmark de LGA_NKS_NameParser.
+  Cada funcion _legacy_* es una copia de la implementacion que tenia
+  cada script antes del parser compartido. La conformidad compara, para
+  un corpus de nombres reales y casos borde, lo que cada llamador
+  obtenia antes con lo que obtiene ahora del parser.
+
+  Uso:
+    python LGA_NKS_NameParser_Check.py                 conformidad
+    python LGA_NKS_NameParser_Check.py --benchmark 5000
+______________________________________________________________________
+
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+import LGA_NKS_NameParser as NameParser
+
+
+# ----------------------------------------------------------------------------
+# Implementaciones anteriores (copiadas sin cambios de cada script)
+# ----------------------------------------------------------------------------
+
+
+def _legacy_extract_version_number(version_str):
+    """Pull, Pull_Plan y las tres herramientas de LGA_NKS_Edit."""
+    match = re.search(r"_v(\d+)(?:[-\(][^)]+)?", version_str)
+    if match:
+        try:
+            return int(match.group(1))
+        except ValueError:
+            pass
+    return 0
+
+
+def _legacy_parse_exr_name(file_name):
+    """Pull_Plan.parse_exr_name y MatchVerToEXR.parse_exr_name."""
+    base_name = re.sub(r"_%04d\.exr$", "", file_name)
+    if base_name == file_name:
+        base_name = re.sub(r"\.[^.]+$", "", file_name)
+    version_match = re.search(r"(_v\d+)", base_name)
+    version_str = version_match.group(1) if version_match else "_vUnknown"
+    return base_name, version_str
+
+
+def _legacy_parse_clip_name(file_name):
+    """CompareVerToEditref / CompareEXR_to_aPlate.parse_clip_name."""
+    base_name = re.sub(r"_%04d\.exr$", "", file_name)
+    if base_name == file_name:
+        base_name = re.sub(r"\.[^.]+$", "", file_name)
+    parts = base_name.split("_")
+    if len(parts) >= 4:
+        base_identifier = "_".join(parts[:4])
+    else:
+        base_identifier = base_name
+    version_match = re.search(r"(_v\d+)", base_name)
+    version_str = version_match.group(1) if version_match else "_vUnknown"
+    return base_identifier, version_str
+
+
+def _legacy_clip_identity(file_name):
+    """Pull_Plan.parse_clip_identity (sin el filtro _comp_)."""
+    base_name, version_str = _legacy_parse_exr_name(file_name)
+    try:
+        parts = base_name.split("_")
+        project_name = parts[0]
+        shot_code = "_".join(parts[:5])
+        version_index = parts.index(version_str[1:])
+        task_name = parts[version_index - 1].lower()
+    except Exception:
+        return None
+    return project_name, shot_code, task_name, _legacy_extract_version_number(version_str)
+
+
+def _legacy_sequence_base(file_name):
+    """CreateShot / Shot_info.parse_exr_name."""
+    base_name = re.sub(r"_%04d\.exr$", "", file_name)
+    version_match = re.search(r"_v(\d+)", base_name)
+    version_number = version_match.group(1) if version_match else "Unknown"
+    return base_name, version_number
+
+
+def _legacy_show_in_flow(file_name):
+    """ShowInFlow.parse_exr_name."""
+    if "%04d" in file_name:
+        file_name = file_name.replace(".%", "_%")
+    return _legacy_sequence_base(file_name)
+
+
+def _legacy_review_pic(file_name):
+    """ReviewPic.parse_exr_name."""
+    version_match = re.search(r"_v(\d+)", file_name)
+    version_number = version_match.group(1) if version_match else "Unknown"
+    base_name = re.sub(r"_v\d+_%04d\.exr", "", file_name)
+    return base_name, version_number
+
+
+def _legacy_panel_base(exr_name):
+    """parse_exr_name de LGA_NKS_Flow_Panel, FlowProd_Panel y Assignee_Panel."""
+    if "%04d" in exr_name:
+        exr_name = exr_name.replace(".%", "_%")
+    parts = exr_name.split("_")
+    if len(parts) < 7 or not parts[-2].startswith("v"):
+        raise ValueError(
+            f"Nombre del archivo EXR no tiene el formato esperado: {exr_name}"
+        )
+    return "_".join(parts[:-1])
+
+
+def _legacy_base_name_fields(base_name):
+    """Push, Assignee, Assign_Assignee y Clear_Assignees (base_name del panel)."""
+    project_name = base_name.split("_")[0]
+    parts = base_name.split("_")
+    shot_code = "_".join(parts[:5])
+    version_number_str = None
+    for part in parts:
+        if part.startswith("v") and part[1:].isdigit():
+            version_number_str = part
+            break
+    return project_name, shot_code, version_number_str
+
+
+# ----------------------------------------------------------------------------
+# Parser compartido, tal como lo usa ahora cada llamador
+# ----------------------------------------------------------------------------
+
+
+def _new_parse_clip_name(file_name):
+    parsed = NameParser.parse_media_name(file_name)
+    if len(parsed.parts) >= 4:
+        return "_".join(parsed.parts[:4]), parsed.version_str
+    return parsed.base_name, parsed.version_str
+
+
+def _new_clip_identity(file_name):
+    parsed = NameParser.parse_media_name(file_name)
+    if parsed.task is None:
+        return None
+    return parsed.project, parsed.shot_code, parsed.task, parsed.version_number
+
+
+def _new_sequence_base(file_name):
+    parsed = NameParser.parse_media_name(file_name)
+    return parsed.sequence_base, parsed.version_digits
+
+
+def _new_show_in_flow(file_name):
+    if "%04d" in file_name:
+        file_name = file_name.replace(".%", "_%")
+    return _new_sequence_base(file_name)
+
+
+def _new_review_pic(file_name):
+    parsed = NameParser.parse_media_name(file_name)
+    return parsed.versionless_base, parsed.version_digits
+
+
+def _new_panel_base(exr_name):
+    return NameParser.strict_exr_base(exr_name)
+
+
+def _new_base_name_fields(base_name):
+    parsed = NameParser.parse_base_name(base_name)
+    return parsed.project, parsed.shot_code, parsed.version_token
+
+
+# (nombre, implementacion anterior, implementacion nueva, corpus)
+CALLERS = [
+    ("extract_version_number", _legacy_extract_version_number, NameParser.extract_version_number, "all"),
+    ("parse_exr_name (Pull, MatchVerToEXR)", _legacy_parse_exr_name, NameParser.parse_exr_name, "files"),
+    ("parse_clip_name (Compare*)", _legacy_parse_clip_name, _new_parse_clip_name, "files"),
+    ("parse_clip_identity (Pull)", _legacy_clip_identity, _new_clip_identity, "files"),
+    ("parse_exr_name (CreateShot, Shot_info)", _legacy_sequence_base, _new_sequence_base, "files"),
+    ("parse_exr_name (ShowInFlow)", _legacy_show_in_flow, _new_show_in_flow, "files"),
+    ("parse_exr_name (ReviewPic)", _legacy_review_pic, _new_review_pic, "files"),
+    ("parse_exr_name (paneles)", _legacy_panel_base, _new_panel_base, "files"),
+    ("base_name (Push, Assignee)", _legacy_base_name_fields, _new_base_name_fields, "bases"),
+]
+
+EDGE_CASES = [
+    "ABC_101_010_0010_plate_comp_v003_%04d.exr",
+    "ABC_101_010_0010_plate_comp_v003.%04d.exr",
+    "ABC_101_010_0010_comp_v012_%04d.exr",
+    "ABC_101.010_0010_plate_comp_v003.mov",
+    "ABC_101_010_0010_plate.comp_v003",
+    "ABC_101_010_0010_plate_comp_v003-2.mov",
+    "ABC_101_010_0010_plate_comp_v003(1).mxf",
+    "ABC_101_010_0010_editref_v001.mov",
+    "ABC_101_010_0010_aPlate_v000_%04d.exr",
+    "ABC_101_010_0010_plate_comp_V003_%04d.exr",
+    "ABC_101_010_0010_plate_comp_v0003_%04d.exr",
+    "ABC_101_010_0010_plate_comp_v003_v004_%04d.exr",
+    "ABC_101_010_0010_plate_comp_%04d.exr",
+    "ABC_101_010_0010_plate_comp.mov",
+    "ABC_v2_010_0010_plate_comp_v003_%04d.exr",
+    "ABC_101_010_0010_plate_comp_v003",
+    "ABC_101_010_0010_plate_comp_v003_1001.exr",
+    "ABC_101_010_0010_plate_comp_v003.####.exr",
+    "ABC_101.010_0010_plate_comp_v003.mov",
+    "ABC_101_010_0010_plate.comp_v003",
+    "ABC_101_010_0010_plate_v003_comp_%04d.exr",
+    "shot_v1.mov",
+    "v003_%04d.exr",
+    "noversion",
+    "_v001",
+    "",
+    "ABC_101_010_0010_plate_comp_v003_%04d.EXR",
+    "ABC_101_010_0010_plate_comp_v003.tar.gz",
+    "ABC_101_010_0010_plate_comp_v٣_%04d.exr",
+]
+
+TASKS = ["comp", "roto", "prep", "plate", "editref", "aPlate", "Comp", "cleanup"]
+EXTENSIONS = ["_%04d.exr", ".%04d.exr", ".mov", ".mxf", "_1001.exr", ".exr", ""]
+
+
+def make_corpus(count, seed=7):
+    """Nombres sinteticos con el formato del estudio mas los casos borde."""
+    rng = random.Random(seed)
+    names = list(EDGE_CASES)
+    for _ in range(count):
+        project = rng.choice(["ABC", "XYZ", "Proj2", "LGA"])
+        blocks = [f"{rng.randint(1, 999):03d}" for _ in range(rng.randint(2, 4))]
+        desc = rng.choice(["plate", "bg", "fg01", "main"])
+        task = rng.choice(TASKS)
+        version = f"v{rng.randint(0, 120):0{rng.choice([2, 3, 4])}d}"
+        ext = rng.choice(EXTENSIONS)
+        names.append("_".join([project] + blocks + [desc, task, version]) + ext)
+    return names
+
+
+def _corpora(names):
+    files = names
+    exr = [n for n in names if n.endswith("_%04d.exr")]
+    bases = sorted({NameParser.parse_media_name(n).base_name for n in names})
+    return {"files": files, "exr": exr, "bases": bases, "all": files + bases}
+
+
+def _call(function, value):
+    try:
+        return ("ok", function(value))
+    except Exception as e:
+        return ("error", type(e).__name__)
+
+
+def check_conformance(count=2000, verbose=True):
+    """Compara cada llamador contra su implementacion anterior. Devuelve las diferencias."""
+    corpora = _corpora(make_corpus(count))
+    failures = []
+    for name, legacy, new, corpus in CALLERS:
+        NameParser.clear_cache()
+        values = corpora[corpus]
+        mismatches = []
+        # Dos pasadas: la segunda sale de la cache y tiene que dar lo mismo
+        for _ in range(2):
+            for value in values:
+                expected = _call(legacy, value)
+                got = _call(new, value)
+                if expected != got:
+                    mismatches.append((value, expected, got))
+        if verbose:
+            state = "OK" if not mismatches else f"{len(mismatches)} diferencias"
+            print(f"  {name:45s} {len(values):6d} nombres  {state}")
+            for value, expected, got in mismatches[:5]:
+                print(f"      {value!r}: antes {expected!r} / ahora {got!r}")
+        failures.extend((name,) + m for m in mismatches)
+    return failures
+
+
+def benchmark(count, repeats=5):
+    """Mide el parseo de una pasada por clip (como Pull) con y sin cache."""
+    names = make_corpus(count)
+    legacy_per_clip = [
+        _legacy_parse_exr_name,
+        _legacy_clip_identity,
+        _legacy_sequence_base,
+        lambda n: _legacy_extract_version_number(_legacy_parse_exr_name(n)[1]),
+    ]
+
+    def run_legacy():
+        for name in names:
+            for function in legacy_per_clip:
+                function(name)
+
+    def run_new():
+        for name in names:
+            parsed = NameParser.parse_media_name(name)
+            NameParser.extract_version_number(parsed.version_str)
+
+    results = {}
+    for label, function, clear in [
+        ("anterior", run_legacy, False),
+        ("parser (cache fria)", run_new, True),
+        ("parser (cache caliente)", run_new, False),
+    ]:
+        best = None
+        for _ in range(repeats):
+            if clear:
+                NameParser.clear_cache()
+            start = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[label] = best
+        print(f"  {label:25s} {best * 1000.0:8.2f} ms  ({len(names)} nombres)")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Conformidad y benchmark del parser de nombres.")
+    parser.add_argument("--count", type=int, default=2000, help="Nombres sinteticos del corpus.")
+    parser.add_argument("--benchmark", type=int, metavar="NOMBRES", help="Mide el parseo.")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return 0
+    print("Conformidad de LGA_NKS_NameParser:")
+    failures = check_conformance(args.count)
+    print("Todo OK" if not failures else f"{len(failures)} diferencias")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,10 @@
 """
 _________________________________________________________________________
 
-  LGA_NKS_OpenInNukeX v1.30 - Lega
+  LGA_NKS_OpenInNukeX v1.31 - Lega
   Abre el script asociado al clip seleccionado en NukeX
   Verifica si hay una version mas reciente y pregunta si desea abrirla
+  Las versiones salen del indice compartido LGA_NKS_VersionIndex
   Obtiene la ruta de NukeX desde la configuracion de LGA_OpenInNukeX
 _________________________________________________________________________
 
@@ -15,8 +16,12 @@ import os
 import re
 import subprocess
 import socket
+import sys
 from PySide2 import QtWidgets, QtCore
 
+sys.path.append(os.path.dirname(__file__))
+import LGA_NKS_VersionIndex as VersionIndex
+
 DEBUG = False
 
 
@@ -119,10 +124,9 @@ def show_version_dialog(current_version, latest_version, current_path, latest_pa
 
 def get_version_from_filename(filename):
     debug_print(f"Analizando version del archivo: {filename}")
-    # Busca patrones como _v00, _v01, etc. antes de la extension
-    match = re.search(r"_v(\d{2})\.nk$", filename)
-    if match:
-        version = int(match.group(1))
+    # Misma gramatica que el indice de versiones (_v00, _v01, _v003...)
+    version = VersionIndex.version_number(filename)
+    if version is not None:
         debug_print(f"Version encontrada: {version}")
         return version
     debug_print("No se encontro version en el nombre del archivo")
@@ -131,34 +135,12 @@ def get_version_from_filename(filename):
 
 def find_latest_version(script_path):
     debug_print(f"Buscando versiones en: {script_path}")
-    directory = os.path.dirname(script_path)
-    base_name = os.path.splitext(os.path.basename(script_path))[0]
-    debug_print(f"Nombre base del archivo: {base_name}")
-
-    # Eliminar la version actual del nombre base si existe
-    base_name = re.sub(r"_v\d{2}$", "", base_name)
-    debug_print(f"Nombre base sin version: {base_name}")
-
-    # Buscar todos los archivos que coincidan con el patrón
-    pattern = re.compile(f"{base_name}_v\\d{{2}}\\.nk$")
-    versions = []
-
-    debug_print(f"Buscando archivos en directorio: {directory}")
-    for file in os.listdir(directory):
-        debug_print(f"Archivo encontrado: {file}")
-        if pattern.match(file):
-            version = get_version_from_filename(file)
-            full_path = os.path.join(directory, file)
-            versions.append((version, full_path))
-            debug_print(f"Version valida encontrada: {version} en {full_path}")
-
-    if not versions:
+    # La carpeta se lista una sola vez por mtime (indice compartido)
+    latest = VersionIndex.latest_version(script_path)
+    if latest[0] is None:
         debug_print("No se encontraron versiones validas")
         return None, None
 
-    # Ordenar por version y obtener la mas alta
-    versions.sort(key=lambda x: x[0], reverse=True)
-    latest = versions[0]
     debug_print(f"Version mas alta encontrada: {latest[0]} en {latest[1]}")
     return latest
 
@@ -1,7 +1,7 @@
 """
 ______________________________________________________________________________________________
 
-  LGA_NKS_PrevNext_Rev v1.2 - 2024 - Lega
+  LGA_NKS_PrevNext_Rev v1.4 - 2024 - Lega
 
   Busca el clip anterior o siguiente con estado Rev_Lega o Rev_Sup
   y ajusta la vista:
@@ -12,14 +12,21 @@ ________________________________________________________________________________
   5. Mueve el playhead a la posición del In.
   6. Ajusta el zoom para que se ajuste al clip seleccionado.
   7. Deselecciona todos los clips.
+  Las busquedas usan el indice por intervalos de LGA_NKS_TimelineIndex
+  (cada clip encontrado se verifica contra el timeline).
 ______________________________________________________________________________________________
 """
 
 import hiero.core
 import hiero.ui
+import os
+import sys
 from PySide2.QtGui import QColor
 from PySide2.QtCore import QTimer
 
+sys.path.append(os.path.dirname(__file__))
+import LGA_NKS_TimelineIndex as TimelineIndex
+
 DEBUG = False
 
 def debug_print(*message):
@@ -64,38 +71,33 @@ def find_clip_with_color(direction, rev_type):
     min_distance = float('inf')
     target_color = COLORS.get(rev_type)
 
-    # Buscar en todas las pistas de video
-    for track in seq.videoTracks():
-        for item in track.items():
-            if isinstance(item, hiero.core.EffectTrackItem):
-                continue
-
-            # Verificar si el clip tiene el color buscado
-            bin_item = item.source().binItem()
-            if bin_item.color() == target_color:
-                clip_start = item.timelineIn()
-                clip_end = item.timelineOut()
-
-                # Ignorar el clip si el playhead está sobre él
-                if clip_start <= playhead_pos < clip_end:
-                    debug_print(f"Ignorando clip actual: {item.name()}")
-                    continue
-
-                # Para dirección "next", buscar clips después del playhead
-                if direction == "next" and clip_start > playhead_pos:
-                    distance = clip_start - playhead_pos
-                    if distance < min_distance:
-                        min_distance = distance
-                        target_clip = item
-                        debug_print(f"Encontrado clip siguiente: {item.name()} a distancia {distance}")
-
-                # Para dirección "prev", buscar clips antes del playhead
-                elif direction == "prev" and clip_end < playhead_pos:
-                    distance = playhead_pos - clip_end
-                    if distance < min_distance:
-                        min_distance = distance
-                        target_clip = item
-                        debug_print(f"Encontrado clip anterior: {item.name()} a distancia {distance}")
+    def has_color(item):
+        return item.source().binItem().color() == target_color
+
+    if direction == "next":
+        find = TimelineIndex.next_item
+    elif direction == "prev":
+        find = TimelineIndex.previous_item
+    else:
+        return None
+
+    # Buscar en todas las pistas de video. Los items de cada pista estan ordenados
+    # desde el playhead, asi que el primero con el color es el mas cercano de la pista
+    # (el clip bajo el playhead queda afuera de los dos recorridos)
+    for track_index in TimelineIndex.sequence_index(seq).tracks():
+        item = find(seq, track_index, playhead_pos, has_color)
+        if item is None:
+            continue
+
+        # Para dirección "next", distancia al inicio; para "prev", al final
+        if direction == "next":
+            distance = item.timelineIn() - playhead_pos
+        else:
+            distance = playhead_pos - item.timelineOut()
+        if distance < min_distance:
+            min_distance = distance
+            target_clip = item
+            debug_print(f"Encontrado clip {direction}: {item.name()} a distancia {distance}")
 
     if target_clip:
         debug_print(f"Clip seleccionado: {target_clip.name()}")
@@ -114,33 +116,20 @@ def find_editref_clip_at_position(position):
         return None
 
     # Buscar el track EditRef
-    edit_ref_track = None
-    for track in seq.videoTracks():
-        if track.name() == "EditRef":
-            edit_ref_track = track
-            break
+    edit_ref_track = TimelineIndex.sequence_index(seq).track("EditRef")
 
     if not edit_ref_track:
         debug_print("No se encontró un track llamado 'EditRef'.")
         return None
 
     # Buscar el clip que contiene la posición
-    for item in edit_ref_track.items():
-        if item.timelineIn() <= position < item.timelineOut():
-            return item
+    item = TimelineIndex.item_at(seq, edit_ref_track, position)
+    if item:
+        return item
 
     # Si no se encuentra un clip que contenga la posición,
-    # buscar el más cercano después de la posición
-    closest_clip = None
-    min_distance = float('inf')
-    for item in edit_ref_track.items():
-        if item.timelineIn() > position:
-            distance = item.timelineIn() - position
-            if distance < min_distance:
-                min_distance = distance
-                closest_clip = item
-
-    return closest_clip  # Retornar el clip más cercano si no se encuentra uno exacto
+    # el más cercano después de la posición
+    return TimelineIndex.next_item(seq, edit_ref_track, position)
 
 def set_in_out_from_clip(clip):
     """
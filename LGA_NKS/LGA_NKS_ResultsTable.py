@@ -0,0 +1,223 @@
+"""
+______________________________________________________________________
+
+  LGA_NKS_ResultsTable v1.00 - Lega Pugliese
+  Tabla de resultados compartida (modelo/vista) para las ventanas del
+  Pull y de las herramientas de comparacion de LGA_NKS_Edit.
+  Las filas se agregan en bloques a un QAbstractTableModel, los colores
+  de seleccion mezclados se calculan una sola vez por color y el tamano
+  de la ventana sale de una altura de fila uniforme.
+______________________________________________________________________
+
+"""
+
+from PySide2.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PySide2.QtGui import QBrush, QColor, QFont, QPalette
+from PySide2.QtWidgets import (
+    QApplication,
+    QHeaderView,
+    QStyle,
+    QStyledItemDelegate,
+    QTableView,
+)
+
+# Color de fondo por defecto de las celdas (tambien el de la linea de seleccion)
+DEFAULT_CELL_COLOR = "#8a8a8a"
+
+# Gris con el que se mezcla el color de la celda seleccionada
+SELECTION_MIX_COLOR = (88, 88, 88)
+
+# Filas que se acumulan antes de insertarlas en el modelo
+BATCH_SIZE = 500
+
+# Filas que se miden para calcular el ancho de las columnas
+RESIZE_PRECISION = 500
+
+# Rol con el color de la linea de seleccion de cada celda
+SELECTION_COLOR_ROLE = Qt.UserRole + 1
+
+_colors = {}
+
+
+def cached_color(hex_color):
+    """QColor compartido por color, para no crear uno por celda en cada paint."""
+    color = _colors.get(hex_color)
+    if color is None:
+        color = _colors[hex_color] = QColor(hex_color)
+    return color
+
+
+def text_color_for_background(hex_color):
+    """Texto blanco sobre fondos oscuros y negro sobre fondos claros."""
+    color = cached_color(hex_color)
+    luminance = 0.299 * color.red() + 0.587 * color.green() + 0.114 * color.blue()
+    return "#ffffff" if luminance < 128 else "#000000"
+
+
+def result_cell(text, background=None, foreground=None, centered=False):
+    """
+    Celda de la tabla. Si tiene fondo y no se indica el color del texto, se
+    elige segun la luminancia del fondo. El fondo tambien colorea la seleccion.
+    """
+    if background and not foreground:
+        foreground = text_color_for_background(background)
+    return {
+        "text": str(text),
+        "background": background,
+        "foreground": foreground,
+        "centered": centered,
+        "selection_color": background or DEFAULT_CELL_COLOR,
+    }
+
+
+class ResultsTableModel(QAbstractTableModel):
+    def __init__(self, headers, parent=None):
+        super(ResultsTableModel, self).__init__(parent)
+        self.headers = list(headers)
+        self.rows = []
+        self._brushes = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def _brush(self, hex_color):
+        brush = self._brushes.get(hex_color)
+        if brush is None:
+            brush = self._brushes[hex_color] = QBrush(cached_color(hex_color))
+        return brush
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        cell = self.rows[index.row()][index.column()]
+        if role == Qt.DisplayRole:
+            return cell["text"]
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter if cell["centered"] else None
+        if role == Qt.BackgroundRole:
+            return self._brush(cell["background"]) if cell["background"] else None
+        if role == Qt.ForegroundRole:
+            return self._brush(cell["foreground"]) if cell["foreground"] else None
+        if role == SELECTION_COLOR_ROLE:
+            return cell["selection_color"]
+        return None
+
+    def append_rows(self, rows):
+        """Agrega todas las filas con una sola notificacion a la vista."""
+        if not rows:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+
+class ColorMixDelegate(QStyledItemDelegate):
+    """Pinta la seleccion mezclando el color de la celda con un gris."""
+
+    def __init__(self, mix_color=SELECTION_MIX_COLOR, parent=None):
+        super(ColorMixDelegate, self).__init__(parent)
+        self.mix_color = mix_color
+        self._mixed = {}
+
+    def mixed_color(self, hex_color):
+        mixed = self._mixed.get(hex_color)
+        if mixed is None:
+            original = cached_color(hex_color)
+            r2, g2, b2 = self.mix_color
+            mixed = self._mixed[hex_color] = QColor(
+                (original.red() + r2) // 2,
+                (original.green() + g2) // 2,
+                (original.blue() + b2) // 2,
+            )
+        return mixed
+
+    def paint(self, painter, option, index):
+        hex_color = index.data(SELECTION_COLOR_ROLE) or DEFAULT_CELL_COLOR
+        if option.state & QStyle.State_Selected:
+            option.palette.setColor(QPalette.Highlight, self.mixed_color(hex_color))
+        else:
+            option.palette.setColor(QPalette.Base, cached_color(hex_color))
+        super(ColorMixDelegate, self).paint(painter, option, index)
+
+
+class ResultsTableView(QTableView):
+    """Vista de resultados con el estilo de las ventanas del Pull."""
+
+    def __init__(self, headers, parent=None):
+        super(ResultsTableView, self).__init__(parent)
+        self.pending_rows = []
+        self.results_model = ResultsTableModel(headers, self)
+        self.setModel(self.results_model)
+        self.setItemDelegate(ColorMixDelegate(parent=self))
+
+        header = self.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setResizeContentsPrecision(RESIZE_PRECISION)
+        font = QFont()
+        font.setBold(True)
+        header.setFont(font)
+        # Altura de fila fija: Qt no mide cada fila y el alto total es una cuenta
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.verticalHeader().setVisible(False)
+
+        self.setSelectionBehavior(QTableView.SelectRows)
+        self.setSelectionMode(QTableView.SingleSelection)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setStyleSheet(
+            """
+            QTableView::item:selected {
+                color: black;
+                background-color: transparent;
+            }
+        """
+        )
+
+    def add_row(self, cells):
+        """Encola una fila; se inserta en el modelo cada BATCH_SIZE filas o en flush()."""
+        self.pending_rows.append(cells)
+        if len(self.pending_rows) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        rows, self.pending_rows = self.pending_rows, []
+        self.results_model.append_rows(rows)
+
+    def row_count(self):
+        return self.results_model.rowCount() + len(self.pending_rows)
+
+    def row_height(self):
+        return self.verticalHeader().defaultSectionSize()
+
+
+def fit_window_to_table(window, table):
+    """
+    Ajusta el tamano de la ventana a la tabla (hasta el 80% de la pantalla) y
+    la centra. El alto sale de la altura uniforme de fila, sin recorrer filas.
+    """
+    table.flush()
+    header = table.horizontalHeader()
+    header.setStretchLastSection(False)
+    table.resizeColumnsToContents()
+    width = table.verticalHeader().width() - 30
+    for i in range(table.results_model.columnCount()):
+        width += table.columnWidth(i) + 20
+    screen_rect = QApplication.primaryScreen().availableGeometry()
+    final_width = int(min(width, screen_rect.width() * 0.8))
+    height = header.height() + 20
+    height += table.results_model.rowCount() * (table.row_height() + 4)
+    final_height = int(min(height, screen_rect.height() * 0.8))
+    header.setStretchLastSection(True)
+    window.resize(final_width, final_height)
+    window.move(
+        (screen_rect.width() - final_width) // 2,
+        (screen_rect.height() - final_height) // 2,
+    )
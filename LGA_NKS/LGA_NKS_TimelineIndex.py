@@ -0,0 +1,258 @@
+"""
+______________________________________________________________________
+
+  LGA_NKS_TimelineIndex v1.01 - Lega Pugliese
+  Indice por intervalos de los clips de los tracks de video para buscar
+  "el clip bajo el playhead", "el siguiente" o "el anterior" sin
+  recorrer track.items() comparando timelineIn/timelineOut en cada
+  atajo de teclado.
+    - por track: items ordenados por timelineIn con las listas de
+      inicios y fines; cada busqueda es un bisect, O(log n)
+    - se arma una vez por secuencia (cada track la primera vez que se
+      consulta) y se descarta con el evento kSequenceEdited
+    - cada resultado se verifica contra el item (timelineIn/timelineOut
+      actuales): si el indice quedo viejo se rearma ese track
+  Los clips de un mismo track no se superponen, asi que los fines
+  quedan ordenados igual que los inicios.
+  Lo usan PrevNext_Rev, Clip_DisableEXR, InOut_Editref, ReviewPic,
+  Shot_info y las comparaciones de LGA_NKS_Edit.
+______________________________________________________________________
+
+"""
+
+from bisect import bisect_left, bisect_right
+
+import hiero.core
+
+# Variable global para activar o desactivar los prints
+DEBUG = False
+
+
+def debug_print(*message):
+    if DEBUG:
+        print(*message)
+
+
+# Secuencias recordadas a la vez (la activa y las ultimas abiertas)
+MAX_SEQUENCES = 8
+
+# [(secuencia, SequenceIndex)], la mas reciente al final
+_sequences = []
+_events_registered = False
+stats = {"hits": 0, "builds": 0, "stale": 0}
+
+
+class TrackIndex:
+    """Items de un track ordenados por timelineIn, con bisect sobre inicios y fines."""
+
+    def __init__(self, track, skip_effects=True):
+        self.track = track
+        items = [
+            item
+            for item in track.items()
+            if not (skip_effects and isinstance(item, hiero.core.EffectTrackItem))
+        ]
+        spans = sorted(
+            ((item.timelineIn(), item.timelineOut(), item) for item in items),
+            key=lambda span: span[0],
+        )
+        self.starts = [span[0] for span in spans]
+        self.ends = [span[1] for span in spans]
+        self.items = [span[2] for span in spans]
+        stats["builds"] += 1
+
+    def index_at(self, frame):
+        """Posicion del item con timelineIn <= frame < timelineOut, o -1."""
+        position = bisect_right(self.starts, frame) - 1
+        if position >= 0 and frame < self.ends[position]:
+            return position
+        return -1
+
+    def item_at(self, frame):
+        position = self.index_at(frame)
+        return self.items[position] if position >= 0 else None
+
+    def next_index(self, frame, match=None):
+        """
+        Posicion del primer item que empieza despues de frame (y cumple
+        match(item), si se pasa), o -1.
+        """
+        for position in range(bisect_right(self.starts, frame), len(self.items)):
+            if match is None or match(self.items[position]):
+                return position
+        return -1
+
+    def previous_index(self, frame, match=None):
+        """Como next_index pero hacia atras: items que terminan antes de frame."""
+        for position in range(bisect_left(self.ends, frame) - 1, -1, -1):
+            if match is None or match(self.items[position]):
+                return position
+        return -1
+
+    def next_item(self, frame, match=None):
+        position = self.next_index(frame, match)
+        return self.items[position] if position >= 0 else None
+
+    def previous_item(self, frame, match=None):
+        position = self.previous_index(frame, match)
+        return self.items[position] if position >= 0 else None
+
+    def nearest_index(self, frame):
+        """
+        Posicion del item bajo frame o, si cae en un hueco, del mas cercano
+        (distancia al timelineIn del siguiente o al timelineOut del anterior;
+        en empate gana el anterior). -1 si el track esta vacio.
+        """
+        position = self.index_at(frame)
+        if position >= 0:
+            return position
+        after = bisect_right(self.starts, frame)
+        before = bisect_right(self.ends, frame) - 1
+        if before < 0:
+            return after if after < len(self.items) else -1
+        if after >= len(self.items):
+            return before
+        return before if frame - self.ends[before] <= self.starts[after] - frame else after
+
+    def nearest_item(self, frame):
+        position = self.nearest_index(frame)
+        return self.items[position] if position >= 0 else None
+
+    def is_current(self, position):
+        """True si el item de esa posicion sigue donde el indice cree que esta."""
+        item = self.items[position]
+        try:
+            return (
+                item.timelineIn() == self.starts[position]
+                and item.timelineOut() == self.ends[position]
+            )
+        except Exception:
+            # El item ya no existe en la secuencia
+            return False
+
+
+class SequenceIndex:
+    """TrackIndex de cada track de video de una secuencia, armados a pedido."""
+
+    def __init__(self, seq):
+        self.seq = seq
+        self.video_tracks = list(seq.videoTracks())
+        self._indexes = {}
+
+    def _index(self, position, rebuild=False):
+        if rebuild or position not in self._indexes:
+            self._indexes[position] = TrackIndex(self.video_tracks[position])
+        else:
+            stats["hits"] += 1
+        return self._indexes[position]
+
+    def tracks(self, name=None, ignore_case=False):
+        """TrackIndex de los tracks de video (todos, o los que se llaman name)."""
+        if name is not None and ignore_case:
+            name = name.upper()
+        indexes = []
+        for position, track in enumerate(self.video_tracks):
+            track_name = track.name()
+            if name is not None and (track_name.upper() if ignore_case else track_name) != name:
+                continue
+            indexes.append(self._index(position))
+        return indexes
+
+    def track(self, name, ignore_case=False):
+        """TrackIndex del primer track con ese nombre, o None."""
+        indexes = self.tracks(name, ignore_case)
+        return indexes[0] if indexes else None
+
+    def for_track(self, track):
+        """TrackIndex de un objeto track de la secuencia, o None."""
+        for position, video_track in enumerate(self.video_tracks):
+            if video_track == track:
+                return self._index(position)
+        return None
+
+    def rebuild(self, track_index):
+        """Vuelve a armar un track (el indice quedo viejo)."""
+        stats["stale"] += 1
+        for position, index in self._indexes.items():
+            if index is track_index:
+                return self._index(position, rebuild=True)
+        return TrackIndex(track_index.track)
+
+
+def _on_sequence_edited(event):
+    invalidate()
+
+
+def _register_events():
+    global _events_registered
+    if _events_registered:
+        return True
+    try:
+        hiero.core.events.registerInterest("kSequenceEdited", _on_sequence_edited)
+        _events_registered = True
+    except Exception as e:
+        debug_print(f"No se pudo registrar kSequenceEdited: {e}")
+    return _events_registered
+
+
+def sequence_index(seq):
+    """SequenceIndex de la secuencia (cacheado hasta que se edite)."""
+    if not _register_events():
+        # Sin el evento no hay forma de saber cuando invalidar: indice de un solo uso
+        return SequenceIndex(seq)
+    for position, (cached_seq, index) in enumerate(_sequences):
+        if cached_seq == seq:
+            _sequences.append(_sequences.pop(position))
+            return index
+    index = SequenceIndex(seq)
+    _sequences.append((seq, index))
+    del _sequences[:-MAX_SEQUENCES]
+    return index
+
+
+def _verified(seq, track_index, search):
+    """
+    Item de la posicion que devuelve search(track_index), verificado contra el
+    timeline: si el item se movio (edicion sin evento) se rearma el track y se
+    busca de nuevo.
+    """
+    if track_index is None:
+        return None
+    position = search(track_index)
+    if position >= 0 and not track_index.is_current(position):
+        track_index = sequence_index(seq).rebuild(track_index)
+        position = search(track_index)
+    return track_index.items[position] if position >= 0 else None
+
+
+def item_at(seq, track_index, frame):
+    """item_at de track_index, verificado."""
+    return _verified(seq, track_index, lambda index: index.index_at(frame))
+
+
+def nearest_item(seq, track_index, frame):
+    """nearest_item de track_index, verificado."""
+    return _verified(seq, track_index, lambda index: index.nearest_index(frame))
+
+
+def next_item(seq, track_index, frame, match=None):
+    """next_item de track_index (el primero que cumple match), verificado."""
+    return _verified(seq, track_index, lambda index: index.next_index(frame, match))
+
+
+def previous_item(seq, track_index, frame, match=None):
+    """previous_item de track_index (el primero que cumple match), verificado."""
+    return _verified(seq, track_index, lambda index: index.previous_index(frame, match))
+
+
+def clip_at(seq, track_name, frame, ignore_case=False):
+    """El clip de un track con ese nombre bajo frame, o None."""
+    for track_index in sequence_index(seq).tracks(track_name, ignore_case):
+        item = item_at(seq, track_index, frame)
+        if item is not None:
+            return item
+    return None
+
+
+def invalidate():
+    del _sequences[:]
@@ -0,0 +1,146 @@
+"""
+______________________________________________________________________
+
+  LGA_NKS_VersionIndex v1.00 - Lega Pugliese
+  Indice compartido de archivos y carpetas versionados (.nk, .hrox,
+  .mov, carpetas de render ..._vNNN) para OpenInNukeX,
+  CheckProjectVersions y LGA_NKS_VersionScan_Cache (Edit tools y Pull).
+    - cada carpeta se lista una sola vez por mtime (crear o borrar una
+      version cambia el mtime de la carpeta e invalida el indice)
+    - los nombres se parsean con una sola gramatica compilada:
+      BASE + [_-]vNNN + SUFIJO, o BASE + [_-]NNN + .ext (hrox sin "v")
+    - el indice de la carpeta agrupa las versiones por (BASE, SUFIJO)
+      sin distinguir mayusculas,
+      asi "ultima version de X" y "todas las versiones de X" son una
+      busqueda en un dict (mas un stat de la carpeta para validar)
+  No depende de Hiero.
+______________________________________________________________________
+
+"""
+
+import os
+import re
+import threading
+from functools import lru_cache
+
+# Variable global para activar o desactivar los prints
+DEBUG = False
+
+
+def debug_print(*message):
+    if DEBUG:
+        print(*message)
+
+
+# Gramatica unica. La base es codiciosa: gana el ultimo token de version, y la
+# forma sin "v" solo se usa si el nombre no tiene ningun vNNN.
+#   SHOT_comp_v003.mov / SHOT_comp_v003 / SHOT_comp_v03.nk / PRJ_edit-v12.hrox
+#   PRJ_edit_012.hrox (sin "v": solo con los numeros justo antes de la extension)
+VERSIONED_NAME = re.compile(
+    r"""
+    ^(?:
+        (?P<prefix>.*[_-]v)(?P<digits>\d+)(?P<suffix>(?:\D.*)?)
+      | (?P<prefix_plain>.*[_-])(?P<digits_plain>\d+)(?P<suffix_plain>\.[^.\d]+)
+    )$
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+CACHE_SIZE = 8192
+
+# carpeta -> (mtime_ns, {clave: {version: nombre}})
+_index = {}
+_lock = threading.Lock()
+stats = {"hits": 0, "misses": 0}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_versioned_name(name):
+    """
+    'SHOT_comp_v003.mov' -> (('shot_comp_v', '.mov'), 3). La clave (todo menos
+    el numero, en minusculas) agrupa las versiones de un mismo archivo.
+    None si el nombre no tiene version.
+    """
+    match = VERSIONED_NAME.match(name)
+    if not match:
+        return None
+    if match.group("digits") is not None:
+        prefix, digits, suffix = match.group("prefix", "digits", "suffix")
+    else:
+        prefix, digits, suffix = match.group("prefix_plain", "digits_plain", "suffix_plain")
+    return (prefix.lower(), suffix.lower()), int(digits)
+
+
+def version_number(name):
+    """Numero de version del nombre, o None."""
+    parsed = parse_versioned_name(os.path.basename(name or ""))
+    return parsed[1] if parsed else None
+
+
+def _build_index(directory):
+    index = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            parsed = parse_versioned_name(entry.name)
+            if parsed:
+                key, number = parsed
+                index.setdefault(key, {})[number] = entry.name
+    return index
+
+
+def directory_index(directory):
+    """
+    {clave: {version: nombre}} de la carpeta, reconstruido solo si cambio su
+    mtime. Una carpeta inaccesible devuelve {}.
+    """
+    directory = os.path.normpath(directory)
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError:
+        return {}
+    with _lock:
+        cached = _index.get(directory)
+        if cached and cached[0] == mtime_ns:
+            stats["hits"] += 1
+            return cached[1]
+    try:
+        index = _build_index(directory)
+    except OSError as e:
+        debug_print(f"No se pudo listar {directory}: {e}")
+        return {}
+    with _lock:
+        stats["misses"] += 1
+        _index[directory] = (mtime_ns, index)
+    return index
+
+
+def versions_of(path):
+    """
+    {version: ruta} de las versiones hermanas de path (un archivo o una carpeta
+    de render con version), incluido el propio path si existe. {} si no tiene
+    version.
+    """
+    directory, name = os.path.split(os.path.normpath(path))
+    parsed = parse_versioned_name(name)
+    if not parsed:
+        return {}
+    versions = directory_index(directory or ".").get(parsed[0], {})
+    return {number: os.path.join(directory, entry) for number, entry in versions.items()}
+
+
+def latest_version(path):
+    """(version, ruta) de la version mas alta de path en disco, o (None, None)."""
+    versions = versions_of(path)
+    if not versions:
+        return None, None
+    number = max(versions)
+    return number, versions[number]
+
+
+def invalidate(directory=None):
+    """Olvida el indice de una carpeta (o de todas)."""
+    with _lock:
+        if directory is None:
+            _index.clear()
+        else:
+            _index.pop(os.path.normpath(directory), None)
@@ -0,0 +1,121 @@
+"""
+______________________________________________________________________
+
+  LGA_NKS_VersionScan_Cache v1.01 - Lega Pugliese
+  Cache de las versiones que hay en disco para cada clip. Las carpetas
+  hermanas _vNNN de la carpeta de la version salen del indice compartido
+  LGA_NKS_VersionIndex: la carpeta padre se lista una sola vez por mtime
+  (crear o borrar una version lo cambia e invalida la entrada).
+  Los scripts que usan hiero.core.VersionScanner consultan esta cache y
+  solo llaman a doScan cuando en disco hay versiones que el binItem
+  todavia no conoce.
+______________________________________________________________________
+
+"""
+
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+import LGA_NKS_VersionIndex as VersionIndex
+
+# Variable global para activar o desactivar los prints
+DEBUG = False
+
+
+def debug_print(*message):
+    if DEBUG:
+        print(*message)
+
+
+VERSION_PATTERN = re.compile(r"_v(\d+)", re.IGNORECASE)
+
+_lock = threading.Lock()
+stats = {"scans": 0, "skipped_scans": 0}
+
+
+def extract_version_number(name):
+    """Ultimo _vNNN del nombre, o None."""
+    matches = VERSION_PATTERN.findall(name or "")
+    return int(matches[-1]) if matches else None
+
+
+def _versioned_component(file_path):
+    """
+    Elemento del path que lleva la version: la carpeta del archivo si se llama
+    ..._vNNN (renders EXR) o si no el propio archivo (.mov, .nk sueltos).
+    """
+    file_path = os.path.normpath(file_path)
+    version_dir = os.path.dirname(file_path)
+    if VERSION_PATTERN.search(os.path.basename(version_dir)):
+        return version_dir
+    if VERSION_PATTERN.search(os.path.basename(file_path)):
+        return file_path
+    return None
+
+
+def versions_on_disk(file_path):
+    """
+    {version_number: ruta} de las versiones hermanas de file_path (misma base,
+    mismo sufijo, otro _vNNN). Vacio si el path no tiene version.
+    """
+    component = _versioned_component(file_path)
+    if not component:
+        return {}
+    return VersionIndex.versions_of(component)
+
+
+def highest_version_on_disk(file_path):
+    versions = versions_on_disk(file_path)
+    return max(versions) if versions else None
+
+
+def clip_file_path(clip):
+    try:
+        return clip.source().mediaSource().fileinfos()[0].filename()
+    except Exception:
+        return None
+
+
+def needs_version_scan(clip, newer_only=True):
+    """
+    True si hace falta VersionScanner().doScan para el clip: en disco hay una
+    version mas alta que las del binItem (newer_only) o cualquier version que
+    el binItem no tenga. Si no se puede decidir (sin path, sin _vNNN o sin
+    acceso a la carpeta) devuelve True para no cambiar el comportamiento.
+    """
+    file_path = clip_file_path(clip)
+    if not file_path:
+        return True
+    on_disk = versions_on_disk(file_path)
+    if not on_disk:
+        return True
+    try:
+        known = {
+            extract_version_number(version.name())
+            for version in clip.source().binItem().items()
+        }
+    except Exception:
+        return True
+    known.discard(None)
+    if newer_only:
+        needed = not known or max(on_disk) > max(known)
+    else:
+        needed = not set(on_disk).issubset(known)
+    with _lock:
+        stats["scans" if needed else "skipped_scans"] += 1
+    debug_print(
+        f"{os.path.basename(file_path)}: disco {sorted(on_disk)} / bin {sorted(known)}"
+        f" -> {'doScan' if needed else 'sin scan'}"
+    )
+    return needed
+
+
+def clear():
+    VersionIndex.invalidate()
+    with _lock:
+        for key in stats:
+            stats[key] = 0
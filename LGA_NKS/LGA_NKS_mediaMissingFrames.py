@@ -1,8 +1,11 @@
 """
 ________________________________________________________________________________
 
-  LGA_NKS_mediaMissingFrames v1.5 | 2024 | Lega  
+  LGA_NKS_mediaMissingFrames v1.8 | 2024 | Lega  
   Escanea los clips seleccionados en Hiero para secuencias EXR con frames faltantes o corruptos
+  Cada carpeta se lista una sola vez (LGA_NKS_FrameScan) y los frames se muestran como rangos
+  Los EXR se validan en Python (LGA_NKS_ExrCheck): header y tabla de offsets, sin exrheader.exe
+  La validacion corre en paralelo con cache persistente por (ruta, tamaño, mtime) (LGA_NKS_FrameCheck)
 ________________________________________________________________________________
 
 """
@@ -13,11 +16,13 @@ from PySide2.QtWidgets import QApplication, QWidget, QVBoxLayout, QTableWidget,
 from PySide2.QtGui import QScreen
 from PySide2.QtCore import Qt, QThread, Signal, QTimer
 import os
-import re
-import subprocess
 import traceback
-import hashlib
 import logging
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+import LGA_NKS_FrameScan as FrameScan
+import LGA_NKS_FrameCheck as FrameCheck
 
 # Configurar el logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -31,7 +36,6 @@ class WorkerThread(QThread):
     def __init__(self, selected_items):
         QThread.__init__(self)
         self.selected_items = selected_items
-        self.exr_cache = {}
 
     def run(self):
         for index, item in enumerate(self.selected_items):
@@ -53,65 +57,28 @@ class WorkerThread(QThread):
         last_frame = int(clip.mediaSource().startTime() + clip.mediaSource().duration() - 1)
         total_frames = last_frame - first_frame + 1
         
-        directory = os.path.dirname(file_path)
-        filename_pattern = os.path.basename(file_path)
-        filename_pattern = re.sub(r'%0\d+d', r'%d', filename_pattern)
-        
-        missing_frames, corrupt_frames = self.check_frames(directory, filename_pattern, first_frame, last_frame)
+        missing_frames, corrupt_frames = self.check_frames(file_path, first_frame, last_frame)
         
         return [file_path, clip.name(), str(first_frame), str(last_frame), str(total_frames),
-                ", ".join(map(str, missing_frames)) if missing_frames else "Ninguno",
-                ", ".join(map(str, corrupt_frames)) if corrupt_frames else "Ninguno"]
+                FrameScan.compact_ranges(missing_frames) if missing_frames else "Ninguno",
+                FrameScan.compact_ranges(corrupt_frames) if corrupt_frames else "Ninguno"]
 
-    def check_frames(self, directory, filename_pattern, first_frame, last_frame):
+    def check_frames(self, file_path, first_frame, last_frame):
         missing_frames = []
         corrupt_frames = []
         try:
-            for frame in range(first_frame, last_frame + 1):
-                expected_filename = os.path.join(directory, filename_pattern % frame)
-                if not os.path.exists(expected_filename):
-                    missing_frames.append(frame)
-                    logger.warning(f"Frame faltante: {expected_filename}")
-                elif not self.is_exr_valid(expected_filename):
-                    corrupt_frames.append(frame)
-                    logger.warning(f"Frame corrupto: {expected_filename}")
+            # Un solo listado de la carpeta; los frames sin cambios salen de la cache
+            missing_frames, corrupt = FrameCheck.check_sequence(file_path, first_frame, last_frame)
+            if missing_frames:
+                logger.warning(f"Frames faltantes en {file_path}: {FrameScan.compact_ranges(missing_frames)}")
+            for frame, (frame_path, reason) in corrupt.items():
+                corrupt_frames.append(frame)
+                logger.warning(f"Frame corrupto: {frame_path} ({reason})")
         except Exception as e:
             logger.error(f"Error verificando frames: {str(e)}")
             logger.error(traceback.format_exc())
         return missing_frames, corrupt_frames
 
-    def is_exr_valid(self, file_path):
-        file_hash = hashlib.md5(file_path.encode()).hexdigest()
-        if file_hash in self.exr_cache:
-            return self.exr_cache[file_hash]
-
-        exrheader_path = os.path.join(os.path.dirname(__file__), 'OpenEXR', 'exrheader.exe')
-        try:
-            result = subprocess.run([exrheader_path, file_path], capture_output=True, text=True, timeout=5)
-            
-            # Registrar la salida completa para depuracion
-            logger.debug(f"Salida de exrheader para {file_path}:\n{result.stdout}")
-            
-            # Verificar si hay errores especificos en la salida
-            is_valid = result.returncode == 0 and "ERROR" not in result.stdout and "invalid" not in result.stdout.lower()
-            
-            if not is_valid:
-                logger.warning(f"Archivo potencialmente corrupto: {file_path}")
-                logger.warning(f"Codigo de retorno: {result.returncode}")
-                logger.warning(f"Salida de error: {result.stderr}")
-            
-            self.exr_cache[file_hash] = is_valid
-            return is_valid
-        except subprocess.TimeoutExpired:
-            logger.error(f"Timeout al verificar el archivo: {file_path}")
-            self.exr_cache[file_hash] = False
-            return False
-        except Exception as e:
-            logger.error(f"Error al verificar el archivo {file_path}: {str(e)}")
-            logger.error(traceback.format_exc())
-            self.exr_cache[file_hash] = False
-            return False
-
 class ClipMediaInfo(QWidget):
     def __init__(self, parent=None):
         super(ClipMediaInfo, self).__init__(parent)
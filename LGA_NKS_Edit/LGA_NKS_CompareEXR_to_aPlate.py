@@ -1,7 +1,7 @@
 """
 _______________________________________________________________________________________
 
-  LGA_NKS_CompareEXR_to_aPlate v1.12 | Lega
+  LGA_NKS_CompareEXR_to_aPlate v1.16 | Lega
   Compara los rangos de frames de todos los clips del track EXR con
   los clips correspondientes del track aPlate para verificar coincidencias.
 _______________________________________________________________________________________
@@ -9,24 +9,27 @@ ________________________________________________________________________________
 """
 
 import os
-import re
 import hiero.core
 import hiero.ui
 from PySide2.QtWidgets import (
     QApplication,
     QWidget,
     QVBoxLayout,
-    QTableWidget,
-    QTableWidgetItem,
-    QHeaderView,
     QMessageBox,
     QPushButton,
     QHBoxLayout,
 )
-from PySide2.QtWidgets import QStyledItemDelegate, QStyle
-from PySide2.QtGui import QColor, QBrush, QFont, QPalette
 from PySide2.QtCore import Qt
 import sys
+from pathlib import Path
+
+# Cache de versiones en disco, tabla de resultados y parser de nombres compartidos con el Pull
+sys.path.append(str(Path(__file__).parent.parent / "LGA_NKS"))
+import LGA_NKS_VersionScan_Cache as VersionScanCache
+import LGA_NKS_ResultsTable as ResultsTable
+import LGA_NKS_NameParser as NameParser
+import LGA_NKS_TimelineIndex as TimelineIndex
+from LGA_NKS_NameParser import extract_version_number
 
 # Variable global para activar o desactivar los prints
 DEBUG = True
@@ -61,22 +64,9 @@ def frame_to_tc(frame, fps):
     return f"{h:02d}:{m:02d}:{s:02d}:{f:02d}"
 
 
-def extract_version_number(version_str):
-    """Extrae el numero de version numerico de un string de version."""
-    match = re.search(r"_v(\d+)(?:[-\(][^)]+)?", version_str)
-    if match:
-        try:
-            version_num = int(match.group(1))
-            return version_num
-        except ValueError:
-            pass
-    return 0
-
-
 class FrameRangeComparisonGUI(QWidget):
     def __init__(self, parent=None):
         super(FrameRangeComparisonGUI, self).__init__(parent)
-        self.row_background_colors = []  # COPIADO DEL PULL para el delegado
         self.hiero_ops = None
         self.initUI()
 
@@ -99,69 +89,37 @@ class FrameRangeComparisonGUI(QWidget):
                     "No se encontraron clips EXR con correspondientes clips aPlate.",
                 )
 
-    def add_color_to_background_list(self, row_colors):
-        """COPIADO DEL PULL - Agrega una lista de colores de fondo para una nueva fila."""
-        self.row_background_colors.append(row_colors)
-
     def initUI(self):
         self.setWindowTitle("EXR to aPlate Frame Range Comparison - Results")
         layout = QVBoxLayout(self)
 
         # Ajustar columnas segun la flag AnalizeTC
         if AnalizeTC:
-            self.table = QTableWidget(0, 8, self)
-            self.table.setHorizontalHeaderLabels(
-                [
-                    "Shot",
-                    "EXR Range",
-                    "aPlate Range",
-                    "EXR TC IN",
-                    "aPlate TC IN",
-                    "EXR FPS",
-                    "aPlate FPS",
-                    "Status",
-                ]
-            )
+            headers = [
+                "Shot",
+                "EXR Range",
+                "aPlate Range",
+                "EXR TC IN",
+                "aPlate TC IN",
+                "EXR FPS",
+                "aPlate FPS",
+                "Status",
+            ]
         else:
-            self.table = QTableWidget(0, 6, self)
-            self.table.setHorizontalHeaderLabels(
-                [
-                    "Shot",
-                    "EXR Range",
-                    "aPlate Range",
-                    "EXR FPS",
-                    "aPlate FPS",
-                    "Status",
-                ]
-            )
-
-        # COPIADO DEL PULL - Configuracion de tabla
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
-        self.table.verticalHeader().setVisible(False)
-        self.table.setFocusPolicy(Qt.NoFocus)
-        self.table.setStyleSheet(
-            """
-            QTableView::item:selected {
-                color: black;
-                background-color: transparent;
-            }
-        """
-        )
-
-        # COPIADO DEL PULL - Asignar delegado personalizado
-        delegate = ColorMixDelegate(self.table, self.row_background_colors)
-        self.table.setItemDelegate(delegate)
-
+            headers = [
+                "Shot",
+                "EXR Range",
+                "aPlate Range",
+                "EXR FPS",
+                "aPlate FPS",
+                "Status",
+            ]
+
+        # Tabla modelo/vista compartida con el Pull
+        self.table = ResultsTable.ResultsTableView(headers, self)
         layout.addWidget(self.table)
         self.setLayout(layout)
 
-        # COPIADO DEL PULL - Estilo para headers
-        font = QFont()
-        font.setBold(True)
-        self.table.horizontalHeader().setFont(font)
-
     def add_result(
         self,
         shot_base,
@@ -174,32 +132,6 @@ class FrameRangeComparisonGUI(QWidget):
         status,
     ):
         """Anadir una fila a la tabla con el resultado."""
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-
-        # Agregar items a la tabla
-        shot_item = QTableWidgetItem(shot_base + "   ")  # COPIADO DEL PULL - espacios
-        exr_item = QTableWidgetItem(exr_range)
-        aplate_item = QTableWidgetItem(aplate_range)
-        exr_fps_item = QTableWidgetItem(exr_fps)
-        aplate_fps_item = QTableWidgetItem(aplate_fps)
-        status_item = QTableWidgetItem(status)
-
-        # Items de TC solo si AnalizeTC esta activado
-        if AnalizeTC:
-            exr_tc_item = QTableWidgetItem(exr_tc_in)
-            aplate_tc_item = QTableWidgetItem(aplate_tc_in)
-
-        # COPIADO DEL PULL - Centrado
-        exr_item.setTextAlignment(Qt.AlignCenter)
-        aplate_item.setTextAlignment(Qt.AlignCenter)
-        exr_fps_item.setTextAlignment(Qt.AlignCenter)
-        aplate_fps_item.setTextAlignment(Qt.AlignCenter)
-
-        if AnalizeTC:
-            exr_tc_item.setTextAlignment(Qt.AlignCenter)
-            aplate_tc_item.setTextAlignment(Qt.AlignCenter)
-
         # Colorear segun el estado
         if status == "Match":
             status_color = "#244c19"  # Verde oscuro
@@ -216,79 +148,25 @@ class FrameRangeComparisonGUI(QWidget):
         else:
             status_color = "#8a8a8a"  # Gris por defecto
 
-        # COPIADO DEL PULL - Configuracion de colores
-        status_bg_color = QColor(status_color)
-        status_text_color = self.color_for_background(status_color)
-        status_item.setBackground(QBrush(status_bg_color))
-        status_item.setForeground(QBrush(QColor(status_text_color)))
-        status_item.setTextAlignment(Qt.AlignCenter)
-
-        # Agregar items segun la flag AnalizeTC
+        cell = ResultsTable.result_cell
+        row = [
+            cell(shot_base + "   "),  # COPIADO DEL PULL - espacios
+            cell(exr_range, centered=True),
+            cell(aplate_range, centered=True),
+        ]
+        # Columnas de TC solo si AnalizeTC esta activado
         if AnalizeTC:
-            # Modo con TC IN (8 columnas)
-            self.table.setItem(row, 0, shot_item)
-            self.table.setItem(row, 1, exr_item)
-            self.table.setItem(row, 2, aplate_item)
-            self.table.setItem(row, 3, exr_tc_item)
-            self.table.setItem(row, 4, aplate_tc_item)
-            self.table.setItem(row, 5, exr_fps_item)
-            self.table.setItem(row, 6, aplate_fps_item)
-            self.table.setItem(row, 7, status_item)
-
-            # COPIADO DEL PULL - Configuracion de colores para delegado
-            row_colors = ["#8a8a8a"] * 8  # Color por defecto para 8 columnas
-            row_colors[7] = status_color  # Color para la columna de status
-        else:
-            # Modo sin TC IN (5 columnas)
-            self.table.setItem(row, 0, shot_item)
-            self.table.setItem(row, 1, exr_item)
-            self.table.setItem(row, 2, aplate_item)
-            self.table.setItem(row, 3, exr_fps_item)
-            self.table.setItem(row, 4, aplate_fps_item)
-            self.table.setItem(row, 5, status_item)
-
-            # COPIADO DEL PULL - Configuracion de colores para delegado
-            row_colors = ["#8a8a8a"] * 6  # Color por defecto para 6 columnas
-            row_colors[5] = status_color  # Color para la columna de status
-
-        self.add_color_to_background_list(row_colors)
-
-        self.table.resizeColumnsToContents()
-
-    def luminance(self, color):
-        """COPIADO DEL PULL - Calcula la luminancia de un color para determinar si es claro u oscuro."""
-        red = color.red()
-        green = color.green()
-        blue = color.blue()
-        return 0.299 * red + 0.587 * green + 0.114 * blue
-
-    def color_for_background(self, hex_color):
-        """COPIADO DEL PULL - Determina el color del texto basado en el color de fondo."""
-        color = QColor(hex_color)
-        return "#ffffff" if self.luminance(color) < 128 else "#000000"
+            row += [cell(exr_tc_in, centered=True), cell(aplate_tc_in, centered=True)]
+        row += [
+            cell(exr_fps, centered=True),
+            cell(aplate_fps, centered=True),
+            cell(status, background=status_color, centered=True),
+        ]
+        self.table.add_row(row)
 
     def adjust_window_size(self):
-        """COPIADO EXACTO DEL PULL - Ajustes para cambiar el tamano y posicion de la ventana"""
-        self.table.horizontalHeader().setStretchLastSection(False)
-        self.table.resizeColumnsToContents()
-        width = self.table.verticalHeader().width() - 30
-        for i in range(self.table.columnCount()):
-            width += self.table.columnWidth(i) + 20
-        screen = QApplication.primaryScreen()
-        screen_rect = screen.availableGeometry()
-        max_width = screen_rect.width() * 0.8
-        final_width = min(width, max_width)
-        height = self.table.horizontalHeader().height() + 20
-        for i in range(self.table.rowCount()):
-            height += self.table.rowHeight(i) + 4
-        max_height = screen_rect.height() * 0.8
-        final_height = min(height, max_height)
-        self.table.horizontalHeader().setStretchLastSection(True)
-        self.resize(final_width, final_height)
-        self.move(
-            (screen_rect.width() - final_width) // 2,
-            (screen_rect.height() - final_height) // 2,
-        )
+        """Ajusta el tamano y posicion de la ventana - tabla compartida con el Pull"""
+        ResultsTable.fit_window_to_table(self, self.table)
 
     def keyPressEvent(self, event):
         """COPIADO DEL PULL - Cerrar la ventana con ESC."""
@@ -298,38 +176,6 @@ class FrameRangeComparisonGUI(QWidget):
             super(FrameRangeComparisonGUI, self).keyPressEvent(event)
 
 
-class ColorMixDelegate(QStyledItemDelegate):
-    """COPIADO EXACTO DEL PULL - Delegado para mezclar colores en selecciones"""
-
-    def __init__(
-        self, table_widget, background_colors, mix_color=(88, 88, 88), parent=None
-    ):
-        super(ColorMixDelegate, self).__init__(parent)
-        self.table_widget = table_widget
-        self.background_colors = background_colors
-        self.mix_color = mix_color
-
-    def paint(self, painter, option, index):
-        row = index.row()
-        column = index.column()
-        if option.state & QStyle.State_Selected:
-            original_color = QColor(self.background_colors[row][column])
-            mixed_color = self.mix_colors(
-                (original_color.red(), original_color.green(), original_color.blue()),
-                self.mix_color,
-            )
-            option.palette.setColor(QPalette.Highlight, QColor(*mixed_color))
-        else:
-            original_color = QColor(self.background_colors[row][column])
-            option.palette.setColor(QPalette.Base, original_color)
-        super(ColorMixDelegate, self).paint(painter, option, index)
-
-    def mix_colors(self, original_color, mix_color):
-        r1, g1, b1 = original_color
-        r2, g2, b2 = mix_color
-        return ((r1 + r2) // 2, (g1 + g2) // 2, (b1 + b2) // 2)
-
-
 class HieroOperations:
     """Clase para manejar operaciones en Hiero - COPIADA de LGA_NKS_Flow_Pull.py"""
 
@@ -341,24 +187,10 @@ class HieroOperations:
 
     def parse_clip_name(self, file_name):
         """Extrae el nombre base usando los primeros 4 bloques separados por guiones bajos"""
-        # Remover extension y secuencia numerica para archivos EXR
-        base_name = re.sub(r"_%04d\.exr$", "", file_name)
-        # Si no cambio, puede ser un archivo de video (mxf, mov, etc)
-        if base_name == file_name:
-            # Remover extension para archivos de video
-            base_name = re.sub(r"\.[^.]+$", "", file_name)
-
-        # Extraer los primeros 4 bloques separados por guiones bajos
-        parts = base_name.split("_")
-        if len(parts) >= 4:
-            base_identifier = "_".join(parts[:4])
-        else:
-            base_identifier = base_name
-
-        version_match = re.search(r"(_v\d+)", base_name)
-        version_str = version_match.group(1) if version_match else "_vUnknown"
-
-        return base_identifier, version_str
+        parsed = NameParser.parse_media_name(file_name)
+        if len(parsed.parts) >= 4:
+            return "_".join(parsed.parts[:4]), parsed.version_str
+        return parsed.base_name, parsed.version_str
 
     def get_highest_version(self, binItem):
         """Obtiene la version mas alta de un binItem - COPIADO EXACTO del Pull"""
@@ -376,8 +208,9 @@ class HieroOperations:
         """Cambia el clip a la version mas alta disponible - COPIADO EXACTO del Pull"""
         binItem = clip.source().binItem()
         activeVersion = binItem.activeVersion()
-        vc = hiero.core.VersionScanner()
-        vc.doScan(activeVersion)
+        if VersionScanCache.needs_version_scan(clip):
+            vc = hiero.core.VersionScanner()
+            vc.doScan(activeVersion)
         highest_version = self.get_highest_version(binItem)
         if highest_version:
             binItem.setActiveVersion(highest_version)
@@ -461,11 +294,10 @@ class HieroOperations:
             )
         else:
             # Buscar clip en track EXR en la posicion del playhead
-            exr_clip_at_playhead = None
-            for clip in exr_track:
-                if clip.timelineIn() <= current_time < clip.timelineOut():
-                    exr_clip_at_playhead = clip
-                    break
+            # Indice por intervalos de la secuencia: bisect en lugar de recorrer el track
+            exr_clip_at_playhead = TimelineIndex.item_at(
+                seq, TimelineIndex.sequence_index(seq).for_track(exr_track), current_time
+            )
 
             if not exr_clip_at_playhead:
                 QMessageBox.warning(
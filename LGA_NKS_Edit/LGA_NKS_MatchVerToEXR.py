@@ -1,7 +1,7 @@
 """
 _______________________________________________________________________________________
 
-  LGA_NKS_MatchVerToEXR v0.4 | Lega
+  LGA_NKS_MatchVerToEXR v0.7 | Lega
   Busca la version actual de todos los clips del track llamado EXR e
   intenta subir la versión de todos los clips del track llamado REV a la misma versión.
 _______________________________________________________________________________________
@@ -9,24 +9,26 @@ ________________________________________________________________________________
 """
 
 import os
-import re
 import hiero.core
 import hiero.ui
 from PySide2.QtWidgets import (
     QApplication,
     QWidget,
     QVBoxLayout,
-    QTableWidget,
-    QTableWidgetItem,
-    QHeaderView,
     QMessageBox,
     QPushButton,
     QHBoxLayout,
 )
-from PySide2.QtWidgets import QStyledItemDelegate, QStyle
-from PySide2.QtGui import QColor, QBrush, QFont, QPalette
 from PySide2.QtCore import Qt
 import sys
+from pathlib import Path
+
+# Cache de versiones en disco, tabla de resultados y parser de nombres compartidos con el Pull
+sys.path.append(str(Path(__file__).parent.parent / "LGA_NKS"))
+import LGA_NKS_VersionScan_Cache as VersionScanCache
+import LGA_NKS_ResultsTable as ResultsTable
+import LGA_NKS_NameParser as NameParser
+from LGA_NKS_NameParser import extract_version_number
 
 # Variable global para activar o desactivar los prints
 DEBUG = True
@@ -41,22 +43,9 @@ def debug_print(*message):
         print(*message)
 
 
-def extract_version_number(version_str):
-    """Extrae el numero de version numerico de un string de version."""
-    match = re.search(r"_v(\d+)(?:[-\(][^)]+)?", version_str)
-    if match:
-        try:
-            version_num = int(match.group(1))
-            return version_num
-        except ValueError:
-            pass
-    return 0
-
-
 class VersionMatcherGUI(QWidget):
     def __init__(self, parent=None):
         super(VersionMatcherGUI, self).__init__(parent)
-        self.row_background_colors = []  # COPIADO DEL PULL para el delegado
         self.hiero_ops = None
         self.initUI()
 
@@ -79,61 +68,19 @@ class VersionMatcherGUI(QWidget):
                     "No se encontraron clips EXR con correspondientes clips REV.",
                 )
 
-    def add_color_to_background_list(self, row_colors):
-        """COPIADO DEL PULL - Agrega una lista de colores de fondo para una nueva fila."""
-        self.row_background_colors.append(row_colors)
-
     def initUI(self):
         self.setWindowTitle("EXR to REV Version Matcher - Results")
         layout = QVBoxLayout(self)
 
-        self.table = QTableWidget(0, 4, self)
-        self.table.setHorizontalHeaderLabels(
-            ["Shot", "EXR Version", "REV Was", "Status"]
-        )
-
-        # COPIADO DEL PULL - Configuracion de tabla
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
-        self.table.verticalHeader().setVisible(False)
-        self.table.setFocusPolicy(Qt.NoFocus)
-        self.table.setStyleSheet(
-            """
-            QTableView::item:selected {
-                color: black;
-                background-color: transparent;
-            }
-        """
+        # Tabla modelo/vista compartida con el Pull
+        self.table = ResultsTable.ResultsTableView(
+            ["Shot", "EXR Version", "REV Was", "Status"], self
         )
-
-        # COPIADO DEL PULL - Asignar delegado personalizado
-        delegate = ColorMixDelegate(self.table, self.row_background_colors)
-        self.table.setItemDelegate(delegate)
-
         layout.addWidget(self.table)
         self.setLayout(layout)
 
-        # COPIADO DEL PULL - Estilo para headers
-        font = QFont()
-        font.setBold(True)
-        self.table.horizontalHeader().setFont(font)
-
     def add_result(self, shot_base, exr_version, rev_was_version, status):
         """Anadir una fila a la tabla con el resultado."""
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-
-        # Agregar items a la tabla
-        shot_item = QTableWidgetItem(shot_base + "   ")  # COPIADO DEL PULL - espacios
-        exr_item = QTableWidgetItem(f"v{exr_version:02d}")
-        rev_item = QTableWidgetItem(f"v{rev_was_version:02d}")
-        status_item = QTableWidgetItem(status)
-
-        # COPIADO DEL PULL - Centrado
-        exr_item.setTextAlignment(Qt.AlignCenter)
-        rev_item.setTextAlignment(Qt.AlignCenter)
-
         # Colorear segun el estado
         if status == "Updated":
             status_color = "#7d4cff"  # Morado
@@ -144,60 +91,19 @@ class VersionMatcherGUI(QWidget):
         else:
             status_color = "#8a8a8a"  # Gris por defecto
 
-        # COPIADO DEL PULL - Configuracion de colores
-        status_bg_color = QColor(status_color)
-        status_text_color = self.color_for_background(status_color)
-        status_item.setBackground(QBrush(status_bg_color))
-        status_item.setForeground(QBrush(QColor(status_text_color)))
-        status_item.setTextAlignment(Qt.AlignCenter)
-
-        # Agregar items
-        self.table.setItem(row, 0, shot_item)
-        self.table.setItem(row, 1, exr_item)
-        self.table.setItem(row, 2, rev_item)
-        self.table.setItem(row, 3, status_item)
-
-        # COPIADO DEL PULL - Configuracion de colores para delegado
-        row_colors = ["#8a8a8a"] * 4  # Color por defecto
-        row_colors[3] = status_color  # Color para la columna de status
-        self.add_color_to_background_list(row_colors)
-
-        self.table.resizeColumnsToContents()
-
-    def luminance(self, color):
-        """COPIADO DEL PULL - Calcula la luminancia de un color para determinar si es claro u oscuro."""
-        red = color.red()
-        green = color.green()
-        blue = color.blue()
-        return 0.299 * red + 0.587 * green + 0.114 * blue
-
-    def color_for_background(self, hex_color):
-        """COPIADO DEL PULL - Determina el color del texto basado en el color de fondo."""
-        color = QColor(hex_color)
-        return "#ffffff" if self.luminance(color) < 128 else "#000000"
+        cell = ResultsTable.result_cell
+        self.table.add_row(
+            [
+                cell(shot_base + "   "),  # COPIADO DEL PULL - espacios
+                cell(f"v{exr_version:02d}", centered=True),
+                cell(f"v{rev_was_version:02d}", centered=True),
+                cell(status, background=status_color, centered=True),
+            ]
+        )
 
     def adjust_window_size(self):
-        """COPIADO EXACTO DEL PULL - Ajustes para cambiar el tamano y posicion de la ventana"""
-        self.table.horizontalHeader().setStretchLastSection(False)
-        self.table.resizeColumnsToContents()
-        width = self.table.verticalHeader().width() - 30
-        for i in range(self.table.columnCount()):
-            width += self.table.columnWidth(i) + 20
-        screen = QApplication.primaryScreen()
-        screen_rect = screen.availableGeometry()
-        max_width = screen_rect.width() * 0.8
-        final_width = min(width, max_width)
-        height = self.table.horizontalHeader().height() + 20
-        for i in range(self.table.rowCount()):
-            height += self.table.rowHeight(i) + 4
-        max_height = screen_rect.height() * 0.8
-        final_height = min(height, max_height)
-        self.table.horizontalHeader().setStretchLastSection(True)
-        self.resize(final_width, final_height)
-        self.move(
-            (screen_rect.width() - final_width) // 2,
-            (screen_rect.height() - final_height) // 2,
-        )
+        """Ajusta el tamano y posicion de la ventana - tabla compartida con el Pull"""
+        ResultsTable.fit_window_to_table(self, self.table)
 
     def keyPressEvent(self, event):
         """COPIADO DEL PULL - Cerrar la ventana con ESC."""
@@ -207,38 +113,6 @@ class VersionMatcherGUI(QWidget):
             super(VersionMatcherGUI, self).keyPressEvent(event)
 
 
-class ColorMixDelegate(QStyledItemDelegate):
-    """COPIADO EXACTO DEL PULL - Delegado para mezclar colores en selecciones"""
-
-    def __init__(
-        self, table_widget, background_colors, mix_color=(88, 88, 88), parent=None
-    ):
-        super(ColorMixDelegate, self).__init__(parent)
-        self.table_widget = table_widget
-        self.background_colors = background_colors
-        self.mix_color = mix_color
-
-    def paint(self, painter, option, index):
-        row = index.row()
-        column = index.column()
-        if option.state & QStyle.State_Selected:
-            original_color = QColor(self.background_colors[row][column])
-            mixed_color = self.mix_colors(
-                (original_color.red(), original_color.green(), original_color.blue()),
-                self.mix_color,
-            )
-            option.palette.setColor(QPalette.Highlight, QColor(*mixed_color))
-        else:
-            original_color = QColor(self.background_colors[row][column])
-            option.palette.setColor(QPalette.Base, original_color)
-        super(ColorMixDelegate, self).paint(painter, option, index)
-
-    def mix_colors(self, original_color, mix_color):
-        r1, g1, b1 = original_color
-        r2, g2, b2 = mix_color
-        return ((r1 + r2) // 2, (g1 + g2) // 2, (b1 + b2) // 2)
-
-
 class HieroOperations:
     """Clase para manejar operaciones en Hiero - COPIADA de LGA_NKS_Flow_Pull.py"""
 
@@ -249,18 +123,8 @@ class HieroOperations:
         )
 
     def parse_exr_name(self, file_name):
-        """Extrae el nombre base del archivo y el numero de version con prefijo - COPIADO del Pull"""
-        # Remover extension y secuencia numerica para archivos EXR
-        base_name = re.sub(r"_%04d\.exr$", "", file_name)
-        # Si no cambio, puede ser un archivo de video (mxf, mov, etc)
-        if base_name == file_name:
-            # Remover extension para archivos de video
-            base_name = re.sub(r"\.[^.]+$", "", file_name)
-
-        version_match = re.search(r"(_v\d+)", base_name)
-        version_str = version_match.group(1) if version_match else "_vUnknown"
-
-        return base_name, version_str
+        """Extrae el nombre base del archivo y el numero de version con prefijo - parser compartido con el Pull"""
+        return NameParser.parse_exr_name(file_name)
 
     def get_highest_version(self, binItem):
         """Obtiene la version mas alta de un binItem - COPIADO EXACTO del Pull"""
@@ -278,8 +142,9 @@ class HieroOperations:
         """Cambia el clip a la version mas alta disponible - COPIADO EXACTO del Pull"""
         binItem = clip.source().binItem()
         activeVersion = binItem.activeVersion()
-        vc = hiero.core.VersionScanner()
-        vc.doScan(activeVersion)
+        if VersionScanCache.needs_version_scan(clip):
+            vc = hiero.core.VersionScanner()
+            vc.doScan(activeVersion)
         highest_version = self.get_highest_version(binItem)
         if highest_version:
             binItem.setActiveVersion(highest_version)
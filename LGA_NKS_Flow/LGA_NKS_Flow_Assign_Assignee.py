@@ -1,8 +1,10 @@
 """
 ________________________________________________________________
 
-  LGA_NKS_Flow_Assign_Assignee v1.21 | Lega Pugliese
+  LGA_NKS_Flow_Assign_Assignee v1.25 | Lega Pugliese
   Asigna un usuario a una tarea en ShotGrid (Flow) a partir del base_name y nombre de usuario
+  Con varios clips seleccionados resuelve todas las tareas juntas y las
+  actualiza en un solo batch (assign_assignee_to_tasks)
 ________________________________________________________________
 """
 
@@ -27,6 +29,11 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
 from SecureConfig_Reader import get_flow_credentials
+import LGA_NKS_Flow_IdResolver as IdResolver
+
+# Parser de nombres compartido
+sys.path.append(os.path.join(os.path.dirname(current_dir), "LGA_NKS"))
+import LGA_NKS_NameParser as NameParser
 
 DEBUG = False
 debug_messages = []
@@ -175,6 +182,15 @@ class FlowStatusWindow(QDialog):
         self.close_button.setEnabled(True)  # Habilitar botón de Close
         self._adjust_window_size()
 
+    def show_bulk_results(self, results):
+        """Muestra el resultado de cada clip de una asignacion en bloque"""
+        html, summary, all_ok = IdResolver.clip_results_html(results)
+        self.shot_label.setText(html)
+        if all_ok:
+            self.show_success(summary)
+        else:
+            self.show_error(summary)
+
     def show_error(self, message):
         """Muestra mensaje de error en rojo"""
         error_html = f"<span style='color: #C05050; '>{message}</span>"
@@ -220,46 +236,20 @@ class ShotGridManager:
         if not self.sg:
             debug_print("Conexion a ShotGrid no esta inicializada")
             return None, None
-        debug_print(f"Buscando proyecto con nombre: {project_name}")
+        # IDs desde pipesync.db o la cache; Flow solo si no estan (una consulta)
         try:
-            projects = self.sg.find(
-                "Project", [["name", "is", project_name]], ["id", "name"]
+            shot, task = IdResolver.resolve_task(
+                project_name, shot_code, task_name_lower, self.sg
             )
         except Exception as e:
-            debug_print(f"Error buscando proyecto: {e}")
+            debug_print(f"Error buscando shot y tarea: {e}")
             return None, None
-        if not projects:
-            debug_print("No se encontro el proyecto con el nombre especificado.")
-            return None, None
-        project_id = projects[0]["id"]
-        filters_shot = [
-            ["project", "is", {"type": "Project", "id": project_id}],
-            ["code", "is", shot_code],
-        ]
-        fields_shot = ["id", "code"]
-        shots = self.sg.find("Shot", filters_shot, fields_shot)
-        if not shots:
+        if not shot:
             debug_print("No se encontro el Shot con el codigo especificado.")
             return None, None
-        shot_id = shots[0]["id"]
-        shot_code_found = shots[0]["code"]
-        debug_print(f"Shot encontrado: {shot_code_found} (ID: {shot_id})")
-        filters_task = [
-            ["entity", "is", {"type": "Shot", "id": shot_id}],
-            ["content", "is", task_name_lower],
-        ]
-        fields_task = ["id", "content", "task_assignees"]
-        tasks = self.sg.find("Task", filters_task, fields_task)
-        if not tasks:
-            filters_task_all = [["entity", "is", {"type": "Shot", "id": shot_id}]]
-            fields_task_all = ["id", "content", "task_assignees"]
-            all_tasks = self.sg.find("Task", filters_task_all, fields_task_all)
-            for task in all_tasks:
-                if task["content"].lower() == task_name_lower:
-                    tasks = [task]
-                    break
-        if tasks:
-            task = tasks[0]
+        shot_code_found = shot["shot_code"]
+        debug_print(f"Shot encontrado: {shot_code_found} (ID: {shot['shot_id']})")
+        if task:
             debug_print(f"Task encontrada: {task['content']} (ID: {task['id']})")
             return shot_code_found, task
         else:
@@ -288,18 +278,19 @@ class ShotGridManager:
             debug_print(f"Error buscando usuario: {e}")
             return None
 
-    def add_assignee_to_task(self, task_id, current_assignees, user):
+    def add_assignee_to_task(self, task_id, user):
         if not self.sg:
             debug_print("Conexion a ShotGrid no esta inicializada")
             return False, "Conexion a ShotGrid no inicializada"
         try:
-            # Evitar duplicados
-            assignees = current_assignees or []
-            if any(u["id"] == user["id"] for u in assignees):
-                debug_print(f"El usuario ya es asignado de la tarea.")
-                return True, "El usuario ya estaba asignado a la tarea."
-            new_assignees = assignees + [user]
-            result = self.sg.update("Task", task_id, {"task_assignees": new_assignees})
+            # Modo "add": Flow agrega el usuario a los asignados actuales (sin
+            # duplicarlo) y no hace falta leerlos antes
+            result = self.sg.update(
+                "Task",
+                task_id,
+                {"task_assignees": [{"type": "HumanUser", "id": user["id"]}]},
+                multi_entity_update_modes={"task_assignees": "add"},
+            )
             if result:
                 debug_print(f"Usuario asignado exitosamente a la tarea {task_id}")
                 return True, f"Usuario asignado exitosamente."
@@ -310,10 +301,35 @@ class ShotGridManager:
             debug_print(f"Error al asignar usuario: {e}")
             return False, f"Error al asignar usuario: {e}"
 
+    def add_assignee_to_tasks(self, task_ids, user):
+        """Igual que add_assignee_to_task para muchas tareas, en un solo batch."""
+        if not self.sg:
+            debug_print("Conexion a ShotGrid no esta inicializada")
+            return False, "Conexion a ShotGrid no inicializada"
+        requests = [
+            {
+                "request_type": "update",
+                "entity_type": "Task",
+                "entity_id": task_id,
+                "data": {"task_assignees": [{"type": "HumanUser", "id": user["id"]}]},
+                "multi_entity_update_modes": {"task_assignees": "add"},
+            }
+            for task_id in task_ids
+        ]
+        try:
+            # El batch es todo o nada: o se actualizan todas o ninguna
+            self.sg.batch(requests)
+            debug_print(f"Usuario asignado a {len(task_ids)} tareas en un batch")
+            return True, "Usuario asignado exitosamente."
+        except Exception as e:
+            debug_print(f"Error al asignar usuario: {e}")
+            return False, f"Error al asignar usuario: {e}"
+
 
 class WorkerSignals(QObject):
     shot_info_ready = Signal(str, str)  # shot_name, task_name
     finished = Signal(bool, str)  # success, message
+    bulk_finished = Signal(list)  # resultado de cada clip
     error = Signal(str)
 
 
@@ -346,14 +362,11 @@ class AssignAssigneeWorker(QRunnable):
                 )
                 return
 
-            project_name = self.base_name.split("_")[0]
-            parts = self.base_name.split("_")
-            shot_code = "_".join(parts[:5])
-            version_number_str = None
-            for part in parts:
-                if part.startswith("v") and part[1:].isdigit():
-                    version_number_str = part
-                    break
+            parsed = NameParser.parse_base_name(self.base_name)
+            project_name = parsed.project
+            parts = parsed.parts
+            shot_code = parsed.shot_code
+            version_number_str = parsed.version_token
             if not version_number_str:
                 self.signals.error.emit(
                     "Error: No se encontro un numero de version valido en el nombre base."
@@ -383,10 +396,7 @@ class AssignAssigneeWorker(QRunnable):
                     f"No se encontro el usuario '{self.user_name}' en ShotGrid."
                 )
                 return
-            current_assignees = task.get("task_assignees", [])
-            success, message = sg_manager.add_assignee_to_task(
-                task["id"], current_assignees, user
-            )
+            success, message = sg_manager.add_assignee_to_task(task["id"], user)
 
             if success:
                 self.signals.finished.emit(
@@ -401,6 +411,56 @@ class AssignAssigneeWorker(QRunnable):
             self.signals.error.emit(f"Error: {str(e)}")
 
 
+class BulkAssignAssigneeWorker(QRunnable):
+    def __init__(self, base_names, user_name):
+        super(BulkAssignAssigneeWorker, self).__init__()
+        self.base_names = base_names
+        self.user_name = user_name
+        self.signals = WorkerSignals()
+
+    @Slot()
+    def run(self):
+        try:
+            debug_print(
+                f"=== Asignando {self.user_name} a {len(self.base_names)} clips ==="
+            )
+            sg_url, sg_login, sg_password = get_flow_credentials_secure()
+            if not all([sg_url, sg_login, sg_password]):
+                self.signals.error.emit(
+                    "No se pudieron obtener las credenciales de Flow desde SecureConfig."
+                )
+                return
+            sg_manager = ShotGridManager(sg_url, sg_login, sg_password)
+            if not sg_manager.sg:
+                self.signals.error.emit(
+                    "No se pudo inicializar la conexión a ShotGrid."
+                )
+                return
+
+            results = IdResolver.resolve_clip_tasks(self.base_names, sg_manager.sg)
+            # Dos clips del mismo shot/task se actualizan una sola vez
+            task_ids = list(
+                dict.fromkeys(r["task_id"] for r in results if r["task_id"])
+            )
+            if task_ids:
+                user = sg_manager.find_user_by_name(self.user_name)
+                if not user:
+                    self.signals.error.emit(
+                        f"No se encontro el usuario '{self.user_name}' en ShotGrid."
+                    )
+                    return
+                success, message = sg_manager.add_assignee_to_tasks(task_ids, user)
+                for result in results:
+                    if result["task_id"]:
+                        result["ok"] = success
+                        result["message"] = "Asignado." if success else message
+            self.signals.bulk_finished.emit(results)
+
+        except Exception as e:
+            debug_print(f"Error en BulkAssignAssigneeWorker: {e}")
+            self.signals.error.emit(f"Error: {str(e)}")
+
+
 def get_flow_credentials_secure():
     sg_url, sg_login, sg_password = get_flow_credentials()
     if not sg_url or not sg_login or not sg_password:
@@ -466,6 +526,37 @@ def assign_assignee_to_task(base_name, user_name):
     debug_print("=== Worker iniciado en hilo separado ===")
 
 
+def assign_assignee_to_tasks(base_names, user_name):
+    """
+    Asigna el usuario a las tareas de varios clips con un solo batch a Flow
+    y muestra el resultado de cada uno en la ventana de estado.
+
+    Args:
+        base_names (list): Nombres base de los clips seleccionados
+        user_name (str): Nombre del usuario a asignar
+    """
+    global _status_window
+
+    user_display_name, user_color = get_user_info_from_config(user_name)
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+
+    _status_window = FlowStatusWindow(user_display_name, user_color, "asignar usuario")
+    _status_window.show()
+    _status_window.show_processing_message()
+
+    worker = BulkAssignAssigneeWorker(base_names, user_name)
+    worker.signals.bulk_finished.connect(
+        lambda results, window=_status_window: window.show_bulk_results(results)
+    )
+    worker.signals.error.connect(
+        lambda error_msg, window=_status_window: window.show_error(error_msg)
+    )
+    QThreadPool.globalInstance().start(worker)
+
+
 if __name__ == "__main__":
     import sys
 
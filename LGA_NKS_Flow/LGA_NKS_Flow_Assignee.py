@@ -1,7 +1,7 @@
 """
 _____________________________________________________________
 
-  LGA_NKS_Flow_Assignee v1.2 | Lega Pugliese
+  LGA_NKS_Flow_Assignee v1.4 | Lega Pugliese
   Imprime los asignados de una tarea en ShotGrid (Flow) a partir del base_name
   Se usa desde el panel de assignee de LGA_NKS_Flow_Assignee_Panel.py
 _____________________________________________________________
@@ -28,6 +28,11 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
 from SecureConfig_Reader import get_flow_credentials
+import LGA_NKS_Flow_IdResolver as IdResolver
+
+# Parser de nombres compartido
+sys.path.append(os.path.join(os.path.dirname(current_dir), "LGA_NKS"))
+import LGA_NKS_NameParser as NameParser
 
 # Variable global para debug
 DEBUG = False
@@ -250,46 +255,6 @@ class ShotGridManager:
             debug_print(f"Error al inicializar la conexion a ShotGrid: {e}")
             self.sg = None
 
-    def find_shot_and_tasks(self, project_name, shot_code):
-        if not self.sg:
-            debug_print("Conexion a ShotGrid no esta inicializada")
-            return None, None, None
-        debug_print(f"Buscando proyecto con nombre: {project_name}")
-        try:
-            projects = self.sg.find(
-                "Project", [["name", "is", project_name]], ["id", "name"]
-            )
-        except Exception as e:
-            debug_print(f"Error buscando proyecto: {e}")
-            return None, None, None
-        if projects:
-            project_id = projects[0]["id"]
-            filters = [
-                ["project", "is", {"type": "Project", "id": project_id}],
-                ["code", "is", shot_code],
-            ]
-            fields = ["id", "code", "description"]
-            shots = self.sg.find("Shot", filters, fields)
-            if shots:
-                shot_id = shots[0]["id"]
-                debug_print(f"Shot encontrado: {shots[0]['code']} (ID: {shot_id})")
-                tasks = self.find_tasks_for_shot(shot_id)
-                return projects[0], shots[0], tasks
-            else:
-                debug_print("No se encontro el Shot con el codigo especificado.")
-                return None, None, None
-        else:
-            debug_print("No se encontro el proyecto con el nombre especificado.")
-            return None, None, None
-
-    def find_tasks_for_shot(self, shot_id):
-        if not self.sg:
-            debug_print("Conexion a ShotGrid no esta inicializada")
-            return []
-        filters = [["entity", "is", {"type": "Shot", "id": shot_id}]]
-        fields = ["id", "content", "sg_status_list"]
-        return self.sg.find("Task", filters, fields)
-
     def get_task_assignees(self, task_id):
         if not self.sg:
             debug_print("Conexion a ShotGrid no esta inicializada")
@@ -342,15 +307,11 @@ class AssigneeWorker(QRunnable):
                 return
 
             # Extraer datos del base_name igual que en el script de push
-            project_name = self.base_name.split("_")[0]
-            parts = self.base_name.split("_")
-            shot_code = "_".join(parts[:5])
-            # Extraer nombre de la tarea
-            version_number_str = None
-            for part in parts:
-                if part.startswith("v") and part[1:].isdigit():
-                    version_number_str = part
-                    break
+            parsed = NameParser.parse_base_name(self.base_name)
+            project_name = parsed.project
+            parts = parsed.parts
+            shot_code = parsed.shot_code
+            version_number_str = parsed.version_token
             if not version_number_str:
                 self.signals.error.emit(
                     "Error: No se encontro un numero de version valido en el nombre base."
@@ -365,18 +326,13 @@ class AssigneeWorker(QRunnable):
             debug_print(
                 f"Buscando shot y tareas para el proyecto: {project_name}, Shot: {shot_code}"
             )
-            project, shot, tasks = sg_manager.find_shot_and_tasks(
-                project_name, shot_code
+            shot, task = IdResolver.resolve_task(
+                project_name, shot_code, task_name, sg_manager.sg
             )
-            if not tasks:
+            if not shot or not shot["tasks"]:
                 self.signals.error.emit("No se encontraron tareas para el shot.")
                 return
-            # Buscar el task_id correcto
-            task_id = None
-            for task in tasks:
-                if task["content"].lower() == task_name:
-                    task_id = task["id"]
-                    break
+            task_id = task["id"] if task else None
             if not task_id:
                 self.signals.error.emit(
                     f"No se encontro la tarea '{task_name}' para el shot."
@@ -385,7 +341,7 @@ class AssigneeWorker(QRunnable):
             debug_print(f"Task ID encontrado: {task_id}")
             # Obtener los asignados
             assignees = sg_manager.get_task_assignees(task_id)
-            shot_name = shot.get("code", "-") if shot else shot_code
+            shot_name = shot["shot_code"]
 
             # Emitir los asignados encontrados
             self.signals.assignees_ready.emit(assignees)
@@ -1,8 +1,10 @@
 """
 ________________________________________________________________
 
-  LGA_NKS_Flow_Clear_Assignees v1.2 | Lega Pugliese
+  LGA_NKS_Flow_Clear_Assignees v1.6 | Lega Pugliese
   Elimina los asignados de una tarea en ShotGrid (Flow) a partir del base_name
+  Con varios clips seleccionados resuelve todas las tareas juntas y las
+  limpia en un solo batch (clear_task_assignees_from_base_names)
 ________________________________________________________________
 """
 
@@ -27,6 +29,11 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
 from SecureConfig_Reader import get_flow_credentials
+import LGA_NKS_Flow_IdResolver as IdResolver
+
+# Parser de nombres compartido
+sys.path.append(os.path.join(os.path.dirname(current_dir), "LGA_NKS"))
+import LGA_NKS_NameParser as NameParser
 
 # Variable global para debug
 DEBUG = False
@@ -168,6 +175,15 @@ class FlowStatusWindow(QDialog):
         self.close_button.setEnabled(True)  # Habilitar botón de Close
         self._adjust_window_size()
 
+    def show_bulk_results(self, results):
+        """Muestra el resultado de cada clip de una limpieza en bloque"""
+        html, summary, all_ok = IdResolver.clip_results_html(results)
+        self.shot_label.setText(html)
+        if all_ok:
+            self.show_success(summary)
+        else:
+            self.show_error(summary)
+
     def show_error(self, message):
         """Muestra mensaje de error en rojo"""
         error_html = f"<span style='color: #C05050; '>{message}</span>"
@@ -213,57 +229,24 @@ class ShotGridManager:
         if not self.sg:
             debug_print("Conexion a ShotGrid no esta inicializada")
             return None, None
-        debug_print(f"Buscando proyecto con nombre: {project_name}")
+        # IDs desde pipesync.db o la cache; Flow solo si no estan (una consulta)
         try:
-            projects = self.sg.find(
-                "Project", [["name", "is", project_name]], ["id", "name"]
+            shot, task = IdResolver.resolve_task(
+                project_name, shot_code, task_name_lower, self.sg
             )
         except Exception as e:
-            debug_print(f"Error buscando proyecto: {e}")
-            return None, None
-        if not projects:
-            debug_print("No se encontro el proyecto con el nombre especificado.")
+            debug_print(f"Error buscando shot y tarea: {e}")
             return None, None
-
-        project_id = projects[0]["id"]
-        filters_shot = [
-            ["project", "is", {"type": "Project", "id": project_id}],
-            ["code", "is", shot_code],
-        ]
-        fields_shot = ["id", "code"]
-        shots = self.sg.find("Shot", filters_shot, fields_shot)
-        if not shots:
+        if not shot:
             debug_print("No se encontro el Shot con el codigo especificado.")
             return None, None
 
-        shot_id = shots[0]["id"]
-        shot_code_found = shots[0]["code"]
-        debug_print(f"Shot encontrado: {shot_code_found} (ID: {shot_id})")
-
-        filters_task = [
-            ["entity", "is", {"type": "Shot", "id": shot_id}],
-            [
-                "content",
-                "is",
-                task_name_lower,
-            ],  # ShotGrid parece distinguir mayus/minus en 'is'
-        ]
-        fields_task = ["id", "content"]
-        tasks = self.sg.find("Task", filters_task, fields_task)
-
-        # Fallback si no encuentra por 'is', intenta con 'contains' o iterando
-        if not tasks:
-            filters_task_all = [["entity", "is", {"type": "Shot", "id": shot_id}]]
-            fields_task_all = ["id", "content"]
-            all_tasks = self.sg.find("Task", filters_task_all, fields_task_all)
-            for task in all_tasks:
-                if task["content"].lower() == task_name_lower:
-                    tasks = [task]
-                    break
-
-        if tasks:
-            task_id = tasks[0]["id"]
-            debug_print(f"Task encontrada: {tasks[0]['content']} (ID: {task_id})")
+        shot_code_found = shot["shot_code"]
+        debug_print(f"Shot encontrado: {shot_code_found} (ID: {shot['shot_id']})")
+
+        if task:
+            task_id = task["id"]
+            debug_print(f"Task encontrada: {task['content']} (ID: {task_id})")
             return shot_code_found, task_id
         else:
             debug_print(
@@ -290,10 +273,34 @@ class ShotGridManager:
             debug_print(f"Error al eliminar los asignados de la tarea: {e}")
             return False, f"Error al eliminar asignados: {e}"
 
+    def clear_tasks_assignees(self, task_ids):
+        """Igual que clear_task_assignees para muchas tareas, en un solo batch."""
+        if not self.sg:
+            debug_print("Conexion a ShotGrid no esta inicializada")
+            return False, "Conexion a ShotGrid no inicializada"
+        requests = [
+            {
+                "request_type": "update",
+                "entity_type": "Task",
+                "entity_id": task_id,
+                "data": {"task_assignees": []},
+            }
+            for task_id in task_ids
+        ]
+        try:
+            # El batch es todo o nada: o se limpian todas o ninguna
+            self.sg.batch(requests)
+            debug_print(f"Asignados eliminados de {len(task_ids)} tareas en un batch")
+            return True, "Asignados eliminados."
+        except Exception as e:
+            debug_print(f"Error al eliminar los asignados de las tareas: {e}")
+            return False, f"Error al eliminar asignados: {e}"
+
 
 class WorkerSignals(QObject):
     shot_info_ready = Signal(str, str)  # shot_name, task_name
     finished = Signal(bool, str)  # success, message
+    bulk_finished = Signal(list)  # resultado de cada clip
     error = Signal(str)
 
 
@@ -326,15 +333,11 @@ class ClearAssigneeWorker(QRunnable):
                 return
 
             # Extraer datos del base_name
-            project_name = self.base_name.split("_")[0]
-            parts = self.base_name.split("_")
-            shot_code = "_".join(parts[:5])
-            # Extraer nombre de la tarea
-            version_number_str = None
-            for part in parts:
-                if part.startswith("v") and part[1:].isdigit():
-                    version_number_str = part
-                    break
+            parsed = NameParser.parse_base_name(self.base_name)
+            project_name = parsed.project
+            parts = parsed.parts
+            shot_code = parsed.shot_code
+            version_number_str = parsed.version_token
             if not version_number_str:
                 self.signals.error.emit(
                     "Error: No se encontro un numero de version valido en el nombre base."
@@ -379,6 +382,47 @@ class ClearAssigneeWorker(QRunnable):
             self.signals.error.emit(f"Error: {str(e)}")
 
 
+class BulkClearAssigneeWorker(QRunnable):
+    def __init__(self, base_names):
+        super(BulkClearAssigneeWorker, self).__init__()
+        self.base_names = base_names
+        self.signals = WorkerSignals()
+
+    @Slot()
+    def run(self):
+        try:
+            debug_print(f"=== Limpiando asignados de {len(self.base_names)} clips ===")
+            sg_url, sg_login, sg_password = get_flow_credentials_secure()
+            if not all([sg_url, sg_login, sg_password]):
+                self.signals.error.emit(
+                    "No se pudieron obtener las credenciales de Flow desde SecureConfig."
+                )
+                return
+            sg_manager = ShotGridManager(sg_url, sg_login, sg_password)
+            if not sg_manager.sg:
+                self.signals.error.emit(
+                    "No se pudo inicializar la conexión a ShotGrid."
+                )
+                return
+
+            results = IdResolver.resolve_clip_tasks(self.base_names, sg_manager.sg)
+            # Dos clips del mismo shot/task se actualizan una sola vez
+            task_ids = list(
+                dict.fromkeys(r["task_id"] for r in results if r["task_id"])
+            )
+            if task_ids:
+                success, message = sg_manager.clear_tasks_assignees(task_ids)
+                for result in results:
+                    if result["task_id"]:
+                        result["ok"] = success
+                        result["message"] = "Limpia." if success else message
+            self.signals.bulk_finished.emit(results)
+
+        except Exception as e:
+            debug_print(f"Error en BulkClearAssigneeWorker: {e}")
+            self.signals.error.emit(f"Error: {str(e)}")
+
+
 def get_flow_credentials_secure():
     sg_url, sg_login, sg_password = get_flow_credentials()
     if not sg_url or not sg_login or not sg_password:
@@ -443,6 +487,38 @@ def clear_task_assignees_from_base_name(base_name):
     debug_print("=== Worker iniciado en hilo separado ===")
 
 
+def clear_task_assignees_from_base_names(base_names):
+    """
+    Elimina los asignados de las tareas de varios clips con un solo batch a
+    Flow y muestra el resultado de cada uno en la ventana de estado.
+
+    Args:
+        base_names (list): Nombres base de los clips seleccionados
+    """
+    global _status_window
+
+    user_display_name, user_color = get_user_info_from_config()
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+
+    _status_window = FlowStatusWindow(
+        user_display_name, user_color, "limpiar asignados"
+    )
+    _status_window.show()
+    _status_window.show_processing_message()
+
+    worker = BulkClearAssigneeWorker(base_names)
+    worker.signals.bulk_finished.connect(
+        lambda results, window=_status_window: window.show_bulk_results(results)
+    )
+    worker.signals.error.connect(
+        lambda error_msg, window=_status_window: window.show_error(error_msg)
+    )
+    QThreadPool.globalInstance().start(worker)
+
+
 if __name__ == "__main__":
     import sys
 
@@ -1,15 +1,21 @@
 """
 ____________________________________________________________________________________
 
-  LGA_NKS_Flow_CreateShot v1.0 | Lega Pugliese
+  LGA_NKS_Flow_CreateShot v1.3 | Lega Pugliese
   Script para crear shots en ShotGrid basado en el nombre del clip seleccionado en Hiero
+  Todos los clips se procesan juntos: proyectos, shots, secuencia y template se
+  buscan una vez, los shots nuevos se crean en batch y los thumbnails se suben
+  en paralelo (el del dialogo o el que dejo CreateShot_Thumbs en ShotThumbs_Cache)
 ____________________________________________________________________________________
 """
 
 import hiero.core
+import glob
 import os
 import re
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from PySide2.QtCore import QRunnable, Slot, QThreadPool, Signal, QObject, Qt
 from PySide2.QtWidgets import (
@@ -38,10 +44,22 @@ import shotgun_api3
 sys.path.append(str(Path(__file__).parent))
 from SecureConfig_Reader import get_flow_credentials
 
+# Parser de nombres compartido
+sys.path.append(str(Path(__file__).parent.parent / "LGA_NKS"))
+import LGA_NKS_NameParser as NameParser
+
 # IMPORTANTE!!!! NO ACTIVAR DEBUG PORQUE CRASHEA HIERO!!!!!!!!!!!!!!!!!!!!!!!!!!!!
 DEBUG = False
 debug_messages = []
 
+TASK_TEMPLATE_NAME = "Template_comp"
+# Requests por llamada a sg.batch (un batch enorme puede superar el timeout de Flow)
+BATCH_SIZE = 50
+# Subidas de thumbnails simultaneas, cada una con su propia conexion a Flow
+THUMBNAIL_UPLOAD_WORKERS = 4
+# Carpeta donde CreateShot y CreateShot_Thumbs guardan los thumbnails
+THUMBS_CACHE_DIR = os.path.join(os.path.dirname(__file__), "ShotThumbs_Cache")
+
 
 def debug_print(message):
     """Imprime un mensaje de debug si la variable DEBUG es True."""
@@ -661,6 +679,10 @@ class ShotGridManager:
 
     def __init__(self, url, login, password):
         debug_print("Inicializando conexion a ShotGrid para crear shot")
+        self.url = url
+        self.login = login
+        self.password = password
+        self._thread_local = threading.local()
         try:
             self.sg = shotgun_api3.Shotgun(url, login=login, password=password)
             debug_print("Conexion a ShotGrid inicializada exitosamente")
@@ -668,9 +690,21 @@ class ShotGridManager:
             debug_print(f"Error al inicializar la conexion a ShotGrid: {e}")
             self.sg = None
 
-    def upload_thumbnail(self, entity_type, entity_id, thumbnail_path):
+    def _upload_connection(self):
+        """
+        Conexion de ShotGrid del hilo actual. shotgun_api3.Shotgun no es thread
+        safe, asi que cada hilo del pool de thumbnails abre la suya una sola vez.
+        """
+        sg = getattr(self._thread_local, "sg", None)
+        if sg is None:
+            sg = shotgun_api3.Shotgun(self.url, login=self.login, password=self.password)
+            self._thread_local.sg = sg
+        return sg
+
+    def upload_thumbnail(self, entity_type, entity_id, thumbnail_path, sg=None):
         """Sube un thumbnail a una entidad en ShotGrid."""
-        if not self.sg:
+        sg = sg or self.sg
+        if not sg:
             debug_print("Conexion a ShotGrid no esta inicializada")
             return False
 
@@ -692,7 +726,7 @@ class ShotGridManager:
 
         try:
             debug_print(f"Iniciando subida de thumbnail: {thumbnail_path}")
-            result = self.sg.upload_thumbnail(entity_type, entity_id, thumbnail_path)
+            result = sg.upload_thumbnail(entity_type, entity_id, thumbnail_path)
             debug_print(f"Thumbnail subido exitosamente: {result}")
             return True
         except Exception as e:
@@ -827,7 +861,7 @@ class ShotGridManager:
 
         # Parametros predefinidos
         sequence_name = shot_config.get("sequence_name")
-        task_template_name = "Template_comp"
+        task_template_name = TASK_TEMPLATE_NAME
 
         debug_print(f"Creando shot '{shot_code}' con configuracion personalizada...")
 
@@ -896,6 +930,275 @@ class ShotGridManager:
             debug_print(f"ERROR al crear el shot: {e}")
             return None
 
+    def send_batch(self, requests):
+        """
+        sg.batch en tandas de BATCH_SIZE. Cada tanda es todo o nada, pero una
+        tanda que falla no afecta a las otras. Devuelve (resultados, errores):
+        resultados alineado con requests (None en las tandas que fallaron) y
+        errores {indice: mensaje} para esas mismas requests.
+        """
+        results = [None] * len(requests)
+        errors = {}
+        for start in range(0, len(requests), BATCH_SIZE):
+            chunk = requests[start : start + BATCH_SIZE]
+            try:
+                results[start : start + len(chunk)] = self.sg.batch(chunk)
+            except Exception as e:
+                debug_print(f"ERROR en la tanda {start // BATCH_SIZE + 1} del batch: {e}")
+                for index in range(start, start + len(chunk)):
+                    errors[index] = str(e)
+        return results, errors
+
+    def upload_thumbnails(self, uploads):
+        """
+        Sube en paralelo los thumbnails de [(shot_id, thumbnail_path)].
+        Devuelve el conjunto de shot_ids cuyo thumbnail se subio.
+        """
+        if not uploads:
+            return set()
+
+        def upload(shot_id, thumbnail_path):
+            return self.upload_thumbnail(
+                "Shot", shot_id, thumbnail_path, self._upload_connection()
+            )
+
+        workers = min(THUMBNAIL_UPLOAD_WORKERS, len(uploads))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                shot_id: executor.submit(upload, shot_id, thumbnail_path)
+                for shot_id, thumbnail_path in uploads
+            }
+        return {shot_id for shot_id, future in futures.items() if future.result()}
+
+    def create_shots_bulk(self, clips_info, shot_config, thumbnails=None, step=None):
+        """
+        Version en bloque de find_shot_and_tasks para todos los clips:
+          - proyectos, shots existentes, secuencias y task template: una
+            consulta cada uno para toda la corrida
+          - shots nuevos: sg.batch; el estado de los existentes va en otro
+            sg.batch, asi un update rechazado no deshace ninguna creacion
+          - tareas Comp de todos los shots: una consulta y un sg.batch
+          - thumbnails de los shots nuevos: en paralelo
+        thumbnails es {shot_code: ruta}. step(mensaje) informa el avance.
+        Devuelve una lista con un dict por shot: shot_code, project_name,
+        shot (o None), created, thumbnail y error.
+        """
+        step = step or (lambda message: None)
+        sequence_name = shot_config.get("sequence_name")
+        thumbnails = thumbnails or {}
+
+        # Un shot por (proyecto, codigo) aunque haya varios clips del mismo shot
+        results = {}
+        for clip_info in clips_info:
+            key = (clip_info["project_name"], clip_info["shot_code"])
+            results.setdefault(
+                key,
+                {
+                    "project_name": key[0],
+                    "shot_code": key[1],
+                    "shot": None,
+                    "created": False,
+                    "thumbnail": False,
+                    "error": "",
+                },
+            )
+
+        step("Buscando proyectos y shots existentes...")
+        project_names = sorted({project for project, _ in results})
+        projects = {
+            project["name"]: project
+            for project in self.sg.find(
+                "Project", [["name", "in", project_names]], ["id", "name"]
+            )
+        }
+        project_ids = [project["id"] for project in projects.values()]
+        project_names_by_id = {project["id"]: name for name, project in projects.items()}
+        existing = {}
+        if project_ids:
+            for shot in self.sg.find(
+                "Shot",
+                [
+                    ["project", "in", [{"type": "Project", "id": i} for i in project_ids]],
+                    ["code", "in", sorted({code for _, code in results})],
+                ],
+                ["id", "code", "project", "description", "sg_status_list"],
+            ):
+                project_name = project_names_by_id.get(shot["project"]["id"])
+                existing.setdefault((project_name, shot["code"]), shot)
+
+        to_create = []
+        for key, result in results.items():
+            if key[0] not in projects:
+                result["error"] = "No se encontro el proyecto."
+            elif key in existing:
+                result["shot"] = existing[key]
+            else:
+                to_create.append(key)
+
+        create_requests = []
+        create_keys = []
+        if to_create:
+            step("Buscando secuencia y task template...")
+            needed_projects = sorted({projects[project]["id"] for project, _ in to_create})
+            sequences = {
+                sequence["project"]["id"]: sequence
+                for sequence in self.sg.find(
+                    "Sequence",
+                    [
+                        [
+                            "project",
+                            "in",
+                            [{"type": "Project", "id": i} for i in needed_projects],
+                        ],
+                        ["code", "is", sequence_name],
+                    ],
+                    ["id", "code", "project"],
+                )
+            }
+            task_template = self.sg.find_one(
+                "TaskTemplate", [["code", "is", TASK_TEMPLATE_NAME]], ["id", "code"]
+            )
+            if not task_template:
+                debug_print(
+                    f"ERROR: No se encontro el task template '{TASK_TEMPLATE_NAME}'"
+                )
+            for key in to_create:
+                project_id = projects[key[0]]["id"]
+                if not task_template:
+                    results[key]["error"] = (
+                        f"No se encontro el task template '{TASK_TEMPLATE_NAME}'."
+                    )
+                    continue
+                if project_id not in sequences:
+                    results[key]["error"] = (
+                        f"No se encontro la secuencia '{sequence_name}'."
+                    )
+                    continue
+                shot_data = {
+                    "project": {"type": "Project", "id": project_id},
+                    "code": key[1],
+                    "description": shot_config["description"],
+                    "sg_sequence": {
+                        "type": "Sequence",
+                        "id": sequences[project_id]["id"],
+                    },
+                    "task_template": {"type": "TaskTemplate", "id": task_template["id"]},
+                }
+                if shot_config["shot_ready"]:
+                    shot_data["sg_status_list"] = "ready"
+                create_requests.append(
+                    {"request_type": "create", "entity_type": "Shot", "data": shot_data}
+                )
+                create_keys.append(key)
+
+        if create_requests:
+            step(f"Creando {len(create_keys)} shots en Flow...")
+            created, errors = self.send_batch(create_requests)
+            for index, key in enumerate(create_keys):
+                if index in errors:
+                    # Solo los shots de la tanda que fallo: los de las otras ya existen
+                    results[key]["error"] = f"Error al crear el shot: {errors[index]}"
+                    continue
+                new_shot = created[index]
+                results[key]["shot"] = new_shot
+                results[key]["created"] = True
+                debug_print(f"Shot creado: {new_shot['code']} (ID: {new_shot['id']})")
+
+        # Los shots existentes solo cambian de estado (como update_shot_status_if_needed):
+        # un error no afecta al resultado del shot
+        if shot_config["shot_ready"]:
+            update_keys = [
+                key
+                for key in results
+                if key in existing and existing[key].get("sg_status_list") != "ready"
+            ]
+            if update_keys:
+                step(f"Actualizando el estado de {len(update_keys)} shots existentes...")
+                _, errors = self.send_batch(
+                    [
+                        {
+                            "request_type": "update",
+                            "entity_type": "Shot",
+                            "entity_id": existing[key]["id"],
+                            "data": {"sg_status_list": "ready"},
+                        }
+                        for key in update_keys
+                    ]
+                )
+                for index in errors:
+                    debug_print(
+                        f"Error actualizando shot status de {update_keys[index][1]}: {errors[index]}"
+                    )
+
+        shots = [result["shot"] for result in results.values() if result["shot"]]
+        if shots and (shot_config["task_ready"] or shot_config["copy_to_comp"]):
+            step("Actualizando tareas Comp...")
+            self.update_comp_tasks(shots, shot_config)
+
+        uploads = [
+            (result["shot"]["id"], thumbnails[result["shot_code"]])
+            for result in results.values()
+            if result["created"] and thumbnails.get(result["shot_code"])
+        ]
+        if uploads:
+            step(f"Subiendo {len(uploads)} thumbnails...")
+            uploaded = self.upload_thumbnails(uploads)
+            for result in results.values():
+                if result["shot"] and result["shot"]["id"] in uploaded:
+                    result["thumbnail"] = True
+
+        return list(results.values())
+
+    def update_comp_tasks(self, shots, shot_config):
+        """Estado y descripcion de las tareas Comp de todos los shots en un solo batch."""
+        data = {}
+        if shot_config["task_ready"]:
+            data["sg_status_list"] = "ready"
+        if shot_config["copy_to_comp"]:
+            data["sg_description"] = shot_config["description"]
+        try:
+            tasks = self.sg.find(
+                "Task",
+                [
+                    [
+                        "entity",
+                        "in",
+                        [{"type": "Shot", "id": shot["id"]} for shot in shots],
+                    ],
+                    ["content", "is", "Comp"],
+                ],
+                ["id", "content"],
+            )
+            requests = [
+                {
+                    "request_type": "update",
+                    "entity_type": "Task",
+                    "entity_id": task["id"],
+                    "data": data,
+                }
+                for task in tasks
+                if task["content"].lower() == "comp"
+            ]
+            _, errors = self.send_batch(requests) if requests else ([], {})
+            debug_print(f"{len(requests) - len(errors)} tareas Comp actualizadas")
+        except Exception as e:
+            debug_print(f"Error actualizando tareas Comp: {e}")
+
+
+def find_cached_thumbnail(clip_info):
+    """
+    Thumbnail que CreateShot_Thumbs guardo para el clip (clip_name.jpg o
+    clip_name_N.jpg en ShotThumbs_Cache), el mas reciente, o None.
+    """
+    candidates = []
+    for name in {clip_info.get("clip_name"), clip_info["shot_code"]}:
+        if not name:
+            continue
+        name = glob.escape(re.sub(r'[<>:"/\\|?*]', "_", name))
+        candidates += glob.glob(os.path.join(THUMBS_CACHE_DIR, f"{name}.jpg"))
+        candidates += glob.glob(os.path.join(THUMBS_CACHE_DIR, f"{name}_*.jpg"))
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
 
 class HieroOperations:
     """Clase para manejar operaciones en Hiero."""
@@ -905,10 +1208,8 @@ class HieroOperations:
 
     def parse_exr_name(self, file_name):
         """Extrae el nombre base del archivo EXR y el numero de version."""
-        base_name = re.sub(r"_%04d\.exr$", "", file_name)
-        version_match = re.search(r"_v(\d+)", base_name)
-        version_number = version_match.group(1) if version_match else "Unknown"
-        return base_name, version_number
+        parsed = NameParser.parse_media_name(file_name)
+        return parsed.sequence_base, parsed.version_digits
 
     def get_selected_clips_info(self):
         """Obtiene informacion de los clips seleccionados en el timeline de Hiero."""
@@ -922,6 +1223,10 @@ class HieroOperations:
                     file_path = clip.source().mediaSource().fileinfos()[0].filename()
                     exr_name = os.path.basename(file_path)
                     base_name, version_number = self.parse_exr_name(exr_name)
+                    try:
+                        clip_name = clip.name()
+                    except Exception:
+                        clip_name = None
 
                     project_name = base_name.split("_")[0]
                     parts = base_name.split("_")
@@ -933,6 +1238,7 @@ class HieroOperations:
                             "project_name": project_name,
                             "shot_code": shot_code,
                             "version_number": version_number,
+                            "clip_name": clip_name,
                         }
                     )
                 return clips_info
@@ -1041,33 +1347,40 @@ class CreateShotWorker(QRunnable):
                 )
                 return
 
-            # Procesar cada clip
-            total_clips = len(clips_info)
-            success_count = 0
-
-            for i, clip_info in enumerate(clips_info, 1):
-                # Emitir información del shot
+            if len(clips_info) == 1:
                 self.signals.shot_info_ready.emit(
-                    clip_info["shot_code"], clip_info["project_name"]
-                )
-
-                self.signals.step_update.emit(
-                    f"Procesando clip {i}/{total_clips}: {clip_info['shot_code']}"
+                    clips_info[0]["shot_code"], clips_info[0]["project_name"]
                 )
 
-                # Procesar shot
-                shot, tasks = sg_manager.find_shot_and_tasks(
-                    clip_info["project_name"],
-                    clip_info["shot_code"],
-                    self.shot_config,
-                    self.thumbnail_path,
-                )
+            # Thumbnail del dialogo (un clip) o los de ShotThumbs_Cache
+            thumbnails = {}
+            for clip_info in clips_info:
+                thumbnail = self.thumbnail_path if len(clips_info) == 1 else None
+                thumbnail = thumbnail or find_cached_thumbnail(clip_info)
+                if thumbnail:
+                    thumbnails[clip_info["shot_code"]] = thumbnail
+
+            # Todos los shots juntos: consultas una vez por corrida y creacion en batch
+            results = sg_manager.create_shots_bulk(
+                clips_info,
+                self.shot_config,
+                thumbnails,
+                step=self.signals.step_update.emit,
+            )
 
-                if shot:
+            total_clips = len(results)
+            success_count = 0
+            for result in results:
+                if result["shot"]:
                     success_count += 1
-                    debug_print(f"Shot procesado exitosamente: {shot['code']}")
+                    debug_print(
+                        f"Shot procesado exitosamente: {result['shot_code']}"
+                        f" (creado: {result['created']}, thumbnail: {result['thumbnail']})"
+                    )
                 else:
-                    debug_print(f"Error procesando shot: {clip_info['shot_code']}")
+                    debug_print(
+                        f"Error procesando shot: {result['shot_code']}: {result['error']}"
+                    )
 
             # Mensaje final
             if success_count == total_clips:
@@ -1081,7 +1394,10 @@ class CreateShotWorker(QRunnable):
                     f"Se procesaron {success_count}/{total_clips} shots exitosamente.",
                 )
             else:
-                self.signals.error.emit("No se pudieron procesar ninguno de los shots.")
+                errors = sorted({result["error"] for result in results if result["error"]})
+                self.signals.error.emit(
+                    "No se pudieron procesar ninguno de los shots. " + " ".join(errors)
+                )
 
         except Exception as e:
             debug_print(f"Error en CreateShotWorker: {e}")
@@ -0,0 +1,400 @@
+"""
+____________________________________________________________________________
+
+  LGA_NKS_Flow_IdResolver v1.02 - Lega Pugliese
+  Traduce (proyecto, shot_code, task) a los IDs de Flow para Push, Show
+  in Flow y los scripts de Assignee, sin las 2 a 4 consultas en cadena
+  (proyecto -> shot -> tasks) que hacia cada uno.
+  Orden de busqueda:
+    1. pipesync.db (tasks.task_id y tasks.shot_sg_id), sin red.
+    2. Cache persistente flow_ids_cache.db con vencimiento (CACHE_TTL_SECONDS).
+    3. Una sola consulta a Flow: el Shot con filtro por el nombre del
+       proyecto (deep link) y el campo tasks, que trae id y nombre de
+       cada task. El resultado se guarda en la cache.
+  Cada shot se devuelve como dict:
+    {"project_id", "shot_id", "shot_code", "tasks": [{"id", "content"}], "source"}
+  project_id es None cuando el dato sale de pipesync.db.
+  resolve_tasks resuelve muchos clips juntos (asignaciones en bloque) con
+  una sola consulta a Flow para todo lo que falte; resolve_clip_tasks hace
+  lo mismo a partir de los base_names de los clips y clip_results_html
+  arma el resumen que muestran las ventanas de Assignee.
+____________________________________________________________________________
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+import PipeSync_DB
+
+# Parser de nombres compartido
+sys.path.append(str(Path(__file__).parent.parent / "LGA_NKS"))
+import LGA_NKS_NameParser as NameParser
+
+
+CACHE_DB_NAME = "flow_ids_cache.db"
+
+# Los IDs de Flow casi no cambian: un dia alcanza para no seguir usando un shot
+# borrado y recreado
+CACHE_TTL_SECONDS = 24 * 3600
+
+CACHE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS flow_ids (
+        project_name TEXT NOT NULL,
+        shot_code TEXT NOT NULL,
+        shots TEXT NOT NULL,
+        stored_at REAL NOT NULL,
+        PRIMARY KEY (project_name, shot_code)
+    )
+"""
+
+_cache_path = None
+_local = threading.local()
+_stats_lock = threading.Lock()
+stats = {"pipesync": 0, "cache": 0, "flow": 0, "not_found": 0}
+
+
+def debug_print(message):
+    PipeSync_DB.debug_print(f"[IdResolver] {message}")
+
+
+def _count(source):
+    with _stats_lock:
+        stats[source] += 1
+
+
+def get_cache_path():
+    global _cache_path
+    if _cache_path is None:
+        _cache_path = PipeSync_DB.sibling_path(CACHE_DB_NAME)
+    return _cache_path
+
+
+def set_cache_path(cache_path):
+    """Fuerza la ruta de la cache (diagnostico y pruebas)."""
+    global _cache_path
+    _close_connection()
+    _cache_path = cache_path
+
+
+def _connection():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(
+            get_cache_path(), timeout=PipeSync_DB.BUSY_TIMEOUT_MS / 1000.0
+        )
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(CACHE_SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def _close_connection():
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        try:
+            conn.close()
+        finally:
+            _local.conn = None
+
+
+def _from_pipesync(project_name, shot_code):
+    if not PipeSync_DB.db_exists():
+        return []
+
+    def load():
+        rows = PipeSync_DB.fetch_all(
+            """
+            SELECT s.shot_name, t.shot_sg_id, t.task_id, t.task_type
+            FROM shots s
+            JOIN projects p ON s.project_id = p.id
+            JOIN tasks t ON t.shot_id = s.id
+            WHERE p.project_name = ? AND s.shot_name = ?
+            """,
+            (project_name, shot_code),
+        )
+        rows = [row for row in rows if row["shot_sg_id"] and row["task_id"]]
+        if not rows:
+            return []
+        return [
+            {
+                "project_id": None,
+                "shot_id": rows[0]["shot_sg_id"],
+                "shot_code": rows[0]["shot_name"],
+                "tasks": [
+                    {"id": row["task_id"], "content": row["task_type"]} for row in rows
+                ],
+                "source": "pipesync",
+            }
+        ]
+
+    try:
+        return PipeSync_DB.record_cache.get(
+            "id_resolver", (project_name, shot_code), load
+        )
+    except sqlite3.Error as e:
+        debug_print(f"Error leyendo pipesync.db: {e}")
+        return []
+
+
+def _from_cache(project_name, shot_code):
+    try:
+        row = (
+            _connection()
+            .execute(
+                "SELECT shots, stored_at FROM flow_ids WHERE project_name = ? AND shot_code = ?",
+                (project_name, shot_code),
+            )
+            .fetchone()
+        )
+    except sqlite3.Error as e:
+        debug_print(f"Error leyendo la cache de IDs: {e}")
+        return []
+    if not row or time.time() - row[1] > CACHE_TTL_SECONDS:
+        return []
+    shots = json.loads(row[0])
+    for shot in shots:
+        shot["source"] = "cache"
+    return shots
+
+
+def _store(project_name, shot_code, shots):
+    try:
+        conn = _connection()
+        with conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO flow_ids (project_name, shot_code, shots, stored_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (project_name, shot_code, json.dumps(shots), time.time()),
+            )
+    except sqlite3.Error as e:
+        debug_print(f"Error guardando la cache de IDs: {e}")
+
+
+def _from_flow_many(sg, pairs):
+    """
+    Una sola consulta para varios (proyecto, shot_code): los errores de Flow se
+    propagan al llamador. Devuelve {(proyecto, shot_code): [shots]}.
+    """
+    found = sg.find(
+        "Shot",
+        [
+            ["project.Project.name", "in", sorted({project for project, _ in pairs})],
+            ["code", "in", sorted({shot_code for _, shot_code in pairs})],
+        ],
+        ["id", "code", "project", "project.Project.name", "tasks"],
+    )
+    by_pair = {pair: [] for pair in pairs}
+    for shot in found:
+        pair = (shot.get("project.Project.name"), shot["code"])
+        if pair not in by_pair:
+            continue
+        by_pair[pair].append(
+            {
+                "project_id": shot["project"]["id"] if shot.get("project") else None,
+                "shot_id": shot["id"],
+                "shot_code": shot["code"],
+                "tasks": [
+                    {"id": task["id"], "content": task.get("name")}
+                    for task in shot.get("tasks") or []
+                ],
+            }
+        )
+    for (project_name, shot_code), shots in by_pair.items():
+        if shots:
+            _store(project_name, shot_code, shots)
+        for shot in shots:
+            shot["source"] = "flow"
+    return by_pair
+
+
+def _from_flow(sg, project_name, shot_code):
+    return _from_flow_many(sg, [(project_name, shot_code)])[(project_name, shot_code)]
+
+
+def resolve_shots(project_name, shot_code, sg=None):
+    """
+    Shots de Flow con ese codigo en el proyecto (normalmente uno; Flow puede
+    tener duplicados). Sin sg solo se consulta pipesync.db y la cache.
+    """
+    for source, lookup in (("pipesync", _from_pipesync), ("cache", _from_cache)):
+        shots = lookup(project_name, shot_code)
+        if shots:
+            _count(source)
+            debug_print(f"{project_name}/{shot_code}: IDs desde {source}")
+            return shots
+    if sg is None:
+        _count("not_found")
+        return []
+    shots = _from_flow(sg, project_name, shot_code)
+    _count("flow" if shots else "not_found")
+    debug_print(f"{project_name}/{shot_code}: {len(shots)} shot(s) desde Flow")
+    return shots
+
+
+def resolve_shot(project_name, shot_code, sg=None):
+    """El primer shot encontrado, o None."""
+    shots = resolve_shots(project_name, shot_code, sg)
+    return shots[0] if shots else None
+
+
+def find_task(shot, task_name):
+    """Task del shot por nombre (sin distinguir mayusculas), o None."""
+    if not shot:
+        return None
+    task_name = task_name.lower()
+    for task in shot["tasks"]:
+        if (task["content"] or "").lower() == task_name:
+            return task
+    return None
+
+
+def resolve_task(project_name, shot_code, task_name, sg=None):
+    """
+    (shot, task) para una task de un shot. Si la task no aparece en pipesync.db
+    o en la cache (se creo despues), se vuelve a preguntar a Flow una vez.
+    """
+    shot = resolve_shot(project_name, shot_code, sg)
+    task = find_task(shot, task_name)
+    if shot and not task and shot["source"] == "pipesync":
+        # Una consulta anterior a Flow pudo haberla guardado en la cache
+        cached = _from_cache(project_name, shot_code)
+        if find_task(cached[0] if cached else None, task_name):
+            shot = cached[0]
+            task = find_task(shot, task_name)
+    if shot and not task and sg is not None and shot["source"] != "flow":
+        debug_print(f"La task {task_name} no esta en {shot['source']}: se consulta Flow")
+        shots = _from_flow(sg, project_name, shot_code)
+        _count("flow")
+        shot = shots[0] if shots else None
+        task = find_task(shot, task_name)
+    return shot, task
+
+
+def resolve_tasks(targets, sg=None):
+    """
+    resolve_task para muchos clips a la vez: targets es una lista de
+    (proyecto, shot_code, task). Lo que no esta en pipesync.db ni en la cache
+    se pide a Flow en una sola consulta. Devuelve {target: (shot, task)}.
+    """
+    local = {}
+    for project_name, shot_code, _ in targets:
+        pair = (project_name, shot_code)
+        if pair not in local:
+            shots = _from_pipesync(*pair) or _from_cache(*pair)
+            local[pair] = shots[0] if shots else None
+
+    def local_task(target):
+        shot = local[target[:2]]
+        task = find_task(shot, target[2])
+        if shot and not task and shot["source"] == "pipesync":
+            cached = _from_cache(*target[:2])
+            if find_task(cached[0] if cached else None, target[2]):
+                shot = cached[0]
+                task = find_task(shot, target[2])
+        return shot, task
+
+    results = {target: local_task(target) for target in targets}
+    missing = sorted({target[:2] for target, (_, task) in results.items() if not task})
+    for pair, shot in local.items():
+        if shot and pair not in missing:
+            _count(shot["source"])
+    if not missing or sg is None:
+        for pair in missing:
+            _count("not_found")
+        return results
+
+    debug_print(f"{len(missing)} shot(s) sin IDs locales: una consulta a Flow")
+    from_flow = _from_flow_many(sg, missing)
+    for pair in missing:
+        _count("flow" if from_flow[pair] else "not_found")
+    for target in targets:
+        if target[:2] in from_flow and not results[target][1]:
+            shots = from_flow[target[:2]]
+            shot = shots[0] if shots else results[target][0]
+            results[target] = (shot, find_task(shot, target[2]))
+    return results
+
+
+def resolve_clip_tasks(base_names, sg=None):
+    """
+    resolve_tasks a partir de los base_names de los clips (la task es la parte
+    anterior a la version). Devuelve una lista de dicts, uno por base_name, con
+    shot_name, task_name, task_id (None si no se encontro), ok y message.
+    """
+    clips = []
+    for base_name in base_names:
+        parsed = NameParser.parse_base_name(base_name)
+        task_name = None
+        if parsed.version_token:
+            version_index = parsed.parts.index(parsed.version_token)
+            task_name = parsed.parts[version_index - 1].lower()
+        clips.append((parsed.project, parsed.shot_code, task_name))
+    targets = [clip for clip in clips if clip[2]]
+    resolved = resolve_tasks(targets, sg) if targets else {}
+
+    results = []
+    for project_name, shot_code, task_name in clips:
+        result = {
+            "shot_name": shot_code,
+            "task_name": task_name or "-",
+            "task_id": None,
+            "ok": False,
+            "message": "",
+        }
+        results.append(result)
+        if not task_name:
+            result["message"] = "Sin numero de version valido en el nombre base."
+            continue
+        shot, task = resolved[(project_name, shot_code, task_name)]
+        if shot:
+            result["shot_name"] = shot["shot_code"]
+        if not task:
+            result["message"] = "No se encontro la tarea."
+            continue
+        result["task_id"] = task["id"]
+    return results
+
+
+def clip_results_html(results):
+    """
+    (html, resumen, todo_ok) de los resultados de resolve_clip_tasks despues
+    de aplicar el cambio: una linea por clip con su shot, task y mensaje.
+    """
+    lines = []
+    for result in results:
+        color = "#00ff00" if result["ok"] else "#C05050"
+        lines.append(
+            f"<span style='color: #6AB5CA; '>{result['shot_name']}</span>"
+            f"<span style='color: #CCCCCC; '> / </span>"
+            f"<span style='color: #B56AB5; '>{result['task_name']}</span>"
+            f"<span style='color: {color}; '> {result['message']}</span>"
+        )
+    html = "<div style='text-align: left;'>" + "<br>".join(lines) + "</div>"
+    ok_count = sum(1 for result in results if result["ok"])
+    summary = f"{ok_count} de {len(results)} tareas actualizadas"
+    return html, summary, ok_count == len(results)
+
+
+def invalidate(project_name, shot_code):
+    """Olvida los IDs cacheados de un shot (por ejemplo si Flow los rechaza)."""
+    try:
+        conn = _connection()
+        with conn:
+            conn.execute(
+                "DELETE FROM flow_ids WHERE project_name = ? AND shot_code = ?",
+                (project_name, shot_code),
+            )
+    except sqlite3.Error as e:
+        debug_print(f"Error invalidando la cache de IDs: {e}")
+
+
+def get_stats():
+    with _stats_lock:
+        return dict(stats)
@@ -0,0 +1,245 @@
+"""
+__________________________________________________________________
+
+  LGA_NKS_Flow_Notes_Search v1.01 - Lega Pugliese
+  Busca texto en las notas de las versiones (indice FTS5 de
+  pipesync.db) y salta a los clips del timeline de cada resultado
+__________________________________________________________________
+
+"""
+
+import hiero.core
+import hiero.ui
+import sys
+import time
+from pathlib import Path
+from PySide2.QtCore import Qt, QTimer
+from PySide2.QtGui import QColor, QFont, QKeySequence
+from PySide2.QtWidgets import (
+    QApplication,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QShortcut,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+# Acceso compartido de solo lectura a pipesync.db
+sys.path.append(str(Path(__file__).parent))
+import PipeSync_DB
+import PipeSync_DB_Search
+
+# Parser de nombres compartido
+sys.path.append(str(Path(__file__).parent.parent / "LGA_NKS"))
+import LGA_NKS_NameParser as NameParser
+
+
+# Variable global para activar o desactivar los prints
+DEBUG = False
+
+# Espera (ms) despues de la ultima tecla antes de buscar
+SEARCH_DELAY_MS = 250
+
+
+def debug_print(*message):
+    if DEBUG:
+        print(*message)
+
+
+app = None
+window = None
+
+
+class TimelineClipIndex:
+    """Clips del timeline activo agrupados por shot, armado una vez al abrir la ventana."""
+
+    def __init__(self, seq):
+        self.seq = seq
+        # shot_code -> [(version_number, track_item)]
+        self.clips_by_shot = {}
+        if seq:
+            self.build()
+
+    def build(self):
+        for track in self.seq.videoTracks():
+            for item in track:
+                if isinstance(item, hiero.core.EffectTrackItem):
+                    continue
+                try:
+                    file_path = item.source().mediaSource().fileinfos()[0].filename()
+                except Exception:
+                    continue
+                parsed = NameParser.parse_media_path(file_path)
+                if len(parsed.parts) < 5:
+                    continue
+                version_number = (
+                    None if parsed.version_str == "_vUnknown" else parsed.version_number
+                )
+                self.clips_by_shot.setdefault(parsed.shot_code, []).append(
+                    (version_number, item)
+                )
+        debug_print(f"Clips indexados: {len(self.clips_by_shot)} shots")
+
+    def has_shot(self, shot_code):
+        return shot_code in self.clips_by_shot
+
+    def clips_for(self, shot_code, version_number=None):
+        """Clips del shot; si alguno tiene la version de la nota, solo esos."""
+        clips = self.clips_by_shot.get(shot_code, [])
+        same_version = [item for number, item in clips if number == version_number]
+        return same_version or [item for _, item in clips]
+
+
+class NotesSearchWindow(QWidget):
+    def __init__(self, clip_index, parent=None):
+        super(NotesSearchWindow, self).__init__(parent)
+        self.clip_index = clip_index
+        self.results = []
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.timeout.connect(self.run_search)
+        self.initUI()
+
+    def initUI(self):
+        self.setWindowTitle("Search Notes")
+        self.setMinimumSize(900, 500)
+        layout = QVBoxLayout(self)
+
+        search_layout = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Buscar en notas (texto, autor o shot)...")
+        self.search_edit.textChanged.connect(
+            lambda: self.search_timer.start(SEARCH_DELAY_MS)
+        )
+        self.search_edit.returnPressed.connect(self.run_search)
+        search_layout.addWidget(self.search_edit)
+        self.select_all_button = QPushButton("Ir a todos")
+        self.select_all_button.clicked.connect(self.select_all_results)
+        search_layout.addWidget(self.select_all_button)
+        layout.addLayout(search_layout)
+
+        self.table = QTableWidget(0, 6, self)
+        self.table.setHorizontalHeaderLabels(
+            ["Shot", " Task ", " Version ", " Autor ", " Fecha ", "Nota"]
+        )
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.cellDoubleClicked.connect(self.jump_to_row)
+        font = QFont()
+        font.setBold(True)
+        self.table.horizontalHeader().setFont(font)
+        layout.addWidget(self.table)
+
+        self.status_label = QLabel()
+        self.status_label.setStyleSheet("color: #888888;")
+        layout.addWidget(self.status_label)
+        if not PipeSync_DB_Search.index_available():
+            self.status_label.setText(
+                "Indice FTS no instalado: la busqueda es lenta. "
+                "Ejecutar PipeSync_DB_Search.py --install"
+            )
+
+        shortcut = QShortcut(QKeySequence(Qt.Key_Escape), self)
+        shortcut.activated.connect(self.close)
+
+    def run_search(self):
+        self.search_timer.stop()
+        text = self.search_edit.text()
+        start = time.perf_counter()
+        try:
+            self.results = PipeSync_DB_Search.search_notes(text)
+        except Exception as e:
+            debug_print(f"Error en la busqueda: {e}")
+            self.results = []
+            self.status_label.setText(f"Error en la busqueda: {e}")
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self.fill_table()
+        in_timeline = sum(
+            1 for r in self.results if self.clip_index.has_shot(r["shot_name"])
+        )
+        self.status_label.setText(
+            f"{len(self.results)} notas ({in_timeline} de shots en el timeline) "
+            f"en {elapsed_ms:.1f} ms"
+        )
+
+    def fill_table(self):
+        self.table.setRowCount(0)
+        self.table.setRowCount(len(self.results))
+        missing_color = QColor(110, 110, 110)
+        for row, result in enumerate(self.results):
+            values = [
+                result["shot_name"],
+                result["task_type"],
+                f"v{result['version_number']:03d}",
+                result["created_by"] or "",
+                str(result["created_on"] or "")[:10],
+                (result["snippet"] or "").replace("\n", " "),
+            ]
+            in_timeline = self.clip_index.has_shot(result["shot_name"])
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if not in_timeline:
+                    # Shot sin clips en el timeline activo: no se puede saltar
+                    item.setForeground(missing_color)
+                self.table.setItem(row, column, item)
+
+    def jump_to_row(self, row, column=None):
+        result = self.results[row]
+        clips = self.clip_index.clips_for(result["shot_name"], result["version_number"])
+        self.jump_to_clips(clips)
+
+    def select_all_results(self):
+        clips = []
+        seen = set()
+        for result in self.results:
+            if result["shot_name"] in seen:
+                continue
+            seen.add(result["shot_name"])
+            clips.extend(
+                self.clip_index.clips_for(result["shot_name"], result["version_number"])
+            )
+        self.jump_to_clips(clips)
+
+    def jump_to_clips(self, clips):
+        """Selecciona los clips en el timeline y lleva el playhead al primero."""
+        if not clips or not self.clip_index.seq:
+            self.status_label.setText("El shot no tiene clips en el timeline activo")
+            return
+        clips = sorted(clips, key=lambda item: item.timelineIn())
+        timeline_editor = hiero.ui.getTimelineEditor(self.clip_index.seq)
+        if timeline_editor:
+            timeline_editor.setSelection(clips)
+        viewer = hiero.ui.currentViewer()
+        if viewer:
+            viewer.setTime(clips[0].timelineIn())
+        debug_print(f"Seleccionados {len(clips)} clips")
+
+
+def main():
+    global app, window
+    if not PipeSync_DB.db_exists():
+        debug_print(f"DB file not found at path: {PipeSync_DB.get_db_path()}")
+        return
+    if not QApplication.instance():
+        app = QApplication(sys.argv)
+    else:
+        app = QApplication.instance()
+    clip_index = TimelineClipIndex(hiero.ui.activeSequence())
+    window = NotesSearchWindow(clip_index)
+    window.setWindowFlags(window.windowFlags() | Qt.Window)
+    window.show()
+    window.search_edit.setFocus()
+
+
+if __name__ == "__main__":
+    main()
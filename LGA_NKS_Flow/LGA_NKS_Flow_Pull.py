@@ -1,6 +1,6 @@
 """
 ____________________________________________________________________________
-  LGA_NKS_Flow_Pull v3.23 | Lega Pugliese
+  LGA_NKS_Flow_Pull v3.28 | Lega Pugliese
   Compara los estados de las task Comp de los shots del timeline de Hiero
   con los estados registrados en un archivo JSON basado en Flow PT
   Tambien aplica tags con los colores de los estados en xyplorer
@@ -10,28 +10,33 @@ ____________________________________________________________________________
 import json
 import hiero.core
 import hiero.ui
-import os
-import re
 import nuke
 import shotgun_api3
 from PySide2.QtWidgets import (
     QApplication,
     QWidget,
     QVBoxLayout,
-    QTableWidget,
-    QTableWidgetItem,
-    QHeaderView,
     QColorDialog,
     QMessageBox,
 )
-from PySide2.QtWidgets import QStyledItemDelegate, QStyle
-from PySide2.QtGui import QColor, QBrush, QScreen, QFont, QPalette
+from PySide2.QtGui import QColor
 from PySide2.QtCore import Qt
 import sys
 import ctypes
 import ctypes.wintypes
 import platform
-import sqlite3
+from pathlib import Path
+
+# Acceso compartido de solo lectura a pipesync.db
+sys.path.append(str(Path(__file__).parent))
+import PipeSync_DB
+import LGA_NKS_Flow_Pull_Plan as PullPlan
+from LGA_NKS_Flow_Pull_Plan import extract_version_number
+
+# Cache de versiones en disco y tabla de resultados compartidas con LGA_NKS_Edit
+sys.path.append(str(Path(__file__).parent.parent / "LGA_NKS"))
+import LGA_NKS_VersionScan_Cache as VersionScanCache
+import LGA_NKS_ResultsTable as ResultsTable
 
 
 # Incluir la funcion delete_tags_from_clip aqui
@@ -55,29 +60,21 @@ def debug_print(*message):
         print(message)
 
 
-def extract_version_number(version_str):
-    """Extrae el numero de version numerico de un string de version."""
-    debug_print(f"Intentando extraer version de: {version_str}")
-    match = re.search(r"_v(\d+)(?:[-\(][^)]+)?", version_str)
+# SQLite limita la cantidad de parametros por consulta (999 en builds viejos)
+SQL_IN_CHUNK = 900
 
-    if match:
-        try:
-            version_num = int(match.group(1))
-            debug_print(f"Version extraida: {version_num}")
-            return version_num
-        except ValueError:
-            debug_print(f"No se pudo convertir a entero: {match.group(1)}")
-    debug_print(f"No se encontro numero de version en: {version_str}")
-    return 0
+
+def _chunks(items, size=SQL_IN_CHUNK):
+    """Divide una lista en bloques para armar consultas IN (...)."""
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
 
 
 class ShotGridManager:
     """Clase para manejar operaciones con datos de la base de datos SQLite en lugar de JSON."""
 
-    def __init__(self, db_path):
-        self.db_path = db_path
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row
+    def __init__(self):
+        self.db_path = PipeSync_DB.get_db_path()
         # Importante: Los colores deben ser en formato hexadecimal con minúsculas
         self.task_status_dict = {
             "noread": ("Not Ready To Start", "#000000", None),
@@ -99,16 +96,126 @@ class ShotGridManager:
             "vwd": ("Viewed", "#000000", None),
         }
 
+    @property
+    def shot_cache(self):
+        """
+        Shots ya cargados: (project_name, shot_code) -> dict (o None si no existe).
+        Vive en PipeSync_DB.record_cache, asi sobrevive entre ejecuciones de Pull
+        y se vacia sola cuando PipeSync sincroniza la base.
+        """
+        return PipeSync_DB.record_cache.section("pull_shots")
+
     def find_project(self, project_name):
         """Busca un proyecto por nombre en la base de datos."""
-        cur = self.conn.cursor()
-        cur.execute("SELECT * FROM projects WHERE project_name = ?", (project_name,))
-        return cur.fetchone()
+        return PipeSync_DB.record_cache.get(
+            "projects",
+            project_name,
+            lambda: PipeSync_DB.fetch_one(
+                "SELECT * FROM projects WHERE project_name = ?", (project_name,)
+            ),
+        )
+
+    def prefetch_shots(self, shot_keys):
+        """
+        Carga en memoria todos los shots pedidos con sus tasks, asignados y versiones.
+
+        shot_keys es un iterable de tuplas (project_name, shot_code). En lugar de
+        hacer varias consultas por clip se hacen unas pocas consultas IN por tabla
+        y el resultado queda en self.shot_cache, asi find_shot pasa a ser un
+        lookup de diccionario. Los shots que no existen se guardan como None.
+        """
+        shot_cache = self.shot_cache
+        pending = {}
+        for project_name, shot_code in shot_keys:
+            if (project_name, shot_code) in shot_cache:
+                continue
+            pending.setdefault(project_name, set()).add(shot_code)
+        if not pending:
+            return
+
+        shots_by_id = {}
+
+        # Shots: una consulta por proyecto (y por bloque de nombres)
+        for project_name, shot_codes in pending.items():
+            for chunk in _chunks(sorted(shot_codes)):
+                placeholders = ",".join("?" * len(chunk))
+                rows = PipeSync_DB.fetch_all(
+                    f"""
+                    SELECT s.* FROM shots s
+                    JOIN projects p ON s.project_id = p.id
+                    WHERE p.project_name = ? AND s.shot_name IN ({placeholders})
+                """,
+                    (project_name, *chunk),
+                )
+                for shot in rows:
+                    shot_dict = dict(shot)
+                    shot_dict["tasks"] = []
+                    shots_by_id[shot_dict["id"]] = shot_dict
+                    shot_cache[(project_name, shot_dict["shot_name"])] = shot_dict
+            # Marcar los que no existen para no volver a consultarlos
+            for shot_code in shot_codes:
+                shot_cache.setdefault((project_name, shot_code), None)
+
+        if not shots_by_id:
+            return
+
+        # Tasks de todos los shots encontrados
+        tasks_by_id = {}
+        for chunk in _chunks(list(shots_by_id)):
+            placeholders = ",".join("?" * len(chunk))
+            rows = PipeSync_DB.fetch_all(
+                f"SELECT * FROM tasks WHERE shot_id IN ({placeholders}) ORDER BY shot_id, id",
+                chunk,
+            )
+            for task in rows:
+                task_dict = dict(task)
+                task_dict["task_assigned_to"] = None
+                task_dict["versions"] = []
+                tasks_by_id[task_dict["id"]] = task_dict
+                shots_by_id[task_dict["shot_id"]]["tasks"].append(task_dict)
+
+        if not tasks_by_id:
+            return
+
+        task_ids = list(tasks_by_id)
+        # Asignados: se conserva el primero de cada task, igual que find_shot
+        for chunk in _chunks(task_ids):
+            placeholders = ",".join("?" * len(chunk))
+            rows = PipeSync_DB.fetch_all(
+                f"""
+                SELECT task_id, assigned_to FROM task_assignments
+                WHERE task_id IN ({placeholders}) ORDER BY task_id, id
+            """,
+                chunk,
+            )
+            for assign in rows:
+                task_dict = tasks_by_id[assign["task_id"]]
+                if task_dict["task_assigned_to"] is None:
+                    task_dict["task_assigned_to"] = assign["assigned_to"]
+
+        # Versiones ordenadas de mayor a menor dentro de cada task
+        for chunk in _chunks(task_ids):
+            placeholders = ",".join("?" * len(chunk))
+            rows = PipeSync_DB.fetch_all(
+                f"""
+                SELECT * FROM versions WHERE task_id IN ({placeholders})
+                ORDER BY task_id, version_number DESC
+            """,
+                chunk,
+            )
+            for version in rows:
+                tasks_by_id[version["task_id"]]["versions"].append(dict(version))
+
+        debug_print(
+            f"Prefetch: {len(shots_by_id)} shots, {len(tasks_by_id)} tasks cargadas en memoria"
+        )
 
     def find_shot(self, project_name, shot_code):
         """Busca un shot por nombre y codigo en la base de datos."""
-        cur = self.conn.cursor()
-        cur.execute(
+        shot_cache = self.shot_cache
+        if (project_name, shot_code) in shot_cache:
+            return shot_cache[(project_name, shot_code)]
+        shot = PipeSync_DB.fetch_one(
             """
             SELECT s.* FROM shots s
             JOIN projects p ON s.project_id = p.id
@@ -116,76 +223,52 @@ class ShotGridManager:
         """,
             (project_name, shot_code),
         )
-        shot = cur.fetchone()
         if not shot:
             return None
         # Obtener las tasks asociadas a este shot
-        cur.execute("SELECT * FROM tasks WHERE shot_id = ?", (shot["id"],))
-        tasks = cur.fetchall()
+        tasks = PipeSync_DB.fetch_all(
+            "SELECT * FROM tasks WHERE shot_id = ?", (shot["id"],)
+        )
         shot_dict = dict(shot)
         shot_dict["tasks"] = []
         for task in tasks:
             task_dict = dict(task)
             # Obtener asignado
-            cur.execute(
+            assign = PipeSync_DB.fetch_one(
                 "SELECT assigned_to FROM task_assignments WHERE task_id = ?",
                 (task["id"],),
             )
-            assign = cur.fetchone()
             if assign:
                 task_dict["task_assigned_to"] = assign["assigned_to"]
             else:
                 task_dict["task_assigned_to"] = None
             # Obtener versiones
-            cur.execute(
+            versions = PipeSync_DB.fetch_all(
                 "SELECT * FROM versions WHERE task_id = ? ORDER BY version_number DESC",
                 (task["id"],),
             )
-            versions = cur.fetchall()
             task_dict["versions"] = [dict(v) for v in versions]
             shot_dict["tasks"].append(task_dict)
         return shot_dict
 
     def find_task(self, shot, task_name):
         """Busca una tarea especifica por nombre en un shot (dict)."""
-        for t in shot["tasks"]:
-            if t["task_type"].lower() == task_name.lower():
-                return t
-        return None
+        return PullPlan.find_task(shot, task_name)
 
     def find_highest_version_for_shot(self, shot):
         """Encuentra la version mas alta de un shot basandose en la base de datos."""
-        all_versions = []
-        for task in shot["tasks"]:
-            all_versions.extend(task["versions"])
-        if all_versions:
-            # Buscar la version con el mayor version_number
-            highest_version = max(
-                all_versions,
-                key=lambda v: (
-                    v["version_number"] if v["version_number"] is not None else 0
-                ),
-            )
-            # Adaptar el formato esperado por el resto del script
-            return {
-                "version_number": f"{shot['shot_name']}_comp_v{highest_version['version_number']:03d}",
-                "version_status": highest_version.get("status", ""),
-                "version_description": highest_version.get("description", ""),
-            }
-        return None
+        return PullPlan.find_highest_version_for_shot(shot)
 
     def close(self):
-        if hasattr(self, "conn") and self.conn:
-            self.conn.close()
+        # La conexion y la cache de registros son compartidas por PipeSync_DB
+        # y siguen vivas para la proxima ejecucion
+        pass
 
 
 class GUI_Table(QWidget):
     def __init__(self, sg_manager, parent=None):
         super(GUI_Table, self).__init__(parent)
         self.sg_manager = sg_manager
-        self.row_background_colors = (
-            []
-        )  # Lista para almacenar listas de colores de fondo por fila
         self.hiero_ops = None
         self.initUI()
         self.last_selected_index = (
@@ -211,15 +294,11 @@ class GUI_Table(QWidget):
                     "No changes were detected in the selected shots.",
                 )
 
-    def add_color_to_background_list(self, row_colors):
-        """Agrega una lista de colores de fondo para una nueva fila."""
-        self.row_background_colors.append(row_colors)
-
     def initUI(self):
         self.setWindowTitle("Read Nodes EXR Info")
         layout = QVBoxLayout(self)
-        self.table = QTableWidget(0, 6, self)
-        self.table.setHorizontalHeaderLabels(
+        # Tabla modelo/vista compartida con las ventanas de LGA_NKS_Edit
+        self.table = ResultsTable.ResultsTableView(
             [
                 "Shot",
                 " v_NKS ",
@@ -227,59 +306,15 @@ class GUI_Table(QWidget):
                 " v_Status ",
                 " Previous Status ",
                 " New Status ",
-            ]
-        )
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
-        self.table.verticalHeader().setVisible(False)
-        self.table.setFocusPolicy(Qt.NoFocus)
-        self.table.setStyleSheet(
-            """
-            QTableView::item:selected {
-                color: black;
-                background-color: transparent;  // Hacer transparente el fondo de los items seleccionados
-            }
-        """
+            ],
+            self,
         )
-        # Asigna el delegado personalizado
-        delegate = ColorMixDelegate(self.table, self.row_background_colors)
-        self.table.setItemDelegate(delegate)
         layout.addWidget(self.table)
         self.setLayout(layout)
-        font = QFont()
-        font.setBold(True)
-        self.table.horizontalHeader().setFont(font)
-
-    def mix_colors(self, original_color, mix_color=(88, 88, 88)):
-        """Mezcla dos colores RGB."""
-        r1, g1, b1 = original_color
-        r2, g2, b2 = mix_color
-        mixed_color = ((r1 + r2) // 2, (g1 + g2) // 2, (b1 + b2) // 2)
-        return mixed_color
 
     def adjust_window_size(self):
         # Ajustes para cambiar el tamano y posicion de la ventana de acuerdo a la pantalla
-        self.table.horizontalHeader().setStretchLastSection(False)
-        self.table.resizeColumnsToContents()
-        width = self.table.verticalHeader().width() - 30
-        for i in range(self.table.columnCount()):
-            width += self.table.columnWidth(i) + 20
-        screen = QApplication.primaryScreen()
-        screen_rect = screen.availableGeometry()
-        max_width = screen_rect.width() * 0.8
-        final_width = min(width, max_width)
-        height = self.table.horizontalHeader().height() + 20
-        for i in range(self.table.rowCount()):
-            height += self.table.rowHeight(i) + 4
-        max_height = screen_rect.height() * 0.8
-        final_height = min(height, max_height)
-        self.table.horizontalHeader().setStretchLastSection(True)
-        self.resize(final_width, final_height)
-        self.move(
-            (screen_rect.width() - final_width) // 2,
-            (screen_rect.height() - final_height) // 2,
-        )
+        ResultsTable.fit_window_to_table(self, self.table)
 
     def keyPressEvent(self, event):
         """Cierra la ventana cuando se presiona la tecla ESC."""
@@ -295,36 +330,6 @@ class GUI_Table(QWidget):
         super(GUI_Table, self).closeEvent(event)
 
 
-class ColorMixDelegate(QStyledItemDelegate):
-    def __init__(
-        self, table_widget, background_colors, mix_color=(88, 88, 88), parent=None
-    ):
-        super(ColorMixDelegate, self).__init__(parent)
-        self.table_widget = table_widget
-        self.background_colors = background_colors
-        self.mix_color = mix_color
-
-    def paint(self, painter, option, index):
-        row = index.row()
-        column = index.column()
-        if option.state & QStyle.State_Selected:
-            original_color = QColor(self.background_colors[row][column])
-            mixed_color = self.mix_colors(
-                (original_color.red(), original_color.green(), original_color.blue()),
-                self.mix_color,
-            )
-            option.palette.setColor(QPalette.Highlight, QColor(*mixed_color))
-        else:
-            original_color = QColor(self.background_colors[row][column])
-            option.palette.setColor(QPalette.Base, original_color)
-        super(ColorMixDelegate, self).paint(painter, option, index)
-
-    def mix_colors(self, original_color, mix_color):
-        r1, g1, b1 = original_color
-        r2, g2, b2 = mix_color
-        return ((r1 + r2) // 2, (g1 + g2) // 2, (b1 + b2) // 2)
-
-
 class HieroOperations:
     """Clase para manejar operaciones en Hiero."""
 
@@ -337,40 +342,9 @@ class HieroOperations:
             "Rev_Dir_D": "#4d21a8",
         }
 
-    def parse_exr_name(self, file_name):
-        """Extrae el nombre base del archivo y el numero de version con prefijo."""
-        debug_print(f"Parseando nombre de archivo: {file_name}")
-
-        # Remover extension y secuencia numerica para archivos EXR
-        base_name = re.sub(r"_%04d\.exr$", "", file_name)
-        debug_print(f"Despues de remover secuencia EXR: {base_name}")
-
-        # Si no cambio, puede ser un archivo de video (mxf, mov, etc)
-        if base_name == file_name:
-            # Remover extension para archivos de video
-            base_name = re.sub(r"\.[^.]+$", "", file_name)
-            debug_print(f"Despues de remover extension de video: {base_name}")
-
-        version_match = re.search(r"(_v\d+)", base_name)
-        version_str = version_match.group(1) if version_match else "_vUnknown"
-        debug_print(f"Version string extraida: {version_str}")
-
-        return base_name, version_str
-
-    def get_current_clip_color(self, item):
-        """Obtiene el color actual del clip."""
-        bin_item = item.source().binItem()
-        if item.source().mediaSource().isMediaPresent():
-            active_version = bin_item.activeVersion()
-            if active_version:
-                current_color = bin_item.color()
-                return current_color.name()  # Retorna el color en formato hexadecimal
-        return None
-
     def add_row_to_table(
         self,
         table,
-        gui_table,
         shot_code,
         version_number,
         prev_status,
@@ -380,116 +354,30 @@ class HieroOperations:
         sg_version_number,
         sg_status,
     ):
-        row_count = table.rowCount()
-        table.insertRow(row_count)
         # Extraer numeros de version de forma segura
         version_num = extract_version_number(version_number)
         sg_version_num = extract_version_number(sg_version_number)
+        # La version de SG y el estado "rev" se marcan con fondo bordo y texto claro
+        highlight = {"background": "#81395a", "foreground": "#c8c8c8"}
+        sg_version_style = highlight if sg_version_num > version_num else {}
+        sg_status_style = highlight if sg_status == "rev" else {}
         # Anadir un espacio al final de cada texto para mejorar la visualizacion
-        shot_item = QTableWidgetItem(shot_code + "   ")
-        version_item = QTableWidgetItem(str(version_num))
-        sg_version_item = QTableWidgetItem(str(sg_version_num))
-        sg_status_item = QTableWidgetItem(sg_status)
-        prev_status_item = QTableWidgetItem(" " + prev_status + " ")
-        new_status_item = QTableWidgetItem(new_status)
-        # Centrado de algunas columnas
-        version_item.setTextAlignment(Qt.AlignCenter)
-        sg_version_item.setTextAlignment(Qt.AlignCenter)
-        sg_status_item.setTextAlignment(Qt.AlignCenter)
-        # Configuracion de color de fondo y texto para el nombre del shot
-        # shot_color_bg = QColor('#323232')  # Color oscuro para el fondo
-        # shot_color_text = QColor('#c8c8c8')  # Texto blanco para mejor contraste
-        # shot_item.setBackground(QBrush(shot_color_bg))
-        # shot_item.setForeground(QBrush(shot_color_text))
-        # Configuracion del color de fondo para la columna v_SG basada en la condicion especifica
-        if sg_version_num > version_num:  # Condicion para pintar la columna v_SG
-            sg_version_item.setBackground(QBrush(QColor("#81395a")))
-            sg_version_item.setForeground(
-                QBrush(QColor("#c8c8c8"))
-            )  # Texto blanco para mejor contraste
-        # Configuracion del color de fondo para la columna v_Status basada en la condicion especifica
-        if sg_status == "rev":  # Condicion para pintar la columna v_Status
-            sg_status_item.setBackground(QBrush(QColor("#81395a")))
-            sg_status_item.setForeground(
-                QBrush(QColor("#c8c8c8"))
-            )  # Texto blanco para mejor contraste
-        # Configuracion de colores para columna de estado previo y nuevo
-        prev_status_bg_color = QColor(prev_color)
-        prev_status_text_color = self.color_for_background(prev_color)
-        prev_status_item.setBackground(QBrush(prev_status_bg_color))
-        prev_status_item.setForeground(QBrush(prev_status_text_color))
-        prev_status_item.setTextAlignment(Qt.AlignCenter)
-        new_status_bg_color = QColor(new_color)
-        new_status_text_color = self.color_for_background(new_color)
-        new_status_item.setBackground(QBrush(new_status_bg_color))
-        new_status_item.setForeground(QBrush(new_status_text_color))
-        new_status_item.setTextAlignment(Qt.AlignCenter)
-        # Anadir los items a la fila
-        table.setItem(row_count, 0, shot_item)
-        table.setItem(row_count, 1, version_item)
-        table.setItem(row_count, 2, sg_version_item)
-        table.setItem(row_count, 3, sg_status_item)
-        table.setItem(row_count, 4, prev_status_item)
-        table.setItem(row_count, 5, new_status_item)
-        # Configuracion de colores que se agregan a la lista para la linea de seleccion
-        row_colors = ["#8a8a8a"] * 6  # Color por defecto para todas las columnas
-        if sg_version_num > version_num:  # Si la version SG es mayor que la version NKS
-            row_colors[2] = "#81395a"  # Color para la columna v_SG
-        if sg_status == "rev":  # Si el estado es "rev"
-            row_colors[3] = "#81395a"  # Color para la columna v_Status
-        row_colors[4] = prev_color  # Color para la columna de estado previo
-        row_colors[5] = new_color  # Color para la columna de nuevo estado
-        gui_table.add_color_to_background_list(
-            row_colors
-        )  # Anadir la lista de colores al final del metodo
-        table.resizeColumnsToContents()
-
-    def luminance(self, color):
-        """Calcula la luminancia de un color para determinar si es claro u oscuro."""
-        red = color.red()
-        green = color.green()
-        blue = color.blue()
-        return 0.299 * red + 0.587 * green + 0.114 * blue
-
-    def color_for_background(self, hex_color):
-        """Determina el color del texto basado en el color de fondo."""
-        color = QColor(hex_color)
-        return "#ffffff" if self.luminance(color) < 128 else "#000000"
-
-    def change_clip_color(self, item, new_color_hex, task_status, task_name, shot_code):
-        current_color_hex = self.get_current_clip_color(item)
-        current_status = self.get_status_name_by_color(current_color_hex)
-        # No cambiar el color si las condiciones especificas se cumplen
-        if current_color_hex == new_color_hex:
-            return ""
-        if current_status == "v_00" and (
-            task_status == "Not Ready To Start" or task_status == "Ready To Start"
-        ):
-            return ""
-        if task_status == "In Progress" and current_status != "v_00":
-            return ""
-        # Cambia el color del clip si no se cumplen las condiciones anteriores
-        new_color = QColor(new_color_hex)
-        bin_item = item.source().binItem()
-        previous_color_hex = current_color_hex if current_color_hex else "None"
-        bin_item.setColor(new_color)
-        # Formatea los nombres y colores de los estados para el mensaje
-        text_color = self.color_for_background(new_color_hex)
-        status_format = f"<span style='background-color: {new_color_hex}; color: {text_color};'>{task_status}</span>"
-        previous_status_format = f"<span style='background-color: {previous_color_hex}; color: {self.color_for_background(previous_color_hex)};'>{current_status}</span>"
-        return f"{shot_code} | {task_name} | {previous_status_format} -> {status_format}<br>"
-
-    def get_status_name_by_color(self, color_hex):
-        """Devuelve el nombre del estado basado en el color."""
-        # Verificar primero en el diccionario de Hiero
-        for status, color in self.hiero_status_dict.items():
-            if color == color_hex:
-                return status
-        # Si no se encuentra en Hiero, buscar en el diccionario de ShotGrid
-        for status, (name, color, tag) in self.sg_manager.task_status_dict.items():
-            if color == color_hex:
-                return name
-        return "Unknown"
+        table.add_row(
+            [
+                ResultsTable.result_cell(shot_code + "   "),
+                ResultsTable.result_cell(version_num, centered=True),
+                ResultsTable.result_cell(
+                    sg_version_num, centered=True, **sg_version_style
+                ),
+                ResultsTable.result_cell(sg_status, centered=True, **sg_status_style),
+                ResultsTable.result_cell(
+                    " " + prev_status + " ", background=prev_color, centered=True
+                ),
+                ResultsTable.result_cell(
+                    new_status, background=new_color, centered=True
+                ),
+            ]
+        )
 
     def add_custom_tag_to_clip(
         self, clip, tag_name, tag_description, tag_icon, assignee
@@ -508,230 +396,119 @@ class HieroOperations:
             f"Added tag '{tag_name}' with note '{safe_description}' and assignee '{formatted_assignee}' to clip: {clip.name()}"
         )
 
+    def get_clips_to_process(self, seq):
+        """Clips seleccionados, los del track EXR (force_all_clips) o todos si no hay seleccion."""
+        te = hiero.ui.getTimelineEditor(seq)
+        selected_clips = te.selection()
+
+        # Si force_all_clips es True, obtener solo los clips del track "EXR"
+        if hasattr(self.gui_table, "force_all_clips") and self.gui_table.force_all_clips:
+            selected_clips = []
+            for track in seq.videoTracks():
+                # Solo procesar clips si el track se llama "EXR"
+                if track.name() == "EXR":
+                    selected_clips.extend(track.items())
+                    debug_print(f"Procesando clips del track: {track.name()}")
+        elif not selected_clips:
+            # Comportamiento original cuando no hay selección
+            selected_clips = []
+            for track in seq.videoTracks():
+                selected_clips.extend(track.items())
+        return selected_clips
+
     def process_selected_clips(self, table, sg_manager):
+        """
+        Pull en cuatro etapas: 1) leer los clips, 2) resolver los shots en la DB
+        en bloque, 3) calcular el plan de cambios (LGA_NKS_Flow_Pull_Plan, sin Hiero),
+        4) aplicar todas las modificaciones dentro de un unico grupo de undo.
+        """
         seq = hiero.ui.activeSequence()
-        changes_made = False
-        if seq:
-            te = hiero.ui.getTimelineEditor(seq)
-            selected_clips = te.selection()
-
-            # Si force_all_clips es True, obtener solo los clips del track "EXR"
-            if (
-                hasattr(self.gui_table, "force_all_clips")
-                and self.gui_table.force_all_clips
-            ):
-                # Si force_all_clips es True, obtener todos los clips directamente
-                all_tracks = seq.videoTracks()
-                selected_clips = []
-                for track in all_tracks:
-                    # Solo procesar clips si el track se llama "EXR"
-                    if track.name() == "EXR":
-                        selected_clips.extend(track.items())
-                        debug_print(f"Procesando clips del track: {track.name()}")
-            elif not selected_clips:
-                # Comportamiento original cuando no hay selección
-                all_tracks = seq.videoTracks()
-                selected_clips = []
-                for track in all_tracks:
-                    selected_clips.extend(track.items())
+        if not seq:
+            debug_print("No active sequence found in Hiero.")
+            return False
+        selected_clips = self.get_clips_to_process(seq)
+        if not selected_clips:
+            debug_print("No clips found in the timeline.")
+            return False
+
+        # 1. Recoleccion
+        records = PullPlan.collect_clip_records(
+            selected_clips,
+            lambda clip: isinstance(clip, hiero.core.EffectTrackItem),
+        )
+        # 2. Resolucion en bloque contra la DB
+        keys = PullPlan.shot_keys(records)
+        sg_manager.prefetch_shots(keys)
+        shots = {key: sg_manager.find_shot(*key) for key in keys}
+        # 3. Plan
+        plan = PullPlan.build_change_plan(
+            records, shots, sg_manager.task_status_dict, self.hiero_status_dict
+        )
+        # 4. Aplicacion
+        self.apply_change_plan(plan)
+
+        rows = [action["row"] for action in plan if action["row"]]
+        for row in rows:
+            self.add_row_to_table(
+                table,
+                row["shot_code"],
+                row["version_number"],
+                row["prev_status"],
+                row["prev_color"],
+                row["new_status"],
+                row["new_color"],
+                row["sg_version_number"],
+                row["sg_status"],
+            )
+        return bool(rows)
 
-            if selected_clips:
-                project = hiero.core.projects()[0]
-                for clip in selected_clips:
-                    debug_print(f"Procesando clip: {clip.name()}")
-                    if isinstance(clip, hiero.core.EffectTrackItem):
-                        debug_print(f"Ignore effect item: {clip.name()}")
-                        continue
-                    # Borrar los tags del clip antes de procesarlo
+    def apply_change_plan(self, plan):
+        """Aplica las modificaciones del plan en Hiero como una sola operacion de undo."""
+        project = hiero.core.projects()[0]
+        project.beginUndo("Flow Pull")
+        try:
+            for action in plan:
+                clip = action["clip"]
+                if action["clear_tags"]:
                     delete_tags_from_clip(clip)
-                    file_path = (
-                        clip.source().mediaSource().fileinfos()[0].filename()
-                        if clip.source().mediaSource().fileinfos()
-                        else None
-                    )
-                    debug_print(f"File path obtenido: {file_path}")
-                    if not file_path:
-                        debug_print(
-                            f"No se pudo obtener file_path para el clip: {clip.name()}"
-                        )
-                        continue
-
-                    file_basename = os.path.basename(file_path).lower()
-                    debug_print(f"Basename del archivo: {file_basename}")
-
-                    if "_comp_" not in file_basename:
-                        debug_print(
-                            f"El archivo no contiene '_comp_' en el nombre: {file_basename}"
-                        )
-                        continue
-                    exr_name = os.path.basename(file_path)
-                    debug_print(f"Nombre del archivo extraido: {exr_name}")
-
-                    base_name, version_str = self.parse_exr_name(exr_name)
-                    debug_print(
-                        f"Base name: {base_name}, Version string: {version_str}"
-                    )
-
-                    version_number = extract_version_number(
-                        version_str
-                    )  # Use extracted version number
-                    debug_print(f"Version extraida: {version_number} de {version_str}")
-
-                    try:
-                        project_name = base_name.split("_")[0]
-                        debug_print(f"Project name: {project_name}")
-
-                        parts = base_name.split("_")
-                        debug_print(f"Parts del nombre: {parts}")
-
-                        shot_code = "_".join(parts[:5])
-                        debug_print(f"Shot code: {shot_code}")
-
-                        version_index = parts.index(version_str[1:])
-                        debug_print(f"Version index: {version_index}")
-
-                        task_name = parts[version_index - 1].lower()
-                        debug_print(f"Task name: {task_name}")
-                    except Exception as e:
-                        debug_print(f"Error procesando nombre del archivo: {e}")
-                        debug_print(
-                            f"base_name: {base_name}, version_str: {version_str}"
-                        )
-                        continue
-
-                    # Obtener la ruta base del shot (subimos un nivel adicional)
-                    shot_base_path = os.path.dirname(
-                        os.path.dirname(os.path.dirname(os.path.dirname(file_path)))
-                    )
-                    debug_print(f"Ruta base del shot: {shot_base_path}")
-                    # Obtener el estado y el tag correspondiente
-                    debug_print(
-                        f"Buscando shot en SG: project='{project_name}', shot='{shot_code}'"
-                    )
-                    shot = sg_manager.find_shot(project_name, shot_code)
-                    if shot:
-                        debug_print(f"Shot encontrado: {shot_code}")
-                        debug_print(f"Buscando task '{task_name}' en el shot")
-                        task = sg_manager.find_task(shot, task_name)
-                        if task:
-                            debug_print(f"Task encontrada: {task_name}")
-                            task_status_code = task["task_status"]
-                            task_status_name, new_color_hex, xyplorer_tag = (
-                                sg_manager.task_status_dict.get(
-                                    task_status_code,
-                                    ("Estado desconocido", "#000000", None),
-                                )
-                            )
-                            # Aplicar el tag correspondiente en XYplorer solo si XYPlorer_Tags es True
-                            if XYPlorer_Tags:
-                                tag_shot_folder(shot_base_path, xyplorer_tag)
-                            current_color_hex = self.get_current_clip_color(clip)
-                            current_status = self.get_status_name_by_color(
-                                current_color_hex
-                            )
-                            highest_version = sg_manager.find_highest_version_for_shot(
-                                shot
-                            )
-                            if highest_version:
-                                debug_print(
-                                    f"Version mas alta en SG: {highest_version['version_number']}"
-                                )
-                            else:
-                                debug_print("No se encontro version en SG")
-                            sg_version_str = (
-                                highest_version["version_number"]
-                                if highest_version
-                                else "No info"
-                            )
-                            sg_version_number = extract_version_number(
-                                sg_version_str
-                            )  # Use extracted SG version number
-                            sg_status = (
-                                highest_version["version_status"]
-                                if highest_version
-                                else "No info"
-                            )
-                            sg_description = (
-                                highest_version["version_description"]
-                                if highest_version
-                                and "version_description" in highest_version
-                                else "No description available"
-                            )
-                            # Obtener el nombre del asignado si existe
-                            assignee = task.get("task_assigned_to", "No assignee")
-                            debug_print(f"Assignee: {assignee}")
-                            # Mantener sg_description sin el assignee
-                            change = self.change_clip_color(
-                                clip,
-                                new_color_hex,
-                                task_status_name,
-                                task_name,
-                                shot_code,
-                            )
-                            if change or sg_version_number > version_number:
-                                prev_color_hex = (
-                                    current_color_hex
-                                    if current_color_hex
-                                    else "#000000"
-                                )
-                                self.add_row_to_table(
-                                    table,
-                                    self.gui_table,
-                                    shot_code,
-                                    version_str,
-                                    current_status,
-                                    prev_color_hex,
-                                    task_status_name,
-                                    new_color_hex,
-                                    sg_version_str,
-                                    sg_status,
-                                )
-                                changes_made = True
-                                if sg_version_number > version_number:
-                                    # comente esta linea para que no agregue tags amarillos
-                                    # self.add_custom_tag_to_clip(clip, "Updated Version", sg_description, "icons:TagYellow.png", assignee)
-                                    highest_version = self.change_to_highest_version(
-                                        clip
-                                    )
-                                    # Extraer el nuevo numero de version del clip actualizado
-                                    if highest_version:
-                                        new_version_str = highest_version.name().split(
-                                            "_v"
-                                        )[-1]
-                                        new_version_number = int(new_version_str)
-                                    else:
-                                        new_version_number = version_number
-                                    # Volver a comparar con la version de SG
-                                    if sg_version_number > new_version_number:
-                                        self.add_custom_tag_to_clip(
-                                            clip,
-                                            "Version Mismatch",
-                                            f"SG Version: {sg_version_str}",
-                                            "icons:TagRed.png",
-                                            assignee,
-                                        )
-                        else:
-                            debug_print(
-                                f"No se encontro task '{task_name}' para el shot '{shot_code}'"
-                            )
-                            debug_print(
-                                f"Tasks disponibles en el shot: {[t['task_type'] for t in shot['tasks']]}"
-                            )
-                            pass
-                    else:
-                        debug_print(
-                            f"No se encontro shot '{shot_code}' en el proyecto '{project_name}'"
-                        )
-                        pass
-                # Llamar a enable_or_disable_clips al final del proceso
-                self.enable_or_disable_clips(selected_clips)
-            else:
-                debug_print("No clips found in the timeline.")
-                pass
+                # Aplicar el tag correspondiente en XYplorer solo si XYPlorer_Tags es True
+                if XYPlorer_Tags and action["shot_base_path"]:
+                    tag_shot_folder(action["shot_base_path"], action["xyplorer_tag"])
+                if action["set_color"]:
+                    clip.source().binItem().setColor(QColor(action["set_color"]))
+                enable = action["enable"]
+                if action["check_newer_version"]:
+                    self.apply_newer_version(action)
+                    # El plan se armo con el archivo anterior: un comp v00 que paso a
+                    # una version real tiene que quedar habilitado
+                    enable = PullPlan.clip_should_be_enabled(PullPlan.clip_file_path(clip))
+                try:
+                    clip.setEnabled(enable)
+                except Exception as e:
+                    debug_print(f"Error during enable/disable operation: {e}")
+        finally:
+            project.endUndo()
+
+    def apply_newer_version(self, action):
+        """Escanea el disco, pasa el clip a la version mas alta y marca si sigue atrasado."""
+        clip = action["clip"]
+        # comente esta linea para que no agregue tags amarillos
+        # self.add_custom_tag_to_clip(clip, "Updated Version", sg_description, "icons:TagYellow.png", assignee)
+        highest_version = self.change_to_highest_version(clip)
+        # Extraer el nuevo numero de version del clip actualizado
+        if highest_version:
+            new_version_number = int(highest_version.name().split("_v")[-1])
         else:
-            debug_print("No active sequence found in Hiero.")
-            pass
-        return changes_made
+            new_version_number = action["version_number"]
+        # Volver a comparar con la version de SG
+        if action["sg_version_number"] > new_version_number:
+            self.add_custom_tag_to_clip(
+                clip,
+                "Version Mismatch",
+                f"SG Version: {action['sg_version_str']}",
+                "icons:TagRed.png",
+                action["assignee"],
+            )
 
     def get_highest_version(self, binItem):
         """Obtiene la version mas alta de un binItem."""
@@ -755,8 +532,10 @@ class HieroOperations:
         binItem = clip.source().binItem()
         activeVersion = binItem.activeVersion()
         debug_print(f"Version activa actual: {activeVersion.name()}")
-        vc = hiero.core.VersionScanner()
-        vc.doScan(activeVersion)
+        # Solo se escanea si en disco hay una version mas nueva que las del bin
+        if VersionScanCache.needs_version_scan(clip):
+            vc = hiero.core.VersionScanner()
+            vc.doScan(activeVersion)
         highest_version = self.get_highest_version(binItem)
         if highest_version:
             debug_print(f"Cambiando a la version: {highest_version.name()}")
@@ -765,25 +544,6 @@ class HieroOperations:
             debug_print("No se pudo determinar la version mas alta")
         return highest_version
 
-    def enable_or_disable_clips(self, selected_clips):
-        try:
-            for item in selected_clips:
-                if not isinstance(item, hiero.core.EffectTrackItem):
-                    file_path = (
-                        item.source().mediaSource().fileinfos()[0].filename()
-                        if item.source().mediaSource().fileinfos()
-                        else None
-                    )
-                    if file_path and "_comp_" in os.path.basename(file_path).lower():
-                        if re.search(r"_comp_v00", os.path.basename(file_path).lower()):
-                            item.setEnabled(False)
-                        else:
-                            item.setEnabled(True)
-                    else:
-                        item.setEnabled(True)
-        except Exception as e:
-            debug_print(f"Error during enable/disable operation: {e}")
-
 
 ##### Aca empieza la joda del XYplorer
 
@@ -883,18 +643,11 @@ def FPT_Hiero(force_all_clips=False):
                                de la selección actual.
     """
     global app, window, hiero_ops
-    # Selecciona la ruta de la base de datos segun el sistema operativo
-    if platform.system() == "Windows":
-        db_path = r"C:/Portable/LGA/PipeSync/cache/pipesync.db"
-    elif platform.system() == "Darwin":
-        db_path = "/Users/leg4/Library/Caches/LGA/PipeSync/pipesync.db"
-    else:
-        debug_print(f"Sistema operativo no soportado: {platform.system()}")
-        return
-    if not os.path.exists(db_path):
-        debug_print(f"DB file not found at path: {db_path}")
+    # La ruta de la base de datos se resuelve en PipeSync_DB segun el sistema operativo
+    if not PipeSync_DB.db_exists():
+        debug_print(f"DB file not found at path: {PipeSync_DB.get_db_path()}")
         return
-    sg_manager = ShotGridManager(db_path)
+    sg_manager = ShotGridManager()
     app = QApplication.instance() if QApplication.instance() else QApplication(sys.argv)
     window = GUI_Table(sg_manager)
     hiero_ops = HieroOperations(sg_manager, window)
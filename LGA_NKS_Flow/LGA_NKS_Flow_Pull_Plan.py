@@ -0,0 +1,405 @@
+"""
+____________________________________________________________________________
+
+  LGA_NKS_Flow_Pull_Plan | Lega Pugliese
+  Etapas puras (sin Hiero ni Qt) del Flow Pull:
+    1. collect_clip_records: lee de cada track item lo necesario (archivo,
+       color actual) y parsea el nombre del EXR
+    2. shot_keys: arma la lista de shots a resolver contra la DB en bloque
+    3. build_change_plan: decide que cambiar en cada clip sin tocar nada
+  LGA_NKS_Flow_Pull aplica el plan dentro de un unico grupo de undo.
+  Se puede correr sin Hiero con track items falsos:
+    python LGA_NKS_Flow_Pull_Plan.py --clips 2000
+____________________________________________________________________________
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+# Parser de nombres compartido (re-exporta extract_version_number)
+sys.path.append(str(Path(__file__).parent.parent / "LGA_NKS"))
+import LGA_NKS_NameParser as NameParser
+from LGA_NKS_NameParser import extract_version_number
+
+
+# Variable global para activar o desactivar los prints
+DEBUG = False
+
+
+def debug_print(*message):
+    if DEBUG:
+        print(message)
+
+
+def parse_clip_identity(file_path):
+    """
+    Extrae del archivo del clip los datos necesarios para buscarlo en la DB.
+    Devuelve None si el clip no es un comp o el nombre no tiene el formato esperado.
+    """
+    if not file_path:
+        return None
+
+    file_basename = os.path.basename(file_path).lower()
+    if "_comp_" not in file_basename:
+        debug_print(f"El archivo no contiene '_comp_' en el nombre: {file_basename}")
+        return None
+
+    parsed = NameParser.parse_media_path(file_path)
+    if parsed.task is None:
+        debug_print(f"No se encontro la task en el nombre del archivo: {parsed.base_name}")
+        return None
+
+    return {
+        "file_path": file_path,
+        "version_str": parsed.version_str,
+        "version_number": parsed.version_number,
+        "project_name": parsed.project,
+        "shot_code": parsed.shot_code,
+        "task_name": parsed.task,
+    }
+
+
+def clip_file_path(item):
+    """Ruta del primer archivo del media del track item, o None."""
+    fileinfos = item.source().mediaSource().fileinfos()
+    return fileinfos[0].filename() if fileinfos else None
+
+
+def clip_color(item):
+    """Color actual del clip en el bin (hex) o None si no hay media."""
+    bin_item = item.source().binItem()
+    if item.source().mediaSource().isMediaPresent():
+        if bin_item.activeVersion():
+            return bin_item.color().name()
+    return None
+
+
+def clip_should_be_enabled(file_path):
+    """Los comps v00 (placeholders) quedan deshabilitados, todo lo demas habilitado."""
+    if file_path and "_comp_" in os.path.basename(file_path).lower():
+        return not re.search(r"_comp_v00", os.path.basename(file_path).lower())
+    return True
+
+
+# --- Etapa 1: recoleccion ---------------------------------------------------
+
+
+def collect_clip_records(clips, is_effect):
+    """
+    Lee una sola vez lo que el plan necesita de cada track item.
+    is_effect(item) indica los items de efecto, que no se procesan.
+    """
+    records = []
+    for item in clips:
+        if is_effect(item):
+            records.append({"clip": item, "is_effect": True})
+            continue
+        file_path = clip_file_path(item)
+        records.append(
+            {
+                "clip": item,
+                "is_effect": False,
+                "file_path": file_path,
+                "identity": parse_clip_identity(file_path),
+                "current_color": clip_color(item),
+            }
+        )
+    return records
+
+
+# --- Etapa 2: claves para la resolucion en bloque -----------------------------
+
+
+def shot_keys(records):
+    """(project_name, shot_code) unicos de los clips con nombre valido, en orden."""
+    keys = []
+    seen = set()
+    for record in records:
+        identity = record.get("identity")
+        if not identity:
+            continue
+        key = (identity["project_name"], identity["shot_code"])
+        if key not in seen:
+            seen.add(key)
+            keys.append(key)
+    return keys
+
+
+# --- Etapa 3: plan ------------------------------------------------------------
+
+
+def find_task(shot, task_name):
+    """Busca una tarea especifica por nombre en un shot (dict)."""
+    for t in shot["tasks"]:
+        if t["task_type"].lower() == task_name.lower():
+            return t
+    return None
+
+
+def find_highest_version_for_shot(shot):
+    """Encuentra la version mas alta de un shot basandose en la base de datos."""
+    all_versions = []
+    for task in shot["tasks"]:
+        all_versions.extend(task["versions"])
+    if all_versions:
+        # Buscar la version con el mayor version_number
+        highest_version = max(
+            all_versions,
+            key=lambda v: (v["version_number"] if v["version_number"] is not None else 0),
+        )
+        # Adaptar el formato esperado por el resto del script
+        return {
+            "version_number": f"{shot['shot_name']}_comp_v{highest_version['version_number']:03d}",
+            "version_status": highest_version.get("status", ""),
+            "version_description": highest_version.get("description", ""),
+        }
+    return None
+
+
+def status_name_by_color(color_hex, hiero_status_dict, task_status_dict):
+    """Devuelve el nombre del estado basado en el color."""
+    # Verificar primero en el diccionario de Hiero
+    for status, color in hiero_status_dict.items():
+        if color == color_hex:
+            return status
+    # Si no se encuentra en Hiero, buscar en el diccionario de ShotGrid
+    for status, (name, color, tag) in task_status_dict.items():
+        if color == color_hex:
+            return name
+    return "Unknown"
+
+
+def color_change_needed(current_color_hex, current_status, new_color_hex, task_status):
+    """Reglas de Pull para decidir si el color del clip se actualiza."""
+    if current_color_hex == new_color_hex:
+        return False
+    if current_status == "v_00" and task_status in (
+        "Not Ready To Start",
+        "Ready To Start",
+    ):
+        return False
+    if task_status == "In Progress" and current_status != "v_00":
+        return False
+    return True
+
+
+def build_change_plan(records, shots, task_status_dict, hiero_status_dict):
+    """
+    Calcula los cambios de cada clip sin tocar Hiero.
+    shots: {(project_name, shot_code): shot dict o None} ya resuelto contra la DB.
+    Devuelve una accion (dict) por cada clip que no es efecto, en el mismo orden.
+    """
+    plan = []
+    for record in records:
+        if record["is_effect"]:
+            continue
+        action = {
+            "clip": record["clip"],
+            "clear_tags": True,
+            # Con check_newer_version el apply lo recalcula despues de cambiar de version
+            "enable": clip_should_be_enabled(record["file_path"]),
+            "set_color": None,
+            "xyplorer_tag": None,
+            "shot_base_path": None,
+            "check_newer_version": False,
+            "row": None,
+        }
+        plan.append(action)
+
+        identity = record["identity"]
+        if not identity:
+            continue
+        shot_code = identity["shot_code"]
+        shot = shots.get((identity["project_name"], shot_code))
+        if not shot:
+            debug_print(
+                f"No se encontro shot '{shot_code}' en el proyecto '{identity['project_name']}'"
+            )
+            continue
+        task = find_task(shot, identity["task_name"])
+        if not task:
+            debug_print(
+                f"No se encontro task '{identity['task_name']}' para el shot '{shot_code}'"
+            )
+            continue
+
+        task_status_name, new_color_hex, xyplorer_tag = task_status_dict.get(
+            task["task_status"], ("Estado desconocido", "#000000", None)
+        )
+        # Ruta base del shot (cuatro niveles arriba del archivo) para XYplorer
+        action["shot_base_path"] = os.path.dirname(
+            os.path.dirname(os.path.dirname(os.path.dirname(identity["file_path"])))
+        )
+        action["xyplorer_tag"] = xyplorer_tag
+
+        current_color_hex = record["current_color"]
+        current_status = status_name_by_color(
+            current_color_hex, hiero_status_dict, task_status_dict
+        )
+        highest_version = find_highest_version_for_shot(shot)
+        sg_version_str = highest_version["version_number"] if highest_version else "No info"
+        sg_version_number = extract_version_number(sg_version_str)
+        sg_status = highest_version["version_status"] if highest_version else "No info"
+
+        color_changed = color_change_needed(
+            current_color_hex, current_status, new_color_hex, task_status_name
+        )
+        if color_changed:
+            action["set_color"] = new_color_hex
+        newer_in_flow = sg_version_number > identity["version_number"]
+        if color_changed or newer_in_flow:
+            action["row"] = {
+                "shot_code": shot_code,
+                "version_number": identity["version_str"],
+                "prev_status": current_status,
+                "prev_color": current_color_hex if current_color_hex else "#000000",
+                "new_status": task_status_name,
+                "new_color": new_color_hex,
+                "sg_version_number": sg_version_str,
+                "sg_status": sg_status,
+            }
+        if newer_in_flow:
+            action["check_newer_version"] = True
+            action["version_number"] = identity["version_number"]
+            action["sg_version_number"] = sg_version_number
+            action["sg_version_str"] = sg_version_str
+            action["assignee"] = task.get("task_assigned_to", "No assignee")
+    return plan
+
+
+# --- Benchmark headless -------------------------------------------------------
+
+
+class _FakeFileInfo:
+    def __init__(self, filename):
+        self._filename = filename
+
+    def filename(self):
+        return self._filename
+
+
+class _FakeColor:
+    def __init__(self, hex_color):
+        self._hex = hex_color
+
+    def name(self):
+        return self._hex
+
+
+class _FakeSource:
+    """Hace de source(), mediaSource() y binItem() a la vez."""
+
+    def __init__(self, filename, color):
+        self._fileinfos = [_FakeFileInfo(filename)]
+        self._color = _FakeColor(color)
+
+    def mediaSource(self):
+        return self
+
+    def binItem(self):
+        return self
+
+    def fileinfos(self):
+        return self._fileinfos
+
+    def isMediaPresent(self):
+        return True
+
+    def activeVersion(self):
+        return self
+
+    def color(self):
+        return self._color
+
+
+class FakeTrackItem:
+    """Track item minimo para correr las etapas 1 y 3 sin Hiero."""
+
+    def __init__(self, filename, color="#8a8a8a", effect=False):
+        self._source = _FakeSource(filename, color)
+        self.effect = effect
+
+    def source(self):
+        return self._source
+
+
+def make_fake_reel(clip_count, project="BENCH"):
+    """Track items y shots resueltos de un reel sintetico."""
+    statuses = ("corr", "rev_su", "apr", "progre", "ready")
+    clips = []
+    shots = {}
+    for i in range(clip_count):
+        shot_code = f"{project}_{i // 100:03d}_{i % 100:03d}_{i:04d}_aaa"
+        clip_version = 1 + i % 5
+        filename = (
+            f"T:/{project}/{shot_code}/Comp/4_publish/"
+            f"{shot_code}_comp_v{clip_version:03d}/{shot_code}_comp_v{clip_version:03d}_%04d.exr"
+        )
+        clips.append(FakeTrackItem(filename, color=("#8a8a8a", "#2e77d4")[i % 2]))
+        if i % 50 == 0:
+            clips.append(FakeTrackItem(filename, effect=True))
+        if i % 97 == 0:
+            continue  # shot que no esta en la DB
+        versions = [
+            {"version_number": n, "status": "rev", "description": ""}
+            for n in range(1, clip_version + 1 + i % 2)
+        ]
+        shots[(project, shot_code)] = {
+            "shot_name": shot_code,
+            "tasks": [
+                {
+                    "task_type": "Comp",
+                    "task_status": statuses[i % len(statuses)],
+                    "task_assigned_to": "Ana",
+                    "versions": versions,
+                }
+            ],
+        }
+    return clips, shots
+
+
+def benchmark(clip_count=2000, repeat=5):
+    # Diccionarios iguales a los de LGA_NKS_Flow_Pull (colores en minusculas)
+    task_status_dict = {
+        "ready": ("Ready To Start", "#8a8a8a", None),
+        "progre": ("In Progress", "#7d4cff", None),
+        "corr": ("Corrections", "#2e77d4", "Corrections"),
+        "rev_su": ("Review Sup", "#a3557e", "Rev_Sup"),
+        "apr": ("Approved", "#244c19", "Approved"),
+    }
+    hiero_status_dict = {"v_00": "#8a8a8a"}
+    clips, shots = make_fake_reel(clip_count)
+
+    timings = {"collect": [], "resolve": [], "plan": []}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        records = collect_clip_records(clips, lambda item: item.effect)
+        timings["collect"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        resolved = {key: shots.get(key) for key in shot_keys(records)}
+        timings["resolve"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        plan = build_change_plan(records, resolved, task_status_dict, hiero_status_dict)
+        timings["plan"].append(time.perf_counter() - start)
+
+    print(f"{len(clips)} track items, {len(plan)} acciones")
+    print(f"  colores: {sum(1 for a in plan if a['set_color'])}")
+    print(f"  filas:   {sum(1 for a in plan if a['row'])}")
+    print(f"  scans:   {sum(1 for a in plan if a['check_newer_version'])}")
+    for stage, values in timings.items():
+        print(f"  {stage:8s} {min(values) * 1000.0:8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de las etapas puras del Pull.")
+    parser.add_argument("--clips", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    benchmark(args.clips, args.repeat)
+    sys.exit(0)
@@ -1,13 +1,16 @@
 """
 _____________________________________________________________
 
-  LGA_NKS_Flow_Push v3.70 | Lega
+  LGA_NKS_Flow_Push v3.80 | Lega
 
   Envia a flow nuevos estados de las tasks comps.
   En algunos estados permite enviar un mensaje a la version
   También actualiza la base de datos local para mantenerla sincronizada
   Muestra thumbnails de imagenes capturadas en el dialogo de notas para referencia visual
-  y envía las imagenes a la nota en Flow
+  y envía las imagenes a la nota en Flow (reducidas en paralelo antes de subirlas)
+  Los cambios se guardan en la cola de PipeSync_Outbox y se envian a Flow
+  en segundo plano, con reintentos si Flow no responde
+  Cada cambio sale de pipesync.db y viaja a Flow en un solo sg.batch
 _____________________________________________________________
 
 """
@@ -15,12 +18,12 @@ _____________________________________________________________
 import os
 import re
 import shotgun_api3
-import sqlite3
 import platform
 import glob
 import shutil
-import tempfile
-from PySide2.QtCore import QRunnable, Slot, QThreadPool, Signal, QObject, Qt
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PySide2.QtCore import QObject, Qt, Signal
 import datetime
 import subprocess  # Importar subprocess para abrir archivos
 import sys
@@ -29,6 +32,13 @@ from pathlib import Path
 # Importar el módulo de configuración segura
 sys.path.append(str(Path(__file__).parent))
 from SecureConfig_Reader import get_flow_credentials
+import PipeSync_DB
+import PipeSync_Outbox as Outbox
+import LGA_NKS_Flow_IdResolver as IdResolver
+
+# Parser de nombres compartido
+sys.path.append(str(Path(__file__).parent.parent / "LGA_NKS"))
+import LGA_NKS_NameParser as NameParser
 
 # from PySide2.QtCore import QWaitCondition, QMutex
 from PySide2.QtWidgets import (
@@ -45,7 +55,7 @@ from PySide2.QtWidgets import (
     QWidget,
     QCheckBox,
 )
-from PySide2.QtGui import QKeySequence, QPixmap
+from PySide2.QtGui import QImage, QKeySequence, QPixmap
 
 # Diccionario de traduccion de estados
 status_translation = {
@@ -65,6 +75,21 @@ status_translation = {
 DEBUG = False
 debug_messages = []
 
+# Uploads simultaneos de imagenes de ReviewPic a una nota
+UPLOAD_WORKERS = 4
+
+# Subcarpeta (junto a las imagenes) para las copias reducidas y los hard links
+# con el nombre de ShotGrid, con una carpeta por imagen
+UPLOAD_LINK_DIR = "_flow_upload"
+
+# Reduccion de las imagenes de ReviewPic antes de subirlas (los originales no se tocan)
+UPLOAD_MAX_EDGE = 1920  # Lado mayor en pixeles (0 = subir sin reducir)
+UPLOAD_JPEG_QUALITY = 85
+RESIZE_WORKERS = 4
+
+# Mostrar una ventana con el resultado y los round-trips de cada tanda enviada
+SHOW_PUSH_RESULTS = True
+
 
 def debug_print(message):
     if DEBUG:
@@ -78,14 +103,9 @@ def find_review_images(base_name):
     """
     try:
         # Extraer informacion del nombre base
-        parts = base_name.split("_")
-
-        # Buscar numero de version
-        version_number_str = None
-        for part in parts:
-            if part.startswith("v") and part[1:].isdigit():
-                version_number_str = part
-                break
+        parsed = NameParser.parse_base_name(base_name)
+        parts = parsed.parts
+        version_number_str = parsed.version_token
 
         if not version_number_str:
             debug_print("No se encontro numero de version en el nombre base")
@@ -140,60 +160,51 @@ class DBManager:
     """Clase para manejar operaciones con la base de datos SQLite local."""
 
     def __init__(self):
-        # Selecciona la ruta de la base de datos segun el sistema operativo
-        if platform.system() == "Windows":
-            self.db_path = r"C:/Portable/LGA/PipeSync/cache/pipesync.db"
-        elif platform.system() == "Darwin":
-            self.db_path = "/Users/leg4/Library/Caches/LGA/PipeSync/pipesync.db"
-        else:
-            debug_print(f"Sistema operativo no soportado: {platform.system()}")
-            self.db_path = None
-
-        if self.db_path and os.path.exists(self.db_path):
-            try:
-                self.conn = sqlite3.connect(self.db_path)
-                self.conn.row_factory = sqlite3.Row
-                debug_print(f"Conexión exitosa a la base de datos: {self.db_path}")
-            except Exception as e:
-                debug_print(f"Error al conectar a la base de datos: {e}")
-                self.conn = None
+        # La ruta y las conexiones (una por hilo) las maneja PipeSync_DB
+        self.db_path = PipeSync_DB.get_db_path()
+        self.available = PipeSync_DB.db_exists()
+        if self.available:
+            debug_print(f"Base de datos disponible: {self.db_path}")
         else:
             debug_print(f"DB file not found at path: {self.db_path}")
-            self.conn = None
 
     def find_project(self, project_name):
         """Busca un proyecto por nombre en la base de datos."""
-        if not self.conn:
+        if not self.available:
             debug_print("No hay conexión a la base de datos")
             return None
 
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                "SELECT * FROM projects WHERE project_name = ?", (project_name,)
+            return PipeSync_DB.record_cache.get(
+                "projects",
+                project_name,
+                lambda: PipeSync_DB.fetch_one(
+                    "SELECT * FROM projects WHERE project_name = ?", (project_name,)
+                ),
             )
-            return cur.fetchone()
         except Exception as e:
             debug_print(f"Error al buscar proyecto {project_name}: {e}")
             return None
 
     def find_shot(self, project_name, shot_code):
         """Busca un shot por nombre y código en la base de datos."""
-        if not self.conn:
+        if not self.available:
             debug_print("No hay conexión a la base de datos")
             return None
 
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                """
-                SELECT s.* FROM shots s
-                JOIN projects p ON s.project_id = p.id
-                WHERE p.project_name = ? AND s.shot_name = ?
-                """,
+            return PipeSync_DB.record_cache.get(
+                "push_shots",
                 (project_name, shot_code),
+                lambda: PipeSync_DB.fetch_one(
+                    """
+                    SELECT s.* FROM shots s
+                    JOIN projects p ON s.project_id = p.id
+                    WHERE p.project_name = ? AND s.shot_name = ?
+                    """,
+                    (project_name, shot_code),
+                ),
             )
-            return cur.fetchone()
         except Exception as e:
             debug_print(
                 f"Error al buscar shot {shot_code} en proyecto {project_name}: {e}"
@@ -202,20 +213,22 @@ class DBManager:
 
     def find_task(self, shot_id, task_name):
         """Busca una tarea específica por nombre y shot_id."""
-        if not self.conn:
+        if not self.available:
             debug_print("No hay conexión a la base de datos")
             return None
 
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                """
-                SELECT * FROM tasks 
-                WHERE shot_id = ? AND LOWER(task_type) = LOWER(?)
-                """,
-                (shot_id, task_name),
+            return PipeSync_DB.record_cache.get(
+                "push_tasks",
+                (shot_id, task_name.lower()),
+                lambda: PipeSync_DB.fetch_one(
+                    """
+                    SELECT * FROM tasks 
+                    WHERE shot_id = ? AND LOWER(task_type) = LOWER(?)
+                    """,
+                    (shot_id, task_name),
+                ),
             )
-            return cur.fetchone()
         except Exception as e:
             debug_print(
                 f"Error al buscar tarea {task_name} para shot_id {shot_id}: {e}"
@@ -224,16 +237,14 @@ class DBManager:
 
     def update_task_status(self, task_id, status):
         """Actualiza el estado de una tarea en la base de datos."""
-        if not self.conn:
+        if not self.available:
             debug_print("No hay conexión a la base de datos")
             return False
 
         try:
-            cur = self.conn.cursor()
-            cur.execute(
+            PipeSync_DB.execute_write(
                 "UPDATE tasks SET task_status = ? WHERE id = ?", (status, task_id)
             )
-            self.conn.commit()
             debug_print(
                 f"Estado de la tarea (ID: {task_id}) actualizado a '{status}' en la base de datos local"
             )
@@ -246,17 +257,15 @@ class DBManager:
 
     def update_version_status(self, task_id, version_number, status):
         """Actualiza el estado de una versión específica en la base de datos."""
-        if not self.conn:
+        if not self.available:
             debug_print("No hay conexión a la base de datos")
             return False
 
         try:
-            cur = self.conn.cursor()
-            cur.execute(
+            PipeSync_DB.execute_write(
                 "UPDATE versions SET status = ? WHERE task_id = ? AND version_number = ?",
                 (status, task_id, version_number),
             )
-            self.conn.commit()
             debug_print(
                 f"Estado de la versión {version_number} (task_id: {task_id}) actualizado a '{status}' en la base de datos local"
             )
@@ -269,15 +278,13 @@ class DBManager:
 
     def get_user_name(self):
         """Obtiene el nombre del usuario actual desde app_settings."""
-        if not self.conn:
+        if not self.available:
             debug_print("No hay conexión a la base de datos para obtener user_name")
             return "Desconocido"
         try:
-            cur = self.conn.cursor()
-            cur.execute(
+            row = PipeSync_DB.fetch_one(
                 "SELECT setting_value FROM app_settings WHERE setting_key = 'user_name'"
             )
-            row = cur.fetchone()
             if row and row[0]:
                 return row[0]
             else:
@@ -288,7 +295,7 @@ class DBManager:
 
     def add_version_note(self, version_id, content, created_by=None):
         """Añade una nota a una versión en la base de datos."""
-        if not self.conn:
+        if not self.available:
             debug_print("No hay conexión a la base de datos")
             return False
         if created_by is None:
@@ -298,15 +305,13 @@ class DBManager:
             datetime.datetime.now().astimezone().isoformat(sep=" ", timespec="seconds")
         )
         try:
-            cur = self.conn.cursor()
-            cur.execute(
+            PipeSync_DB.execute_write(
                 """
                 INSERT INTO version_notes (version_id, content, created_by, created_on) 
                 VALUES (?, ?, ?, ?)
                 """,
                 (version_id, content, created_by, created_on),
             )
-            self.conn.commit()
             debug_print(
                 f"Nota añadida a la versión (ID: {version_id}) en la base de datos local por {created_by} en {created_on}"
             )
@@ -317,37 +322,59 @@ class DBManager:
 
     def find_latest_version(self, task_id):
         """Encuentra la versión más reciente para una tarea específica."""
-        if not self.conn:
+        if not self.available:
             debug_print("No hay conexión a la base de datos")
             return None
 
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                """
-                SELECT * FROM versions 
-                WHERE task_id = ? 
-                ORDER BY version_number DESC 
-                LIMIT 1
-                """,
-                (task_id,),
+            return PipeSync_DB.record_cache.get(
+                "push_latest_versions",
+                task_id,
+                lambda: PipeSync_DB.fetch_one(
+                    """
+                    SELECT * FROM versions 
+                    WHERE task_id = ? 
+                    ORDER BY version_number DESC 
+                    LIMIT 1
+                    """,
+                    (task_id,),
+                ),
             )
-            return cur.fetchone()
         except Exception as e:
             debug_print(
                 f"Error al buscar la última versión para task_id {task_id}: {e}"
             )
             return None
 
+    def find_version(self, task_id, version_number):
+        """Busca una versión de una tarea por número."""
+        if not self.available:
+            debug_print("No hay conexión a la base de datos")
+            return None
+
+        try:
+            return PipeSync_DB.record_cache.get(
+                "push_versions",
+                (task_id, version_number),
+                lambda: PipeSync_DB.fetch_one(
+                    "SELECT * FROM versions WHERE task_id = ? AND version_number = ?",
+                    (task_id, version_number),
+                ),
+            )
+        except Exception as e:
+            debug_print(
+                f"Error al buscar la versión {version_number} para task_id {task_id}: {e}"
+            )
+            return None
+
     def close(self):
-        """Cierra la conexión a la base de datos."""
-        if hasattr(self, "conn") and self.conn:
-            try:
-                self.conn.close()
-                self.conn = None
-                debug_print("Conexión a la base de datos cerrada")
-            except Exception as e:
-                debug_print(f"Error al cerrar la conexión a la base de datos: {e}")
+        """Las conexiones son por hilo y se reutilizan: solo se registran los tiempos."""
+        cache = PipeSync_DB.record_cache
+        debug_print(f"Cache DB: {cache.hits} aciertos, {cache.misses} lecturas")
+        for stats in PipeSync_DB.get_query_stats()[:5]:
+            debug_print(
+                f"DB {stats['count']}x {stats['avg_ms']:.2f} ms: {stats['sql'][:80]}"
+            )
 
 
 class InputDialog(QDialog):
@@ -615,72 +642,107 @@ def delete_review_pic_cache():
         return False
 
 
+class CountedShotgun:
+    """
+    Envuelve una conexion de ShotGrid y cuenta cada llamada a la API: cada una
+    es un round-trip a Flow (un batch cuenta como uno solo).
+    """
+
+    RPC_METHODS = (
+        "find",
+        "find_one",
+        "create",
+        "update",
+        "delete",
+        "batch",
+        "upload",
+        "summarize",
+    )
+
+    def __init__(self, sg, on_call):
+        self._sg = sg
+        self._on_call = on_call
+
+    def __getattr__(self, name):
+        attr = getattr(self._sg, name)
+        if name not in self.RPC_METHODS:
+            return attr
+
+        def counted(*args, **kwargs):
+            self._on_call()
+            return attr(*args, **kwargs)
+
+        return counted
+
+
 class ShotGridManager:
     def __init__(self, url, login, password):
         debug_print("Inicializando conexion a ShotGrid")
+        # Credenciales para las conexiones de los hilos de upload
+        self.url = url
+        self.login = login
+        self.password = password
+        self._thread_local = threading.local()
+        # Errores de Flow de esta conexion: Push los usa para decidir si reintentar
+        self.error_count = 0
+        # Llamadas a Flow de esta conexion y de las de upload
+        self.round_trips = 0
+        # Bytes que no se subieron gracias a la reduccion de imagenes
+        self.upload_bytes_saved = 0
+        self._round_trips_lock = threading.Lock()
         try:
-            self.sg = shotgun_api3.Shotgun(url, login=login, password=password)
+            self.sg = CountedShotgun(
+                shotgun_api3.Shotgun(url, login=login, password=password),
+                self.count_round_trip,
+            )
             debug_print("Conexion a ShotGrid inicializada exitosamente")
         except Exception as e:
             debug_print(f"Error al inicializar la conexion a ShotGrid: {e}")
             self.sg = None
 
+    def log_error(self, message):
+        self.error_count += 1
+        debug_print(message)
+
+    def count_round_trip(self):
+        with self._round_trips_lock:
+            self.round_trips += 1
+
     def find_shot_and_tasks(self, project_name, shot_code):
         if not self.sg:
             debug_print("ShotGrid no inicializado")
             return None, None, None
-        debug_print(f"Buscando proyecto con nombre: {project_name}")
+        # IDs desde pipesync.db o la cache; Flow solo si no estan (una consulta)
         try:
-            projects = self.sg.find(
-                "Project", [["name", "is", project_name]], ["id", "name"]
-            )
+            shots = IdResolver.resolve_shots(project_name, shot_code, self.sg)
         except Exception as e:
-            debug_print(f"Error buscando proyecto: {e}")
+            self.log_error(f"Error buscando shot: {e}")
             return None, None, None
-        if projects:
-            project = projects[0]
-            project_id = project["id"]
-            debug_print(f"Proyecto encontrado: {project['name']} (ID: {project_id})")
-            filters = [
-                ["project", "is", {"type": "Project", "id": project_id}],
-                ["code", "is", shot_code],
-            ]
-            fields = ["id", "code", "description"]
+        if not shots:
+            debug_print("No se encontro el Shot con el codigo especificado.")
+            return None, None, None
+        project = {"id": shots[0]["project_id"], "name": project_name}
+        found = [{"id": shot["shot_id"], "code": shot["shot_code"]} for shot in shots]
+        # Si hay múltiples shots con el mismo nombre, mostrar un diálogo y abortar
+        if len(found) > 1:
+            debug_print(
+                f"Múltiples shots encontrados ({len(found)}) para el código: {shot_code}"
+            )
+            # El diálogo solo se puede mostrar desde el hilo principal (no desde el flusher)
             try:
-                shots = self.sg.find("Shot", filters, fields)
+                app = QApplication.instance()
+                if app is not None and threading.current_thread() is threading.main_thread():
+                    dialog = MultipleShotsDialog(found, shot_code)
+                    dialog.exec_()
             except Exception as e:
-                debug_print(f"Error buscando shot: {e}")
-                return project, None, None
-            if shots:
-                # Si hay múltiples shots con el mismo nombre, mostrar un diálogo y abortar
-                if len(shots) > 1:
-                    debug_print(
-                        f"Múltiples shots encontrados ({len(shots)}) para el código: {shot_code}"
-                    )
-                    # Mostrar el diálogo en el hilo principal si está disponible
-                    try:
-                        app = QApplication.instance()
-                        if app is not None:
-                            dialog = MultipleShotsDialog(shots, shot_code)
-                            dialog.exec_()
-                    except Exception as e:
-                        debug_print(f"Error mostrando diálogo: {e}")
-                    debug_print(
-                        "Operación abortada debido a múltiples shots con el mismo nombre."
-                    )
-                    return project, None, None
-                else:
-                    shot = shots[0]
-                    shot_id = shot["id"]
-                    debug_print(f"Shot encontrado: {shot['code']} (ID: {shot_id})")
-                    tasks = self.find_tasks_for_shot(shot_id)
-                    return project, shot, tasks
-            else:
-                debug_print("No se encontro el Shot con el codigo especificado.")
-                return project, None, None
-        else:
-            debug_print("No se encontro el proyecto con el nombre especificado.")
-            return None, None, None
+                debug_print(f"Error mostrando diálogo: {e}")
+            debug_print(
+                "Operación abortada debido a múltiples shots con el mismo nombre."
+            )
+            return project, None, None
+        shot = found[0]
+        debug_print(f"Shot encontrado: {shot['code']} (ID: {shot['id']})")
+        return project, shot, shots[0]["tasks"]
 
     def find_tasks_for_shot(self, shot_id):
         if not self.sg:
@@ -691,7 +753,7 @@ class ShotGridManager:
         try:
             return self.sg.find("Task", filters, fields)
         except Exception as e:
-            debug_print(f"Error buscando tareas para shot_id {shot_id}: {e}")
+            self.log_error(f"Error buscando tareas para shot_id {shot_id}: {e}")
             return []
 
     def find_highest_version_for_shot(self, shot_id):
@@ -703,7 +765,7 @@ class ShotGridManager:
         try:
             versions = self.sg.find("Version", filters, fields)
         except Exception as e:
-            debug_print(f"Error buscando versiones para shot_id {shot_id}: {e}")
+            self.log_error(f"Error buscando versiones para shot_id {shot_id}: {e}")
             return None, None, None
         comp_versions = [v for v in versions if "_comp_" in v["code"].lower()]
         if comp_versions:
@@ -723,154 +785,270 @@ class ShotGridManager:
             return highest_version, version_number, user_id
         return None, None, None
 
-    def update_task_status(self, task_id, new_status):
+    def find_version_ids(self, project_name, shot_code, version_str):
+        """IDs de las versiones del shot cuyo codigo contiene version_str (ej. "v003")."""
         if not self.sg:
             debug_print("ShotGrid no inicializado")
-            return
+            return []
+        filters = [
+            ["project.Project.name", "is", project_name],
+            ["entity.Shot.code", "is", shot_code],
+            ["code", "contains", version_str],
+        ]
         try:
-            debug_print(
-                f"Actualizando estado de la tarea (ID: {task_id}) a: {new_status}"
-            )
-            self.sg.update("Task", task_id, {"sg_status_list": new_status})
+            return [version["id"] for version in self.sg.find("Version", filters, ["id"])]
         except Exception as e:
-            debug_print(f"Error al actualizar el estado de la tarea: {e}")
+            self.log_error(f"Error buscando versiones {version_str} de {shot_code}: {e}")
+            return []
 
-    def update_version_status(self, project_name, shot_code, version_str, new_status):
+    def find_note_context(self, version_id):
+        """
+        Datos de una nota que no estan en pipesync.db, en una sola consulta:
+        (project_id, id del autor de la version, id del primer asignado de su task).
+        """
         if not self.sg:
             debug_print("ShotGrid no inicializado")
-            return
+            return None, None, None
         try:
-            debug_print(
-                f"Actualizando estado de la version para el Shot: {shot_code}, Version: {version_str} a: {new_status}"
+            version = self.sg.find_one(
+                "Version",
+                [["id", "is", version_id]],
+                ["project", "user", "sg_task.Task.task_assignees"],
             )
-            filters = [
-                ["project.Project.name", "is", project_name],
-                ["entity.Shot.code", "is", shot_code],
-                ["code", "contains", version_str],
-            ]
-            versions = self.sg.find("Version", filters, ["id"])
-            for version in versions:
-                debug_print(
-                    f"Actualizando version (ID: {version['id']}) a estado: {new_status}"
-                )
-                self.sg.update("Version", version["id"], {"sg_status_list": new_status})
         except Exception as e:
-            debug_print(f"Error al actualizar el estado de la version: {e}")
-
-    def get_task_assignee(self, task_id):
+            self.log_error(f"Error buscando datos de la version {version_id}: {e}")
+            return None, None, None
+        if not version:
+            return None, None, None
+        project_id = version["project"]["id"] if version.get("project") else None
+        user_id = version["user"]["id"] if version.get("user") else None
+        assignees = version.get("sg_task.Task.task_assignees") or []
+        if isinstance(assignees, dict):
+            assignees = [assignees]
+        assignee_id = assignees[0]["id"] if assignees else None
+        return project_id, user_id, assignee_id
+
+    def send_batch(self, requests):
+        """Envia todas las escrituras juntas (un round-trip, todo o nada). None si fallo."""
         if not self.sg:
             debug_print("ShotGrid no inicializado")
             return None
         try:
-            task = self.sg.find_one("Task", [["id", "is", task_id]], ["task_assignees"])
-            if task and task["task_assignees"]:
-                return task["task_assignees"][0]["id"]
-            return None
+            debug_print(f"Enviando batch con {len(requests)} operaciones")
+            return self.sg.batch(requests)
         except Exception as e:
-            debug_print(f"Error al obtener el asignado de la tarea: {e}")
+            self.log_error(f"Error enviando el batch a Flow: {e}")
             return None
 
-    def add_comment_to_version(
-        self, version_id, project_id, comment, user_id, task_assignee_id, shot_id=None
-    ):
-        if not self.sg:
-            debug_print("ShotGrid no inicializado")
-            return
+    def _upload_connection(self):
+        """
+        Conexion de ShotGrid del hilo actual. shotgun_api3.Shotgun no es thread
+        safe, asi que cada hilo del pool de uploads abre la suya una sola vez.
+        """
+        sg = getattr(self._thread_local, "sg", None)
+        if sg is None:
+            sg = CountedShotgun(
+                shotgun_api3.Shotgun(self.url, login=self.login, password=self.password),
+                self.count_round_trip,
+            )
+            self._thread_local.sg = sg
+        return sg
+
+    def _upload_name(self, version_id, image_path):
+        # Convencion de ShotGrid para mostrar el frame: annot_version_<version_id>.<frame>.jpg
+        frame_number = self.extract_frame_number_from_path(image_path)
+        file_extension = os.path.splitext(image_path)[1]
+        return f"annot_version_{version_id}.{frame_number}{file_extension}"
+
+    def _upload_dir(self, image_path):
+        # Subcarpeta junto a la imagen: mismo disco, asi los hard links funcionan.
+        # Una carpeta por imagen: dos capturas del mismo frame (_1001 y _1001_1)
+        # tienen el mismo nombre de ShotGrid y no se pueden pisar entre si
+        upload_dir = os.path.join(
+            os.path.dirname(image_path),
+            UPLOAD_LINK_DIR,
+            os.path.splitext(os.path.basename(image_path))[0],
+        )
+        os.makedirs(upload_dir, exist_ok=True)
+        return upload_dir
+
+    def _link_with_upload_name(self, image_path, upload_name):
+        """
+        Hard link con el nombre de ShotGrid en la subcarpeta de upload (sin
+        copiar bytes). Devuelve None si el sistema de archivos no permite hard links.
+        """
         try:
-            debug_print(
-                f"Agregando comentario a la version (ID: {version_id}): {comment}"
+            link_path = os.path.join(self._upload_dir(image_path), upload_name)
+            if os.path.exists(link_path):
+                os.remove(link_path)
+            os.link(image_path, link_path)
+            return link_path
+        except OSError as e:
+            debug_print(f"No se pudo crear el hard link de {image_path}: {e}")
+            return None
+
+    def _downscale_copy(self, image_path, upload_name):
+        """
+        Copia reducida (lado mayor UPLOAD_MAX_EDGE) y recomprimida (JPEG
+        UPLOAD_JPEG_QUALITY) en la subcarpeta de upload. None si no se pudo
+        leer la imagen o si la copia no pesa menos que el original.
+        """
+        if not UPLOAD_MAX_EDGE:
+            return None
+        image = QImage(image_path)
+        if image.isNull():
+            debug_print(f"No se pudo leer {image_path} para reducirla")
+            return None
+        if max(image.width(), image.height()) > UPLOAD_MAX_EDGE:
+            image = image.scaled(
+                UPLOAD_MAX_EDGE,
+                UPLOAD_MAX_EDGE,
+                Qt.KeepAspectRatio,
+                Qt.SmoothTransformation,
             )
-            addressings_to = [{"type": "HumanUser", "id": user_id}]
-            if task_assignee_id and task_assignee_id != user_id:
-                addressings_to.append({"type": "HumanUser", "id": task_assignee_id})
-            note_data = {
-                "project": {"type": "Project", "id": project_id},
-                "content": comment,
-                "note_links": [
-                    {"type": "Version", "id": version_id},
-                    {"type": "Shot", "id": shot_id},
-                ],
-                "addressings_to": addressings_to,
-            }
-            created_note = self.sg.create("Note", note_data)
-            return created_note
-        except Exception as e:
-            debug_print(f"Error al agregar comentario a la version: {e}")
+        staged_path = os.path.join(
+            self._upload_dir(image_path), os.path.splitext(upload_name)[0] + ".jpg"
+        )
+        if not image.save(staged_path, "JPEG", UPLOAD_JPEG_QUALITY):
+            return None
+        if os.path.getsize(staged_path) >= os.path.getsize(image_path):
+            os.remove(staged_path)
             return None
+        return staged_path
+
+    def _stage_image(self, version_id, image_path):
+        """
+        Prepara una imagen para subir con el nombre de ShotGrid: una copia
+        reducida si pesa menos, o si no un hard link al original. Sin ninguna
+        de las dos se sube el original con el nombre como display_name.
+        El archivo de ReviewPic_Cache no se modifica.
+        """
+        upload_name = self._upload_name(version_id, image_path)
+        original_bytes = os.path.getsize(image_path)
+        try:
+            staged_path = self._downscale_copy(image_path, upload_name)
+        except Exception as e:
+            debug_print(f"Error reduciendo {image_path}: {e}")
+            staged_path = None
+        if staged_path:
+            upload_name = os.path.basename(staged_path)
+        else:
+            staged_path = self._link_with_upload_name(image_path, upload_name)
+        return {
+            "source": image_path,
+            "path": staged_path or image_path,
+            "upload_name": upload_name,
+            "staged": bool(staged_path),
+            "original_bytes": original_bytes,
+            "upload_bytes": os.path.getsize(staged_path or image_path),
+        }
+
+    def prepare_upload_images(self, version_id, image_paths):
+        """Etapa previa al upload: prepara todas las imagenes en paralelo (RESIZE_WORKERS hilos)."""
+        workers = max(1, min(RESIZE_WORKERS, len(image_paths)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            staged_images = list(
+                executor.map(
+                    lambda path: self._stage_image(version_id, path), image_paths
+                )
+            )
+        original_bytes = sum(image["original_bytes"] for image in staged_images)
+        upload_bytes = sum(image["upload_bytes"] for image in staged_images)
+        self.upload_bytes_saved += original_bytes - upload_bytes
+        debug_print(
+            f"Imagenes para subir: {original_bytes / 1048576:.2f} MB -> "
+            f"{upload_bytes / 1048576:.2f} MB "
+            f"(ahorro {(original_bytes - upload_bytes) / 1048576:.2f} MB)"
+        )
+        return staged_images
+
+    def _upload_image(self, note_id, staged_image):
+        """Sube una imagen preparada a la nota. Corre en un hilo del pool de uploads."""
+        try:
+            uploaded_attachment_id = self._upload_connection().upload(
+                "Note",
+                note_id,
+                staged_image["path"],
+                field_name="attachments",
+                display_name=staged_image["upload_name"],
+            )
+        finally:
+            if staged_image["staged"]:
+                try:
+                    os.remove(staged_image["path"])
+                    os.rmdir(os.path.dirname(staged_image["path"]))
+                except OSError:
+                    pass
+        return staged_image["upload_name"], uploaded_attachment_id
 
     def attach_images_to_note(self, note_id, version_id, image_paths):
         """
         Adjunta imagenes a una nota con numeros de frame siguiendo la convencion de ShotGrid.
-        Usa upload directo a Note que es el metodo mas simple y efectivo.
+        Primero se reducen en paralelo (prepare_upload_images); los uploads
+        tambien corren en paralelo (una conexion por hilo) y la funcion vuelve
+        recien cuando terminaron todos, con exito o con error.
         """
         if not self.sg:
             debug_print("ShotGrid no inicializado")
             return False
 
-        try:
-            # Crear una carpeta temporal para los archivos renombrados
-            temp_dir = tempfile.mkdtemp()
-            debug_print(f"Carpeta temporal creada: {temp_dir}")
-
-            attached_count = 0
-
-            for image_path in image_paths:
-                if not os.path.exists(image_path):
-                    debug_print(f"Imagen no encontrada: {image_path}")
-                    continue
-
-                # Extraer numero de frame del nombre del archivo
-                frame_number = self.extract_frame_number_from_path(image_path)
-
-                # Crear nombre de archivo con convencion de ShotGrid para mostrar frame number
-                # Formato: annot_version_<version_id>.<frame_number>.jpg
-                file_extension = os.path.splitext(image_path)[1]
-                new_filename = (
-                    f"annot_version_{version_id}.{frame_number}{file_extension}"
-                )
-                temp_file_path = os.path.join(temp_dir, new_filename)
+        existing_paths = []
+        for image_path in image_paths:
+            if os.path.exists(image_path):
+                existing_paths.append(image_path)
+            else:
+                debug_print(f"Imagen no encontrada: {image_path}")
+        if not existing_paths:
+            return False
 
-                # Copiar archivo con el nuevo nombre
-                shutil.copy2(image_path, temp_file_path)
-                debug_print(f"Archivo copiado: {image_path} -> {temp_file_path}")
+        staged_images = self.prepare_upload_images(version_id, existing_paths)
 
-                # Subir archivo directamente a la nota usando el metodo que funciono en exploracion
+        attached_count = 0
+        workers = min(UPLOAD_WORKERS, len(staged_images))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._upload_image, note_id, image): image["source"]
+                for image in staged_images
+            }
+            for future in as_completed(futures):
                 try:
-                    uploaded_attachment_id = self.sg.upload(
-                        "Note", note_id, temp_file_path, field_name="attachments"
-                    )
-
-                    if uploaded_attachment_id:
-                        attached_count += 1
-                        debug_print(
-                            f"Imagen adjuntada exitosamente: {new_filename} (ID: {uploaded_attachment_id})"
-                        )
-                    else:
-                        debug_print(
-                            f"Error: No se obtuvo ID de attachment para {new_filename}"
-                        )
-
+                    upload_name, uploaded_attachment_id = future.result()
                 except Exception as upload_error:
                     debug_print(
-                        f"Error subiendo archivo {new_filename}: {upload_error}"
+                        f"Error subiendo archivo {futures[future]}: {upload_error}"
                     )
                     continue
+                if uploaded_attachment_id:
+                    attached_count += 1
+                    debug_print(
+                        f"Imagen adjuntada exitosamente: {upload_name} (ID: {uploaded_attachment_id})"
+                    )
+                else:
+                    debug_print(
+                        f"Error: No se obtuvo ID de attachment para {upload_name}"
+                    )
 
-            # Limpiar carpeta temporal
+        # Las subcarpetas de upload quedan vacias al terminar (primero la de
+        # cada imagen, despues la comun)
+        upload_dirs = set()
+        for path in existing_paths:
+            upload_dir = os.path.join(os.path.dirname(path), UPLOAD_LINK_DIR)
+            upload_dirs.add(upload_dir)
+            image_dir = os.path.splitext(os.path.basename(path))[0]
             try:
-                shutil.rmtree(temp_dir)
-                debug_print(f"Carpeta temporal eliminada: {temp_dir}")
-            except Exception as cleanup_error:
-                debug_print(f"Error limpiando carpeta temporal: {cleanup_error}")
-
-            debug_print(
-                f"Adjuntadas {attached_count} imagenes de {len(image_paths)} totales"
-            )
-            return attached_count > 0
+                os.rmdir(os.path.join(upload_dir, image_dir))
+            except OSError:
+                pass
+        for upload_dir in upload_dirs:
+            try:
+                os.rmdir(upload_dir)
+            except OSError:
+                pass
 
-        except Exception as e:
-            debug_print(f"Error adjuntando imagenes a la nota: {e}")
-            return False
+        debug_print(
+            f"Adjuntadas {attached_count} imagenes de {len(image_paths)} totales"
+        )
+        return attached_count == len(image_paths)
 
     def extract_frame_number_from_path(self, image_path):
         """
@@ -897,263 +1075,324 @@ class ShotGridManager:
             debug_print(f"Error extrayendo numero de frame de {image_path}: {e}")
             return "0001"
 
-    def get_project_id_from_version(self, version_id):
-        """
-        Obtiene el ID del proyecto a partir del ID de una version.
-        """
-        if not self.sg:
-            debug_print("ShotGrid no inicializado")
-            return None
-        try:
-            version = self.sg.find_one(
-                "Version", [["id", "is", version_id]], ["project"]
-            )
-            if version and version.get("project"):
-                return version["project"]["id"]
-            return None
-        except Exception as e:
-            debug_print(f"Error obteniendo project_id de version {version_id}: {e}")
-            return None
 
+class PushSignals(QObject):
+    # Resultado de cada operacion de la tanda enviada (base_name, button_name,
+    # round_trips, bytes_saved, error)
+    batch_sent = Signal(list)
 
-class WorkerSignals(QObject):
-    result_ready = Signal(str, int, int)
-    task_finished = Signal(bool)  # Ahora incluye el estado de exito
-    debug_output = Signal()  # Nueva señal para imprimir logs
-
-
-class Worker(QRunnable):
-    def __init__(
-        self,
-        button_name,
-        base_name,
-        sg_manager,
-        message,
-        review_images=None,
-        should_delete_images=False,
-    ):
-        super(Worker, self).__init__()
-        self.button_name = button_name
-        self.base_name = base_name
-        self.sg_manager = sg_manager
-        self.message = message
-        self.review_images = review_images or []
-        self.should_delete_images = should_delete_images
-        self.signals = WorkerSignals()
-
-    @Slot()
-    def run(self):
-        db_manager = DBManager()  # Crear la conexión en el hilo correcto
-        try:
-            project_name = self.base_name.split("_")[0]
-            parts = self.base_name.split("_")
-            shot_code = "_".join(parts[:5])
-
-            version_number_str = None
-            for part in parts:
-                if part.startswith("v") and part[1:].isdigit():
-                    version_number_str = part
-                    break
-
-            if version_number_str:
-                version_number = int(version_number_str.replace("v", ""))
-                debug_print(f"Shot code: {shot_code}, Version number: {version_number}")
-            else:
-                debug_print(
-                    "Error: No se encontro un numero de version valido en el nombre del archivo."
-                )
-                return
 
-            version_index = parts.index(version_number_str)
-            task_name = parts[version_index - 1].lower()
+class PushRetry(Exception):
+    """Flow fallo antes de crear la nota: la operacion vuelve a la cola sin duplicar nada."""
+
+
+# Estado que toma la version segun el estado de la task
+version_status_translation = {
+    "rev_di": "vwd",
+    "corr": "vwd",
+    "rev_su": "rev",
+    "revleg": "unvleg",
+}
+
+# Estados cuya nota se envia a Flow (en revhld la nota solo queda en la base local)
+FLOW_NOTE_STATUSES = ("rev_di", "corr", "revleg")
+
+
+def update_local_db(db_manager, project_name, shot_code, task_name, sg_status, message):
+    """Refleja en pipesync.db el estado de la task, el de su ultima version y la nota."""
+    db_shot = db_manager.find_shot(project_name, shot_code)
+    if not db_shot:
+        debug_print(f"No se encontró el shot: {shot_code} en la base de datos local")
+        return
+    db_task = db_manager.find_task(db_shot["id"], task_name)
+    if not db_task:
+        debug_print(
+            f"No se encontró la tarea: {task_name} en la base de datos local"
+        )
+        return
+    debug_print(
+        f"Actualizando estado de tarea local (ID: {db_task['id']}) a: {sg_status}"
+    )
+    db_manager.update_task_status(db_task["id"], sg_status)
+
+    # Obtener la última versión para esta tarea
+    latest_version = db_manager.find_latest_version(db_task["id"])
+    if not latest_version:
+        return
+    version_status = version_status_translation.get(sg_status)
+    if version_status:
+        debug_print(
+            f"Actualizando estado de versión local (ID: {latest_version['id']}, version: {latest_version['version_number']}) a: {version_status}"
+        )
+        db_manager.update_version_status(
+            db_task["id"], latest_version["version_number"], version_status
+        )
+    # Añadir nota si hay mensaje
+    if message:
+        debug_print(f"Añadiendo nota a versión local (ID: {latest_version['id']})")
+        db_manager.add_version_note(latest_version["id"], message)
+
+
+def resolve_local_target(db_manager, project_name, shot_code, task_name, version_number):
+    """
+    IDs de Flow de la task, el shot y las versiones tomados de pipesync.db.
+    None si la task no esta en la base o no tiene sus IDs de Flow.
+    version_ids queda vacio y note_version_id en None si PipeSync todavia no
+    sincronizo la version (datos viejos): esos se piden a Flow.
+    """
+    db_shot = db_manager.find_shot(project_name, shot_code)
+    db_task = db_manager.find_task(db_shot["id"], task_name) if db_shot else None
+    if not db_task or not db_task["task_id"] or not db_task["shot_sg_id"]:
+        return None
+    db_version = db_manager.find_version(db_task["id"], version_number)
+    latest_version = db_manager.find_latest_version(db_task["id"])
+    note_version = None
+    if latest_version and latest_version["version_number"] >= version_number:
+        note_version = latest_version
+    return {
+        "task_sg_id": db_task["task_id"],
+        "shot_sg_id": db_task["shot_sg_id"],
+        "version_ids": (
+            [db_version["version_sg_id"]]
+            if db_version and db_version["version_sg_id"]
+            else []
+        ),
+        "note_version_id": note_version["version_sg_id"] if note_version else None,
+    }
+
+
+def resolve_flow_target(sg_manager, project_name, shot_code, task_name):
+    """Lo mismo que resolve_local_target, consultando a Flow (shot fuera de la base local)."""
+    debug_print(
+        f"Buscando shot y tareas para el proyecto: {project_name}, Shot: {shot_code}"
+    )
+    project, shot, tasks = sg_manager.find_shot_and_tasks(project_name, shot_code)
+    if not shot:
+        return None
+    debug_print(f"Shot encontrado: {shot['code']} (ID: {shot['id']})")
+    task = IdResolver.find_task({"tasks": tasks}, task_name)
+    if task is None:
+        # La task puede ser nueva y no estar en pipesync.db ni en la cache
+        _, task = IdResolver.resolve_task(
+            project_name, shot_code, task_name, sg_manager.sg
+        )
+    task_sg_id = task["id"] if task else None
+    return {
+        "task_sg_id": task_sg_id,
+        "shot_sg_id": shot["id"],
+        "version_ids": [],
+        "note_version_id": None,
+    }
+
+
+def send_push_operation(sg_manager, db_manager, operation):
+    """
+    Envia a Flow una operacion de la cola y actualiza pipesync.db.
+    Los IDs salen de pipesync.db y Flow solo se consulta por lo que falta o
+    esta viejo. La actualizacion de la task, la de la version y la creacion de
+    la nota viajan juntas en un solo sg.batch (todo o nada): si falla algo
+    antes o durante el batch se lanza PushRetry y la operacion se reintenta
+    sin duplicar nada. Despues del batch la operacion ya cuenta como enviada:
+    los errores al actualizar pipesync.db o al adjuntar las imagenes solo se
+    registran (reintentar duplicaria la nota). Devuelve los round-trips usados.
+    """
+    button_name = operation["button_name"]
+    base_name = operation["base_name"]
+    message = operation.get("message")
+    review_images = operation.get("review_images") or []
+    round_trips_before = sg_manager.round_trips
+
+    parsed = NameParser.parse_base_name(base_name)
+    project_name = parsed.project
+    shot_code = parsed.shot_code
+    version_number_str = parsed.version_token
+    if not version_number_str:
+        debug_print(
+            "Error: No se encontro un numero de version valido en el nombre del archivo."
+        )
+        return 0
+    version_number = int(version_number_str.replace("v", ""))
+    task_name = parsed.parts[parsed.parts.index(version_number_str) - 1].lower()
+    sg_status = status_translation.get(button_name, None)
+    if not sg_status:
+        debug_print(f"No se encontro un estado valido para: {button_name}")
+        return 0
+
+    errors_before = sg_manager.error_count
+    target = resolve_local_target(
+        db_manager, project_name, shot_code, task_name, version_number
+    )
+    if target is None:
+        debug_print(f"{shot_code} no esta en la base local: se consulta Flow")
+        target = resolve_flow_target(sg_manager, project_name, shot_code, task_name)
+    if target is None:
+        if sg_manager.error_count > errors_before:
+            raise PushRetry(f"Flow no respondio buscando el shot {shot_code}")
+        debug_print(f"No se encontro el Shot con el codigo: {shot_code}")
+        return sg_manager.round_trips - round_trips_before
+
+    version_status = version_status_translation.get(sg_status)
+    if version_status and not target["version_ids"]:
+        target["version_ids"] = sg_manager.find_version_ids(
+            project_name, shot_code, version_number_str
+        )
 
+    note_data = None
+    if sg_status in FLOW_NOTE_STATUSES and message:
+        note_version_id = target["note_version_id"]
+        if not note_version_id:
+            # Buscar la versión más alta para obtener su ID para los comentarios
+            sg_highest_version, _, _ = sg_manager.find_highest_version_for_shot(
+                target["shot_sg_id"]
+            )
+            note_version_id = sg_highest_version["id"] if sg_highest_version else None
+        if note_version_id:
+            project_id, user_id, task_assignee_id = sg_manager.find_note_context(
+                note_version_id
+            )
+            addressings_to = [
+                {"type": "HumanUser", "id": person_id}
+                for person_id in dict.fromkeys((user_id, task_assignee_id))
+                if person_id
+            ]
+            note_data = {
+                "project": {"type": "Project", "id": project_id},
+                "content": message,
+                "note_links": [
+                    {"type": "Version", "id": note_version_id},
+                    {"type": "Shot", "id": target["shot_sg_id"]},
+                ],
+                "addressings_to": addressings_to,
+            }
+    if sg_manager.error_count > errors_before:
+        raise PushRetry(f"Flow no respondio resolviendo {base_name}")
+
+    requests = []
+    if target["task_sg_id"]:
+        debug_print(f"Actualizando tarea (ID: {target['task_sg_id']}) a: {sg_status}")
+        requests.append(
+            {
+                "request_type": "update",
+                "entity_type": "Task",
+                "entity_id": target["task_sg_id"],
+                "data": {"sg_status_list": sg_status},
+            }
+        )
+    if version_status:
+        for version_id in target["version_ids"]:
             debug_print(
-                f"Buscando shot y tareas para el proyecto: {project_name}, Shot: {shot_code}"
+                f"Actualizando version (ID: {version_id}) a estado: {version_status}"
             )
-            project, shot, tasks = self.sg_manager.find_shot_and_tasks(
-                project_name, shot_code
+            requests.append(
+                {
+                    "request_type": "update",
+                    "entity_type": "Version",
+                    "entity_id": version_id,
+                    "data": {"sg_status_list": version_status},
+                }
             )
+    if note_data:
+        debug_print(f"Agregando comentario a la version: {message}")
+        requests.append(
+            {"request_type": "create", "entity_type": "Note", "data": note_data}
+        )
+    if not requests:
+        return sg_manager.round_trips - round_trips_before
 
-            if shot:
-                debug_print(f"Shot encontrado: {shot['code']} (ID: {shot['id']})")
-
-                # Realizar las actualizaciones en ShotGrid
-                sg_status = status_translation.get(self.button_name, None)
-                if sg_status:
-                    task_id = None
-                    task_assignee_id = None
-                    for task in tasks:
-                        if task["content"].lower() == task_name:
-                            debug_print(
-                                f"Actualizando tarea: {task['content']} (ID: {task['id']})"
-                            )
-                            self.sg_manager.update_task_status(task["id"], sg_status)
-                            task_id = task["id"]
-                            task_assignee_id = self.sg_manager.get_task_assignee(
-                                task_id
-                            )
-
-                            # Actualizar en base de datos local si existe
-                            db_shot = db_manager.find_shot(project_name, shot_code)
-                            if db_shot:
-                                db_task = db_manager.find_task(db_shot["id"], task_name)
-                                if db_task:
-                                    debug_print(
-                                        f"Actualizando estado de tarea local (ID: {db_task['id']}) a: {sg_status}"
-                                    )
-                                    db_manager.update_task_status(
-                                        db_task["id"], sg_status
-                                    )
-
-                                    # Obtener la última versión para esta tarea
-                                    latest_version = db_manager.find_latest_version(
-                                        db_task["id"]
-                                    )
-                                    if latest_version:
-                                        # Decidir qué estado aplicar a la versión dependiendo del estado de la tarea
-                                        version_status = None
-                                        if sg_status == "rev_di" or sg_status == "corr":
-                                            version_status = "vwd"
-                                        elif sg_status == "rev_su":
-                                            version_status = "rev"
-                                        elif sg_status == "revleg":
-                                            version_status = "unvleg"
-
-                                        if version_status:
-                                            debug_print(
-                                                f"Actualizando estado de versión local (ID: {latest_version['id']}, version: {latest_version['version_number']}) a: {version_status}"
-                                            )
-                                            db_manager.update_version_status(
-                                                db_task["id"],
-                                                latest_version["version_number"],
-                                                version_status,
-                                            )
-
-                                        # Añadir nota si hay mensaje
-                                        if self.message:
-                                            debug_print(
-                                                f"Añadiendo nota a versión local (ID: {latest_version['id']})"
-                                            )
-                                            db_manager.add_version_note(
-                                                latest_version["id"], self.message
-                                            )
-                                else:
-                                    debug_print(
-                                        f"No se encontró la tarea: {task_name} en la base de datos local"
-                                    )
-                            else:
-                                debug_print(
-                                    f"No se encontró el shot: {shot_code} en la base de datos local"
-                                )
-                            break
-
-                    # Buscar la versión más alta para obtener su ID y usuario para los comentarios
-                    sg_highest_version, sg_version_number, user_id = (
-                        self.sg_manager.find_highest_version_for_shot(shot["id"])
-                    )
+    results = sg_manager.send_batch(requests)
+    if results is None:
+        # Si los IDs cacheados quedaron viejos (shot recreado), el reintento los vuelve a pedir
+        IdResolver.invalidate(project_name, shot_code)
+        raise PushRetry(f"Flow no respondio el batch de {base_name}")
 
-                    if sg_status == "rev_di" or sg_status == "corr":
-                        debug_print(
-                            f"Actualizando version del Shot: {shot_code}, Version: {version_number_str} a: vwd"
-                        )
-                        self.sg_manager.update_version_status(
-                            project_name, shot_code, version_number_str, "vwd"
-                        )
-                        project_id = project["id"]
-                        try:
-                            if self.message and sg_highest_version:
-                                debug_print(
-                                    f"Agregando comentario a la version (ID: {sg_highest_version['id']}): {self.message}"
-                                )
-                                created_note = self.sg_manager.add_comment_to_version(
-                                    sg_highest_version["id"],
-                                    project_id,
-                                    self.message,
-                                    user_id,
-                                    task_assignee_id,
-                                    shot["id"],
-                                )
-
-                                # Adjuntar imagenes si existen y se creo la nota
-                                if created_note and self.review_images:
-                                    debug_print(
-                                        f"Adjuntando {len(self.review_images)} imagenes a la nota"
-                                    )
-                                    self.sg_manager.attach_images_to_note(
-                                        created_note["id"],
-                                        sg_highest_version["id"],
-                                        self.review_images,
-                                    )
-                        except Exception as e:
-                            debug_print(f"Error while adding comment to version: {e}")
-                    elif sg_status == "rev_su":
-                        debug_print(
-                            f"Actualizando version del Shot: {shot_code}, Version: {version_number_str} a: rev"
-                        )
-                        self.sg_manager.update_version_status(
-                            project_name, shot_code, version_number_str, "rev"
-                        )
-                    elif sg_status == "revleg":
-                        debug_print(
-                            f"Actualizando version del Shot: {shot_code}, Version: {version_number_str} a: unvleg"
-                        )
-                        self.sg_manager.update_version_status(
-                            project_name, shot_code, version_number_str, "unvleg"
-                        )
-                        project_id = project["id"]
-                        try:
-                            if self.message and sg_highest_version:
-                                debug_print(
-                                    f"Agregando comentario a la version (ID: {sg_highest_version['id']}): {self.message}"
-                                )
-                                created_note = self.sg_manager.add_comment_to_version(
-                                    sg_highest_version["id"],
-                                    project_id,
-                                    self.message,
-                                    user_id,
-                                    task_assignee_id,
-                                    shot["id"],
-                                )
-
-                                # Adjuntar imagenes si existen y se creo la nota
-                                if created_note and self.review_images:
-                                    debug_print(
-                                        f"Adjuntando {len(self.review_images)} imagenes a la nota"
-                                    )
-                                    self.sg_manager.attach_images_to_note(
-                                        created_note["id"],
-                                        sg_highest_version["id"],
-                                        self.review_images,
-                                    )
-                        except Exception as e:
-                            debug_print(f"Error while adding comment to version: {e}")
-                else:
-                    debug_print(
-                        f"No se encontro un estado valido para: {self.button_name}"
-                    )
-            else:
-                debug_print(f"No se encontro el Shot con el codigo: {shot_code}")
-            # Marcar como exitoso si llegamos hasta aqui sin excepciones
-            success = True
+    if target["task_sg_id"]:
+        try:
+            update_local_db(
+                db_manager, project_name, shot_code, task_name, sg_status, message
+            )
         except Exception as e:
-            debug_print(f"Exception in Worker.run: {e}")
-            success = False
-        finally:
-            # Cerrar la conexión a la base de datos
-            if db_manager:
-                db_manager.close()
+            debug_print(f"Error actualizando la base local para {base_name}: {e}")
 
-            # Borrar imagenes SOLO si se completó exitosamente y el usuario lo solicitó
-            if success and self.should_delete_images:
-                debug_print(
-                    "Operacion exitosa: Borrando carpeta ReviewPic_Cache como solicitó el usuario"
-                )
-                delete_review_pic_cache()
-            elif not success and self.should_delete_images:
-                debug_print("Operacion fallida: NO se borra la carpeta ReviewPic_Cache")
+    # Adjuntar imagenes si existen y se creo la nota
+    if note_data and review_images:
+        created_note = results[-1]
+        debug_print(f"Adjuntando {len(review_images)} imagenes a la nota")
+        try:
+            sg_manager.attach_images_to_note(
+                created_note["id"], note_data["note_links"][0]["id"], review_images
+            )
+        except Exception as e:
+            sg_manager.log_error(
+                f"Error adjuntando imagenes a la nota {created_note['id']}: {e}"
+            )
+    return sg_manager.round_trips - round_trips_before
 
-            self.signals.task_finished.emit(success)
-            self.signals.debug_output.emit()  # Emitir señal al finalizar
+
+def review_images_still_queued(op_id):
+    """True si otra operacion de la cola todavia necesita imagenes de ReviewPic_Cache."""
+    return any(
+        operation.get("review_images")
+        for operation in Outbox.list_operations()
+        if operation["id"] != op_id
+    )
+
+
+def send_push_batch(operations):
+    """
+    Sender de PipeSync_Outbox: manda una tanda de operaciones con una sola
+    conexion a Flow. Devuelve {id: error} para las que hay que reintentar.
+    """
+    sg_url, sg_login, sg_password = get_flow_credentials()
+    if not sg_url or not sg_login or not sg_password:
+        raise PushRetry("No se pudieron obtener las credenciales de Flow")
+    sg_manager = ShotGridManager(sg_url, sg_login, sg_password)
+    if not sg_manager.sg:
+        raise PushRetry("No se pudo conectar a Flow")
+
+    db_manager = DBManager()  # Las conexiones se reutilizan por hilo en PipeSync_DB
+    errors = {}
+    results = []
+    try:
+        for operation in operations:
+            round_trips_before = sg_manager.round_trips
+            bytes_saved_before = sg_manager.upload_bytes_saved
+            # Si falla en el ultimo intento la cola la deja como 'failed'
+            final_attempt = operation.get("attempts", 0) + 1 >= Outbox.MAX_ATTEMPTS
+            result = {
+                "base_name": operation["base_name"],
+                "button_name": operation["button_name"],
+                "error": "",
+                "final_attempt": final_attempt,
+            }
+            results.append(result)
+            try:
+                send_push_operation(sg_manager, db_manager, operation)
+            except Exception as e:
+                debug_print(f"Operacion {operation['id']} ({operation['base_name']}): {e}")
+                errors[operation["id"]] = e
+                result["error"] = str(e)
+            result["round_trips"] = sg_manager.round_trips - round_trips_before
+            result["bytes_saved"] = sg_manager.upload_bytes_saved - bytes_saved_before
+            if result["error"]:
+                continue
+
+            # Borrar imagenes SOLO si se completó exitosamente y el usuario lo solicitó
+            if operation.get("should_delete_images"):
+                if review_images_still_queued(operation["id"]):
+                    debug_print(
+                        "Otras operaciones en cola usan ReviewPic_Cache: no se borra todavia"
+                    )
+                else:
+                    debug_print(
+                        "Operacion exitosa: Borrando carpeta ReviewPic_Cache como solicitó el usuario"
+                    )
+                    delete_review_pic_cache()
+    finally:
+        db_manager.close()
+        print_debug_messages()
+        if SHOW_PUSH_RESULTS and results:
+            push_signals.batch_sent.emit(results)
+    return errors
 
 
 class MessageBoxManager:
@@ -1172,6 +1411,15 @@ class MessageBoxManager:
         msg_box.show()
         self.message_boxes.append(msg_box)
 
+    def show_result_message(self, info):
+        msg_box = QMessageBox()
+        msg_box.setTextFormat(Qt.RichText)
+        msg_box.setText(info)
+        msg_box.setWindowTitle("Flow Push")
+        msg_box.setWindowModality(Qt.NonModal)
+        msg_box.show()
+        self.message_boxes.append(msg_box)
+
 
 class MultipleShotsDialog(QDialog):
     """Diálogo para informar sobre múltiples shots encontrados"""
@@ -1245,14 +1493,73 @@ def show_version_dialog(base_name, local_version, flow_version):
     return response == QMessageBox.Yes
 
 
+def show_push_results(results):
+    """Ventana con el resultado de cada operacion enviada y sus round-trips a Flow."""
+    lines = []
+    for result in results:
+        round_trips = result["round_trips"]
+        text = (
+            f"{result['base_name']} - {result['button_name']}: "
+            f"{round_trips} round-trip{'s' if round_trips != 1 else ''}"
+        )
+        if result["bytes_saved"]:
+            text += f", imagenes {result['bytes_saved'] / 1048576:.1f} MB mas livianas"
+        if result["error"] and result["final_attempt"]:
+            text = (
+                f"<span style='color: #B95C5C;'>{text} - fallo, no se reintenta "
+                f"(usar PipeSync_Outbox.py --retry_failed)</span>"
+            )
+        elif result["error"]:
+            text = (
+                f"<span style='color: #B95C5C;'>{text} - en cola, se reintenta</span>"
+            )
+        lines.append(text)
+    total = sum(result["round_trips"] for result in results)
+    lines.append(f"<br><b>Total: {total} round-trips a Flow</b>")
+    msg_manager.show_result_message("<br>".join(lines))
+
+
 def handle_results(info, sg_version_number, version_number):
     if sg_version_number > version_number:
         msg_manager.show_warning_message(info)
 
 
-def Push_Task_Status(button_name, base_name, update_callback=None):
-    global msg_manager
+def find_flow_version_number(project_name, shot_code, task_name):
+    """
+    Version mas alta del shot para comparar con la local: primero pipesync.db
+    (sin red); solo si el shot o la task no estan en la base se pregunta a Flow.
+    Devuelve None si no se pudo averiguar.
+    """
+    db_manager = DBManager()
+    db_shot = db_manager.find_shot(project_name, shot_code)
+    db_task = db_manager.find_task(db_shot["id"], task_name) if db_shot else None
+    if db_task:
+        latest_version = db_manager.find_latest_version(db_task["id"])
+        return latest_version["version_number"] if latest_version else None
+
+    debug_print(f"{shot_code} no esta en la base local: se consulta Flow")
+    sg_url, sg_login, sg_password = get_flow_credentials()
+    sg_manager = ShotGridManager(sg_url, sg_login, sg_password)
+    project, shot, _ = sg_manager.find_shot_and_tasks(project_name, shot_code)
+    if not shot:
+        debug_print(f"No se encontró el Shot con el código: {shot_code}")
+        return None
+    sg_highest_version, sg_version_number, _ = (
+        sg_manager.find_highest_version_for_shot(shot["id"])
+    )
+    if not sg_highest_version:
+        debug_print(
+            f"No se encontró la versión más alta para el Shot (ID: {shot['id']})"
+        )
+        return None
+    return int(sg_version_number)
+
 
+def Push_Task_Status(button_name, base_name, update_callback=None):
+    """
+    Guarda el cambio de estado (y la nota) en la cola de PipeSync_Outbox y
+    vuelve enseguida. El envio a Flow lo hace el flusher en segundo plano.
+    """
     # Obtener las credenciales desde la configuración encriptada
     sg_url, sg_login, sg_password = get_flow_credentials()
 
@@ -1262,8 +1569,6 @@ def Push_Task_Status(button_name, base_name, update_callback=None):
         )
         return False  # Retornar False si faltan credenciales
 
-    sg_manager = ShotGridManager(sg_url, sg_login, sg_password)
-
     # Primero solicitar el mensaje al usuario para ciertos estados
     message = None
     review_images = []
@@ -1287,45 +1592,26 @@ def Push_Task_Status(button_name, base_name, update_callback=None):
         print_debug_messages()  # Imprimir logs después de obtener la información del diálogo
 
     # Ahora extraer información del nombre base y verificar versiones
-    try:
-        project_name = base_name.split("_")[0]
-        parts = base_name.split("_")
-        shot_code = "_".join(parts[:5])
-
-        # Extraer número de versión
-        version_number_str = None
-        for part in parts:
-            if part.startswith("v") and part[1:].isdigit():
-                version_number_str = part
-                break
-
-        if not version_number_str:
-            debug_print(
-                "Error: No se encontró un número de versión válido en el nombre del archivo."
-            )
-            return False
+    parsed = NameParser.parse_base_name(base_name)
+    project_name = parsed.project
+    shot_code = parsed.shot_code
+    version_number_str = parsed.version_token
+    if not version_number_str:
+        debug_print(
+            "Error: No se encontró un número de versión válido en el nombre del archivo."
+        )
+        return False
+    task_name = parsed.parts[parsed.parts.index(version_number_str) - 1].lower()
 
+    try:
         local_version = int(version_number_str.replace("v", ""))
-
-        # Verificar versión en Flow ANTES de hacer cualquier cambio
-        project, shot, _ = sg_manager.find_shot_and_tasks(project_name, shot_code)
-        if not shot:
-            debug_print(f"No se encontró el Shot con el código: {shot_code}")
-            return False
-
-        sg_highest_version, sg_version_number, _ = (
-            sg_manager.find_highest_version_for_shot(shot["id"])
-        )
-        if not sg_highest_version:
-            debug_print(
-                f"No se encontró la versión más alta para el Shot (ID: {shot['id']})"
-            )
-        elif sg_version_number and int(sg_version_number) > local_version:
+        flow_version = find_flow_version_number(project_name, shot_code, task_name)
+        if flow_version and int(flow_version) > local_version:
             # Si la versión en Flow es mayor, mostrar el diálogo y preguntar si desea continuar
             debug_print(
-                f"Versión local ({local_version}) es menor que la versión en Flow ({sg_version_number})"
+                f"Versión local ({local_version}) es menor que la versión en Flow ({flow_version})"
             )
-            if not show_version_dialog(base_name, local_version, sg_version_number):
+            if not show_version_dialog(base_name, local_version, flow_version):
                 debug_print(
                     "Usuario canceló la operación debido a diferencia de versiones"
                 )
@@ -1334,32 +1620,51 @@ def Push_Task_Status(button_name, base_name, update_callback=None):
         debug_print(f"Error durante la verificación de versiones: {e}")
         # Continuamos con el proceso aunque falle la verificación
 
-    # Una vez que el usuario ha confirmado (o no hay problema de versiones), proceder con las actualizaciones
-    if sg_status in ["rev_di", "corr", "revleg", "revhld"]:
-        worker = Worker(
-            button_name,
-            base_name,
-            sg_manager,
-            message,
-            review_images,
-            should_delete_images,
+    # Guardar la operacion en la cola; los cambios de estado sin nota ni
+    # imagenes reemplazan a los pendientes de la misma task
+    payload = {
+        "button_name": button_name,
+        "base_name": base_name,
+        "message": message,
+        "review_images": review_images,
+        "should_delete_images": should_delete_images,
+    }
+    try:
+        op_id = Outbox.enqueue(
+            f"{project_name}/{shot_code}/{task_name}",
+            payload,
+            coalescible=not message and not review_images,
         )
-        worker.signals.result_ready.connect(handle_results)
-        worker.signals.debug_output.connect(
-            lambda: print_debug_messages()
-        )  # Conectar nueva señal
-        if update_callback:
-            worker.signals.task_finished.connect(update_callback)
-        QThreadPool.globalInstance().start(worker)
-    else:
-        worker = Worker(button_name, base_name, sg_manager, None, [], False)
-        worker.signals.result_ready.connect(handle_results)
-        worker.signals.debug_output.connect(lambda: print_debug_messages())
-        if update_callback:
-            worker.signals.task_finished.connect(update_callback)
-        QThreadPool.globalInstance().start(worker)
-
-    return True  # Retornar True indicando que la operación fue iniciada
+    except Exception as e:
+        debug_print(f"Error guardando la operacion en la cola: {e}")
+        print_debug_messages()
+        return False
+    debug_print(f"Operacion {op_id} en cola: {button_name} {base_name}")
+    Outbox.start_flusher(send_push_batch)
+    print_debug_messages()
+
+    if update_callback:
+        update_callback()
+    return True  # Retornar True indicando que la operación quedo en cola
+
+
+def resume_outbox():
+    """
+    La llama el panel de Flow al cargarse: si quedaron operaciones pendientes
+    (o a mitad de envio) de la sesion anterior, arranca el flusher para que las
+    recupere y las mande sin esperar a que se presione otro boton.
+    """
+    try:
+        pending = Outbox.pending_count()
+    except Exception as e:
+        debug_print(f"Error leyendo la cola: {e}")
+        print_debug_messages()
+        return 0
+    if pending:
+        debug_print(f"{pending} operacion(es) pendientes de la sesion anterior")
+        Outbox.start_flusher(send_push_batch)
+    print_debug_messages()
+    return pending
 
 
 def print_debug_messages():
@@ -1369,3 +1674,8 @@ def print_debug_messages():
 
 
 msg_manager = MessageBoxManager()
+
+# El flusher de PipeSync_Outbox corre en otro hilo: la ventana de resultados se
+# abre en el hilo principal a traves de esta señal
+push_signals = PushSignals()
+push_signals.batch_sent.connect(show_push_results)
@@ -1,7 +1,7 @@
 """
 __________________________________________________________________
 
-  LGA_NKS_Flow_Shot_info v1.82 - Lega Pugliese
+  LGA_NKS_Flow_Shot_info v1.85 - Lega Pugliese
   Imprime informacion del shot y las versiones de la task comp
 __________________________________________________________________
 
@@ -13,11 +13,30 @@ import os
 import re
 import json
 import sys
-import sqlite3
+import hashlib
 import subprocess
 import platform
-from PySide2.QtCore import QCoreApplication, Qt, QSize, Signal
-from PySide2.QtGui import QFontMetrics, QKeySequence, QPixmap, QCursor
+from pathlib import Path
+from PySide2.QtCore import (
+    QCoreApplication,
+    Qt,
+    QSize,
+    Signal,
+    Slot,
+    QObject,
+    QPoint,
+    QRunnable,
+    QThreadPool,
+    QTimer,
+)
+from PySide2.QtGui import (
+    QFontMetrics,
+    QKeySequence,
+    QPixmap,
+    QCursor,
+    QImage,
+    QImageReader,
+)
 from PySide2.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -30,10 +49,29 @@ from PySide2.QtWidgets import (
     QFrame,
 )
 
+# Acceso compartido de solo lectura a pipesync.db
+sys.path.append(str(Path(__file__).parent))
+import PipeSync_DB
+
+# Parser de nombres e indice del timeline compartidos
+sys.path.append(str(Path(__file__).parent.parent / "LGA_NKS"))
+import LGA_NKS_NameParser as NameParser
+import LGA_NKS_TimelineIndex as TimelineIndex
+
 
 # Variable global para activar o desactivar los prints
 DEBUG = False
 
+# Maximo de parametros por consulta IN (limite de SQLite: 999)
+SQL_IN_CHUNK = 900
+# Versiones que se muestran por shot al abrir y en cada pagina al hacer scroll
+VERSIONS_PAGE_SIZE = 3
+# Distancia (px) al borde inferior visible a partir de la cual se carga la pagina siguiente
+SCROLL_PRELOAD_MARGIN = 200
+# Cache en disco de thumbnails de attachments ya reducidos
+THUMB_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "NoteThumbs_Cache")
+THUMB_CACHE_MAX_BYTES = 100 * 1024 * 1024
+
 
 def debug_print(*message):
     if DEBUG:
@@ -82,6 +120,115 @@ def extract_frame_from_filename(filename):
         return "---"
 
 
+def thumbnail_cache_path(image_path, size):
+    """Ruta del thumbnail cacheado. La clave incluye tamaño y mtime, asi se regenera si cambia la imagen."""
+    stat = os.stat(image_path)
+    key = f"{os.path.abspath(image_path)}|{stat.st_size}|{stat.st_mtime_ns}|{size}"
+    return os.path.join(
+        THUMB_CACHE_DIR, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png"
+    )
+
+
+def load_thumbnail_image(image_path, size):
+    """
+    Devuelve un QImage reducido a size px (lado mayor) usando la cache en disco.
+    Corre fuera del hilo de UI: solo usa QImage/QImageReader, nunca QPixmap.
+    """
+    try:
+        cache_path = thumbnail_cache_path(image_path, size)
+    except OSError as e:
+        debug_print(f"Archivo de imagen no existe: {image_path} ({e})")
+        return QImage()
+
+    if os.path.exists(cache_path):
+        image = QImage(cache_path)
+        if not image.isNull():
+            try:
+                # Marca de uso para que la limpieza borre primero los menos usados
+                os.utime(cache_path, None)
+            except OSError:
+                pass
+            return image
+
+    reader = QImageReader(image_path)
+    reader.setAutoTransform(True)
+    original_size = reader.size()
+    if original_size.isValid() and (
+        original_size.width() > size or original_size.height() > size
+    ):
+        # El decoder reduce mientras lee (en JPEG evita decodificar la imagen completa)
+        reader.setScaledSize(original_size.scaled(size, size, Qt.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        debug_print(f"No se pudo cargar la imagen {image_path}: {reader.errorString()}")
+        return image
+
+    try:
+        os.makedirs(THUMB_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        if image.save(tmp_path, "PNG"):
+            os.replace(tmp_path, cache_path)
+    except OSError as e:
+        debug_print(f"No se pudo guardar el thumbnail en cache: {e}")
+    return image
+
+
+def prune_thumbnail_cache(max_bytes=THUMB_CACHE_MAX_BYTES):
+    """Borra los thumbnails usados hace mas tiempo hasta que la cache entre en max_bytes."""
+    try:
+        entries = []
+        total = 0
+        with os.scandir(THUMB_CACHE_DIR) as it:
+            for entry in it:
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+    except OSError:
+        return
+    if total <= max_bytes:
+        return
+    entries.sort()
+    for _, file_size, path in entries:
+        try:
+            os.remove(path)
+            total -= file_size
+        except OSError:
+            continue
+        if total <= max_bytes:
+            break
+    debug_print(f"Cache de thumbnails reducida a {total / (1024 * 1024):.1f} MB")
+
+
+class ThumbnailSignals(QObject):
+    thumbnail_ready = Signal(str, QImage)  # image_path, imagen reducida
+
+
+class ThumbnailLoader(QRunnable):
+    """Decodifica y reduce un attachment en el QThreadPool."""
+
+    def __init__(self, image_path, thumbnail_size):
+        super(ThumbnailLoader, self).__init__()
+        self.image_path = image_path
+        self.thumbnail_size = thumbnail_size
+        self.signals = ThumbnailSignals()
+
+    @Slot()
+    def run(self):
+        try:
+            image = load_thumbnail_image(self.image_path, self.thumbnail_size)
+        except Exception as e:
+            debug_print(f"Error al cargar imagen {self.image_path}: {e}")
+            image = QImage()
+        self.signals.thumbnail_ready.emit(self.image_path, image)
+
+
+class ThumbnailCachePruner(QRunnable):
+    @Slot()
+    def run(self):
+        prune_thumbnail_cache()
+
+
 class ThumbnailWidget(QLabel):
     """Widget personalizado para mostrar un thumbnail clickeable"""
 
@@ -109,19 +256,22 @@ class ThumbnailWidget(QLabel):
         )
 
     def load_image(self):
-        """Carga la imagen original"""
+        """Muestra un placeholder y pide el thumbnail reducido al QThreadPool"""
+        self.create_placeholder()
+        loader = ThumbnailLoader(self.image_path, self.thumbnail_size)
+        loader.signals.thumbnail_ready.connect(self.on_thumbnail_ready)
+        QThreadPool.globalInstance().start(loader)
+
+    def on_thumbnail_ready(self, image_path, image):
+        """Recibe el QImage del loader (en el hilo de UI) y lo convierte a QPixmap"""
+        if image_path != self.image_path or image.isNull():
+            return
         try:
-            if os.path.exists(self.image_path):
-                self.original_pixmap = QPixmap(self.image_path)
-                if self.original_pixmap.isNull():
-                    debug_print(f"No se pudo cargar la imagen: {self.image_path}")
-                    self.create_placeholder()
-            else:
-                debug_print(f"Archivo de imagen no existe: {self.image_path}")
-                self.create_placeholder()
-        except Exception as e:
-            debug_print(f"Error al cargar imagen {self.image_path}: {e}")
-            self.create_placeholder()
+            self.original_pixmap = QPixmap.fromImage(image)
+            self.update_size()
+        except RuntimeError:
+            # La ventana se cerro antes de que terminara la carga
+            pass
 
     def create_placeholder(self):
         """Crea un pixmap de placeholder"""
@@ -194,19 +344,28 @@ window = None
 class ShotGridManager:
     """Clase para manejar operaciones con datos de la base de datos SQLite en lugar de JSON."""
 
-    def __init__(self, db_path):
-        self.db_path = db_path
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row
+    def __init__(self):
+        self.db_path = PipeSync_DB.get_db_path()
 
     def find_project(self, project_name):
-        cur = self.conn.cursor()
-        cur.execute("SELECT * FROM projects WHERE project_name = ?", (project_name,))
-        return cur.fetchone()
+        return PipeSync_DB.record_cache.get(
+            "projects",
+            project_name,
+            lambda: PipeSync_DB.fetch_one(
+                "SELECT * FROM projects WHERE project_name = ?", (project_name,)
+            ),
+        )
 
     def find_shot(self, project_name, shot_code):
-        cur = self.conn.cursor()
-        cur.execute(
+        # Se relee de la base solo si PipeSync sincronizo desde la ultima vez
+        return PipeSync_DB.record_cache.get(
+            "shot_info_shots",
+            (project_name, shot_code),
+            lambda: self._load_shot(project_name, shot_code),
+        )
+
+    def _load_shot(self, project_name, shot_code):
+        shot = PipeSync_DB.fetch_one(
             """
             SELECT s.* FROM shots s
             JOIN projects p ON s.project_id = p.id
@@ -214,7 +373,6 @@ class ShotGridManager:
             """,
             (project_name, shot_code),
         )
-        shot = cur.fetchone()
         if not shot:
             return None
         # Estructura igual al JSON original
@@ -224,8 +382,9 @@ class ShotGridManager:
             "tasks": [],
         }
         # Obtener las tasks asociadas a este shot
-        cur.execute("SELECT * FROM tasks WHERE shot_id = ?", (shot["id"],))
-        tasks = cur.fetchall()
+        tasks = PipeSync_DB.fetch_all(
+            "SELECT * FROM tasks WHERE shot_id = ?", (shot["id"],)
+        )
         for task in tasks:
             task_dict = {
                 "task_type": task["task_type"],
@@ -235,59 +394,73 @@ class ShotGridManager:
                 "versions": [],
             }
             # Obtener asignado
-            cur.execute(
+            assign = PipeSync_DB.fetch_one(
                 "SELECT assigned_to FROM task_assignments WHERE task_id = ?",
                 (task["id"],),
             )
-            assign = cur.fetchone()
             if assign:
                 task_dict["task_assigned_to"] = assign["assigned_to"]
             else:
                 task_dict["task_assigned_to"] = "No asignado"
             # Obtener versiones
-            cur.execute(
+            versions = PipeSync_DB.fetch_all(
                 "SELECT * FROM versions WHERE task_id = ? ORDER BY version_number DESC",
                 (task["id"],),
             )
-            versions = cur.fetchall()
             for v in versions:
-                # Obtener comentarios/notas de la version con información de attachments
-                cur.execute(
-                    "SELECT content, created_by, created_on, local_attachment_paths FROM version_notes WHERE version_id = ? ORDER BY created_on DESC",
-                    (v["id"],),
-                )
-                notes = cur.fetchall()
-                comments = []
-                for n in notes:
-                    # Procesar attachment paths si existen
-                    attachment_paths = []
-                    if n["local_attachment_paths"]:
-                        # Los paths están separados por punto y coma
-                        paths = n["local_attachment_paths"].split(";")
-                        for path in paths:
-                            path = path.strip()
-                            if path and os.path.exists(path):
-                                attachment_paths.append(path)
-
-                    comments.append(
-                        {
-                            "user": n["created_by"] or "",
-                            "text": n["content"] or "",
-                            "date": n["created_on"],
-                            "attachments": attachment_paths,
-                        }
-                    )
+                # Los comentarios se cargan por pagina con find_version_comments
                 version_dict = {
+                    "version_id": v["id"],
                     "version_number": f"v{v['version_number']:03d}",
                     "version_description": v["description"] or "",
                     "version_date": v["created_on"] or "",
                     "created_by": v["created_by"] or "Unknown",
-                    "comments": comments,
                 }
                 task_dict["versions"].append(version_dict)
             shot_dict["tasks"].append(task_dict)
         return shot_dict
 
+    def find_version_comments(self, version_ids):
+        """
+        Devuelve {version_id: [comentarios]} para las versiones pedidas.
+        Lee de la base solo las que no estan en la cache, en una consulta por bloque.
+        """
+        cached = PipeSync_DB.record_cache.section("shot_info_notes")
+        missing = [vid for vid in version_ids if vid not in cached]
+        for start in range(0, len(missing), SQL_IN_CHUNK):
+            chunk = missing[start : start + SQL_IN_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            notes = PipeSync_DB.fetch_all(
+                f"""
+                SELECT version_id, content, created_by, created_on, local_attachment_paths
+                FROM version_notes WHERE version_id IN ({placeholders})
+                ORDER BY version_id, created_on DESC
+                """,
+                chunk,
+            )
+            loaded = {vid: [] for vid in chunk}
+            for n in notes:
+                # Procesar attachment paths si existen
+                attachment_paths = []
+                if n["local_attachment_paths"]:
+                    # Los paths están separados por punto y coma
+                    paths = n["local_attachment_paths"].split(";")
+                    for path in paths:
+                        path = path.strip()
+                        if path and os.path.exists(path):
+                            attachment_paths.append(path)
+
+                loaded[n["version_id"]].append(
+                    {
+                        "user": n["created_by"] or "",
+                        "text": n["content"] or "",
+                        "date": n["created_on"],
+                        "attachments": attachment_paths,
+                    }
+                )
+            cached.update(loaded)
+        return {vid: cached.get(vid, []) for vid in version_ids}
+
     def find_task(self, shot, task_name):
         for t in shot["tasks"]:
             if t["task_type"].lower() == task_name.lower():
@@ -295,8 +468,8 @@ class ShotGridManager:
         return None
 
     def close(self):
-        if hasattr(self, "conn") and self.conn:
-            self.conn.close()
+        # La conexion es compartida por PipeSync_DB y se reutiliza en la proxima llamada
+        pass
 
 
 class HieroOperations:
@@ -314,27 +487,21 @@ class HieroOperations:
             if not viewer:
                 return None
             current_time = viewer.time()
-            for track in seq.videoTracks():
-                if track.name().upper() == track_name.upper():
-                    for clip in track:
-                        if isinstance(clip, hiero.core.EffectTrackItem):
-                            continue
-                        if clip.timelineIn() <= current_time < clip.timelineOut():
-                            debug_print(
-                                f">>> Clip encontrado en track {track_name} en posicion {current_time}"
-                            )
-                            return clip
-            return None
+            # Indice por intervalos de la secuencia (sin efectos): bisect por track
+            clip = TimelineIndex.clip_at(seq, track_name, current_time, ignore_case=True)
+            if clip:
+                debug_print(
+                    f">>> Clip encontrado en track {track_name} en posicion {current_time}"
+                )
+            return clip
         except Exception as e:
             debug_print(f"Error buscando clip por playhead en track {track_name}: {e}")
             return None
 
     def parse_exr_name(self, file_name):
         """Extrae el nombre base del archivo EXR y el numero de version."""
-        base_name = re.sub(r"_%04d\.exr$", "", file_name)
-        version_match = re.search(r"_v(\d+)", base_name)
-        version_number = version_match.group(1) if version_match else "Unknown"
-        return base_name, version_number
+        parsed = NameParser.parse_media_name(file_name)
+        return parsed.sequence_base, parsed.version_digits
 
     def process_selected_clips(self):
         """Procesa primero el clip en playhead del track EXR y, si no existe, la seleccion."""
@@ -403,10 +570,10 @@ class HieroOperations:
                     version_number = match.group() if match else v["version_number"]
                     version_info.append(
                         {
+                            "version_id": v["version_id"],
                             "version_number": version_number,
                             "version_description": v["version_description"]
                             or "No description",
-                            "comments": v.get("comments", []),
                             "created_by": v.get("created_by", "Unknown"),
                         }
                     )
@@ -428,6 +595,8 @@ class GUIWindow(QWidget):
     def __init__(self, hiero_ops, parent=None):
         super(GUIWindow, self).__init__(parent)
         self.hiero_ops = hiero_ops
+        # Versiones de cada shot que todavia no se dibujaron (se cargan al hacer scroll)
+        self.pending_pages = []
         self.initUI()
 
     def initUI(self):
@@ -472,6 +641,9 @@ class GUIWindow(QWidget):
 
         self.scroll_area.setWidget(self.scroll_content)
         main_layout.addWidget(self.scroll_area)
+        self.scroll_area.verticalScrollBar().valueChanged.connect(
+            self.load_visible_pages
+        )
 
         # Anadir evento para cerrar la ventana con la tecla ESC
         shortcut = QShortcut(QKeySequence(Qt.Key_Escape), self)
@@ -482,8 +654,13 @@ class GUIWindow(QWidget):
         if hasattr(self.hiero_ops, "sg_manager") and self.hiero_ops.sg_manager:
             self.hiero_ops.sg_manager.close()
             self.hiero_ops.sg_manager = None
+        self.pending_pages = []
         super(GUIWindow, self).closeEvent(event)
 
+    def resizeEvent(self, event):
+        super(GUIWindow, self).resizeEvent(event)
+        self.load_visible_pages()
+
     def create_shot_header_widget(self, shot_code, assignee, description):
         """Crea el widget de cabecera para un shot"""
         header_widget = QWidget()
@@ -509,7 +686,7 @@ class GUIWindow(QWidget):
 
         return header_widget
 
-    def create_version_widget(self, version):
+    def create_version_widget(self, version, comments):
         """Crea el widget para una version"""
         version_widget = QWidget()
         version_layout = QVBoxLayout(version_widget)
@@ -541,7 +718,7 @@ class GUIWindow(QWidget):
         version_layout.addWidget(version_label)
 
         # Comentarios de la version
-        for comment in version.get("comments", []):
+        for comment in comments:
             comment_widget = self.create_comment_widget(comment)
             version_layout.addWidget(comment_widget)
 
@@ -614,6 +791,7 @@ class GUIWindow(QWidget):
         debug_print("Displaying results...")
 
         # Limpiar contenido anterior
+        self.pending_pages = []
         for i in reversed(range(self.scroll_layout.count())):
             child = self.scroll_layout.itemAt(i).widget()
             if child:
@@ -666,33 +844,86 @@ class GUIWindow(QWidget):
             )
             shot_layout.addWidget(header_widget)
 
-            # Agregar versiones
-            for version in versions:
-                version_widget = self.create_version_widget(version)
-                shot_layout.addWidget(version_widget)
+            # Agregar versiones: solo la primera pagina, el resto al hacer scroll
+            more_label = QLabel()
+            more_label.setStyleSheet(
+                "color: #888888; font-size: 11px; background-color: transparent;"
+            )
+            shot_layout.addWidget(more_label)
+            page = {
+                "layout": shot_layout,
+                "versions": list(versions),
+                "more_label": more_label,
+            }
+            self.add_version_page(page)
+            if page["versions"]:
+                self.pending_pages.append(page)
 
             self.scroll_layout.addWidget(shot_widget)
 
         self.setWindowFlags(self.windowFlags() | Qt.Window)
         self.show()
+        # Si la primera pagina no llena la ventana, seguir cargando
+        QTimer.singleShot(0, self.load_visible_pages)
+        QThreadPool.globalInstance().start(ThumbnailCachePruner())
         debug_print("Results displayed successfully.")
 
+    def add_version_page(self, page):
+        """Dibuja las proximas VERSIONS_PAGE_SIZE versiones de un shot con sus comentarios."""
+        versions = page["versions"][:VERSIONS_PAGE_SIZE]
+        del page["versions"][:VERSIONS_PAGE_SIZE]
+
+        sg_manager = self.hiero_ops.sg_manager
+        comments = (
+            sg_manager.find_version_comments([v["version_id"] for v in versions])
+            if sg_manager
+            else {}
+        )
+        layout = page["layout"]
+        index = layout.indexOf(page["more_label"])
+        for version in versions:
+            version_widget = self.create_version_widget(
+                version, comments.get(version["version_id"], [])
+            )
+            layout.insertWidget(index, version_widget)
+            index += 1
+
+        remaining = len(page["versions"])
+        if remaining:
+            page["more_label"].setText(f"{remaining} versiones anteriores...")
+        else:
+            page["more_label"].hide()
+
+    def load_visible_pages(self, *args):
+        """Carga la pagina siguiente de cada shot cuyo final quedo a la vista."""
+        if not self.pending_pages:
+            return
+        scroll_bar = self.scroll_area.verticalScrollBar()
+        visible_bottom = (
+            scroll_bar.value()
+            + self.scroll_area.viewport().height()
+            + SCROLL_PRELOAD_MARGIN
+        )
+        loaded = False
+        for page in list(self.pending_pages):
+            label_top = page["more_label"].mapTo(self.scroll_content, QPoint(0, 0)).y()
+            if label_top <= visible_bottom:
+                self.add_version_page(page)
+                loaded = True
+                if not page["versions"]:
+                    self.pending_pages.remove(page)
+        if loaded:
+            # Revisar de nuevo cuando el layout tenga las alturas nuevas
+            QTimer.singleShot(0, self.load_visible_pages)
+
 
 def main():
     global app, window
-    # Selecciona la ruta de la base de datos segun el sistema operativo
-    if platform.system() == "Windows":
-        db_path = r"C:/Portable/LGA/PipeSync/cache/pipesync.db"
-    elif platform.system() == "Darwin":  # macOS
-        db_path = "/Users/leg4/Library/Caches/LGA/PipeSync/pipesync.db"
-    else:
-        debug_print(f"Sistema operativo no soportado: {platform.system()}")
-        return
-
-    if not os.path.exists(db_path):
-        debug_print(f"DB file not found at path: {db_path}")
+    # La ruta de la base de datos se resuelve en PipeSync_DB segun el sistema operativo
+    if not PipeSync_DB.db_exists():
+        debug_print(f"DB file not found at path: {PipeSync_DB.get_db_path()}")
         return
-    sg_manager = ShotGridManager(db_path)
+    sg_manager = ShotGridManager()
     hiero_ops = HieroOperations(sg_manager)
     if not QApplication.instance():
         app = QApplication(sys.argv)
@@ -1,21 +1,23 @@
 """
 _____________________________________________________________________________________________________
 
-  LGA_NKS_Flow_ShowInFlow v1.22 | Lega Pugliese
+  LGA_NKS_Flow_ShowInFlow v1.25 | Lega Pugliese
   Abre la URL de la task Comp del shot, tomando la informacion del nombre del clip seleccionado
   Verifica si existe más de un shot con el mismo nombre y te pide que selecciones uno
+  Las URLs se arman con los IDs de pipesync.db (o la cache de IDs): solo se conecta
+  a Flow si algun shot no esta. Con varios clips abre una pestaña por shot.
 _____________________________________________________________________________________________________
 """
 
 import os
 import sys
-import re
 import platform
 import hiero.core
 import hiero.ui
 import webbrowser
 import threading
 import subprocess
+from urllib.parse import urlsplit
 import base64  # Importar base64
 import binascii  # Importar binascii para la excepcion
 from PySide2.QtWidgets import (
@@ -82,8 +84,13 @@ import shotgun_api3
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent))
 from SecureConfig_Reader import get_flow_credentials
+import LGA_NKS_Flow_IdResolver as IdResolver
 # --- FIN: Importar el módulo de configuración segura ---
 
+# Parser de nombres compartido
+sys.path.append(str(Path(__file__).parent.parent / "LGA_NKS"))
+import LGA_NKS_NameParser as NameParser
+
 
 class ShotSelectionDialog(QDialog):
     """Dialogo para seleccionar entre multiples shots encontrados"""
@@ -103,11 +110,9 @@ class ShotSelectionDialog(QDialog):
 
         # Botones para cada shot
         for i, (shot, tasks) in enumerate(shots_with_tasks):
-            comp_tasks = [t for t in tasks if "Comp" in t["content"]]
+            comp_tasks = [t for t in tasks if "Comp" in (t["content"] or "")]
             if comp_tasks:
-                text = (
-                    f"Shot ID: {shot['id']} - Comp: {comp_tasks[0]['sg_status_list']}"
-                )
+                text = f"Shot ID: {shot['id']} - Comp: {comp_tasks[0].get('sg_status_list', '-')}"
             else:
                 text = f"Shot ID: {shot['id']} - Sin Comp"
 
@@ -135,32 +140,37 @@ else:
 
 use_default_browser = False  # Si esta en True, usa el navegador por defecto
 
+# Pestañas que se abren como maximo con varios clips seleccionados
+MAX_OPEN_TABS = 20
+
 
 class ShotGridManager:
     def __init__(self, url, login, password):
-        self.sg = shotgun_api3.Shotgun(url, login=login, password=password)
+        self.url = url
+        self.login = login
+        self.password = password
+        self._sg = None
+        # Mismo formato que Shotgun.base_url, sin tener que conectarse
+        parts = urlsplit(url)
+        self.base_url = f"{parts.scheme}://{parts.netloc}"
+
+    @property
+    def sg(self):
+        """La conexion a Flow se abre solo cuando hace falta consultar algo."""
+        if self._sg is None:
+            debug_print(f"Conectando a ShotGrid URL: {self.url}")
+            self._sg = shotgun_api3.Shotgun(
+                self.url, login=self.login, password=self.password
+            )
+        return self._sg
 
     def find_shot_and_tasks(self, project_name, shot_code):
         debug_print(f"Buscando proyecto: {project_name}, shot: {shot_code}")
 
-        # Buscar proyecto
-        projects = self.sg.find(
-            "Project", [["name", "is", project_name]], ["id", "name"]
-        )
-        if not projects:
-            debug_print("No se encontro el proyecto")
-            return None, None
-
-        project_id = projects[0]["id"]
-        debug_print(f"Proyecto encontrado: {project_id}")
-
-        # Buscar shots
-        filters = [
-            ["project", "is", {"type": "Project", "id": project_id}],
-            ["code", "is", shot_code],
-        ]
-        fields = ["id", "code", "description"]
-        shots = self.sg.find("Shot", filters, fields)
+        # IDs desde pipesync.db o la cache sin conectarse; si no estan, una consulta a Flow
+        shots = IdResolver.resolve_shots(project_name, shot_code)
+        if not shots:
+            shots = IdResolver.resolve_shots(project_name, shot_code, self.sg)
 
         if not shots:
             debug_print("No se encontro el shot")
@@ -171,13 +181,14 @@ class ShotGridManager:
         # Si hay un solo shot, usarlo directamente (sin tiempo extra)
         if len(shots) == 1:
             shot = shots[0]
-            debug_print(f"Shot unico encontrado: {shot['id']}")
-            tasks = self.find_tasks_for_shot(shot["id"])
-            return shot, tasks
+            debug_print(f"Shot unico encontrado: {shot['shot_id']}")
+            return {"id": shot["shot_id"], "code": shot["shot_code"]}, shot["tasks"]
 
-        # Si hay multiples shots, devolver todos para que se maneje en el hilo principal
+        # Si hay multiples shots, devolver todos para que se maneje en el hilo principal.
+        # El dialogo muestra el estado de la Comp, que no esta en la cache de IDs
         shots_with_tasks = []
-        for shot in shots:
+        for found in shots:
+            shot = {"id": found["shot_id"], "code": found["shot_code"]}
             tasks = self.find_tasks_for_shot(shot["id"])
             shots_with_tasks.append((shot, tasks))
             debug_print(f"Shot {shot['id']} tiene {len(tasks)} tasks")
@@ -194,10 +205,10 @@ class ShotGridManager:
         return tasks
 
     def get_task_url(self, task_id):
-        return f"{self.sg.base_url}/detail/Task/{task_id}"
+        return f"{self.base_url}/detail/Task/{task_id}"
 
     def get_shot_url(self, shot_id):
-        return f"{self.sg.base_url}/detail/Shot/{shot_id}"
+        return f"{self.base_url}/detail/Shot/{shot_id}"
 
 
 class HieroOperations:
@@ -209,10 +220,8 @@ class HieroOperations:
         if "%04d" in file_name:
             file_name = file_name.replace(".%", "_%")  # Reemplazar patron para analisis
 
-        base_name = re.sub(r"_%04d\.exr$", "", file_name)
-        version_match = re.search(r"_v(\d+)", base_name)
-        version_number = version_match.group(1) if version_match else "Unknown"
-        return base_name, version_number
+        parsed = NameParser.parse_media_name(file_name)
+        return parsed.sequence_base, parsed.version_digits
 
     def process_selected_clips(self):
         seq = hiero.ui.activeSequence()
@@ -227,6 +236,8 @@ class HieroOperations:
             debug_print("No se han seleccionado clips en el timeline.")
             return False
 
+        # (proyecto, shot_code) de cada clip, sin repetir y en orden
+        targets = []
         for clip in selected_clips:
             if not isinstance(clip, hiero.core.EffectTrackItem):
                 if clip.source().mediaSource().isMediaPresent():
@@ -248,50 +259,95 @@ class HieroOperations:
                     parts = base_name.split("_")
                     shot_code = "_".join(parts[:5])
                     debug_print(f"Project name: {project_name}, shot code: {shot_code}")
+                    if (project_name, shot_code) not in targets:
+                        targets.append((project_name, shot_code))
 
-                    shot, tasks = self.sg_manager.find_shot_and_tasks(
-                        project_name, shot_code
-                    )
+        if not targets:
+            return False
+        if len(targets) == 1:
+            return self.show_single_shot(*targets[0])
 
-                    # Verificar si tenemos multiples shots
-                    if shot == "MULTIPLE_SHOTS":
-                        # Devolver informacion para manejar en el hilo principal
-                        return ("MULTIPLE_SHOTS", tasks)
-
-                    if shot:
-                        # Buscar task Comp
-                        comp_task = None
-                        for task in tasks:
-                            if task["content"] == "Comp":
-                                comp_task = task
-                                break
-
-                        if comp_task:
-                            # Si hay task Comp, abrir la URL de la task
-                            task_url = self.sg_manager.get_task_url(comp_task["id"])
-                            debug_print(
-                                f"  - Task: {comp_task['content']} (Status: {comp_task['sg_status_list']}) URL: {task_url}"
-                            )
-                            target_url = task_url
-                        else:
-                            # Si no hay task Comp, abrir la URL del shot
-                            shot_url = self.sg_manager.get_shot_url(shot["id"])
-                            debug_print(
-                                f"No hay task Comp. Abriendo URL del shot: {shot_url}"
-                            )
-                            target_url = shot_url
-
-                        if use_default_browser:
-                            webbrowser.open(target_url)
-                        else:
-                            self.open_url_in_browser(target_url)
-                        return True
-                    else:
-                        debug_print(
-                            "No se encontro el shot correspondiente en ShotGrid."
-                        )
-                        return False
-        return False
+        urls = self.find_comp_urls(targets)
+        if not urls:
+            debug_print("No se encontro ninguno de los shots en ShotGrid.")
+            return False
+        self.open_urls_in_browser(urls)
+        return True
+
+    def show_single_shot(self, project_name, shot_code):
+        shot, tasks = self.sg_manager.find_shot_and_tasks(project_name, shot_code)
+
+        # Verificar si tenemos multiples shots
+        if shot == "MULTIPLE_SHOTS":
+            # Devolver informacion para manejar en el hilo principal
+            return ("MULTIPLE_SHOTS", tasks)
+
+        if not shot:
+            debug_print("No se encontro el shot correspondiente en ShotGrid.")
+            return False
+
+        # Buscar task Comp
+        comp_task = None
+        for task in tasks:
+            if (task["content"] or "").lower() == "comp":
+                comp_task = task
+                break
+
+        if comp_task:
+            # Si hay task Comp, abrir la URL de la task
+            task_url = self.sg_manager.get_task_url(comp_task["id"])
+            debug_print(
+                f"  - Task: {comp_task['content']} (Status: {comp_task.get('sg_status_list', '-')}) URL: {task_url}"
+            )
+            target_url = task_url
+        else:
+            # Si no hay task Comp, abrir la URL del shot
+            shot_url = self.sg_manager.get_shot_url(shot["id"])
+            debug_print(f"No hay task Comp. Abriendo URL del shot: {shot_url}")
+            target_url = shot_url
+
+        self.open_urls_in_browser([target_url])
+        return True
+
+    def find_comp_urls(self, targets):
+        """
+        URL de la task Comp (o del shot si no tiene) de cada (proyecto, shot_code).
+        Los IDs salen de pipesync.db o de la cache; solo los shots que no estan
+        en ninguna se piden a Flow, todos en una consulta.
+        """
+        comp_targets = [(project, shot_code, "comp") for project, shot_code in targets]
+        resolved = IdResolver.resolve_tasks(comp_targets)
+        missing = [target for target in comp_targets if not resolved[target][0]]
+        if missing:
+            debug_print(f"{len(missing)} shots sin IDs locales: se consulta Flow")
+            resolved.update(IdResolver.resolve_tasks(missing, self.sg_manager.sg))
+
+        urls = []
+        for target in comp_targets:
+            shot, task = resolved[target]
+            if task:
+                urls.append(self.sg_manager.get_task_url(task["id"]))
+            elif shot:
+                urls.append(self.sg_manager.get_shot_url(shot["shot_id"]))
+            else:
+                debug_print(f"No se encontro el shot {target[1]} en ShotGrid.")
+        return urls[:MAX_OPEN_TABS]
+
+    def open_urls_in_browser(self, urls):
+        """Abre las URLs en pestañas de una sola ventana del navegador."""
+        if use_default_browser:
+            for url in urls:
+                webbrowser.open_new_tab(url)
+        elif platform.system() == "Darwin":
+            # Chrome abre todas las URLs recibidas en una sola llamada
+            try:
+                subprocess.run([browser_path] + urls)
+                debug_print(f"Opening {len(urls)} URLs in specified browser on macOS...")
+            except Exception as e:
+                debug_print(f"Failed to open URLs in specified browser on macOS: {e}")
+        else:
+            for url in urls:
+                self.open_url_in_browser(url)
 
     def open_url_in_browser(self, url):
         if platform.system() == "Darwin":  # macOS
@@ -318,7 +374,6 @@ def threaded_function():
 
     # Si las credenciales son validas, proceder con la logica original
     try:
-        debug_print(f"Conectando a ShotGrid URL: {url} con login: {login}")
         sg_manager = ShotGridManager(url, login, password)
         hiero_ops = HieroOperations(sg_manager)
         result = hiero_ops.process_selected_clips()  # Ejecutar la lógica principal
@@ -388,7 +443,7 @@ def show_in_flow_from_selected_clip():
                 # Intentar encontrar task Comp
                 comp_task = None
                 for task in selected_tasks:
-                    if task["content"] == "Comp":
+                    if (task["content"] or "").lower() == "comp":
                         comp_task = task
                         break
 
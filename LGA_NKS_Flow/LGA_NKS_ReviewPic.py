@@ -1,7 +1,7 @@
 """
 _______________________________________________________________________________________
 
-  LGA_NKS_ReviewPic v0.4 - Lega
+  LGA_NKS_ReviewPic v0.6 - Lega
   Crea un snapshot de la imagen actual del viewer y lo guarda en ReviewPic_Cache
   organizando por clips del track EXR con numeracion de frames
 _______________________________________________________________________________________
@@ -11,12 +11,17 @@ ________________________________________________________________________________
 import hiero.core
 import hiero.ui
 import os
-import re
 import glob
 from PySide2.QtWidgets import QApplication
 from PySide2.QtCore import QRect
 import subprocess
 import sys
+from pathlib import Path
+
+# Parser de nombres e indice del timeline compartidos
+sys.path.append(str(Path(__file__).parent.parent / "LGA_NKS"))
+import LGA_NKS_NameParser as NameParser
+import LGA_NKS_TimelineIndex as TimelineIndex
 
 DEBUG = False
 
@@ -30,10 +35,8 @@ def parse_exr_name(file_name):
     """
     Extrae el nombre base y numero de version de un archivo EXR.
     """
-    version_match = re.search(r"_v(\d+)", file_name)
-    version_number = version_match.group(1) if version_match else "Unknown"
-    base_name = re.sub(r"_v\d+_%04d\.exr", "", file_name)
-    return base_name, version_number
+    parsed = NameParser.parse_media_name(file_name)
+    return parsed.versionless_base, parsed.version_digits
 
 
 def get_clip_info_at_playhead():
@@ -54,26 +57,26 @@ def get_clip_info_at_playhead():
     current_time = viewer.time()
     debug_print(f"Tiempo actual del playhead: {current_time}")
 
-    exr_track = next((t for t in sequence.videoTracks() if t.name() == "EXR"), None)
+    exr_track = TimelineIndex.sequence_index(sequence).track("EXR")
     if not exr_track:
         debug_print("No se encontró un track llamado 'EXR'.")
         return None
 
-    for clip in exr_track:
-        if clip.timelineIn() <= current_time < clip.timelineOut():
-            file_path = clip.source().mediaSource().fileinfos()[0].filename()
-            fileinfo = clip.source().mediaSource().fileinfos()[0]
-            exr_name = os.path.basename(file_path)
-            base_name, version_number = parse_exr_name(exr_name)
+    clip = TimelineIndex.item_at(sequence, exr_track, current_time)
+    if clip:
+        file_path = clip.source().mediaSource().fileinfos()[0].filename()
+        fileinfo = clip.source().mediaSource().fileinfos()[0]
+        exr_name = os.path.basename(file_path)
+        base_name, version_number = parse_exr_name(exr_name)
 
-            start_frame = fileinfo.startFrame()
-            frame_offset = current_time - clip.timelineIn()
-            frame_number = int(start_frame + frame_offset)
+        start_frame = fileinfo.startFrame()
+        frame_offset = current_time - clip.timelineIn()
+        frame_number = int(start_frame + frame_offset)
 
-            debug_print(f"Clip encontrado: {base_name}_v{version_number}")
-            debug_print(f"Frame calculado: {frame_number:04d}")
+        debug_print(f"Clip encontrado: {base_name}_v{version_number}")
+        debug_print(f"Frame calculado: {frame_number:04d}")
 
-            return base_name, version_number, frame_number
+        return base_name, version_number, frame_number
 
     debug_print(
         "No se encontró un clip en el track 'EXR' en la posición actual del playhead."
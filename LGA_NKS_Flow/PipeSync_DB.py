@@ -0,0 +1,332 @@
+"""
+____________________________________________________________________________
+
+  PipeSync_DB | Lega Pugliese
+  Acceso compartido a la base de datos pipesync.db de la app PipeSync.
+  Resuelve la ruta una sola vez, abre conexiones de solo lectura (mode=ro)
+  que no bloquean al writer y reutiliza una conexion por hilo.
+  Registra el tiempo de cada consulta para poder medir los scripts.
+  Mantiene una cache en memoria de registros que se invalida solo cuando
+  PipeSync hace commit (PRAGMA data_version).
+____________________________________________________________________________
+"""
+
+import os
+import platform
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+# Variable global para activar o desactivar los prints de debug
+DEBUG = False
+
+# Tiempo que una consulta espera si PipeSync tiene la base bloqueada
+BUSY_TIMEOUT_MS = 5000
+# Cantidad de sentencias preparadas que sqlite3 mantiene por conexion
+CACHED_STATEMENTS = 256
+# Las consultas que tardan mas que esto se informan con debug_print
+SLOW_QUERY_MS = 50.0
+
+_db_path = None
+_db_path_resolved = False
+_path_lock = threading.Lock()
+
+# Una conexion de lectura y otra de escritura por hilo
+_local = threading.local()
+
+# Estadisticas de tiempo por consulta: sql normalizado -> [count, total_ms, max_ms]
+_stats_lock = threading.Lock()
+_query_stats = {}
+
+
+def debug_print(message):
+    if DEBUG:
+        print(f"[PipeSync_DB] {message}")
+
+
+def get_db_path():
+    """Devuelve la ruta de pipesync.db segun el sistema operativo (se resuelve una vez)."""
+    global _db_path, _db_path_resolved
+    if _db_path_resolved:
+        return _db_path
+    with _path_lock:
+        if not _db_path_resolved:
+            system = platform.system()
+            if system == "Windows":
+                _db_path = r"C:/Portable/LGA/PipeSync/cache/pipesync.db"
+            elif system == "Darwin":
+                _db_path = "/Users/leg4/Library/Caches/LGA/PipeSync/pipesync.db"
+            else:
+                debug_print(f"Sistema operativo no soportado: {system}")
+                _db_path = None
+            _db_path_resolved = True
+    return _db_path
+
+
+def set_db_path(db_path):
+    """Fuerza una ruta de base de datos (herramientas de diagnostico y benchmarks)."""
+    global _db_path, _db_path_resolved
+    close_connection()
+    with _path_lock:
+        _db_path = db_path
+        _db_path_resolved = True
+    record_cache.clear()
+
+
+def db_exists():
+    """True si la base de datos existe en la ruta resuelta."""
+    db_path = get_db_path()
+    return bool(db_path) and os.path.exists(db_path)
+
+
+def sibling_path(file_name):
+    """
+    Ruta para una base propia de los scripts (cola de Push, cache de IDs) junto
+    a pipesync.db, o en la carpeta Data si no hay ruta para este sistema.
+    """
+    db_path = get_db_path()
+    if db_path and os.path.isdir(os.path.dirname(db_path)):
+        folder = os.path.dirname(db_path)
+    else:
+        folder = os.path.join(os.path.dirname(__file__), "Data")
+    return os.path.join(folder, file_name)
+
+
+def _open_connection(readonly, check_same_thread=True):
+    db_path = get_db_path()
+    if not db_path or not os.path.exists(db_path):
+        debug_print(f"DB file not found at path: {db_path}")
+        return None
+
+    conn = None
+    if readonly:
+        # mode=ro: nunca toma locks de escritura, asi PipeSync puede seguir escribiendo
+        uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+        try:
+            conn = sqlite3.connect(
+                uri,
+                uri=True,
+                timeout=BUSY_TIMEOUT_MS / 1000.0,
+                cached_statements=CACHED_STATEMENTS,
+                check_same_thread=check_same_thread,
+            )
+            # connect() no lee el archivo: una base en WAL sin -shm recien falla
+            # en la primera sentencia, asi que se prueba aca leyendo el esquema
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        except sqlite3.Error as e:
+            debug_print(f"No se pudo abrir en modo solo lectura ({e}), usando query_only")
+            if conn is not None:
+                conn.close()
+            conn = None
+    if conn is None:
+        conn = sqlite3.connect(
+            db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000.0,
+            cached_statements=CACHED_STATEMENTS,
+            check_same_thread=check_same_thread,
+        )
+    conn.row_factory = sqlite3.Row
+    # No se toca journal_mode: lo decide el writer (PipeSync). Solo esperamos locks.
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    if readonly:
+        conn.execute("PRAGMA query_only = ON")
+    debug_print(
+        f"Conexion {'ro' if readonly else 'rw'} abierta en hilo {threading.get_ident()}"
+    )
+    return conn
+
+
+def get_connection(readonly=True):
+    """Devuelve la conexion de este hilo, abriendola la primera vez."""
+    attr = "ro_conn" if readonly else "rw_conn"
+    conn = getattr(_local, attr, None)
+    if conn is None:
+        conn = _open_connection(readonly)
+        setattr(_local, attr, conn)
+    return conn
+
+
+def close_connection():
+    """Cierra las conexiones del hilo actual."""
+    for attr in ("ro_conn", "rw_conn"):
+        conn = getattr(_local, attr, None)
+        if conn is not None:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                debug_print(f"Error al cerrar la conexion: {e}")
+            setattr(_local, attr, None)
+
+
+def _record_query(sql, elapsed_ms):
+    key = " ".join(sql.split())
+    with _stats_lock:
+        stats = _query_stats.get(key)
+        if stats is None:
+            _query_stats[key] = [1, elapsed_ms, elapsed_ms]
+        else:
+            stats[0] += 1
+            stats[1] += elapsed_ms
+            if elapsed_ms > stats[2]:
+                stats[2] = elapsed_ms
+    if elapsed_ms > SLOW_QUERY_MS:
+        debug_print(f"Consulta lenta ({elapsed_ms:.1f} ms): {key}")
+
+
+def fetch_all(sql, params=()):
+    """Ejecuta una consulta de lectura y devuelve todas las filas (sqlite3.Row)."""
+    conn = get_connection(readonly=True)
+    if conn is None:
+        return []
+    start = time.perf_counter()
+    cur = conn.execute(sql, params)
+    try:
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+    _record_query(sql, (time.perf_counter() - start) * 1000.0)
+    return rows
+
+
+def fetch_one(sql, params=()):
+    """Ejecuta una consulta de lectura y devuelve la primera fila o None."""
+    conn = get_connection(readonly=True)
+    if conn is None:
+        return None
+    start = time.perf_counter()
+    cur = conn.execute(sql, params)
+    try:
+        row = cur.fetchone()
+    finally:
+        # Cerrar el cursor libera el lock de lectura aunque queden filas
+        cur.close()
+    _record_query(sql, (time.perf_counter() - start) * 1000.0)
+    return row
+
+
+def execute_write(sql, params=()):
+    """Ejecuta una sentencia de escritura y hace commit. Devuelve la cantidad de filas afectadas."""
+    conn = get_connection(readonly=False)
+    if conn is None:
+        raise sqlite3.OperationalError(f"DB file not found at path: {get_db_path()}")
+    start = time.perf_counter()
+    try:
+        cur = conn.execute(sql, params)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    _record_query(sql, (time.perf_counter() - start) * 1000.0)
+    return cur.rowcount
+
+
+class RecordCache:
+    """
+    Cache en memoria de proyectos, shots, tasks y versiones leidos de pipesync.db.
+
+    Los datos se guardan por seccion (un dict por tipo de consulta). Antes de cada
+    uso se compara PRAGMA data_version: si PipeSync (u otro script) escribio en la
+    base desde la ultima vez, se descartan todas las secciones y se vuelven a leer.
+    Entre sincronizaciones las acciones repetidas no tocan el disco.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # data_version es propio de cada conexion: se usa siempre la misma,
+        # compartida entre hilos, para que los valores sean comparables
+        self._watch_conn = None
+        self._token = None
+        self._sections = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _data_version(self):
+        if self._watch_conn is None:
+            self._watch_conn = _open_connection(readonly=True, check_same_thread=False)
+            if self._watch_conn is None:
+                return None
+        return self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def validate(self):
+        """Vacia la cache si la base cambio. Devuelve True si los datos siguen validos."""
+        with self._lock:
+            try:
+                token = self._data_version()
+            except sqlite3.Error as e:
+                debug_print(f"No se pudo leer data_version: {e}")
+                token = None
+            if token is None or token != self._token:
+                if self._sections:
+                    debug_print("pipesync.db cambio: se invalida la cache en memoria")
+                self._sections = {}
+                self._token = token
+                return False
+            return True
+
+    def section(self, name):
+        """Devuelve el dict de una seccion despues de validar la cache."""
+        with self._lock:
+            self.validate()
+            return self._sections.setdefault(name, {})
+
+    def get(self, name, key, loader):
+        """Devuelve el valor cacheado o lo carga con loader() y lo guarda."""
+        data = self.section(name)
+        if key in data:
+            self.hits += 1
+            return data[key]
+        self.misses += 1
+        value = loader()
+        with self._lock:
+            data[key] = value
+        return value
+
+    def clear(self):
+        """Descarta los datos y la conexion de control (por ejemplo al cambiar de base)."""
+        with self._lock:
+            if self._watch_conn is not None:
+                try:
+                    self._watch_conn.close()
+                except sqlite3.Error as e:
+                    debug_print(f"Error al cerrar la conexion de control: {e}")
+                self._watch_conn = None
+            self._sections = {}
+            self._token = None
+
+
+# Instancia compartida por todos los scripts que importan este modulo
+record_cache = RecordCache()
+
+
+def get_query_stats():
+    """Devuelve las estadisticas de tiempo ordenadas por tiempo total (mayor primero)."""
+    with _stats_lock:
+        items = [
+            {
+                "sql": sql,
+                "count": count,
+                "total_ms": total_ms,
+                "avg_ms": total_ms / count,
+                "max_ms": max_ms,
+            }
+            for sql, (count, total_ms, max_ms) in _query_stats.items()
+        ]
+    return sorted(items, key=lambda s: s["total_ms"], reverse=True)
+
+
+def reset_query_stats():
+    with _stats_lock:
+        _query_stats.clear()
+
+
+def print_query_stats(limit=20):
+    """Imprime las consultas mas costosas."""
+    for stats in get_query_stats()[:limit]:
+        print(
+            f"{stats['count']:6d} x {stats['avg_ms']:8.3f} ms "
+            f"(total {stats['total_ms']:9.2f} ms, max {stats['max_ms']:8.2f} ms) "
+            f"{stats['sql']}"
+        )
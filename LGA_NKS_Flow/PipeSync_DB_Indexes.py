@@ -0,0 +1,438 @@
+"""
+____________________________________________________________________________
+
+  PipeSync_DB_Indexes | Lega Pugliese
+  Auditoria de indices de pipesync.db para las consultas de los scripts LGA.
+  Corre EXPLAIN QUERY PLAN sobre cada consulta que emiten Pull, Push y
+  Shot_info, informa los full scans y los ORDER BY que necesitan un b-tree
+  temporal, crea los indices compuestos que faltan (idempotente) y mide la
+  latencia de las busquedas antes y despues.
+
+  Uso:
+    python PipeSync_DB_Indexes.py [--db_path RUTA]            solo auditoria
+    python PipeSync_DB_Indexes.py [--db_path RUTA] --apply    crea los indices
+    python PipeSync_DB_Indexes.py --synthetic 5000 --db_path /tmp/bench.db
+                                  crea una base sintetica y hace el benchmark
+____________________________________________________________________________
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+import PipeSync_DB
+
+
+# Consultas que emiten los scripts LGA: (nombre, sql, tipo de parametro para el benchmark)
+# Las consultas con IN usan tres placeholders, el plan es el mismo para cualquier cantidad.
+HOT_QUERIES = [
+    (
+        "project_by_name",
+        "SELECT * FROM projects WHERE project_name = ?",
+        "project_name",
+    ),
+    (
+        "shot_by_name",
+        """
+        SELECT s.* FROM shots s
+        JOIN projects p ON s.project_id = p.id
+        WHERE p.project_name = ? AND s.shot_name = ?
+        """,
+        "shot_key",
+    ),
+    (
+        "shots_by_name_bulk",
+        """
+        SELECT s.* FROM shots s
+        JOIN projects p ON s.project_id = p.id
+        WHERE p.project_name = ? AND s.shot_name IN (?,?,?)
+        """,
+        "shot_keys",
+    ),
+    ("tasks_by_shot", "SELECT * FROM tasks WHERE shot_id = ?", "shot_id"),
+    (
+        "tasks_by_shot_bulk",
+        "SELECT * FROM tasks WHERE shot_id IN (?,?,?) ORDER BY shot_id, id",
+        "shot_ids",
+    ),
+    (
+        "task_by_shot_and_type",
+        "SELECT * FROM tasks WHERE shot_id = ? AND LOWER(task_type) = LOWER(?)",
+        "task_key",
+    ),
+    (
+        "assignee_by_task",
+        "SELECT assigned_to FROM task_assignments WHERE task_id = ?",
+        "task_id",
+    ),
+    (
+        "assignees_by_task_bulk",
+        """
+        SELECT task_id, assigned_to FROM task_assignments
+        WHERE task_id IN (?,?,?) ORDER BY task_id, id
+        """,
+        "task_ids",
+    ),
+    (
+        "versions_by_task",
+        "SELECT * FROM versions WHERE task_id = ? ORDER BY version_number DESC",
+        "task_id",
+    ),
+    (
+        "latest_version_by_task",
+        "SELECT * FROM versions WHERE task_id = ? ORDER BY version_number DESC LIMIT 1",
+        "task_id",
+    ),
+    (
+        "versions_by_task_bulk",
+        """
+        SELECT * FROM versions WHERE task_id IN (?,?,?)
+        ORDER BY task_id, version_number DESC
+        """,
+        "task_ids",
+    ),
+    (
+        "notes_by_version",
+        """
+        SELECT content, created_by, created_on, local_attachment_paths
+        FROM version_notes WHERE version_id = ? ORDER BY created_on DESC
+        """,
+        "version_id",
+    ),
+]
+
+# Indices que cubren las consultas de arriba: (nombre, tabla, columnas)
+RECOMMENDED_INDEXES = [
+    ("idx_tasks_shot_id", "tasks", "shot_id"),
+    ("idx_task_assignments_task_id", "task_assignments", "task_id"),
+    ("idx_versions_task_id_version", "versions", "task_id, version_number DESC"),
+    (
+        "idx_version_notes_version_id_created",
+        "version_notes",
+        "version_id, created_on DESC",
+    ),
+]
+
+# Esquema minimo (segun Documentacion_DB.md) para la base sintetica del benchmark.
+# Solo trae los indices de shots y tasks, igual que una base sin migrar.
+SYNTHETIC_SCHEMA = """
+CREATE TABLE projects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_name TEXT NOT NULL UNIQUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_sync_date TIMESTAMP
+);
+CREATE TABLE shots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    shot_name TEXT NOT NULL,
+    sequence TEXT,
+    shot_status TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (project_id, shot_name)
+);
+CREATE INDEX idx_shots_project_id ON shots(project_id);
+CREATE TABLE tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    shot_id INTEGER NOT NULL REFERENCES shots(id) ON DELETE CASCADE,
+    shot_sg_id INTEGER,
+    task_type TEXT NOT NULL,
+    task_description TEXT,
+    task_status TEXT,
+    task_id INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_tasks_shot_id ON tasks(shot_id);
+CREATE TABLE task_assignments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id INTEGER NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    assigned_to TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE versions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id INTEGER NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    version_number INTEGER NOT NULL,
+    version_sg_id INTEGER,
+    file_path TEXT,
+    status TEXT,
+    description TEXT,
+    created_by TEXT,
+    created_on TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE version_notes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    version_id INTEGER NOT NULL REFERENCES versions(id) ON DELETE CASCADE,
+    note_sg_id INTEGER,
+    content TEXT,
+    created_by TEXT,
+    created_on TIMESTAMP,
+    local_attachment_paths TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+SYNTHETIC_TASK_TYPES = ("Comp", "Roto", "Paint")
+SYNTHETIC_VERSIONS_PER_TASK = 6
+SYNTHETIC_NOTES_PER_VERSION = 3
+# Vocabulario para que las notas sinteticas se parezcan a las reales (busquedas FTS)
+SYNTHETIC_NOTE_WORDS = (
+    "grain", "edge", "matte", "roto", "despill", "blur", "flicker", "track",
+    "paint", "keying", "lens", "defocus", "color", "match", "plate", "sky",
+    "cleanup", "halo", "motion", "contrast", "fix", "frame", "shadow", "glow",
+    "mas", "menos", "revisar", "borde", "ruido", "pelo", "fondo", "luz",
+)
+
+
+def explain(conn, sql):
+    """Devuelve las lineas de detalle de EXPLAIN QUERY PLAN para una consulta."""
+    params = (None,) * sql.count("?")
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def plan_problems(details):
+    """Filtra las lineas del plan que indican full scan o sort temporal."""
+    problems = []
+    for detail in details:
+        if detail.startswith("SCAN") and "CONSTANT ROW" not in detail:
+            problems.append(detail)
+        elif "TEMP B-TREE" in detail:
+            problems.append(detail)
+    return problems
+
+
+def audit(conn, verbose=True):
+    """Corre EXPLAIN QUERY PLAN sobre HOT_QUERIES. Devuelve {nombre: [problemas]}."""
+    report = {}
+    for name, sql, _ in HOT_QUERIES:
+        details = explain(conn, sql)
+        problems = plan_problems(details)
+        report[name] = problems
+        if verbose:
+            state = "FULL SCAN / SORT" if problems else "ok"
+            print(f"  {name:28s} {state}")
+            for detail in details:
+                marker = "!!" if detail in problems else "  "
+                print(f"      {marker} {detail}")
+    return report
+
+
+def existing_indexes(conn):
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+    ).fetchall()
+    return {row[0] for row in rows}
+
+
+def apply_indexes(db_path):
+    """Crea los indices recomendados que falten. Devuelve los nombres creados."""
+    conn = sqlite3.connect(db_path, timeout=PipeSync_DB.BUSY_TIMEOUT_MS / 1000.0)
+    try:
+        before = existing_indexes(conn)
+        created = []
+        for name, table, columns in RECOMMENDED_INDEXES:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})")
+            if name not in before:
+                created.append(name)
+        if created:
+            # Estadisticas para que el planificador elija los indices nuevos
+            conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    return created
+
+
+def create_synthetic_db(db_path, shot_count, seed=1):
+    """Crea una base con el esquema sin migrar y shot_count shots de datos falsos."""
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(SYNTHETIC_SCHEMA)
+        conn.execute("INSERT INTO projects (project_name) VALUES ('BENCH')")
+        task_id = version_id = 0
+        shots, tasks, assigns, versions, notes = [], [], [], [], []
+        for shot_id in range(1, shot_count + 1):
+            shots.append((shot_id, 1, f"BENCH_{shot_id // 100:03d}_{shot_id:05d}"))
+            for task_type in SYNTHETIC_TASK_TYPES:
+                task_id += 1
+                tasks.append((task_id, shot_id, task_type, rnd.choice(("wip", "rev_su", "apr"))))
+                assigns.append((task_id, rnd.choice(("Ana", "Bruno", "Carla", "Dario"))))
+                for number in range(1, SYNTHETIC_VERSIONS_PER_TASK + 1):
+                    version_id += 1
+                    versions.append((version_id, task_id, number, "rev", f"2025-01-{number:02d}"))
+                    for n in range(SYNTHETIC_NOTES_PER_VERSION):
+                        notes.append(
+                            (
+                                version_id,
+                                " ".join(rnd.choices(SYNTHETIC_NOTE_WORDS, k=8)),
+                                rnd.choice(("Sup", "Dir", "Lega")),
+                                f"2025-01-{number:02d} 1{n}:00:00",
+                            )
+                        )
+        conn.executemany("INSERT INTO shots (id, project_id, shot_name) VALUES (?, ?, ?)", shots)
+        conn.executemany(
+            "INSERT INTO tasks (id, shot_id, task_type, task_status) VALUES (?, ?, ?, ?)", tasks
+        )
+        conn.executemany(
+            "INSERT INTO task_assignments (task_id, assigned_to) VALUES (?, ?)", assigns
+        )
+        conn.executemany(
+            "INSERT INTO versions (id, task_id, version_number, status, created_on) VALUES (?, ?, ?, ?, ?)",
+            versions,
+        )
+        # Las notas se insertan mezcladas, como llegan al sincronizar playlists
+        rnd.shuffle(notes)
+        conn.executemany(
+            "INSERT INTO version_notes (version_id, content, created_by, created_on) VALUES (?, ?, ?, ?)",
+            notes,
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _sample_params(conn, kind, rnd):
+    """Devuelve parametros reales de la base para un tipo de consulta."""
+    def pick(sql, count=1):
+        rows = conn.execute(sql + " ORDER BY RANDOM() LIMIT ?", (count,)).fetchall()
+        return [tuple(r) for r in rows]
+
+    if kind == "project_name":
+        return pick("SELECT project_name FROM projects")[0]
+    if kind == "shot_key":
+        return pick("SELECT p.project_name, s.shot_name FROM shots s JOIN projects p ON s.project_id = p.id")[0]
+    if kind == "shot_keys":
+        rows = pick("SELECT p.project_name, s.shot_name FROM shots s JOIN projects p ON s.project_id = p.id", 3)
+        return (rows[0][0],) + tuple(r[1] for r in rows)
+    if kind == "shot_id":
+        return pick("SELECT id FROM shots")[0]
+    if kind == "shot_ids":
+        return tuple(r[0] for r in pick("SELECT id FROM shots", 3))
+    if kind == "task_key":
+        return pick("SELECT shot_id, task_type FROM tasks")[0]
+    if kind == "task_id":
+        return pick("SELECT id FROM tasks")[0]
+    if kind == "task_ids":
+        return tuple(r[0] for r in pick("SELECT id FROM tasks", 3))
+    if kind == "version_id":
+        return pick("SELECT id FROM versions")[0]
+    raise ValueError(f"Tipo de parametro desconocido: {kind}")
+
+
+def benchmark(db_path, iterations=300, seed=1):
+    """Mide la latencia de cada consulta con PipeSync_DB. Devuelve {nombre: (avg_ms, p95_ms)}."""
+    rnd = random.Random(seed)
+    sampler = sqlite3.connect(db_path)
+    try:
+        samples = {
+            name: [_sample_params(sampler, kind, rnd) for _ in range(iterations)]
+            for name, _, kind in HOT_QUERIES
+        }
+    finally:
+        sampler.close()
+
+    # Conexion nueva para que vea el esquema y las estadisticas actuales
+    PipeSync_DB.set_db_path(db_path)
+    results = {}
+    for name, sql, _ in HOT_QUERIES:
+        timings = []
+        for params in samples[name]:
+            start = time.perf_counter()
+            PipeSync_DB.fetch_all(sql, params)
+            timings.append((time.perf_counter() - start) * 1000.0)
+        timings.sort()
+        results[name] = (
+            sum(timings) / len(timings),
+            timings[int(len(timings) * 0.95) - 1],
+        )
+    PipeSync_DB.close_connection()
+    return results
+
+
+def print_benchmark(before, after=None):
+    header = f"  {'consulta':28s} {'avg ms':>9s} {'p95 ms':>9s}"
+    if after:
+        header += f" {'avg ms':>9s} {'p95 ms':>9s} {'mejora':>8s}"
+    print(header)
+    for name, (avg, p95) in before.items():
+        line = f"  {name:28s} {avg:9.3f} {p95:9.3f}"
+        if after:
+            new_avg, new_p95 = after[name]
+            line += f" {new_avg:9.3f} {new_p95:9.3f} {avg / max(new_avg, 1e-6):7.1f}x"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Audita y crea los indices de pipesync.db que usan los scripts LGA."
+    )
+    parser.add_argument("--db_path", help="Ruta a la base (por defecto la de PipeSync).")
+    parser.add_argument(
+        "--apply", action="store_true", help="Crea los indices que falten."
+    )
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        metavar="SHOTS",
+        help="Crea una base sintetica con esa cantidad de shots en --db_path, "
+        "aplica los indices y compara la latencia antes y despues.",
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=300, help="Consultas por tipo en el benchmark."
+    )
+    args = parser.parse_args(argv)
+
+    db_path = args.db_path or PipeSync_DB.get_db_path()
+    if args.synthetic:
+        if not args.db_path:
+            parser.error("--synthetic necesita --db_path para no pisar la base de PipeSync")
+        print(f"Creando base sintetica con {args.synthetic} shots en {db_path}...")
+        create_synthetic_db(db_path, args.synthetic)
+    if not db_path or not os.path.exists(db_path):
+        print(f"No se encontro la base de datos: {db_path}")
+        return 1
+
+    conn = sqlite3.connect(db_path)
+    try:
+        print("Plan de consultas:")
+        report = audit(conn)
+    finally:
+        conn.close()
+    missing = [name for name, problems in report.items() if problems]
+    print(f"{len(missing)} consultas con full scan o sort temporal")
+
+    if not (args.apply or args.synthetic):
+        if missing:
+            print("Ejecutar con --apply para crear los indices recomendados.")
+        return 0
+
+    before = benchmark(db_path, args.iterations) if args.synthetic else None
+    created = apply_indexes(db_path)
+    print(f"Indices creados: {', '.join(created) if created else 'ninguno (ya existian)'}")
+
+    conn = sqlite3.connect(db_path)
+    try:
+        print("Plan de consultas despues de la migracion:")
+        audit(conn)
+    finally:
+        conn.close()
+
+    if before:
+        after = benchmark(db_path, args.iterations)
+        print("Latencia antes / despues:")
+        print_benchmark(before, after)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+"""
+____________________________________________________________________________
+
+  PipeSync_DB_Search | Lega Pugliese
+  Indice de texto completo (SQLite FTS5) sobre version_notes de pipesync.db.
+  Indexa el contenido y el autor de cada nota junto con el proyecto, shot,
+  task y version a los que pertenece. El indice se mantiene con triggers
+  sobre version_notes, asi cada sincronizacion de PipeSync (y cada nota que
+  agrega Push) lo actualiza de forma incremental.
+  Ojo: con los triggers instalados, toda escritura en version_notes necesita
+  un SQLite con FTS5 (el de PipeSync incluido). --install verifica que el
+  SQLite local lo tenga. Si PipeSync recrea la tabla, los triggers se pierden:
+  index_available() lo detecta y la busqueda vuelve a LIKE hasta el proximo
+  --install (que en ese caso reindexa todo).
+
+  Uso:
+    python PipeSync_DB_Search.py --install [--db_path RUTA]   crea el indice
+    python PipeSync_DB_Search.py --rebuild [--db_path RUTA]   lo regenera
+    python PipeSync_DB_Search.py --drop [--db_path RUTA]      lo elimina
+    python PipeSync_DB_Search.py grain edge [--project NOMBRE]  busca
+    python PipeSync_DB_Search.py --benchmark 5000 --db_path /tmp/bench.db
+____________________________________________________________________________
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+import PipeSync_DB
+
+
+FTS_TABLE = "version_notes_fts"
+FTS_TRIGGERS = tuple(f"{FTS_TABLE}_{suffix}" for suffix in ("ai", "ad", "au"))
+
+# Datos del shot, task y version de una nota (new.* dentro de los triggers)
+_NOTE_CONTEXT_SELECT = """
+    SELECT {note}.id, {note}.content, {note}.created_by,
+           p.project_name, s.shot_name, t.task_type, v.version_number
+    FROM versions v
+    JOIN tasks t ON v.task_id = t.id
+    JOIN shots s ON t.shot_id = s.id
+    JOIN projects p ON s.project_id = p.id
+"""
+
+FTS_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        content,
+        created_by,
+        project_name,
+        shot_name,
+        task_type,
+        version_number UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON version_notes BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, content, created_by, project_name, shot_name, task_type, version_number)
+        {_NOTE_CONTEXT_SELECT.format(note="new")}
+        WHERE v.id = new.version_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON version_notes BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON version_notes BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE} (rowid, content, created_by, project_name, shot_name, task_type, version_number)
+        {_NOTE_CONTEXT_SELECT.format(note="new")}
+        WHERE v.id = new.version_id;
+    END
+    """,
+]
+
+DEFAULT_LIMIT = 200
+
+# Mismo orden con y sin indice: las notas mas nuevas primero
+RESULTS_ORDER = "ORDER BY n.created_on DESC, n.id DESC"
+
+
+def debug_print(message):
+    PipeSync_DB.debug_print(f"[Search] {message}")
+
+
+def _write_connection(db_path):
+    return sqlite3.connect(db_path, timeout=PipeSync_DB.BUSY_TIMEOUT_MS / 1000.0)
+
+
+def fts5_supported(conn):
+    """True si el SQLite de esta conexion tiene el modulo FTS5."""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def _installed_objects(conn):
+    """Nombres de la tabla FTS y de los triggers que existen en la base."""
+    rows = conn.execute(
+        f"""
+        SELECT name FROM sqlite_master
+        WHERE (type = 'table' AND name = ?)
+           OR (type = 'trigger' AND name IN ({','.join('?' * len(FTS_TRIGGERS))}))
+        """,
+        (FTS_TABLE,) + FTS_TRIGGERS,
+    ).fetchall()
+    return {row[0] for row in rows}
+
+
+def _populate(conn):
+    conn.execute(f"DELETE FROM {FTS_TABLE}")
+    conn.execute(
+        f"""
+        INSERT INTO {FTS_TABLE} (rowid, content, created_by, project_name, shot_name, task_type, version_number)
+        {_NOTE_CONTEXT_SELECT.format(note="n")}
+        JOIN version_notes n ON n.version_id = v.id
+        """
+    )
+    conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+
+
+def install_index(db_path=None, rebuild=False):
+    """
+    Crea la tabla FTS5 y los triggers (idempotente). La primera vez, con
+    rebuild=True o si faltaba algun trigger (el indice pudo quedar viejo),
+    indexa todas las notas existentes. Devuelve las notas indexadas.
+    RuntimeError si este SQLite no tiene FTS5.
+    """
+    db_path = db_path or PipeSync_DB.get_db_path()
+    conn = _write_connection(db_path)
+    try:
+        if not fts5_supported(conn):
+            raise RuntimeError(
+                f"El SQLite {sqlite3.sqlite_version} no tiene FTS5: no se instala el indice"
+            )
+        complete = len(_installed_objects(conn)) == 1 + len(FTS_TRIGGERS)
+        with conn:
+            for sql in FTS_SCHEMA:
+                conn.execute(sql)
+            if rebuild or not complete:
+                _populate(conn)
+        count = conn.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}").fetchone()[0]
+    finally:
+        conn.close()
+    PipeSync_DB.record_cache.clear()
+    return count
+
+
+def drop_index(db_path=None):
+    """Elimina la tabla FTS5 y sus triggers."""
+    db_path = db_path or PipeSync_DB.get_db_path()
+    conn = _write_connection(db_path)
+    try:
+        with conn:
+            for trigger in FTS_TRIGGERS:
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            conn.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    finally:
+        conn.close()
+
+
+def _check_index():
+    conn = PipeSync_DB.get_connection(readonly=True)
+    if conn is None:
+        return False
+    installed = _installed_objects(conn)
+    if FTS_TABLE in installed and len(installed) < 1 + len(FTS_TRIGGERS):
+        debug_print("Faltan triggers del indice FTS (PipeSync recreo la tabla?), se usa LIKE")
+        return False
+    return len(installed) == 1 + len(FTS_TRIGGERS)
+
+
+def index_available():
+    """
+    True si la base tiene la tabla FTS y sus tres triggers (sin los triggers el
+    indice deja de actualizarse). Se cachea hasta el proximo sync.
+    """
+    return PipeSync_DB.record_cache.get("search", "fts_available", _check_index)
+
+
+def build_match_query(text):
+    """
+    Convierte el texto del usuario en una consulta FTS5: cada palabra se busca
+    como prefijo y todas deben aparecer ("gra edg" -> "gra"* "edg"*).
+    """
+    tokens = re.findall(r"\w+", text or "", re.UNICODE)
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_notes(text, project_name=None, limit=DEFAULT_LIMIT):
+    """
+    Busca notas por contenido, autor, shot o task. Devuelve una lista de dicts,
+    las notas mas nuevas primero, con note_id, project_name, shot_name, task_type,
+    version_number, created_by, created_on y snippet.
+    """
+    match = build_match_query(text)
+    if not match:
+        return []
+    if not index_available():
+        debug_print("Indice FTS no instalado, se usa LIKE")
+        return _search_notes_like(text, project_name, limit)
+
+    sql = f"""
+        SELECT {FTS_TABLE}.rowid AS note_id, {FTS_TABLE}.project_name,
+               {FTS_TABLE}.shot_name, {FTS_TABLE}.task_type,
+               {FTS_TABLE}.version_number, {FTS_TABLE}.created_by,
+               n.created_on,
+               snippet({FTS_TABLE}, 0, '[', ']', '...', 16) AS snippet
+        FROM {FTS_TABLE}
+        JOIN version_notes n ON n.id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH ?
+    """
+    params = [match]
+    if project_name:
+        sql += f" AND {FTS_TABLE}.project_name = ?"
+        params.append(project_name)
+    # Se ordena por fecha como la busqueda LIKE y no por rank: puntuar todas las
+    # coincidencias es x30 mas lento en terminos comunes
+    sql += f" {RESULTS_ORDER} LIMIT ?"
+    params.append(limit)
+    try:
+        rows = PipeSync_DB.fetch_all(sql, params)
+    except sqlite3.OperationalError as e:
+        # Por ejemplo un SQLite sin FTS5 leyendo una base con el indice instalado
+        debug_print(f"Busqueda FTS fallida ({e}), se usa LIKE")
+        return _search_notes_like(text, project_name, limit)
+    return [dict(row) for row in rows]
+
+
+def _search_notes_like(text, project_name, limit):
+    """Busqueda sin indice (recorre version_notes). Solo para bases sin --install."""
+    tokens = re.findall(r"\w+", text or "", re.UNICODE)
+    sql = """
+        SELECT n.id AS note_id, p.project_name, s.shot_name, t.task_type,
+               v.version_number, n.created_by, n.created_on, n.content AS snippet
+        FROM version_notes n
+        JOIN versions v ON n.version_id = v.id
+        JOIN tasks t ON v.task_id = t.id
+        JOIN shots s ON t.shot_id = s.id
+        JOIN projects p ON s.project_id = p.id
+        WHERE 1 = 1
+    """
+    params = []
+    for token in tokens:
+        sql += " AND (n.content LIKE ? OR n.created_by LIKE ? OR s.shot_name LIKE ?)"
+        params.extend([f"%{token}%"] * 3)
+    if project_name:
+        sql += " AND p.project_name = ?"
+        params.append(project_name)
+    sql += f" {RESULTS_ORDER} LIMIT ?"
+    params.append(limit)
+    return [dict(row) for row in PipeSync_DB.fetch_all(sql, params)]
+
+
+def benchmark(db_path, shot_count, queries=("grain", "edge matte", "ruido bor", "despill halo sky")):
+    """Crea una base sintetica, instala el indice y mide las busquedas."""
+    import PipeSync_DB_Indexes
+
+    print(f"Creando base sintetica con {shot_count} shots en {db_path}...")
+    PipeSync_DB_Indexes.create_synthetic_db(db_path, shot_count)
+    PipeSync_DB_Indexes.apply_indexes(db_path)
+    start = time.perf_counter()
+    count = install_index(db_path)
+    print(f"{count} notas indexadas en {time.perf_counter() - start:.2f} s")
+
+    PipeSync_DB.set_db_path(db_path)
+    print(f"  {'consulta':20s} {'fts ms':>9s} {'like ms':>9s} {'filas':>6s}")
+    for text in queries:
+        start = time.perf_counter()
+        results = search_notes(text)
+        fts_ms = (time.perf_counter() - start) * 1000.0
+        start = time.perf_counter()
+        _search_notes_like(text, None, DEFAULT_LIMIT)
+        like_ms = (time.perf_counter() - start) * 1000.0
+        print(f"  {text:20s} {fts_ms:9.2f} {like_ms:9.2f} {len(results):6d}")
+    PipeSync_DB.close_connection()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Indice de texto completo sobre las notas de pipesync.db."
+    )
+    parser.add_argument("terms", nargs="*", help="Texto a buscar.")
+    parser.add_argument("--db_path", help="Ruta a la base (por defecto la de PipeSync).")
+    parser.add_argument("--project", help="Limitar la busqueda a un proyecto.")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--install", action="store_true", help="Crea el indice y los triggers.")
+    group.add_argument("--rebuild", action="store_true", help="Vuelve a indexar todas las notas.")
+    group.add_argument("--drop", action="store_true", help="Elimina el indice y los triggers.")
+    group.add_argument(
+        "--benchmark",
+        type=int,
+        metavar="SHOTS",
+        help="Crea una base sintetica en --db_path y mide las busquedas.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        if not args.db_path:
+            parser.error("--benchmark necesita --db_path para no pisar la base de PipeSync")
+        benchmark(args.db_path, args.benchmark)
+        return 0
+
+    db_path = args.db_path or PipeSync_DB.get_db_path()
+    if not db_path or not os.path.exists(db_path):
+        print(f"No se encontro la base de datos: {db_path}")
+        return 1
+
+    if args.install or args.rebuild:
+        try:
+            count = install_index(db_path, rebuild=args.rebuild)
+        except RuntimeError as e:
+            print(e)
+            return 1
+        print(f"Indice {FTS_TABLE} listo: {count} notas")
+    elif args.drop:
+        drop_index(db_path)
+        print(f"Indice {FTS_TABLE} eliminado")
+
+    if args.terms:
+        PipeSync_DB.set_db_path(db_path)
+        start = time.perf_counter()
+        results = search_notes(" ".join(args.terms), args.project, args.limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        for r in results:
+            print(
+                f"{r['shot_name']} {r['task_type']} v{r['version_number']:03d} "
+                f"{r['created_by'] or ''}: {r['snippet']}"
+            )
+        print(f"{len(results)} notas en {elapsed_ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+"""
+____________________________________________________________________________
+
+  PipeSync_Outbox | Lega Pugliese
+  Cola persistente (outbox) de las operaciones que Push manda a Flow.
+  El boton del panel solo guarda la operacion en push_outbox.db (junto a
+  pipesync.db) y vuelve; un hilo en segundo plano la envia a Flow en
+  tandas, reintenta con espera creciente si Flow no responde y sobrevive
+  a un cierre de Hiero: lo que queda pendiente se manda en la proxima
+  sesion, cuando se carga el panel de Flow (resume_outbox de Push).
+  Varios cambios de estado seguidos sobre la misma task se juntan en uno
+  solo (el ultimo) mientras sigan pendientes.
+
+  Uso:
+    python PipeSync_Outbox.py                    lista las operaciones en cola
+    python PipeSync_Outbox.py --retry_failed     vuelve a encolar las fallidas
+    python PipeSync_Outbox.py --outbox_path RUTA usa otra base de la cola
+____________________________________________________________________________
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+import PipeSync_DB
+
+
+OUTBOX_DB_NAME = "push_outbox.db"
+
+# Operaciones que el flusher toma de la cola en cada tanda
+FLUSH_BATCH_SIZE = 20
+# Intentos antes de dejar una operacion como fallida
+MAX_ATTEMPTS = 8
+# Espera entre reintentos: RETRY_BASE_SECONDS * 2^(intentos-1), hasta RETRY_MAX_SECONDS
+RETRY_BASE_SECONDS = 5.0
+RETRY_MAX_SECONDS = 600.0
+
+OUTBOX_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS push_outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_key TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        coalescible INTEGER NOT NULL DEFAULT 1,
+        state TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL DEFAULT 0,
+        last_error TEXT,
+        created_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS push_outbox_state
+        ON push_outbox (state, next_attempt_at);
+"""
+
+_outbox_path = None
+_path_lock = threading.Lock()
+_local = threading.local()
+
+# Flusher: un solo hilo por proceso, despertado por enqueue()
+_flusher_lock = threading.Lock()
+_flusher_thread = None
+_flusher_wake = threading.Event()
+_sender = None
+
+
+def debug_print(message):
+    PipeSync_DB.debug_print(f"[Outbox] {message}")
+
+
+def get_outbox_path():
+    """Ruta de push_outbox.db: junto a pipesync.db, o en Data si no hay ruta para este sistema."""
+    global _outbox_path
+    with _path_lock:
+        if _outbox_path is None:
+            _outbox_path = PipeSync_DB.sibling_path(OUTBOX_DB_NAME)
+        return _outbox_path
+
+
+def set_outbox_path(outbox_path):
+    """Fuerza la ruta de la cola (diagnostico y pruebas)."""
+    global _outbox_path
+    close_connection()
+    with _path_lock:
+        _outbox_path = outbox_path
+
+
+def _connection():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(
+            get_outbox_path(), timeout=PipeSync_DB.BUSY_TIMEOUT_MS / 1000.0
+        )
+        conn.row_factory = sqlite3.Row
+        # La base es nuestra: WAL + synchronous NORMAL hace que guardar una
+        # operacion cueste microsegundos y siga sobreviviendo a un cierre de Hiero
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.executescript(OUTBOX_SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def close_connection():
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        try:
+            conn.close()
+        finally:
+            _local.conn = None
+
+
+def _row_to_operation(row):
+    operation = json.loads(row["payload"])
+    operation["id"] = row["id"]
+    operation["attempts"] = row["attempts"]
+    return operation
+
+
+def enqueue(task_key, payload, coalescible=True):
+    """
+    Guarda una operacion y despierta al flusher. Si coalescible, descarta las
+    operaciones pendientes de la misma task que tambien lo sean (solo cambios
+    de estado: la nueva las reemplaza). Devuelve el id de la operacion.
+    """
+    conn = _connection()
+    with conn:
+        if coalescible:
+            replaced = conn.execute(
+                """
+                DELETE FROM push_outbox
+                WHERE task_key = ? AND state = 'pending' AND coalescible = 1
+                """,
+                (task_key,),
+            ).rowcount
+            if replaced:
+                debug_print(f"{replaced} operacion(es) reemplazada(s) para {task_key}")
+        op_id = conn.execute(
+            """
+            INSERT INTO push_outbox (task_key, payload, coalescible, created_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            (task_key, json.dumps(payload), 1 if coalescible else 0, time.time()),
+        ).lastrowid
+    _flusher_wake.set()
+    return op_id
+
+
+def claim_batch(limit=FLUSH_BATCH_SIZE):
+    """
+    Toma hasta limit operaciones listas para enviar (en orden) y las marca como
+    'sending'. Una operacion no se adelanta a otra anterior de la misma task
+    que todavia esta esperando un reintento.
+    """
+    now = time.time()
+    conn = _connection()
+    with conn:
+        rows = conn.execute(
+            "SELECT * FROM push_outbox WHERE state = 'pending' ORDER BY id"
+        ).fetchall()
+        blocked = set()
+        batch = []
+        for row in rows:
+            if row["task_key"] in blocked:
+                continue
+            if row["next_attempt_at"] > now:
+                blocked.add(row["task_key"])
+                continue
+            batch.append(row)
+            if len(batch) >= limit:
+                break
+        conn.executemany(
+            "UPDATE push_outbox SET state = 'sending' WHERE id = ?",
+            [(row["id"],) for row in batch],
+        )
+    return [_row_to_operation(row) for row in batch]
+
+
+def mark_done(op_id):
+    conn = _connection()
+    with conn:
+        conn.execute("DELETE FROM push_outbox WHERE id = ?", (op_id,))
+
+
+def mark_failed(op_id, error):
+    """Programa un reintento, o deja la operacion como 'failed' tras MAX_ATTEMPTS."""
+    conn = _connection()
+    with conn:
+        row = conn.execute(
+            "SELECT attempts FROM push_outbox WHERE id = ?", (op_id,)
+        ).fetchone()
+        if row is None:
+            return
+        attempts = row["attempts"] + 1
+        delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+        state = "failed" if attempts >= MAX_ATTEMPTS else "pending"
+        conn.execute(
+            """
+            UPDATE push_outbox
+            SET state = ?, attempts = ?, next_attempt_at = ?, last_error = ?
+            WHERE id = ?
+            """,
+            (state, attempts, time.time() + delay, str(error), op_id),
+        )
+    debug_print(f"Operacion {op_id} fallo (intento {attempts}, {state}): {error}")
+
+
+def recover_interrupted():
+    """Las operaciones que quedaron en 'sending' (Hiero se cerro a mitad de envio) vuelven a la cola."""
+    conn = _connection()
+    with conn:
+        return conn.execute(
+            "UPDATE push_outbox SET state = 'pending' WHERE state = 'sending'"
+        ).rowcount
+
+
+def retry_failed():
+    conn = _connection()
+    with conn:
+        count = conn.execute(
+            """
+            UPDATE push_outbox SET state = 'pending', attempts = 0, next_attempt_at = 0
+            WHERE state = 'failed'
+            """
+        ).rowcount
+    _flusher_wake.set()
+    return count
+
+
+def list_operations(state=None):
+    conn = _connection()
+    if state:
+        rows = conn.execute(
+            "SELECT * FROM push_outbox WHERE state = ? ORDER BY id", (state,)
+        ).fetchall()
+    else:
+        rows = conn.execute("SELECT * FROM push_outbox ORDER BY id").fetchall()
+    operations = []
+    for row in rows:
+        operation = _row_to_operation(row)
+        operation["state"] = row["state"]
+        operation["last_error"] = row["last_error"]
+        operations.append(operation)
+    return operations
+
+
+def pending_count():
+    row = _connection().execute(
+        "SELECT COUNT(*) FROM push_outbox WHERE state IN ('pending', 'sending')"
+    ).fetchone()
+    return row[0]
+
+
+def _next_due_in():
+    """Segundos hasta la proxima operacion pendiente, o None si no hay ninguna."""
+    row = (
+        _connection()
+        .execute(
+            "SELECT MIN(next_attempt_at) FROM push_outbox WHERE state = 'pending'"
+        )
+        .fetchone()
+    )
+    if row[0] is None:
+        return None
+    return max(0.0, row[0] - time.time())
+
+
+def _flusher_loop():
+    recovered = recover_interrupted()
+    if recovered:
+        debug_print(f"{recovered} operacion(es) interrumpidas vuelven a la cola")
+    while True:
+        _flusher_wake.clear()
+        try:
+            batch = claim_batch()
+        except sqlite3.Error as e:
+            debug_print(f"Error leyendo la cola: {e}")
+            batch = []
+        if batch:
+            try:
+                results = _sender(batch)
+            except Exception as e:
+                # Sin conexion a Flow (o error inesperado): toda la tanda se reintenta
+                results = {operation["id"]: e for operation in batch}
+            for operation in batch:
+                error = results.get(operation["id"])
+                if error is None:
+                    mark_done(operation["id"])
+                else:
+                    mark_failed(operation["id"], error)
+            continue
+        try:
+            wait = _next_due_in()
+        except sqlite3.Error:
+            wait = RETRY_BASE_SECONDS
+        # Sin nada pendiente se duerme hasta el proximo enqueue()
+        _flusher_wake.wait(wait)
+
+
+def start_flusher(sender):
+    """
+    Registra la funcion que envia las tandas y arranca el hilo si no corre.
+    sender(operations) recibe una lista de operaciones (payload + "id") y
+    devuelve {id: error} solo para las que fallaron y deben reintentarse.
+    Push se vuelve a cargar en cada click, asi que siempre se usa el ultimo sender.
+    """
+    global _sender, _flusher_thread
+    with _flusher_lock:
+        _sender = sender
+        if _flusher_thread is None or not _flusher_thread.is_alive():
+            _flusher_thread = threading.Thread(
+                target=_flusher_loop, name="PipeSync_Outbox", daemon=True
+            )
+            _flusher_thread.start()
+    _flusher_wake.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cola de operaciones de Push")
+    parser.add_argument("--outbox_path", help="Ruta de push_outbox.db")
+    parser.add_argument(
+        "--retry_failed", action="store_true", help="Vuelve a encolar las fallidas"
+    )
+    args = parser.parse_args()
+    if args.outbox_path:
+        set_outbox_path(args.outbox_path)
+    if args.retry_failed:
+        print(f"Operaciones reencoladas: {retry_failed()}")
+    operations = list_operations()
+    print(f"{get_outbox_path()}: {len(operations)} operacion(es)")
+    for operation in operations:
+        print(
+            f"  #{operation['id']} [{operation['state']}] intentos={operation['attempts']}"
+            f" {operation.get('button_name')} {operation.get('base_name')}"
+            + (f" -> {operation['last_error']}" if operation["last_error"] else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 """
 ____________________________________________________________________________________
 
-  LGA_NKS_Flow_Assignee_Panel v1.50 | Lega Pugliese
+  LGA_NKS_Flow_Assignee_Panel v1.52 | Lega Pugliese
   Panel para obtener los asignados de la tarea del clip seleccionado en Flow,
   limpiarlos o sumar asignados a la tarea comp.
+  Asignar y limpiar actuan sobre todos los clips seleccionados en un solo
+  batch a Flow.
 ____________________________________________________________________________________
 """
 
@@ -23,6 +25,10 @@ from PySide2.QtWidgets import (
 from PySide2.QtCore import Qt
 from PySide2.QtGui import QColor, QKeySequence
 
+# Parser de nombres compartido
+sys.path.append(os.path.join(os.path.dirname(__file__), "LGA_NKS"))
+import LGA_NKS_NameParser as NameParser
+
 
 # Clase de botón personalizada que maneja el Shift+Click y Ctrl+Shift+Click
 class CustomButton(QPushButton):
@@ -266,16 +272,8 @@ class AssigneePanel(QWidget):
             self.create_buttons()
 
     def parse_exr_name(self, exr_name):
-        # Ajustar el manejo del formato del nombre del archivo EXR
-        if "%04d" in exr_name:
-            exr_name = exr_name.replace(".%", "_%")  # Reemplazar patron para analisis
-        parts = exr_name.split("_")
-        if len(parts) < 7 or not parts[-2].startswith("v"):
-            raise ValueError(
-                f"Nombre del archivo EXR no tiene el formato esperado: {exr_name}"
-            )
-        base_name = "_".join(parts[:-1])
-        return base_name
+        # Nombre base con version ("..._comp_v003"); ValueError si no es un EXR del estudio
+        return NameParser.strict_exr_base(exr_name)
 
     def get_assignees_for_selected_clip(self):
         seq = hiero.ui.activeSequence()
@@ -337,38 +335,58 @@ class AssigneePanel(QWidget):
         except Exception as e:
             QMessageBox.warning(self, "Error al ejecutar", str(e))
 
-    def clear_assignees_for_selected_clip(self):
+    def get_selected_base_names(self):
+        """
+        Nombres base de todos los clips seleccionados (sin repetir, en orden).
+        Avisa una sola vez por los clips sin media o con nombre incorrecto.
+        """
         seq = hiero.ui.activeSequence()
         if not seq:
+            debug_print("No hay secuencia activa")
             QMessageBox.warning(self, "No Sequence", "No hay una secuencia activa.")
-            return
+            return []
         te = hiero.ui.getTimelineEditor(seq)
         selected_items = te.selection()
         if not selected_items:
+            debug_print("No hay items seleccionados")
             QMessageBox.warning(
                 self, "No Selection", "Selecciona un clip en el timeline."
             )
-            return
+            return []
+        debug_print(f"Procesando {len(selected_items)} items seleccionados")
+        base_names = []
+        problems = []
         for item in selected_items:
-            if not isinstance(item, hiero.core.EffectTrackItem):
-                if item.source().mediaSource().isMediaPresent():
-                    fileinfos = item.source().mediaSource().fileinfos()
-                    if not fileinfos:
-                        continue
-                    file_path = fileinfos[0].filename()
-                    exr_name = os.path.basename(file_path)
-                    exr_name = exr_name.replace(".%", "_%")
-                    try:
-                        base_name = self.parse_exr_name(exr_name)
-                        self.call_clear_assignees_script(base_name)
-                    except Exception as e:
-                        QMessageBox.warning(self, "Formato Incorrecto", str(e))
-                else:
-                    QMessageBox.warning(
-                        self, "Media Missing", "El clip no tiene media presente."
-                    )
+            if isinstance(item, hiero.core.EffectTrackItem):
+                continue
+            if not item.source().mediaSource().isMediaPresent():
+                debug_print("El clip no tiene media presente")
+                problems.append(f"{item.name()}: el clip no tiene media presente.")
+                continue
+            fileinfos = item.source().mediaSource().fileinfos()
+            if not fileinfos:
+                debug_print("No hay fileinfos para este item")
+                continue
+            exr_name = os.path.basename(fileinfos[0].filename())
+            exr_name = exr_name.replace(".%", "_%")
+            try:
+                base_name = self.parse_exr_name(exr_name)
+            except Exception as e:
+                debug_print(f"Error parseando nombre: {e}")
+                problems.append(str(e))
+                continue
+            if base_name not in base_names:
+                base_names.append(base_name)
+        if problems:
+            QMessageBox.warning(self, "Clips omitidos", "\n".join(problems))
+        return base_names
+
+    def clear_assignees_for_selected_clip(self):
+        base_names = self.get_selected_base_names()
+        if base_names:
+            self.call_clear_assignees_script(base_names)
 
-    def call_clear_assignees_script(self, base_name):
+    def call_clear_assignees_script(self, base_names):
         script_path = os.path.join(
             os.path.dirname(__file__), "LGA_NKS_Flow", "LGA_NKS_Flow_Clear_Assignees.py"
         )
@@ -391,8 +409,11 @@ class AssigneePanel(QWidget):
                 )
             module = importlib.util.module_from_spec(spec)
             spec.loader.exec_module(module)
-            # Llamar a la función principal pasando el base_name
-            module.clear_task_assignees_from_base_name(base_name)
+            # Un clip usa la ventana detallada; varios van en un solo batch
+            if len(base_names) == 1:
+                module.clear_task_assignees_from_base_name(base_names[0])
+            else:
+                module.clear_task_assignees_from_base_names(base_names)
         except Exception as e:
             QMessageBox.warning(self, "Error al ejecutar", str(e))
 
@@ -400,50 +421,16 @@ class AssigneePanel(QWidget):
         debug_print(
             f"=== assign_assignee_for_selected_clip llamado con user_name: {user_name} ==="
         )
-        seq = hiero.ui.activeSequence()
-        if not seq:
-            debug_print("No hay secuencia activa")
-            QMessageBox.warning(self, "No Sequence", "No hay una secuencia activa.")
-            return
-        te = hiero.ui.getTimelineEditor(seq)
-        selected_items = te.selection()
-        if not selected_items:
-            debug_print("No hay items seleccionados")
-            QMessageBox.warning(
-                self, "No Selection", "Selecciona un clip en el timeline."
+        base_names = self.get_selected_base_names()
+        if base_names:
+            debug_print(
+                f"Llamando call_assign_assignee_script con {len(base_names)} clips y user_name: {user_name}"
             )
-            return
-        debug_print(f"Procesando {len(selected_items)} items seleccionados")
-        for item in selected_items:
-            if not isinstance(item, hiero.core.EffectTrackItem):
-                if item.source().mediaSource().isMediaPresent():
-                    fileinfos = item.source().mediaSource().fileinfos()
-                    if not fileinfos:
-                        debug_print("No hay fileinfos para este item")
-                        continue
-                    file_path = fileinfos[0].filename()
-                    exr_name = os.path.basename(file_path)
-                    exr_name = exr_name.replace(".%", "_%")
-                    debug_print(f"Procesando archivo: {exr_name}")
-                    try:
-                        base_name = self.parse_exr_name(exr_name)
-                        debug_print(f"Base name extraido: {base_name}")
-                        debug_print(
-                            f"Llamando call_assign_assignee_script con user_name: {user_name}"
-                        )
-                        self.call_assign_assignee_script(base_name, user_name)
-                    except Exception as e:
-                        debug_print(f"Error parseando nombre: {e}")
-                        QMessageBox.warning(self, "Formato Incorrecto", str(e))
-                else:
-                    debug_print("El clip no tiene media presente")
-                    QMessageBox.warning(
-                        self, "Media Missing", "El clip no tiene media presente."
-                    )
+            self.call_assign_assignee_script(base_names, user_name)
 
-    def call_assign_assignee_script(self, base_name, user_name):
+    def call_assign_assignee_script(self, base_names, user_name):
         debug_print(f"=== call_assign_assignee_script llamado ===")
-        debug_print(f"base_name: {base_name}")
+        debug_print(f"base_names: {base_names}")
         debug_print(f"user_name: {user_name}")
         debug_print(f"Tipo de user_name: {type(user_name)}")
 
@@ -472,11 +459,17 @@ class AssigneePanel(QWidget):
                 )
             module = importlib.util.module_from_spec(spec)
             spec.loader.exec_module(module)
-            # Llamar a la función principal pasando el base_name y el nombre del usuario
-            debug_print(
-                f"Llamando assign_assignee_to_task con: '{base_name}', '{user_name}'"
-            )
-            module.assign_assignee_to_task(base_name, user_name)
+            # Un clip usa la ventana detallada; varios van en un solo batch
+            if len(base_names) == 1:
+                debug_print(
+                    f"Llamando assign_assignee_to_task con: '{base_names[0]}', '{user_name}'"
+                )
+                module.assign_assignee_to_task(base_names[0], user_name)
+            else:
+                debug_print(
+                    f"Llamando assign_assignee_to_tasks con {len(base_names)} clips, '{user_name}'"
+                )
+                module.assign_assignee_to_tasks(base_names, user_name)
         except Exception as e:
             debug_print(f"Error ejecutando script: {e}")
             QMessageBox.warning(self, "Error al ejecutar", str(e))
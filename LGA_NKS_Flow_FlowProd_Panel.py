@@ -1,7 +1,7 @@
 """
 ____________________________________________________________________________________
 
-  LGA_NKS_Flow_FlowProd_Panel v1.0 | Lega Pugliese
+  LGA_NKS_Flow_FlowProd_Panel v1.1 | Lega Pugliese
   Panel para operaciones de producción con Flow:
   - Revelar clips en Flow
   - Crear shots automáticamente
@@ -23,6 +23,10 @@ from PySide2.QtWidgets import (
 from PySide2.QtCore import Qt
 from PySide2.QtGui import QColor, QKeySequence
 
+# Parser de nombres compartido
+sys.path.append(os.path.join(os.path.dirname(__file__), "LGA_NKS"))
+import LGA_NKS_NameParser as NameParser
+
 
 # Variable global para activar o desactivar los prints
 DEBUG = False
@@ -129,16 +133,8 @@ class FlowProdPanel(QWidget):
             self.create_buttons()
 
     def parse_exr_name(self, exr_name):
-        # Ajustar el manejo del formato del nombre del archivo EXR
-        if "%04d" in exr_name:
-            exr_name = exr_name.replace(".%", "_%")  # Reemplazar patron para analisis
-        parts = exr_name.split("_")
-        if len(parts) < 7 or not parts[-2].startswith("v"):
-            raise ValueError(
-                f"Nombre del archivo EXR no tiene el formato esperado: {exr_name}"
-            )
-        base_name = "_".join(parts[:-1])
-        return base_name
+        # Nombre base con version ("..._comp_v003"); ValueError si no es un EXR del estudio
+        return NameParser.strict_exr_base(exr_name)
 
     def show_in_flow_for_selected_clip(self):
         """Llama al script Show in Flow para abrir la task comp en Chrome"""
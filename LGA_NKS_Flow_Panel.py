@@ -1,7 +1,7 @@
 """
 ____________________________________________________________________________________
 
-  LGA_NKS_Flow_Panel v2.45 | Lega Pugliese
+  LGA_NKS_Flow_Panel v2.48 | Lega Pugliese
   Panel con herramientas que interactuan con las tasks de Flow Production Tracking
   que fueron descargadas previamente con la app LGA_NKS_Flow_Downloader
 ____________________________________________________________________________________
@@ -20,7 +20,11 @@ from PySide2.QtWidgets import (
     QMessageBox,
 )
 from PySide2.QtGui import QColor, QKeySequence
-from PySide2.QtCore import Qt
+from PySide2.QtCore import Qt, QTimer
+
+# Parser de nombres compartido
+sys.path.append(os.path.join(os.path.dirname(__file__), "LGA_NKS"))
+import LGA_NKS_NameParser as NameParser
 
 
 # Variable global para activar o desactivar los prints
@@ -81,6 +85,12 @@ class ColorChangeWidget(QWidget):
                 "action": "shot_info",
                 "shortcut": "Shift+T",
             },
+            {
+                "name": "Search Notes",
+                "color": None,
+                "style": "#1f1f1f",
+                "action": "notes_search",
+            },
             {
                 "name": "Review Pic",
                 "color": None,
@@ -151,6 +161,10 @@ class ColorChangeWidget(QWidget):
         self.adjust_columns_on_resize()
         self.resizeEvent = self.adjust_columns_on_resize
 
+        # Mandar lo que quedo en la cola de Push de la sesion anterior, sin
+        # demorar la carga del panel
+        QTimer.singleShot(0, self.resume_push_outbox)
+
     def create_buttons(self):
         for index, button_info in enumerate(self.buttons):
             name = button_info["name"]
@@ -168,6 +182,8 @@ class ColorChangeWidget(QWidget):
                 button.setShiftClickHandler(self.run_FPT_pull_with_deselect)
             elif action == "review_pic":
                 button.clicked.connect(self.run_review_pic_script)
+            elif action == "notes_search":
+                button.clicked.connect(self.run_notes_search_script)
             elif action == "shot_info":
                 button.clicked.connect(self.run_shot_info_script)
                 if "shortcut" in button_info:
@@ -340,6 +356,31 @@ class ColorChangeWidget(QWidget):
         except Exception as e:
             debug_print(f"Error al ejecutar el script ReviewPic: {e}")
 
+    #### Search Notes
+    def run_notes_search_script(self):
+        try:
+            script_path = os.path.join(
+                os.path.dirname(__file__),
+                "LGA_NKS_Flow",
+                "LGA_NKS_Flow_Notes_Search.py",
+            )
+            if os.path.exists(script_path):
+                import importlib.util
+
+                spec = importlib.util.spec_from_file_location(
+                    "LGA_NKS_Flow_Notes_Search", script_path
+                )
+                if spec is not None and spec.loader is not None:
+                    module = importlib.util.module_from_spec(spec)
+                    spec.loader.exec_module(module)
+                    module.main()
+                    # Mantener el modulo vivo para que la ventana no se destruya
+                    self.notes_search_module = module
+            else:
+                debug_print(f"Script no encontrado en la ruta: {script_path}")
+        except Exception as e:
+            debug_print(f"Error al ejecutar el script Notes Search: {e}")
+
     #### Push
     def handle_color_button_click(self, color, button_name):
         def button_click_handler(_):
@@ -352,19 +393,8 @@ class ColorChangeWidget(QWidget):
         return button_click_handler
 
     def parse_exr_name(self, exr_name):
-        # Ajustar el manejo del formato del nombre del archivo EXR
-        if "%04d" in exr_name:
-            exr_name = exr_name.replace(".%", "_%")  # Reemplazar patron para analisis
-
-        parts = exr_name.split("_")
-        if len(parts) < 7 or not parts[-2].startswith("v"):
-            raise ValueError(
-                f"Nombre del archivo EXR no tiene el formato esperado: {exr_name}"
-            )
-        base_name = "_".join(
-            parts[:-1]
-        )  # Todas las partes excepto la ultima forman el base_name
-        return base_name
+        # Nombre base con version ("..._comp_v003"); ValueError si no es un EXR del estudio
+        return NameParser.strict_exr_base(exr_name)
 
     def push_task_status(self, button_name, base_name, update_callback=None):
         try:
@@ -401,6 +431,26 @@ class ColorChangeWidget(QWidget):
             debug_print(f"Error durante la operacion de push: {e}")
             return False
 
+    def resume_push_outbox(self):
+        script_path = os.path.join(
+            os.path.dirname(__file__), "LGA_NKS_Flow", "LGA_NKS_Flow_Push.py"
+        )
+        if not os.path.exists(script_path):
+            debug_print(f"Script no encontrado en la ruta: {script_path}")
+            return
+        try:
+            import importlib.util
+
+            spec = importlib.util.spec_from_file_location(
+                "LGA_NKS_Flow_Push", script_path
+            )
+            if spec is not None and spec.loader is not None:
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                module.resume_outbox()
+        except Exception as e:
+            debug_print(f"Error al retomar la cola de Push: {e}")
+
     def change_clip_color_and_push_status(self, color, button_name):
         try:
             seq = hiero.ui.activeSequence()